@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 表达式自动补全前缀树
+比较逐条扫描历史表达式与前缀树查询的耗时
+用法：python benchmarks/bench_autocomplete.py [不同表达式数]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.expression_trie import ExpressionTrie
+
+
+def make_counts(unique):
+    """生成测试表达式及其使用次数（少数表达式被频繁使用）"""
+    rng = random.Random(42)
+    counts = {}
+    while len(counts) < unique:
+        expression = f"{rng.randint(1, 999)}×{rng.randint(1, 99)}+{rng.randint(1, 9)}÷{rng.randint(1, 9)}"
+        counts[expression] = int(rng.paretovariate(1.2))
+    return counts
+
+
+def scan_complete(counts, prefix, limit=8):
+    """逐条扫描：筛选前缀后按使用次数排序"""
+    matched = [(count, expression) for expression, count in counts.items()
+               if expression.startswith(prefix) and expression != prefix]
+    matched.sort(key=lambda item: (-item[0], item[1]))
+    return [expression for _, expression in matched[:limit]]
+
+
+def main():
+    unique = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    counts = make_counts(unique)
+
+    start = time.perf_counter()
+    trie = ExpressionTrie()
+    for expression, count in counts.items():
+        trie.add(expression, count)
+    print(f"{unique} 个不同表达式，建立前缀树 {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # 模拟逐字输入一个表达式时的每次查询
+    target = next(iter(counts))
+    prefixes = [target[:i] for i in range(1, len(target) + 1)]
+    for name, complete in [("逐条扫描", lambda p: scan_complete(counts, p)),
+                           ("前缀树", trie.complete)]:
+        start = time.perf_counter()
+        for prefix in prefixes:
+            completions = complete(prefix)
+        cost = (time.perf_counter() - start) / len(prefixes) * 1e6
+        print(f"{name:>6}: 每次按键 {cost:10.1f} µs")
+
+    assert all(trie.complete(p) == scan_complete(counts, p) for p in prefixes)
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        trie.add(target)
+    print(f"增量更新: {(time.perf_counter() - start) / 1000 * 1e6:.1f} µs/条")
+
+
+if __name__ == "__main__":
+    main()
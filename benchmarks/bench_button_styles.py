@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 按钮样式的开销
+比较每个按钮单独设置样式表（旧版）与统一样式表加属性选择器的
+面板创建耗时和程序员模式切换进制的耗时
+用法：python benchmarks/bench_button_styles.py [切换次数]
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication, QMainWindow, QTabWidget
+
+from styles.style_manager import StyleManager
+from ui.standard_panel import StandardPanel
+from ui.scientific_panel import ScientificPanel
+from ui.programmer_panel import ProgrammerPanel
+
+
+# 旧版每个按钮的样式表（基础样式 + 按钮类型样式）
+LEGACY_BASE_STYLE = """
+    QPushButton { border: 1px solid #CCCCCC; border-radius: 6px; font-size: 14px;
+                  font-weight: bold; padding: 8px; margin: 1px; }
+    QPushButton:hover { border-color: #4A90E2; background-color: #F0F8FF; }
+    QPushButton:pressed { background-color: #E6F3FF; border-color: #2E86AB; }
+"""
+LEGACY_TYPE_STYLES = {
+    "normal": "QPushButton { background-color: #FFFFFF; color: #333333; }",
+    "operator": "QPushButton { background-color: #4A90E2; color: #FFFFFF; border-color: #357ABD; }"
+                "QPushButton:hover { background-color: #357ABD; }"
+                "QPushButton:pressed { background-color: #2E86AB; }",
+    "function": "QPushButton { background-color: #F8F9FA; color: #495057; border-color: #DEE2E6; }"
+                "QPushButton:hover { background-color: #E9ECEF; }",
+    "special": "QPushButton { background-color: #FF8C00; color: #FFFFFF; border-color: #FF7F00; }"
+               "QPushButton:hover { background-color: #FF7F00; }"
+               "QPushButton:pressed { background-color: #FF6347; }",
+}
+LEGACY_DIMMED_STYLE = """
+    QPushButton { background-color: #F5F5F5; color: #AAAAAA; border: 2px solid #E0E0E0;
+                  border-radius: 8px; font-size: 13px; font-weight: bold; padding: 8px 6px; margin: 3px; }
+    QPushButton:hover { background-color: #EEEEEE; border: 3px solid #CCCCCC; }
+"""
+LEGACY_ACTIVE_STYLE = """
+    QPushButton { background-color: #4A90E2; color: #FFFFFF; border: 2px solid #357ABD;
+                  border-radius: 6px; font-size: 14px; font-weight: bold; padding: 8px; margin: 1px; }
+"""
+
+
+def legacy_style(button):
+    """旧版：按钮类型对应的样式表"""
+    return LEGACY_BASE_STYLE + LEGACY_TYPE_STYLES[button.property("buttonType")]
+
+
+def legacy_set_base_mode(panel, base):
+    """旧版切换进制：重新为进制按钮和数字按钮设置样式表"""
+    digits = ProgrammerPanel.BASE_DIGITS[base]
+    for button_base, name in ProgrammerPanel.BASE_BUTTONS.items():
+        button = panel.get_button(name)
+        button.setStyleSheet(LEGACY_ACTIVE_STYLE if button_base == base else legacy_style(button))
+    for digit, button in panel.digit_buttons.items():
+        button.setStyleSheet(legacy_style(button) if digit in digits else LEGACY_DIMMED_STYLE)
+
+
+def build_window(legacy):
+    """创建带三个面板的窗口并显示，返回 (窗口, 程序员面板, 耗时毫秒)"""
+    app = QApplication.instance()
+    start = time.perf_counter()
+    window = QMainWindow()
+    window.setStyleSheet(StyleManager().get_main_window_style())
+    tabs = QTabWidget()
+    panels = [StandardPanel(), ScientificPanel(), ProgrammerPanel()]
+    for panel in panels:
+        if legacy:
+            for button in panel.findChildren(type(panel.get_button("="))):
+                button.setStyleSheet(legacy_style(button))
+        tabs.addTab(panel, panel.__class__.__name__)
+    window.setCentralWidget(tabs)
+    window.show()
+    tabs.setCurrentIndex(2)
+    app.processEvents()
+    return window, panels[2], (time.perf_counter() - start) * 1000
+
+
+def main():
+    switches = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    app = QApplication(sys.argv)
+    bases = [16, 10, 8, 2]
+
+    # 预热：排除首次加载字体、样式插件等一次性开销
+    build_window(False)[0].close()
+
+    for legacy in (True, False):
+        name = "每个按钮单独设置样式表" if legacy else "统一样式表 + 属性选择器"
+        window, panel, build_time = build_window(legacy)
+        style_time = 0.0
+        start = time.perf_counter()
+        for i in range(switches):
+            style_start = time.perf_counter()
+            if legacy:
+                legacy_set_base_mode(panel, bases[i % 4])
+            else:
+                panel.set_base_mode(bases[i % 4])
+            style_time += time.perf_counter() - style_start
+            app.processEvents()
+        switch_time = (time.perf_counter() - start) / switches * 1000
+        print(f"{name}: 创建面板并显示 {build_time:.1f} ms，切换进制 {switch_time:.2f} ms/次"
+              f"（其中更新样式 {style_time / switches * 1000:.2f} ms）")
+        window.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 每次按键的命令分发开销
+比较旧版 handle_button_click 的 if/elif 链（每次按键都新建列表做成员判断）与命令表的字典分发，
+两者的处理函数都为空操作，只测量分发本身
+用法：python benchmarks/bench_command_dispatch.py [按键次数]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ui.command_registry import CommandRegistry
+
+
+def noop(*args):
+    """空操作的处理函数"""
+
+
+def legacy_dispatch(button_text, current_base):
+    """旧版 if/elif 链（处理函数替换为空操作）"""
+    if button_text == "=":
+        noop()
+    elif button_text == "C":
+        noop()
+    elif button_text == "CE":
+        noop()
+    elif button_text == "⌫":
+        noop()
+    elif button_text == "MC":
+        noop()
+    elif button_text == "MR":
+        noop()
+    elif button_text == "MS":
+        noop()
+    elif button_text == "M+":
+        noop()
+    elif button_text == "M-":
+        noop()
+    elif button_text in ["√x", "x²", "1/x", "%", "±"]:
+        noop(button_text)
+    elif button_text in ["sin", "cos", "tan", "asin", "acos", "atan",
+                        "sinh", "cosh", "tanh", "log", "ln", "exp",
+                        "x³", "xʸ", "10ˣ", "eˣ", "∛x", "ʸ√x", "n!", "π", "e"]:
+        noop(button_text)
+    elif button_text in ["HEX", "DEC", "OCT", "BIN"]:
+        noop(button_text)
+    elif button_text in ["AND", "OR", "XOR", "NOT", "LSH", "RSH"]:
+        noop(button_text)
+    elif button_text in ["A", "B", "C", "D", "E", "F"]:
+        if current_base == 16:
+            noop(button_text)
+    elif button_text in ["8", "9"]:
+        if current_base >= 10:
+            noop(button_text)
+    elif button_text in ["2", "3", "4", "5", "6", "7"]:
+        if current_base >= 8:
+            noop(button_text)
+    else:
+        noop(button_text)
+
+
+def build_registry():
+    """与主窗口相同结构的命令表（处理函数为空操作）"""
+    registry = CommandRegistry(lambda: 10, fallback=noop)
+    for digit in "0123456789":
+        bases = None if digit in "01" else (8, 10, 16) if digit < "8" else (10, 16)
+        registry.register(digit, noop, bases=bases)
+    for letter in "ABCDEF":
+        registry.register(f"HEX_{letter}", noop, bases=(16,))
+    for name in ["+", "-", "×", "÷", ".", "(", ")", "=", "C", "CE", "⌫", "MC", "MR", "MS", "M+", "M-",
+                 "sin", "cos", "tan", "asin", "acos", "atan", "sinh", "cosh", "tanh", "log", "ln", "exp",
+                 "π", "e", "x³", "xʸ", "10ˣ", "eˣ", "∛x", "ʸ√x", "AND", "OR", "XOR", "LSH", "RSH"]:
+        registry.register(name, noop)
+    for name in ["√x", "x²", "%", "n!", "1/x", "±", "HEX", "DEC", "OCT", "BIN", "NOT"]:
+        registry.register(name, noop, precondition=lambda: True)
+    return registry
+
+
+def main():
+    presses = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    # 按键分布：以数字和四则运算为主
+    rng = random.Random(42)
+    common = list("0123456789") + ["+", "-", "×", "÷", ".", "="]
+    rare = ["C", "CE", "⌫", "sin", "log", "x²", "√x", "AND", "HEX", "MR"]
+    sequence = [rng.choice(common) if rng.random() < 0.9 else rng.choice(rare) for _ in range(presses)]
+
+    registry = build_registry()
+    for name, dispatch in [("if/elif 链", lambda text: legacy_dispatch(text, 10)),
+                           ("命令表", registry.dispatch)]:
+        start = time.perf_counter()
+        for text in sequence:
+            dispatch(text)
+        cost = (time.perf_counter() - start) / presses * 1e9
+        print(f"{name:>8}: 每次按键 {cost:6.0f} ns")
+
+    # 最坏情况：落到链末尾的按钮
+    for name, dispatch in [("if/elif 链", lambda text: legacy_dispatch(text, 10)),
+                           ("命令表", registry.dispatch)]:
+        start = time.perf_counter()
+        for _ in range(presses):
+            dispatch("7")
+        cost = (time.perf_counter() - start) / presses * 1e9
+        print(f"{name:>8}: 数字 7（链末尾） {cost:6.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 文件校验和位统计
+生成一个大文件，先测量按相同块大小顺序读取的速度（读取上限），再在工作线程中计算
+CRC32、Adler-32、置位数和奇偶校验位（以及字节直方图），与读取速度相比较，
+同时用 10 ms 的定时器测量主线程的最大响应间隔
+用法：python benchmarks/bench_file_checksum.py [文件大小 MiB]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication, QThreadPool, QTimer
+
+from core.file_checksum import CHUNK_SIZE, ChecksumTask
+
+
+def read_only(path):
+    """只读取不计算，返回耗时秒"""
+    buffer = memoryview(bytearray(CHUNK_SIZE))
+    start = time.perf_counter()
+    with open(path, "rb", buffering=0) as f:
+        while f.readinto(buffer):
+            pass
+    return time.perf_counter() - start
+
+
+def run_task(app, path, histogram):
+    """在工作线程中计算，返回 (FileDigest, 耗时秒, 主线程最大响应间隔秒)"""
+    task = ChecksumTask(path, 0, None, histogram, 0, threading.Event())
+    task.setAutoDelete(False)
+    outcome = {}
+    task.signals.finished.connect(lambda generation, digest: outcome.__setitem__("digest", digest))
+
+    ticks = [time.perf_counter()]
+    timer = QTimer()
+    timer.setInterval(10)
+    timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+    timer.start()
+
+    pool = QThreadPool.globalInstance()
+    start = time.perf_counter()
+    pool.start(task)
+    while not pool.waitForDone(1):
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+    app.processEvents()
+    timer.stop()
+    gap = max(b - a for a, b in zip(ticks, ticks[1:])) if len(ticks) > 1 else elapsed
+    return outcome["digest"], elapsed, gap
+
+
+def main():
+    size_mib = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    app = QCoreApplication(sys.argv)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "image.bin")
+
+    # 随机数据（1 MiB 重复写入，避免生成数据本身成为瓶颈）
+    block = os.urandom(1 << 20)
+    with open(path, "wb") as f:
+        for _ in range(size_mib):
+            f.write(block)
+    size = size_mib << 20
+    print(f"文件大小: {size_mib} MiB，读取块大小 {CHUNK_SIZE >> 20} MiB")
+
+    read_only(path)  # 预热页缓存
+    seconds = read_only(path)
+    print(f"{'只读取':<20}{seconds:>8.2f} s{size / seconds / 1e6:>10,.0f} MB/s")
+
+    for name, histogram in (("校验和 + 置位数", False), ("同上 + 字节直方图", True)):
+        digest, elapsed, gap = run_task(app, path, histogram)
+        print(f"{name:<20}{elapsed:>8.2f} s{size / elapsed / 1e6:>10,.0f} MB/s"
+              f"  为读取速度的 {seconds / elapsed:.0%}，主线程最大响应间隔 {gap * 1000:.0f} ms")
+
+    # 校验：与一次性计算的结果一致
+    crc = 0
+    for _ in range(size_mib):
+        crc = zlib.crc32(block, crc)
+    print(f"CRC32 0x{digest.crc32:08X}（逐块重算 0x{crc:08X}），置位数 {digest.popcount:,}，奇偶校验位 {digest.parity}")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 金融函数
+测量一组贷款方案（利率 × 本金的网格）的还款计划计算速度：NumPy 一次计算整个网格、
+逐个方案调用 NumPy、逐期的 Python 循环，并校验三者结果一致；再测量 IRR（牛顿法 + 二分）的速度和精度
+用法：python benchmarks/bench_finance.py [利率个数] [本金个数] [期数]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from core import finance
+
+
+def loop_schedule(rate, nper, principal):
+    """逐期循环计算等额本息的还款计划（对照）"""
+    payment = -finance.pmt(rate, nper, principal)
+    balance = principal
+    interests = []
+    for _ in range(nper):
+        interest = balance * rate
+        balance -= payment - interest
+        interests.append(interest)
+    return payment, sum(interests)
+
+
+def timed(function, repeat=3):
+    """返回 (结果, 最短耗时秒)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    rate_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    principal_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    nper = int(sys.argv[3]) if len(sys.argv) > 3 else 360
+    rates = np.linspace(0.02, 0.08, rate_count)[:, np.newaxis] / 12
+    principals = np.linspace(1e5, 2e6, principal_count)
+    loans = rate_count * principal_count
+    print(f"还款计划: {rate_count} 个利率 × {principal_count} 个本金 = {loans:,} 个方案，每个 {nper} 期")
+
+    for name, method in (("等额本息", finance.ANNUITY), ("等额本金", finance.EQUAL_PRINCIPAL)):
+        grid, seconds = timed(lambda: finance.schedule(rates, nper, principals, method))
+        print(f"  {name} 整个网格: {seconds * 1000:>8.1f} ms，{loans / seconds:>12,.0f} 个方案/s，"
+              f"{loans * nper / seconds / 1e6:,.1f} M 期/s")
+
+    # 对照：逐个方案调用 NumPy、逐期 Python 循环（只算一部分方案，按比例折算）
+    sample = [(float(rates[i % rate_count, 0]), float(principals[i * 7 % principal_count])) for i in range(200)]
+    _, seconds = timed(lambda: [finance.schedule(rate, nper, principal) for rate, principal in sample], repeat=1)
+    print(f"  逐个方案调用 NumPy: {len(sample) / seconds:>12,.0f} 个方案/s")
+    looped, seconds = timed(lambda: [loop_schedule(rate, nper, principal) for rate, principal in sample], repeat=1)
+    print(f"  逐期 Python 循环:   {len(sample) / seconds:>12,.0f} 个方案/s")
+
+    # 校验：整个网格的结果与逐期循环一致
+    grid = finance.schedule(rates, nper, principals)
+    error = 0.0
+    for (rate, principal), (payment, interest) in zip(sample, looped):
+        i = int(np.argmin(np.abs(rates[:, 0] - rate)))
+        j = int(np.argmin(np.abs(principals - principal)))
+        error = max(error, abs(grid.payment[i, j, 0] - payment) / payment,
+                    abs(grid.total_interest()[i, j] - interest) / interest)
+    print(f"  与逐期循环的最大相对误差: {error:.1e}")
+
+    # IRR：随机生成已知收益率的现金流
+    print()
+    rng = random.Random(0)
+    for periods in (5, 30, 360):
+        cases = []
+        for _ in range(200):
+            rate = rng.uniform(-0.2, 0.5)
+            flows = [rng.uniform(10, 100) for _ in range(periods)]
+            flows.insert(0, -finance.npv(rate, 0, *flows))
+            cases.append((rate, flows))
+        start = time.perf_counter()
+        results = [finance.irr(flows) for _, flows in cases]
+        seconds = (time.perf_counter() - start) / len(cases)
+        error = max(abs(result - rate) for (rate, _), result in zip(cases, results))
+        print(f"irr {periods:>3} 期现金流: {seconds * 1e6:>8.1f} µs/次，与已知收益率的最大误差 {error:.1e}")
+
+
+if __name__ == "__main__":
+    main()
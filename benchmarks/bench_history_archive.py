@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 内存映射历史记录归档
+打开大量记录时的 Python 内存占用（tracemalloc）和随机翻页耗时
+用法：python benchmarks/bench_history_archive.py [记录数]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication
+
+from core.history_manager import HistoryManager
+from bench_history_dialog import fill_history
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    app = QCoreApplication(sys.argv)
+
+    os.chdir(tempfile.mkdtemp())
+    start = time.perf_counter()
+    fill_history(HistoryManager(), count)
+    print(f"{count} 条记录，写入归档 {time.perf_counter() - start:.2f} s，"
+          f"文件 {sum(os.path.getsize(name) for name in os.listdir('.')) / 2 ** 20:.1f} MiB")
+
+    # 打开归档：只映射文件并读取最新一页
+    tracemalloc.start()
+    start = time.perf_counter()
+    manager = HistoryManager()
+    elapsed = (time.perf_counter() - start) * 1000
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"打开耗时 {elapsed:.1f} ms，Python 对象 {current / 1024:.1f} KiB，"
+          f"常驻记录 {len(manager.history)} 条")
+
+    rng = random.Random(42)
+    pages = (count + manager.PAGE_SIZE - 1) // manager.PAGE_SIZE
+    samples = [rng.randrange(pages) for _ in range(1000)]
+    start = time.perf_counter()
+    for page in samples:
+        manager.get_page(page)
+    page_cost = (time.perf_counter() - start) / len(samples) * 1e6
+    print(f"随机翻页（每页 {manager.PAGE_SIZE} 条）: {page_cost:.1f} µs/页")
+
+    rows = [rng.randrange(count) for _ in range(10000)]
+    start = time.perf_counter()
+    for row in rows:
+        manager.record_at(row)
+    row_cost = (time.perf_counter() - start) / len(rows) * 1e6
+    print(f"随机读取单条记录: {row_cost:.2f} µs/条")
+
+    snapshot = manager.snapshot()
+    start = time.perf_counter()
+    matched = snapshot.match_rows("99×")
+    snapshot.close()
+    print(f"全量搜索 \"99×\": {len(matched)} 条，{(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
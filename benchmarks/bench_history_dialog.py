@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 历史记录对话框打开耗时
+用法：python benchmarks/bench_history_dialog.py [记录数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+
+from core.history_manager import HistoryManager
+from core.history_record import HistoryRecord
+from ui.history_dialog import HistoryDialog
+
+
+def make_records(count):
+    """生成测试记录"""
+    base_time = 1753614780  # 2025-07-27 19:13
+    return [
+        HistoryRecord(f"{i}×{i % 97}+{i % 13}", str(i * (i % 97) + i % 13), base_time - i * 60)
+        for i in range(count)
+    ]
+
+
+def fill_history(manager, count):
+    """把 count 条测试记录写入管理器的存储并重新加载"""
+    records = make_records(count)
+    records.reverse()  # 存储中按从旧到新排列
+    manager.store.rewrite(lambda existing: records)
+    manager.load_history()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    app = QApplication(sys.argv)
+
+    # 在临时目录中运行，避免读写真实的历史文件
+    os.chdir(tempfile.mkdtemp())
+    manager = HistoryManager()
+    fill_history(manager, count)
+
+    start = time.perf_counter()
+    dialog = HistoryDialog(manager)
+    dialog.show()
+    app.processEvents()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{count} 条记录，打开对话框耗时: {elapsed:.1f} ms")
+
+    # 增量插入一条新记录
+    start = time.perf_counter()
+    manager.add_record("1+1", "2")
+    app.processEvents()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"新增一条记录后刷新耗时: {elapsed:.1f} ms")
+
+    dialog.close()
+
+
+if __name__ == "__main__":
+    main()
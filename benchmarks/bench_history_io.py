@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 历史记录导出与导入
+比较 CSV、JSON Lines、列式归档与旧版整体 JSON 文件的大小和读写耗时
+用法：python benchmarks/bench_history_io.py [记录数]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import history_io
+from core.history_record import HistoryRecord
+
+
+def make_records(count, unique=5000):
+    """生成测试记录（表达式和结果会重复出现）"""
+    base_time = 1753614780
+    for i in range(count):
+        n = i % unique
+        yield HistoryRecord(f"{n}×{n % 97}+{n % 13}", str(n * (n % 97) + n % 13), base_time - i * 30)
+
+
+def timed(func):
+    """返回 (结果, 耗时秒)"""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    directory = tempfile.mkdtemp()
+    print(f"{count} 条记录")
+
+    # 旧版：整个列表一次性 json.dump / json.load
+    legacy_path = os.path.join(directory, "history.json")
+    _, write_time = timed(lambda: json.dump([r.to_dict() for r in make_records(count)],
+                                            open(legacy_path, 'w', encoding='utf-8'),
+                                            ensure_ascii=False, indent=2))
+    _, read_time = timed(lambda: [HistoryRecord.from_dict(d)
+                                  for d in json.load(open(legacy_path, encoding='utf-8'))])
+    print(f"{'JSON(旧版)':>10}: {os.path.getsize(legacy_path) / 2 ** 20:7.1f} MiB，"
+          f"写入 {write_time:5.2f} s，读取 {read_time:5.2f} s")
+
+    for extension in (".csv", ".jsonl", ".calccol"):
+        path = os.path.join(directory, "history" + extension)
+        _, write_time = timed(lambda: history_io.write_records(path, make_records(count)))
+        loaded, read_time = timed(lambda: sum(1 for _ in history_io.read_records(path)))
+        assert loaded == count
+        print(f"{extension:>10}: {os.path.getsize(path) / 2 ** 20:7.1f} MiB，"
+              f"写入 {write_time:5.2f} s，读取 {read_time:5.2f} s")
+
+
+if __name__ == "__main__":
+    main()
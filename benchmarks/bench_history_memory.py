@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 历史记录的内存占用（tracemalloc）
+比较旧版字典记录与 HistoryRecord 的每条记录平均内存
+用法：python benchmarks/bench_history_memory.py [记录数]
+"""
+
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.history_record import HistoryRecord
+
+
+def make_inputs(count, unique=5000):
+    """生成测试输入：表达式会重复出现（用户经常重复计算）"""
+    rng = random.Random(42)
+    pool = [f"{rng.randint(1, 9999)}×{rng.randint(1, 99)}÷{rng.randint(1, 9)}" for _ in range(unique)]
+    base_time = 1753614780
+    for i in range(count):
+        # 每次生成新的字符串对象，模拟从显示屏读取的表达式
+        expression = "".join(list(pool[rng.randrange(unique)]))
+        yield expression, str(rng.randint(0, 10 ** 6)), base_time - i * 30
+
+
+def build_dicts(count):
+    """旧版：每条记录一个四字段字典，插入到列表开头"""
+    history = []
+    for expression, result, timestamp in make_inputs(count):
+        moment = datetime.fromtimestamp(timestamp)
+        history.append({
+            "expression": expression,
+            "result": result,
+            "timestamp": moment.isoformat(),
+            "formatted_time": moment.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+    return history
+
+
+def build_records(count):
+    """新版：HistoryRecord 放入有上限的 deque"""
+    history = deque(maxlen=count)
+    for expression, result, timestamp in make_inputs(count):
+        history.appendleft(HistoryRecord(expression, result, timestamp))
+    return history
+
+
+def measure(builder, count):
+    """返回 (每条记录字节数, 构建耗时秒)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    history = builder(count)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del history
+    return current / count, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    for name, builder in [("字典记录", build_dicts), ("HistoryRecord", build_records)]:
+        per_record, elapsed = measure(builder, count)
+        print(f"{name:>14}: {per_record:7.1f} 字节/条，{count} 条共 "
+              f"{per_record * count / 2 ** 20:7.1f} MiB，构建 {elapsed:.2f} s")
+
+    # 头部插入的耗时对比（旧版 list.insert(0, ...) 为 O(n)）
+    items = list(range(count))
+    start = time.perf_counter()
+    for i in range(1000):
+        items.insert(0, i)
+    list_cost = (time.perf_counter() - start) / 1000 * 1e6
+    ring = deque(range(count), maxlen=count)
+    start = time.perf_counter()
+    for i in range(1000):
+        ring.appendleft(i)
+    deque_cost = (time.perf_counter() - start) / 1000 * 1e6
+    print(f"头部插入：list.insert {list_cost:.1f} µs/次，deque.appendleft {deque_cost:.3f} µs/次")
+
+
+if __name__ == "__main__":
+    main()
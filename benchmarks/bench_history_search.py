@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 边输入边搜索时界面线程的耗时
+用法：python benchmarks/bench_history_search.py [记录数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
+
+from core.history_manager import HistoryManager
+from ui.history_dialog import HistoryDialog
+from bench_history_dialog import fill_history
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    app = QApplication(sys.argv)
+
+    os.chdir(tempfile.mkdtemp())
+    manager = HistoryManager()
+    fill_history(manager, count)
+
+    dialog = HistoryDialog(manager)
+    dialog.show()
+
+    keystrokes = list("99×2+")
+    keystroke_costs = []
+    apply_costs = []
+
+    # 统计应用搜索结果的耗时
+    original_finished = dialog.on_search_finished
+
+    def timed_finished(*args):
+        start = time.perf_counter()
+        original_finished(*args)
+        apply_costs.append((time.perf_counter() - start) * 1000)
+
+    dialog.on_search_finished = timed_finished
+
+    def type_next():
+        if keystrokes:
+            start = time.perf_counter()
+            dialog.search_edit.setText(dialog.search_edit.text() + keystrokes.pop(0))
+            keystroke_costs.append((time.perf_counter() - start) * 1000)
+            # 模拟每秒约 12 次按键
+            QTimer.singleShot(80, type_next)
+        else:
+            QTimer.singleShot(3000, app.quit)
+
+    QTimer.singleShot(0, type_next)
+    app.exec()
+
+    print(f"{count} 条记录")
+    print(f"每次按键界面线程耗时: 最大 {max(keystroke_costs):.2f} ms")
+    if apply_costs:
+        print(f"应用搜索结果耗时: 最大 {max(apply_costs):.2f} ms，共 {len(apply_costs)} 次")
+    print(f"匹配结果: {dialog.history_list.model().rowCount()} 条")
+
+
+if __name__ == "__main__":
+    main()
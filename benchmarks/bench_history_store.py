@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 多实例共享历史记录存储
+多个进程同时追加记录，检查没有记录丢失，并统计追加耗时和文件锁持有时间
+用法：python benchmarks/bench_history_store.py [进程数] [每个进程的记录数]
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.history_record import HistoryRecord
+from core.history_store import HistoryStore
+
+
+def writer(directory, name, count, queue):
+    """模拟一个计算器实例：逐条追加记录"""
+    store = HistoryStore(os.path.join(directory, "calculator_history"))
+    store.load()
+    costs = []
+    for i in range(count):
+        start = time.perf_counter()
+        store.append([HistoryRecord(f"{name}:{i}", str(i))])
+        costs.append(time.perf_counter() - start)
+    costs.sort()
+    queue.put((name, costs[len(costs) // 2], costs[int(len(costs) * 0.99)], store.lock.max_hold_time))
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    directory = tempfile.mkdtemp()
+
+    queue = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=writer, args=(directory, f"w{n}", count, queue))
+               for n in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    for _ in workers:
+        name, median, p99, max_hold = queue.get()
+        print(f"{name}: 追加耗时 中位数 {median * 1000:.3f} ms，P99 {p99 * 1000:.3f} ms，"
+              f"锁最长持有 {max_hold * 1000:.3f} ms")
+
+    # 检查增量读取：新实例读到全部记录，且没有丢失
+    store = HistoryStore(os.path.join(directory, "calculator_history"))
+    total = store.load()
+    expected = processes * count
+    print(f"共 {total} 条记录（期望 {expected}），"
+          f"{'没有' if total == expected else '有'}记录丢失")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 矩阵运算
+通过计算引擎（预处理、求值、格式化结果）对 1000×1000 矩阵执行 det、inv、transpose、solve、eig 和矩阵乘法，
+与直接调用 NumPy 相比较，并检查结果的残差；另测矩阵字面量的解析和结果表格的显示（只格式化可见的单元格）
+用法：python benchmarks/bench_matrix.py [矩阵阶数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PySide6.QtWidgets import QApplication
+
+from core.calculator_engine import CalculatorEngine
+from ui.matrix_panel import MatrixPanel
+
+# (表达式, 直接调用 NumPy 的等价运算)
+CASES = [
+    ("det(A)", lambda v: np.linalg.slogdet(v["A"])),
+    ("inv(A)", lambda v: np.linalg.inv(v["A"])),
+    ("transpose(A)", lambda v: v["A"].T),
+    ("solve(A, b)", lambda v: np.linalg.solve(v["A"], v["b"])),
+    ("eig(A)", lambda v: np.linalg.eigvals(v["A"])),
+    ("eig(S)", lambda v: np.linalg.eigvalsh(v["S"])),  # 对称矩阵
+    ("A @ B", lambda v: v["A"] @ v["B"]),
+    ("matmul(A, B)", lambda v: np.matmul(v["A"], v["B"])),
+]
+
+
+def measure(function, repeat):
+    """返回 (结果, 最短耗时秒)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    app = QApplication(sys.argv)
+    os.chdir(tempfile.mkdtemp())
+    engine = CalculatorEngine()
+
+    rng = np.random.default_rng(0)
+    # 特征值分布在以 1 为圆心、半径约 1/3 的圆内：行列式不会溢出，条件数也不大
+    A = np.eye(n) + rng.standard_normal((n, n)) / (3 * np.sqrt(n))
+    B = rng.standard_normal((n, n))
+    b = rng.standard_normal(n)
+    variables = {"A": A, "B": B, "b": b, "S": B + B.T}
+
+    print(f"{n}×{n} 矩阵")
+    print(f"{'表达式':<16}{'引擎':>12}{'NumPy':>12}{'显示':>16}")
+    for expression, direct in CASES:
+        repeat = 1 if expression.startswith("eig") else 3
+
+        def through_engine():
+            value = engine.evaluate_expression(engine.preprocess_expression(expression), variables)
+            return value, engine.format_result(value)
+
+        (value, text), seconds = measure(through_engine, repeat)
+        _, direct_seconds = measure(lambda: direct(variables), repeat)
+        print(f"{expression:<16}{seconds * 1000:>10.1f}ms{direct_seconds * 1000:>10.1f}ms{text:>16}")
+
+    # 残差
+    x = engine.evaluate_expression(engine.preprocess_expression("solve(A, b)"), variables)
+    inverse = engine.evaluate_expression(engine.preprocess_expression("inv(A)"), variables)
+    print(f"solve 残差 ‖Ax−b‖/‖b‖ = {np.linalg.norm(A @ x - b) / np.linalg.norm(b):.1e}，"
+          f"inv 残差 ‖A·inv(A)−I‖ = {np.abs(A @ inverse - np.eye(n)).max():.1e}")
+
+    # 矩阵字面量：预处理并求值一个 100×100 的 [..; ..] 字面量
+    size = 100
+    literal = "[" + "; ".join(", ".join(f"{v:.6g}" for v in row) for row in rng.standard_normal((size, size))) + "]"
+    _, seconds = measure(lambda: engine.evaluate_expression(engine.preprocess_expression(literal)), 5)
+    print(f"{size}×{size} 字面量（{len(literal) // 1024} KiB）解析求值: {seconds * 1000:.1f} ms")
+
+    # 结果表格：显示整个矩阵，只格式化可见的单元格
+    panel = MatrixPanel()
+    panel.resize(550, 500)
+    panel.show()
+    formatted = 0
+
+    def format_number(value):
+        nonlocal formatted
+        formatted += 1
+        return engine.format_result(value)
+
+    start = time.perf_counter()
+    panel.set_matrix(inverse, format_number)
+    panel.grab()
+    seconds = time.perf_counter() - start
+    print(f"表格显示 {n}×{n} 结果: {seconds * 1000:.1f} ms，格式化 {formatted} 个单元格（共 {inverse.size} 个）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 数论函数
+测量 Miller–Rabin 素性检验（64 位确定性、更大的数概率性）和因数分解（试除 + Pollard–Brent rho）的速度、
+缓存命中的耗时；在工作线程中分解 40 位的半素数，记录进度信号和主线程的响应间隔，并测量取消的延迟
+用法：python benchmarks/bench_number_theory.py [随机数个数]
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication, QThreadPool, QTimer
+
+from core import number_theory
+
+
+def next_prime(n):
+    while not number_theory.isprime(n):
+        n += 1
+    return n
+
+
+def run_task(app, n, cancel_after=None):
+    """
+    在工作线程中分解 n，同时用 10 ms 的定时器测量主线程的最大响应间隔
+
+    Returns:
+        (结果或 None, 耗时秒, (进度信号次数, 最后的进度), 最大响应间隔秒, 取消延迟秒或 None)
+    """
+    cancel_event = threading.Event()
+    task = number_theory.FactorizationTask(n, 0, cancel_event)
+    task.setAutoDelete(False)
+    outcome = {"result": None, "progress": []}
+    task.signals.progress.connect(lambda generation, percent: outcome["progress"].append(percent))
+    task.signals.finished.connect(lambda generation, result: outcome.__setitem__("result", result))
+
+    ticks = [time.perf_counter()]
+    timer = QTimer()
+    timer.setInterval(10)
+    timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+    timer.start()
+
+    pool = QThreadPool.globalInstance()
+    start = time.perf_counter()
+    pool.start(task)
+    cancel_latency = None
+    while not pool.waitForDone(1):
+        app.processEvents()
+        if cancel_after is not None and cancel_latency is None and time.perf_counter() - start > cancel_after:
+            cancelled_at = time.perf_counter()
+            cancel_event.set()
+            pool.waitForDone()
+            cancel_latency = time.perf_counter() - cancelled_at
+            break
+    elapsed = time.perf_counter() - start
+    app.processEvents()
+    timer.stop()
+    gap = max(b - a for a, b in zip(ticks, ticks[1:])) if len(ticks) > 1 else elapsed
+    progress = (len(outcome["progress"]), outcome["progress"][-1] if outcome["progress"] else 0)
+    return outcome["result"], elapsed, progress, gap, cancel_latency
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    app = QCoreApplication(sys.argv)
+    rng = random.Random(0)
+
+    start = time.perf_counter()
+    number_theory.small_prime_sieve()
+    print(f"小素数表（{number_theory.SMALL_PRIME_LIMIT} 以内）: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # 素性检验
+    print()
+    for bits in (32, 64, 256, 1024):
+        values = [rng.getrandbits(bits) | 1 << (bits - 1) | 1 for _ in range(count)]
+        primes = [next_prime(value) for value in values[:count // 20]]
+        start = time.perf_counter()
+        for value in values:
+            number_theory.isprime(value)
+        composite = (time.perf_counter() - start) / len(values)
+        start = time.perf_counter()
+        for value in primes:
+            number_theory.isprime(value)
+        prime = (time.perf_counter() - start) / len(primes)
+        kind = "确定性" if bits <= 64 else "概率性"
+        print(f"isprime {bits:>4} 位（{kind}）: 随机奇数 {composite * 1e6:>8.1f} µs/个，素数 {prime * 1e6:>8.1f} µs/个")
+
+    # 因数分解
+    print()
+    cases = [
+        ("随机 32 位", [rng.getrandbits(32) for _ in range(count)]),
+        ("随机 64 位", [rng.getrandbits(64) for _ in range(count // 10)]),
+        ("64 位半素数", [next_prime(rng.getrandbits(32) | 1 << 31) * next_prime(rng.getrandbits(32) | 1 << 31)
+                      for _ in range(20)]),
+    ]
+    for name, values in cases:
+        number_theory.clear_factor_cache()
+        times = []
+        for value in values:
+            start = time.perf_counter()
+            number_theory.factor(value)
+            times.append(time.perf_counter() - start)
+        recent = values[-number_theory.FACTOR_CACHE_SIZE:]
+        start = time.perf_counter()
+        for value in recent:
+            number_theory.factor(value)
+        cached = (time.perf_counter() - start) / len(recent)
+        print(f"factor {name:<10}: 平均 {sum(times) / len(times) * 1000:>7.2f} ms，最长 {max(times) * 1000:>7.2f} ms，"
+              f"缓存命中 {cached * 1e6:.1f} µs")
+
+    # 工作线程：40 位的半素数（13 位 × 27 位）
+    print()
+    n = next_prime(2 * 10 ** 12 + rng.randrange(10 ** 12)) * next_prime(6 * 10 ** 26 + rng.randrange(10 ** 26))
+    try:
+        number_theory.factor(n)
+        print(f"{len(str(n))} 位半素数在迭代次数上限内直接分解")
+    except number_theory.FactorizationDeferred:
+        print(f"{len(str(n))} 位半素数超出直接分解的迭代次数上限，转到工作线程")
+    result, elapsed, progress, gap, _ = run_task(app, n)
+    print(f"工作线程分解: {elapsed:.2f} s，{progress[0]} 次进度信号（最后 {progress[1]}%），"
+          f"主线程最大响应间隔 {gap * 1000:.0f} ms")
+    print(f"  {n} = {result}")
+
+    # 两个 20 位素数之积：rho 需要约 10^10 次迭代，开始 1 秒后取消
+    n = next_prime(5 * 10 ** 19 + rng.randrange(10 ** 19)) * next_prime(5 * 10 ** 19 + rng.randrange(10 ** 19))
+    _, elapsed, progress, gap, latency = run_task(app, n, cancel_after=1.0)
+    print(f"{len(str(n))} 位平衡半素数: 1 秒后取消（进度 {progress[1]}%），任务在 {latency * 1000:.1f} ms 内结束，"
+          f"主线程最大响应间隔 {gap * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 绘图面板平移、缩放时的帧耗时
+在离屏画布上同时绘制多条曲线，模拟连续拖动平移和滚轮缩放，测量每帧从采样到绘制完成的耗时，
+并与每帧都重新采样（不复用已缓存的图块路径）比较；60 fps 对应每帧 16.7 ms
+用法：python benchmarks/bench_plot.py [帧数]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QPointF
+from PySide6.QtGui import QImage
+
+from core.calculator_engine import CalculatorEngine
+from ui.plot_panel import PlotCanvas
+
+EXPRESSIONS = ["sin(x)", "tan(x)", "x²/10", "sqrt(abs(x))*cos(3x)", "1/x", "floor(x)"]
+
+
+def render_frames(canvas, image, frames, step, clear_cache):
+    """逐帧调用 step 改变视图并绘制到 image，返回每帧耗时（毫秒）"""
+    costs = []
+    for frame in range(frames):
+        start = time.perf_counter()
+        if clear_cache:
+            for curve in canvas.curves:
+                curve.tiles.clear()
+        step(frame)
+        canvas.render(image)
+        costs.append((time.perf_counter() - start) * 1000)
+    return costs
+
+
+def report(name, costs):
+    median = statistics.median(costs)
+    p95 = sorted(costs)[int(len(costs) * 0.95)]
+    print(f"{name}: 每帧 中位数 {median:.2f} ms，P95 {p95:.2f} ms，约 {1000 / median:.0f} fps")
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 120
+    app = QApplication(sys.argv)
+    os.chdir(tempfile.mkdtemp())
+    engine = CalculatorEngine()
+    engine.angle_mode = "rad"
+
+    canvas = PlotCanvas(engine)
+    canvas.resize(800, 600)
+    canvas.set_expressions(EXPRESSIONS)
+    image = QImage(canvas.size(), QImage.Format_ARGB32_Premultiplied)
+    center = QPointF(400, 300)
+
+    def pan(frame):
+        # 来回拖动：每帧 12 像素
+        canvas.pan(-12 if frame % 80 < 40 else 12, 0)
+
+    def zoom(frame):
+        # 滚轮放大再缩小
+        canvas.zoom(1.1 if frame % 40 < 20 else 1 / 1.1, center)
+
+    print(f"{len(EXPRESSIONS)} 条曲线，画布 {canvas.width()}x{canvas.height()}，每项 {frames} 帧")
+    for name, step in (("平移", pan), ("缩放", zoom)):
+        for clear_cache, label in ((False, "复用缓存"), (True, "每帧重新采样")):
+            canvas.reset_view()
+            render_frames(canvas, image, 5, lambda frame: None, clear_cache)  # 预热
+            report(f"{name}（{label}）", render_frames(canvas, image, frames, step, clear_cache))
+
+
+if __name__ == "__main__":
+    main()
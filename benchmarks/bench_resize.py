@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 拖动改变窗口大小时每帧的耗时
+比较每次 resizeEvent 都重写窗口样式表（旧版）与防抖后按档位切换属性
+用法：python benchmarks/bench_resize.py [帧数]
+"""
+
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+
+from ui.main_window import MainWindow
+
+
+class LegacyMainWindow(MainWindow):
+    """旧版：每次 resizeEvent 都用正则改写并重新设置整个样式表"""
+
+    def resizeEvent(self, event):
+        super(MainWindow, self).resizeEvent(event)
+        width = self.width()
+        height = self.height()
+        if width < 550 or height < 750:
+            font_size = 11
+        elif width < 650 or height < 850:
+            font_size = 12
+        else:
+            font_size = 13
+        current_style = re.sub(r'QPushButton\s*\{\s*font-size:\s*\d+px;\s*\}', '', self.styleSheet())
+        self.setStyleSheet(current_style + f"\nQPushButton {{\n    font-size: {font_size}px;\n}}\n")
+
+
+def drag(app, window, frames):
+    """模拟来回拖动窗口边框，返回每帧耗时（毫秒）"""
+    costs = []
+    for frame in range(frames):
+        # 宽度在 520~720 之间往返，会跨越字号档位
+        offset = frame % 200
+        width = 520 + (offset if frame // 200 % 2 == 0 else 200 - offset)
+        start = time.perf_counter()
+        window.resize(width, 900)
+        app.processEvents()
+        costs.append((time.perf_counter() - start) * 1000)
+    return costs
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    app = QApplication(sys.argv)
+    os.chdir(tempfile.mkdtemp())
+
+    for name, window_class in [("每次重写样式表", LegacyMainWindow), ("档位防抖 + 属性", MainWindow)]:
+        window = window_class()
+        window.show()
+        # 创建全部面板，与实际使用一段时间后的窗口一致
+        for index in range(len(window.PANELS)):
+            window.ensure_panel(index)
+        app.processEvents()
+
+        costs = sorted(drag(app, window, frames))
+        print(f"{name}: 每帧 中位数 {statistics.median(costs):.2f} ms，"
+              f"P95 {costs[int(len(costs) * 0.95)]:.2f} ms，最大 {costs[-1]:.2f} ms")
+        window.close()
+
+
+if __name__ == "__main__":
+    main()
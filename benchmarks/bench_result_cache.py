@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 结果缓存
+比较同一表达式未命中（预处理、求值、格式化）与命中结果缓存的计算耗时，
+并校验命中时恢复的上次结果（内存操作使用的值）与未命中时完整精度的结果相同
+用法：python benchmarks/bench_result_cache.py [重复次数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication
+
+from core.calculator_engine import CalculatorEngine
+
+EXPRESSIONS = ["2/3", "1+2*3", "sqrt(2)×π", "19.99×1.0825", "exp(1)÷7", "2**0.5", "12345678901234567890*3"]
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    app = QCoreApplication(sys.argv)
+    os.chdir(tempfile.mkdtemp())
+    engine = CalculatorEngine()
+
+    for expression in EXPRESSIONS:
+        engine.set_expression(expression)
+        engine.result_cache.entries.clear()
+        engine.calculate()
+        missed = engine.last_result
+        engine.calculate()
+        hit = engine.last_result
+        # 校验：命中时的上次结果与未命中时完全相同（类型和完整精度）
+        assert type(hit) is type(missed) and repr(hit) == repr(missed), (expression, missed, hit)
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            engine.result_cache.entries.clear()
+            engine.calculate()
+        miss_time = (time.perf_counter() - start) / repeat
+        start = time.perf_counter()
+        for _ in range(repeat):
+            engine.calculate()
+        hit_time = (time.perf_counter() - start) / repeat
+        print(f"{expression:<26}{engine.format_result(hit):>24}  未命中 {miss_time * 1e6:>7.1f} µs，"
+              f"命中 {hit_time * 1e6:>7.1f} µs")
+    engine.result_cache.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - RPN 模式
+逐键输入一长串运算，测量每个运算键作用于栈的耗时，并与中缀模式每按一次“=”都重新解析、计算整个表达式比较；
+再在深栈上测量撤销记录占用的内存（共享节点的不可变栈与每步复制列表比较）和撤销、重绘的耗时
+用法：python benchmarks/bench_rpn.py [运算个数]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+
+from core.calculator_engine import CalculatorEngine
+from core.rpn_stack import RpnCalculator, StackItem, UNDO_LIMIT
+from ui.rpn_panel import RpnPanel
+
+
+def infix_text(length, operators):
+    """与逐键计算相同的运算写成的中缀表达式：((1+1)×2-3)÷4…"""
+    text = "1"
+    for step in range(length):
+        operator = operators[step % 4]
+        if operator in "×÷" and step:
+            text = f"({text})"
+        text += f"{operator}{step % 9 + 1}"
+    return text
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    os.chdir(tempfile.mkdtemp())
+    app = QApplication(sys.argv)
+    engine = CalculatorEngine()
+    operators = ("+", "×", "-", "÷")
+
+    # 逐键计算：每步输入一个数并按运算键
+    calculator = RpnCalculator(engine)
+    calculator.type_text("1")
+    calculator.enter()
+    costs = []
+    for step in range(count):
+        start = time.perf_counter()
+        calculator.type_text(str(step % 9 + 1))
+        calculator.operate(operators[step % 4])
+        costs.append(time.perf_counter() - start)
+    print(f"RPN 逐键计算 {count} 个运算: 每个运算键 {statistics.mean(costs) * 1e6:.1f} µs"
+          f"（最长 {max(costs) * 1e6:.1f} µs）")
+
+    # 对照：中缀模式每按一次“=”都重新解析、计算到当前为止的整个表达式
+    # （更长的表达式括号嵌套超过 Python 解析器的上限 200 层，无法用中缀计算）
+    for length in (10, 100, 300):
+        calculator.clear()
+        calculator.type_text("1")
+        calculator.enter()
+        for step in range(length):
+            calculator.type_text(str(step % 9 + 1))
+            calculator.operate(operators[step % 4])
+        text = infix_text(length, operators)
+        start = time.perf_counter()
+        for _ in range(20):
+            value = engine.evaluate_expression(engine.preprocess_expression(text))
+        seconds = (time.perf_counter() - start) / 20
+        same = abs(value - calculator.stack.top().value) <= 1e-9 * max(1.0, abs(value))
+        print(f"  中缀重新计算 {length:>5} 个运算（{len(text):,} 个字符）: {seconds * 1e6:>9.1f} µs（结果一致: {same}）")
+
+    # 深栈上的撤销记录
+    print()
+    depth = 100000
+    calculator.clear()
+    for value in range(depth):
+        calculator.stack = calculator.stack.push(StackItem(float(value), str(value)))
+    calculator.undo_states.clear()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for step in range(UNDO_LIMIT):
+        calculator.type_text(str(step % 9 + 1))
+        calculator.operate(operators[step % 4])
+    shared = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # 每步复制一份列表（只算列表本身，不算其中的数）
+    copied = len(calculator.undo_states) * sys.getsizeof(list(range(depth)))
+    print(f"栈深 {depth:,}，{len(calculator.undo_states)} 步撤销记录: 共享节点 {shared / 1024:,.0f} KiB，"
+          f"每步复制列表约 {copied / 1024 / 1024:,.0f} MiB")
+
+    # 撤销和重绘（只渲染可见行）
+    panel = RpnPanel(engine)
+    panel.calculator = calculator
+    calculator.stack_changed.connect(panel.update_view)
+    panel.resize(500, 600)
+    panel.show()
+    app.processEvents()
+    costs = []
+    for _ in range(200):
+        start = time.perf_counter()
+        calculator.undo()
+        panel.table.viewport().repaint()
+        costs.append(time.perf_counter() - start)
+    print(f"撤销并重绘: 平均 {statistics.mean(costs) * 1000:.2f} ms，最长 {max(costs) * 1000:.2f} ms")
+    panel.table.scrollToBottom()
+    start = time.perf_counter()
+    panel.table.viewport().repaint()
+    print(f"滚动到栈底后重绘: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 数值求解的精度和求值速度
+用已知精确值检查 solve、integrate、diff 的误差，并统计每次求解的函数求值次数和每秒求值次数；
+另测逐点求值（复用编译结果与每次重新预处理、编译相比）、向量化求值和对偶数求值的吞吐量
+用法：python benchmarks/bench_solvers.py [重复次数]
+"""
+
+import math
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PySide6.QtWidgets import QApplication
+
+from core.calculator_engine import CalculatorEngine
+
+# (表达式, 精确值)
+CASES = [
+    ("solve(x²-2, x, 0, 2)", math.sqrt(2)),
+    ("solve(cos(x)-x, x, 0, 1)", 0.739085133215160641655),
+    ("solve(x**3-2*x-5, x, 2, 3)", 2.0945514815423265915),
+    ("solve(exp(x)-3, x, 0, 5)", math.log(3)),
+    ("integrate(sin(x), x, 0, pi)", 2.0),
+    ("integrate(exp(-x**2), x, -10, 10)", math.sqrt(math.pi)),
+    ("integrate(1/(1+x**2), x, 0, 1)", math.pi / 4),
+    ("integrate(1/sqrt(x), x, 0, 1)", 2.0),
+    ("integrate(ln(x), x, 1, e)", 1.0),
+    ("integrate(floor(x), x, 0, 3.5)", 4.5),
+    ("diff(x**3, x, 2)", 12.0),
+    ("diff(sin(x)*exp(x), x, 1)", math.e * (math.sin(1) + math.cos(1))),
+    ("diff(x**x, x, 2)", 4 * (1 + math.log(2))),
+    ("diff(atan(x)/x, x, 1)", 0.5 - math.pi / 4),
+]
+
+
+def measure(function, repeat):
+    """重复调用 function，返回每次的平均耗时（秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    app = QApplication(sys.argv)
+    os.chdir(tempfile.mkdtemp())
+    engine = CalculatorEngine()
+    engine.angle_mode = "rad"
+    solvers = engine.solvers
+
+    print(f"{'表达式':<36}{'误差':>10}{'求值次数':>10}{'耗时':>12}{'求值/秒':>14}")
+    for expression, exact in CASES:
+        processed = engine.preprocess_expression(expression)
+        solvers.evaluations = 0
+        value = engine.evaluate_expression(processed)
+        evaluations = solvers.evaluations
+        seconds = measure(lambda: engine.evaluate_expression(processed), repeat)
+        rate = f"{evaluations / seconds:,.0f}" if evaluations else "-"
+        print(f"{expression:<36}{abs(value - exact):>10.1e}{evaluations:>10}"
+              f"{seconds * 1000:>10.3f}ms{rate:>14}")
+
+    # 同一个函数的不同求值方式
+    function = solvers.compile(engine.preprocess_expression("sin(x)*exp(-x/5) + x**2/10"), "x")
+    count = 20000
+    xs = np.linspace(-5, 5, count)
+    values = xs.tolist()
+
+    def scalar():
+        for x in values:
+            function.scalar(x)
+
+    def recompile():
+        for x in values[:count // 10]:
+            engine.evaluate_expression(engine.preprocess_expression(f"sin({x})*exp(-{x}/5) + {x}**2/10"))
+
+    def dual():
+        for x in values:
+            function.dual(x)
+
+    print()
+    print(f"逐点求值（复用编译结果）: {count / measure(scalar, 3):,.0f} 次/秒")
+    print(f"逐点求值（每次预处理并编译）: {count // 10 / measure(recompile, 3):,.0f} 次/秒")
+    print(f"向量化求值: {count / measure(lambda: function.vector(xs), repeat):,.0f} 次/秒")
+    print(f"对偶数求值（函数值和导数）: {count / measure(dual, 3):,.0f} 次/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 冷启动到首次绘制的耗时
+每次在新进程中启动，比较立即创建全部面板（旧版）与按需创建面板的耗时；
+再用一个很大的旧版 JSON 历史文件，比较显示前同步加载历史记录（旧版）与窗口显示后在后台加载的
+首次绘制时间和历史记录可用的时间
+用法：python benchmarks/bench_startup.py [次数] [历史记录条数]
+"""
+
+import time
+
+START = time.perf_counter()
+
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure_once(mode, history_file=None):
+    """
+    启动主窗口，打印从进程启动到主窗口首次绘制、历史记录加载完成的毫秒数和首次绘制时已创建的面板数
+
+    Args:
+        mode: "eager"、"lazy"、"sync-history" 或 "deferred-history"
+        history_file: 复制到工作目录中的旧版历史文件（启动时迁移）
+    """
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QObject, QEvent, QTimer
+
+    app = QApplication(sys.argv)
+    os.chdir(tempfile.mkdtemp())
+    if history_file:
+        shutil.copy(history_file, "calculator_history.json")
+
+    from ui.main_window import MainWindow
+
+    class FirstPaint(QObject):
+        """记录首次绘制的时间"""
+
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint and not hasattr(self, "elapsed"):
+                self.elapsed = (time.perf_counter() - START) * 1000
+                self.quit_when_done()
+            return False
+
+        def on_history_loaded(self):
+            self.history_elapsed = (time.perf_counter() - START) * 1000
+            self.quit_when_done()
+
+        def quit_when_done(self):
+            if hasattr(self, "elapsed") and hasattr(self, "history_elapsed"):
+                QTimer.singleShot(0, app.quit)
+
+    first_paint = FirstPaint()
+    window = MainWindow()
+    history_manager = window.calculator_engine.history_manager
+    history_manager.history_loaded.connect(first_paint.on_history_loaded)
+    if mode == "eager":
+        # 模拟旧版：显示之前创建全部面板
+        for index in range(len(window.PANELS)):
+            window.ensure_panel(index)
+    if mode in ("eager", "lazy", "sync-history"):
+        # 模拟旧版：显示之前加载历史记录
+        history_manager.ensure_loaded()
+    window.installEventFilter(first_paint)
+    window.show()
+    app.exec()
+
+    panels = sum(getattr(window, name) is not None for name, _, _ in window.PANELS)
+    print(f"{first_paint.elapsed:.1f} {panels} {first_paint.history_elapsed:.1f} {history_manager.record_count()}")
+
+
+def run_child(mode, runs, history_file=None):
+    """在新进程中启动 runs 次，返回 (首次绘制各次的毫秒数, 历史记录可用各次的毫秒数, 最后一次的输出)"""
+    paints, histories = [], []
+    for _ in range(runs):
+        command = [sys.executable, os.path.abspath(__file__), "--child", mode]
+        if history_file:
+            command.append(history_file)
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout.split()
+        paints.append(float(output[0]))
+        histories.append(float(output[2]))
+    return paints, histories, output
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    for mode in ("eager", "lazy"):
+        paints, _, output = run_child(mode, runs)
+        name = "立即创建全部面板" if mode == "eager" else "按需创建面板"
+        print(f"{name}: 首次绘制 中位数 {statistics.median(paints):.1f} ms，"
+              f"首次绘制时已创建 {output[1]} 个面板")
+
+    # 首次启动时迁移很大的旧版历史文件
+    history_file = os.path.join(tempfile.mkdtemp(), "calculator_history.json")
+    with open(history_file, "w", encoding="utf-8") as f:
+        json.dump([{"expression": f"{i}×{i % 97}+{i % 13}", "result": str(i * (i % 97) + i % 13),
+                    "timestamp": "2024-01-01T00:00:00"} for i in range(count)], f)
+    size = os.path.getsize(history_file) / 1e6
+    print(f"\n旧版历史文件 {count:,} 条记录（{size:.1f} MB）:")
+    for mode in ("sync-history", "deferred-history"):
+        paints, histories, output = run_child(mode, runs, history_file)
+        name = "显示前同步加载" if mode == "sync-history" else "显示后后台加载"
+        print(f"  {name}: 首次绘制 中位数 {statistics.median(paints):.1f} ms，"
+              f"历史记录可用 中位数 {statistics.median(histories):.1f} ms（{int(output[3]):,} 条）")
+    os.remove(history_file)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        measure_once(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    else:
+        main()
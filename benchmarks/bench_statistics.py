@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 大文件流式统计的吞吐量和内存占用
+生成不同大小的三列 CSV 文件，测量流式统计的速度和峰值内存（应与文件大小无关），
+与整体读入 NumPy 数组再统计相比较，并检查均值、方差和分位数的误差
+用法：python benchmarks/bench_statistics.py [最大文件 MiB]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication
+
+from core.streaming_stats import StatisticsTask, QUANTILES
+
+
+def write_csv(path, mib, seed=0):
+    """写入约 mib MiB 的 CSV（id, price, qty），返回 price 列的全部数值（用于核对）"""
+    rng = np.random.default_rng(seed)
+    rows_per_block = 200_000
+    prices = []
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("id,price,qty\n")
+        row = 0
+        while f.tell() < mib << 20:
+            price = rng.lognormal(3, 1, rows_per_block)
+            ids = np.arange(row, row + rows_per_block)
+            block = np.column_stack((ids, price, ids % 17))
+            np.savetxt(f, block, fmt=("%d", "%.6f", "%d"), delimiter=",")
+            prices.append(price.round(6))
+            row += rows_per_block
+    return np.concatenate(prices)
+
+
+def measure(function):
+    """
+    返回 (结果, 耗时秒, Python 堆峰值 MiB)
+
+    tracemalloc 会显著拖慢解析，耗时和峰值内存分两次测量
+    """
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    app = QCoreApplication(sys.argv)
+    directory = tempfile.mkdtemp()
+    sizes = [size for size in (16, 64, 256, 1024) if size <= largest] or [largest]
+
+    for mib in sizes:
+        path = os.path.join(directory, f"data_{mib}.csv")
+        prices = write_csv(path, mib)
+        file_mib = os.path.getsize(path) / 2 ** 20
+        print(f"文件 {file_mib:.0f} MiB，{prices.size} 行")
+
+        task = StatisticsTask(path, 1, 0, threading.Event())
+        statistics, seconds, peak = measure(task.compute)
+        print(f"  流式统计: {seconds:6.2f} s，{file_mib / seconds:6.1f} MiB/s，峰值内存 {peak:6.1f} MiB")
+
+        if mib <= 256:
+            column, load_seconds, load_peak = measure(
+                lambda: np.loadtxt(path, delimiter=",", usecols=1, skiprows=1))
+            print(f"  整体读入: {load_seconds:6.2f} s，{file_mib / load_seconds:6.1f} MiB/s，"
+                  f"峰值内存 {load_peak:6.1f} MiB")
+
+        moments = statistics.moments
+        errors = [abs(moments.mean - prices.mean()) / prices.mean(),
+                  abs(moments.variance() - prices.var(ddof=1)) / prices.var(ddof=1)]
+        estimates = np.sort(prices).searchsorted(
+            statistics.digest.quantiles(QUANTILES, moments.minimum, moments.maximum)) / prices.size
+        print(f"  均值、方差相对误差 {max(errors):.1e}，"
+              f"分位数排名误差 {np.abs(estimates - np.array(QUANTILES)).max():.1e}")
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 运行时切换主题的耗时
+比较每次重新读取并替换主题模板与使用缓存的编译结果，
+并测量在创建了全部面板的主窗口上切换一次主题（一遍重新应用样式）的耗时
+用法：python benchmarks/bench_theme_switch.py [切换次数]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+
+from styles.style_manager import StyleManager
+from ui.main_window import MainWindow
+
+
+def time_compile(names, cached):
+    """编译各主题的样式表，返回每次的平均耗时（毫秒）"""
+    manager = StyleManager()
+    rounds = 200
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for name in names:
+            if not cached:
+                manager.template = None
+                manager.compiled.clear()
+            manager.compile_theme(name)
+    return (time.perf_counter() - start) / (rounds * len(names)) * 1000
+
+
+def main():
+    switches = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    app = QApplication(sys.argv)
+    os.chdir(tempfile.mkdtemp())
+
+    names = list(StyleManager().get_theme_names())
+    print(f"读取并替换模板: {time_compile(names, cached=False):.3f} ms/次")
+    print(f"使用缓存的结果: {time_compile(names, cached=True):.4f} ms/次")
+
+    window = MainWindow()
+    window.show()
+    # 创建全部面板，与实际使用一段时间后的窗口一致
+    for index in range(len(window.PANELS)):
+        window.ensure_panel(index)
+    app.processEvents()
+
+    costs = []
+    for i in range(switches):
+        name = names[(i + 1) % len(names)]
+        start = time.perf_counter()
+        window.style_manager.set_theme(name)
+        app.processEvents()
+        costs.append((time.perf_counter() - start) * 1000)
+    costs.sort()
+    buttons = sum(len(getattr(window, attr).buttons) for attr, _, _ in window.PANELS)
+    print(f"切换主题（{buttons} 个按钮）: 中位数 {statistics.median(costs):.1f} ms，最大 {costs[-1]:.1f} ms")
+    window.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 撤销历史
+模拟逐字输入、退格和修改内存，记录很多步长表达式的撤销历史，测量占用的内存（与每步保存完整字符串比较）、
+记录、撤销和重做的耗时，以及退出时写入、启动时读取快照文件的大小和耗时
+用法：python benchmarks/bench_undo.py [步数] [表达式长度]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.undo_history import UndoHistory, SNAPSHOT_LIMIT
+
+
+def edits(count, length, rng):
+    """生成逐步编辑后的 (表达式, 内存值)：在长表达式末尾输入、退格，偶尔换成新的表达式"""
+    expression = ""
+    memory = 0
+    for step in range(count):
+        roll = rng.random()
+        if roll < 0.002 or len(expression) >= length:
+            expression = "".join(rng.choice("0123456789+-×÷") for _ in range(length // 2))
+        elif roll < 0.2 and expression:
+            expression = expression[:-1]
+        elif roll < 0.21:
+            memory += step
+        else:
+            expression += rng.choice("0123456789+-×÷()")
+        yield expression, memory
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    length = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    directory = tempfile.mkdtemp()
+    steps = list(edits(count, length, random.Random(0)))
+    average = statistics.mean(len(expression) for expression, _ in steps)
+    print(f"{count:,} 步，表达式平均 {average:,.0f} 个字符")
+
+    tracemalloc.start()
+    history = UndoHistory(os.path.join(directory, "undo.bin"))
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for expression, memory in steps:
+        history.record(expression, memory, "deg", 10)
+    record = (time.perf_counter() - start) / count
+    shared = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # 对照：每步保存一份完整的字符串（字符串本身，不算状态对象）
+    full = sum(sys.getsizeof(expression) for expression, _ in steps)
+    print(f"记录: {record * 1e6:.1f} µs/步，共享分块 {shared / 1e6:,.1f} MB，每步保存完整字符串 {full / 1e6:,.1f} MB")
+
+    # 撤销和重做：移动指针，另外测量恢复表达式文本的耗时
+    start = time.perf_counter()
+    for _ in range(count // 2):
+        history.undo()
+    undo = (time.perf_counter() - start) / (count // 2)
+    start = time.perf_counter()
+    for _ in range(count // 2):
+        history.redo()
+    redo = (time.perf_counter() - start) / (count // 2)
+    start = time.perf_counter()
+    for _ in range(1000):
+        history.undo().expression
+    restore = (time.perf_counter() - start) / 1000
+    print(f"撤销 {undo * 1e9:.0f} ns/步，重做 {redo * 1e9:.0f} ns/步，撤销并恢复表达式文本 {restore * 1e6:.1f} µs/步")
+
+    # 快照文件
+    start = time.perf_counter()
+    history.save()
+    save = time.perf_counter() - start
+    size = os.path.getsize(history.snapshot_file)
+    restored = UndoHistory(history.snapshot_file)
+    start = time.perf_counter()
+    restored.load()
+    load = time.perf_counter() - start
+    same = restored.current.expression == history.current.expression and restored.depth == min(history.depth, SNAPSHOT_LIMIT - 1)
+    print(f"快照（最近 {SNAPSHOT_LIMIT:,} 步和可重做的 {len(history.redo_states):,} 步）: {size / 1024:,.0f} KiB，"
+          f"写入 {save * 1000:.0f} ms，读取 {load * 1000:.0f} ms，恢复一致: {same}")
+    os.remove(history.snapshot_file)
+
+    # 校验：内存中是矩阵时也能比较状态（相同的矩阵不记录新的一步）
+    matrix = np.array([[1, 2], [3, 4]])
+    matrix_history = UndoHistory(os.path.join(directory, "matrix.bin"))
+    assert matrix_history.record("1", matrix, "deg", 10)
+    assert not matrix_history.record("1", matrix.copy(), "deg", 10)
+    assert matrix_history.record("1", matrix * 2, "deg", 10)
+    assert matrix_history.record("1", 0, "deg", 10)
+    assert matrix_history.record("1", matrix, "deg", 10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 单位换算
+检查不含单位的计算不会加载单位表，测量单位表的编译时间和第一次使用单位的耗时；
+比较缓存换算系数后的换算（一次乘加）与每次重新解析、组合单位的换算，以及经计算引擎求值的吞吐量
+用法：python benchmarks/bench_units.py [重复次数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication
+
+from core.calculator_engine import CalculatorEngine
+from core import units
+
+# (源单位, 目标单位)
+CONVERSIONS = [
+    ("km/h", "m/s"),
+    ("mi", "km"),
+    ("kWh", "J"),
+    ("psi", "kPa"),
+    ("J/(g·K)", "J/(kg·K)"),
+    ("°F", "°C"),
+    ("GiB", "MB"),
+]
+
+EXPRESSIONS = ["5 km/h to m/s", "3 ft + 20 cm", "100 °C to °F", "9.81 kg·m/s^2 * 2 s to N·s"]
+
+
+def per_second(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return repeat / (time.perf_counter() - start)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    app = QCoreApplication(sys.argv)
+    os.chdir(tempfile.mkdtemp())
+    engine = CalculatorEngine()
+
+    for expression in ("1+2*3", "sin(30)", "2e5/7", "0x1F+1", "solve(x²-2, x, 0, 2)"):
+        engine.evaluate_expression(engine.preprocess_expression(expression))
+    print(f"不含单位的计算后单位表已加载: {units.is_loaded()}")
+
+    start = time.perf_counter()
+    value = engine.evaluate_expression(engine.preprocess_expression("5 km/h to m/s"))
+    print(f"第一次使用单位（含编译单位表）: {(time.perf_counter() - start) * 1000:.2f} ms -> "
+          f"{engine.format_result(value)}")
+    start = time.perf_counter()
+    registry = units.UnitRegistry()
+    print(f"编译单位表: {(time.perf_counter() - start) * 1000:.2f} ms，共 {len(registry.units)} 个单位名称")
+
+    print()
+    print(f"{'换算':<22}{'缓存系数':>14}{'每次重新解析':>14}")
+    table = units.registry()
+    for source, target in CONVERSIONS:
+        quantity = units.quantity(1.5, source)
+        target_unit = table.parse(target)
+        cached = per_second(lambda: quantity.to(target_unit), repeat)
+
+        def uncached():
+            table.composites.clear()
+            table.conversions.clear()
+            units.quantity(1.5, source).to(table.parse(target))
+
+        print(f"{source + ' -> ' + target:<22}{cached:>12,.0f}/s{per_second(uncached, repeat // 10):>12,.0f}/s")
+
+    print()
+    for expression in EXPRESSIONS:
+        processed = engine.preprocess_expression(expression)
+        code = compile(processed, "<bench>", "eval")
+        full = per_second(lambda: engine.evaluate_expression(engine.preprocess_expression(expression)), repeat // 10)
+        compiled = per_second(lambda: engine.evaluate_expression(code), repeat // 10)
+        result = engine.format_result(engine.evaluate_expression(code))
+        print(f"{expression:<28}{result:>22}  预处理并求值 {full:>9,.0f}/s，复用编译结果 {compiled:>9,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试 - 工作表从编辑到结果更新的延迟
+在数千行的工作表中模拟按键修改一行，测量编辑器处理按键、重新计算受影响的行并重绘的耗时，
+并与每次按键都重新解析、计算整个工作表比较
+用法：python benchmarks/bench_worksheet.py [行数]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QTextCursor
+
+from core.calculator_engine import CalculatorEngine
+from core.worksheet import Worksheet
+from ui.worksheet_panel import WorksheetPanel
+
+
+def make_text(lines):
+    """生成测试工作表：每 10 行一组互相依赖的变量，最后是一条 500 行的依赖链"""
+    rows = []
+    group = 0
+    while len(rows) < lines - 500:
+        rows.append(f"a{group} = {group + 1}")
+        rows.append(f"rate{group} = 0.035")
+        for step in range(8):
+            rows.append(f"v{group}_{step} = a{group}*(1+rate{group})**{step + 1}")
+        group += 1
+    rows.append("chain0 = 1")
+    for step in range(1, 500):
+        rows.append(f"chain{step} = chain{step - 1}*1.001 + sqrt(chain{step - 1})")
+    return "\n".join(rows)
+
+
+def type_at(app, editor, line_number, count):
+    """在指定行末尾输入并删除一个字符，返回每次按键到重绘完成的耗时（毫秒）"""
+    block = editor.document().findBlockByNumber(line_number)
+    cursor = QTextCursor(block)
+    cursor.movePosition(QTextCursor.EndOfBlock)
+    costs = []
+    for i in range(count):
+        start = time.perf_counter()
+        if i % 2 == 0:
+            cursor.insertText("1")
+        else:
+            cursor.deletePreviousChar()
+        editor.result_area.repaint()
+        app.processEvents()
+        costs.append((time.perf_counter() - start) * 1000)
+    return costs
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    app = QApplication(sys.argv)
+    os.chdir(tempfile.mkdtemp())
+    engine = CalculatorEngine()
+    text = make_text(lines)
+
+    panel = WorksheetPanel(engine)
+    panel.resize(700, 800)
+    panel.show()
+    start = time.perf_counter()
+    panel.editor.setPlainText(text)
+    app.processEvents()
+    print(f"{len(panel.worksheet)} 行，载入并计算全部 {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    chain_start = len(panel.worksheet) - 500
+    cases = [
+        ("修改叶子行（无下游）", 9),
+        ("修改组内变量（8 行下游）", 0),
+        ("修改依赖链起点（499 行下游）", chain_start),
+    ]
+    for name, line_number in cases:
+        costs = type_at(app, panel.editor, line_number, 40)
+        print(f"{name}: 每次按键 中位数 {statistics.median(costs):.2f} ms，最大 {max(costs):.2f} ms")
+
+    # 对照：每次按键都重新解析、计算整个工作表
+    worksheet = Worksheet(engine)
+    costs = []
+    for _ in range(5):
+        start = time.perf_counter()
+        worksheet.set_text(text)
+        costs.append((time.perf_counter() - start) * 1000)
+    print(f"每次按键重新计算整个工作表: {statistics.median(costs):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
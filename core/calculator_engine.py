@@ -5,10 +5,29 @@
 处理表达式解析、计算和错误处理
 """
 
+import io
 import math
+import numbers
 import re
+import tokenize
 from PySide6.QtCore import QObject, Signal, Slot
 from .history_manager import HistoryManager
+from .result_cache import ResultCache
+from .numeric_solvers import NumericSolvers, SOLVER_CALL_PATTERN, quote_solver_arguments
+from . import matrix_ops
+from . import units
+from . import number_theory
+from . import finance
+
+
+# 函数语义版本号：修改表达式预处理或函数表的行为时必须加一，使旧的结果缓存失效
+FUNCTION_TABLE_VERSION = 10
+
+# 结果取决于角度模式的函数
+ANGLE_DEPENDENT_FUNCTIONS = ("sin", "cos", "tan", "asin", "acos", "atan")
+
+# 结果不确定的函数，含有它们的表达式不缓存
+NON_DETERMINISTIC_FUNCTIONS = ("Rand", "rand", "random")
 
 
 class CalculatorEngine(QObject):
@@ -17,14 +36,22 @@ class CalculatorEngine(QObject):
     # 信号定义
     result_ready = Signal(str)      # 计算结果就绪信号
     error_occurred = Signal(str)    # 错误发生信号
+    matrix_ready = Signal(object)   # 结果是矩阵时另外发送完整的矩阵（NumPy 数组）
+    factorization_requested = Signal(object)  # 因数分解需要较长时间，请求在工作线程中分解（要分解的数）
+    angle_mode_changed = Signal(str)          # 角度模式改变（新的模式）
     
-    def __init__(self):
+    def __init__(self, defer_history=False):
+        """
+        Args:
+            defer_history: 延迟加载历史记录（主窗口显示后再在后台加载，见 HistoryManager）
+        """
         super().__init__()
         self.current_expression = ""
         self.last_result = 0
         self.memory_value = 0
         self.angle_mode = "deg"  # 角度模式：deg(度) 或 rad(弧度)
-        self.history_manager = HistoryManager()
+        self.precision = 10      # 结果显示的有效数字位数
+        self.history_manager = HistoryManager(defer_loading=defer_history)
         
         # 运算符映射
         self.operator_map = {
@@ -34,7 +61,6 @@ class CalculatorEngine(QObject):
             "²": "**2",
             "³": "**3",
             "π": str(math.pi),
-            "e": str(math.e),
             "xʸ": "**",
             "10ˣ": "10**",
             "eˣ": "exp",
@@ -43,6 +69,25 @@ class CalculatorEngine(QObject):
             "n!": "factorial",
             "mod": "%",
         }
+        # 一次替换所有运算符：长的优先，ASCII 字母组成的（如 mod）只匹配完整的单词，
+        # 这样变量名和函数名（exp、model 等）中的字母不会被替换；常数 e 由函数表提供
+        self.operator_pattern = re.compile("|".join(
+            rf"(?<!\w){re.escape(op)}(?!\w)" if op.isascii() and op.isalpha() else re.escape(op)
+            for op in sorted(self.operator_map, key=len, reverse=True)))
+        
+        # 数值求解器（求根、积分、求导），编译结果在多次求值间复用
+        self.solvers = NumericSolvers(self)
+
+        # 表达式求值可用的函数和常数（只创建一次）
+        self.functions = self.build_function_table()
+
+        # 跨会话的结果缓存；首次使用时用历史记录预热（历史记录延迟加载时在加载完成后预热）
+        self.result_cache = ResultCache(FUNCTION_TABLE_VERSION)
+        if not self.result_cache.loaded_from_file:
+            if self.history_manager.loaded:
+                self.seed_result_cache()
+            else:
+                self.history_manager.history_loaded.connect(self.seed_result_cache)
         
     @Slot(str)
     def set_expression(self, expression):
@@ -59,34 +104,65 @@ class CalculatorEngine(QObject):
             # 预处理表达式
             processed_expr = self.preprocess_expression(self.current_expression)
             
-            # 计算结果
-            result = self.evaluate_expression(processed_expr)
-            
-            # 格式化结果
-            formatted_result = self.format_result(result)
+            # 先查结果缓存
+            cache_key = self.get_cache_key(processed_expr)
+            entry = None
+            if cache_key is not None:
+                entry = self.result_cache.get(cache_key)
+                
+            if entry is not None and entry[1] is not None:
+                formatted_result, result = entry
+            else:
+                # 计算结果（由历史记录预热的条目只有显示的结果，第一次命中时计算完整精度的值）
+                result = self.evaluate_expression(processed_expr)
+                
+                # 格式化结果
+                formatted_result = self.format_result(result)
+                
+                # 只缓存实数结果
+                if cache_key is not None and self.is_real_number(result):
+                    self.result_cache.put(cache_key, formatted_result, result)
             
-            # 保存结果
-            self.last_result = result
+            # 保存结果的数值（供内存操作使用）
+            self.last_result = self.numeric_value(result)
 
             # 添加到历史记录
             self.history_manager.add_record(self.current_expression, formatted_result)
 
             # 发送结果信号
             self.result_ready.emit(formatted_result)
+            if matrix_ops.is_matrix(result):
+                self.matrix_ready.emit(result)
             
+        except number_theory.FactorizationDeferred as e:
+            # 在工作线程中分解，结果写入分解缓存后重新计算
+            self.factorization_requested.emit(e.n)
         except Exception as e:
             error_msg = self.get_error_message(e)
             self.error_occurred.emit(error_msg)
             
+    def publish_result(self, expression, result):
+        """把在别处算出的结果（如统计面板的统计量）当作 expression 的计算结果：记入历史并发送结果信号"""
+        formatted_result = self.format_result(result)
+        self.last_result = self.numeric_value(result)
+        self.history_manager.add_record(expression, formatted_result)
+        self.result_ready.emit(formatted_result)
+
     def preprocess_expression(self, expression):
         """预处理表达式"""
         # 替换运算符
-        processed = expression
-        for old_op, new_op in self.operator_map.items():
-            processed = processed.replace(old_op, new_op)
+        processed = self.operator_pattern.sub(self.replace_operator, expression)
+
+        # 带单位的数改写为 quantity(...)，“… to 单位”改写为 convert(...)（单位表在第一次用到时才加载）
+        if units.UNIT_HINT_PATTERN.search(processed):
+            processed = units.rewrite_units(processed)
 
-        # 处理百分比
-        processed = re.sub(r'(\d+(?:\.\d+)?)%', r'(\1/100)', processed)
+        # 矩阵字面量改写为 matrix(...) 调用
+        processed = matrix_ops.convert_matrix_literals(processed)
+
+        # 处理百分比（先检查是否含 %，长表达式如矩阵字面量不必逐个数字尝试匹配）
+        if "%" in processed:
+            processed = re.sub(r'(\d+(?:\.\d+)?)%', r'(\1/100)', processed)
 
         # 处理正负号
         processed = processed.replace('±', '-')
@@ -96,14 +172,32 @@ class CalculatorEngine(QObject):
         processed = re.sub(r'sqrt(\d+(?:\.\d+)?)', r'sqrt(\1)', processed)
 
         # 处理平方
-        processed = re.sub(r'(\d+(?:\.\d+)?)\*\*2', r'(\1)**2', processed)
+        if "**2" in processed:
+            processed = re.sub(r'(\d+(?:\.\d+)?)\*\*2', r'(\1)**2', processed)
+
+        # 求解函数的第一个参数是关于第二个参数的表达式，改写为字符串交给求解器编译
+        if SOLVER_CALL_PATTERN.search(processed):
+            processed = quote_solver_arguments(processed)
 
         return processed
         
-    def evaluate_expression(self, expression):
-        """计算表达式"""
-        # 创建安全的计算环境
-        safe_dict = {
+    def replace_operator(self, match):
+        """替换一个运算符；π 与相邻的数、变量或括号之间的隐式乘法（如 2π、πr）改写为显式的 *"""
+        operator = match.group()
+        replacement = self.operator_map[operator]
+        if operator == "π":
+            text = match.string
+            before = text[match.start() - 1] if match.start() > 0 else ""
+            after = text[match.end()] if match.end() < len(text) else ""
+            if before and (before.isascii() and before.isalnum() or before in ").π"):
+                replacement = "*" + replacement
+            if after and (after.isascii() and after.isalnum() or after in "(."):
+                replacement += "*"
+        return replacement
+
+    def build_function_table(self):
+        """创建安全的计算环境：只包含计算器支持的函数和常数"""
+        return {
             "__builtins__": {},
             "abs": abs,
             "round": round,
@@ -130,30 +224,149 @@ class CalculatorEngine(QObject):
             "radians": math.radians,
             "ceil": math.ceil,
             "floor": math.floor,
+            "solve": self.solve,
+            "integrate": self.solvers.integrate,
+            "diff": self.solvers.diff,
+            "matrix": matrix_ops.matrix,
+            "det": matrix_ops.det,
+            "inv": matrix_ops.inv,
+            "transpose": matrix_ops.transpose,
+            "eig": matrix_ops.eig,
+            "matmul": matrix_ops.matmul,
+            "quantity": units.quantity,
+            "convert": units.convert,
+            "isprime": number_theory.isprime,
+            "factor": number_theory.factor,
+            "gcd": number_theory.gcd,
+            "lcm": number_theory.lcm,
+            "modpow": number_theory.modpow,
+            "modinv": number_theory.modinv,
+            "pmt": finance.pmt,
+            "pv": finance.pv,
+            "fv": finance.fv,
+            "npv": finance.npv,
+            "irr": finance.irr,
         }
+
+    def solve(self, *args):
+        """solve(A, b) 解线性方程组，solve(f, x, a, b) 求 f 在 [a, b] 上的零点"""
+        if len(args) == 2:
+            return matrix_ops.linsolve(*args)
+        return self.solvers.solve(*args)
         
-        # 计算表达式
-        result = eval(expression, safe_dict)
-        return result
+    def evaluate_expression(self, expression, variables=None):
+        """
+        计算表达式
+
+        Args:
+            expression: 预处理后的表达式（字符串或编译好的代码对象）
+            variables: 表达式可引用的变量 {名称: 值}
+        """
+        # 求解函数的表达式参数在求解器中另行编译求值，同样可以引用这些变量
+        previous = self.solvers.variables
+        self.solvers.variables = variables or {}
+        try:
+            # 复制函数表，表达式中的赋值（如海象运算符）不会改动共享的函数表
+            return eval(expression, dict(self.functions), variables)
+        finally:
+            self.solvers.variables = previous
         
     def format_result(self, result):
         """格式化计算结果"""
+        if matrix_ops.is_matrix(result):
+            return matrix_ops.format_matrix(result, self.format_result)
+        if isinstance(result, units.Quantity):
+            return result.format(self.format_result)
+
         if isinstance(result, complex):
             if result.imag == 0:
                 result = result.real
             else:
-                return f"{result.real:.10g}+{result.imag:.10g}i"
+                return f"{result.real:.{self.precision}g}+{result.imag:.{self.precision}g}i"
                 
         if isinstance(result, float):
             if result.is_integer():
                 return str(int(result))
             else:
                 # 限制小数位数，避免浮点精度问题
-                formatted = f"{result:.10g}"
+                formatted = f"{result:.{self.precision}g}"
                 return formatted
         else:
             return str(result)
             
+    def get_cache_key(self, processed):
+        """
+        获取预处理后的表达式的缓存键，不可缓存时返回 None
+
+        键由规范化表达式、角度模式（仅当表达式含三角函数时）和精度组成；
+        规范化表达式是各记号以空格连接（只忽略记号之间的空白，“10mod3”与“10 mod 3”的键不同）
+        """
+        normalized = self.normalize_expression(processed)
+        if not normalized or any(name in normalized for name in NON_DETERMINISTIC_FUNCTIONS):
+            return None
+        if any(name in normalized for name in ANGLE_DEPENDENT_FUNCTIONS):
+            angle_mode = self.angle_mode
+        else:
+            angle_mode = "-"
+        return f"{normalized}|{angle_mode}|{self.precision}"
+
+    @staticmethod
+    def normalize_expression(processed):
+        """把表达式切分为记号并以空格连接，无法切分（如括号不配对）时返回 None"""
+        try:
+            tokens = tokenize.generate_tokens(io.StringIO(processed).readline)
+            return " ".join(token.string for token in tokens if token.string.strip())
+        except (tokenize.TokenError, SyntaxError):
+            return None
+
+    @Slot()
+    def seed_result_cache(self):
+        """用历史记录预热结果缓存（从旧到新写入，最新的最后被淘汰）"""
+        for record in reversed(self.history_manager.get_history(self.result_cache.capacity)):
+            # 历史记录没有保存角度模式，含三角函数的表达式无法确定结果
+            if any(name in record.expression for name in ANGLE_DEPENDENT_FUNCTIONS):
+                continue
+            try:
+                key = self.get_cache_key(self.preprocess_expression(record.expression))
+            except Exception:
+                continue
+            if key is not None and self.parse_number(record.result) is not None:
+                self.result_cache.put(key, record.result, save=False)
+        self.result_cache.save()
+
+    @staticmethod
+    def numeric_value(result):
+        """结果的数值：因数分解结果取原数，真假值、矩阵、带单位的量等不是数值，返回 None"""
+        if isinstance(result, number_theory.Factorization):
+            return int(result)
+        if isinstance(result, numbers.Number) and not isinstance(result, bool):
+            return result
+        return None
+
+    @staticmethod
+    def is_real_number(value):
+        """判断是否为实数结果"""
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    @staticmethod
+    def parse_number(text):
+        """把结果字符串解析为数字，无法解析时返回 None"""
+        try:
+            return int(text)
+        except ValueError:
+            pass
+        try:
+            return float(text)
+        except ValueError:
+            return None
+
+    def get_diagnostics(self):
+        """获取引擎诊断信息"""
+        return {
+            "result_cache": self.result_cache.get_statistics(),
+            "history_store": self.history_manager.get_store_statistics(),
+        }
+            
     def get_error_message(self, exception):
         """获取友好的错误信息"""
         error_type = type(exception).__name__
@@ -166,6 +379,9 @@ class CalculatorEngine(QObject):
             return "数值溢出"
         elif error_type == "SyntaxError":
             return "表达式语法错误"
+        elif error_type in ("SolverError", "MatrixError", "UnitError", "NumberTheoryError", "FactorizationDeferred",
+                            "FinanceError", "RpnError"):
+            return str(exception)
         elif "math domain error" in str(exception):
             return "数学域错误"
         else:
@@ -225,28 +441,33 @@ class CalculatorEngine(QObject):
     @Slot()
     def memory_store(self):
         """存储到内存"""
-        try:
-            self.memory_value = float(self.current_expression)
-        except:
-            self.memory_value = self.last_result
+        value = self.memory_operand()
+        if value is not None:
+            self.memory_value = value
             
     @Slot()
     def memory_add(self):
         """内存加法"""
-        try:
-            value = float(self.current_expression)
+        value = self.memory_operand()
+        if value is not None:
             self.memory_value += value
-        except:
-            self.memory_value += self.last_result
             
     @Slot()
     def memory_subtract(self):
         """内存减法"""
-        try:
-            value = float(self.current_expression)
+        value = self.memory_operand()
+        if value is not None:
             self.memory_value -= value
-        except:
-            self.memory_value -= self.last_result
+
+    def memory_operand(self):
+        """内存操作的操作数：当前输入的数，否则为上次结果的数值；都不是数值时发送错误信号并返回 None"""
+        try:
+            return float(self.current_expression)
+        except ValueError:
+            pass
+        if self.last_result is None:
+            self.error_occurred.emit("内存只能保存数值")
+        return self.last_result
             
     @Slot()
     def clear(self):
@@ -256,8 +477,9 @@ class CalculatorEngine(QObject):
         
     def set_angle_mode(self, mode):
         """设置角度模式"""
-        if mode in ["deg", "rad"]:
+        if mode in ["deg", "rad"] and mode != self.angle_mode:
             self.angle_mode = mode
+            self.angle_mode_changed.emit(mode)
             
     def get_memory_value(self):
         """获取内存值"""
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+表达式前缀树 - 按使用频率给出表达式的自动补全
+每个节点缓存以该前缀开头、使用次数最多的前 k 个表达式，
+查询只需沿前缀走到对应节点，与历史记录的数量无关
+"""
+
+from bisect import insort
+
+
+class TrieNode:
+    """前缀树节点"""
+
+    __slots__ = ("children", "count", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.count = 0   # 以该节点结尾的表达式的使用次数
+        self.top = []    # [(-使用次数, 表达式)]，升序排列即使用次数从多到少
+
+    def offer(self, expression, count, limit):
+        """用表达式的最新使用次数更新本节点的前 k 名"""
+        top = self.top
+        for i, (_, existing) in enumerate(top):
+            if existing == expression:
+                del top[i]
+                break
+        if len(top) < limit or -count < top[-1][0]:
+            insort(top, (-count, expression))
+            del top[limit:]
+
+
+class ExpressionTrie:
+    """按使用频率排序的表达式前缀树"""
+
+    def __init__(self, limit=8):
+        """
+        Args:
+            limit: 每个前缀最多保留的补全数
+        """
+        self.limit = limit
+        self.root = TrieNode()
+        self.size = 0  # 不同表达式的个数
+
+    def add(self, expression, weight=1):
+        """把表达式的使用次数增加 weight，并更新沿途各前缀的前 k 名"""
+        if not expression:
+            return
+        path = [self.root]
+        node = self.root
+        for char in expression:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = TrieNode()
+            node = child
+            path.append(node)
+
+        if node.count == 0:
+            self.size += 1
+        node.count += weight
+        for prefix_node in path:
+            prefix_node.offer(expression, node.count, self.limit)
+
+    def complete(self, prefix, limit=None):
+        """
+        返回以 prefix 开头的表达式（使用次数从多到少，不含 prefix 本身）
+
+        Args:
+            prefix: 已输入的前缀
+            limit: 最多返回的个数，默认为 self.limit
+        """
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        completions = [expression for _, expression in node.top if expression != prefix]
+        return completions[:limit or self.limit]
+
+    def count(self, expression):
+        """表达式的使用次数"""
+        node = self.root
+        for char in expression:
+            node = node.children.get(char)
+            if node is None:
+                return 0
+        return node.count
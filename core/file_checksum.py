@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件校验和位统计 - 对文件或其中的一段计算 CRC32、Adler-32、置位数（1 的个数）、奇偶校验位和字节直方图
+在工作线程中按大块顺序读入同一个缓冲区（不为每块分配内存），校验和由 zlib 计算，
+置位数按 64 位字由 NumPy 向量化计数；字节直方图（np.bincount）比校验和慢得多，只在需要时计算
+"""
+
+import os
+import zlib
+
+import numpy as np
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+
+# 每次读取的块大小（字节）
+CHUNK_SIZE = 4 << 20
+
+# 统计直方图时每次计数的字节数（np.bincount 先把数据展开为 64 位整数，小块能留在缓存中）
+HISTOGRAM_SLICE = 1 << 18
+
+
+def count_bits(chunk):
+    """置位数：前面按 64 位字向量化计数，末尾不足 8 字节的部分逐字节计数"""
+    words = len(chunk) // 8
+    total = 0
+    if words:
+        array = np.frombuffer(chunk, dtype=np.uint64, count=words)
+        if hasattr(np, "bitwise_count"):
+            total = int(np.bitwise_count(array).sum(dtype=np.int64))
+        else:
+            total = int(np.unpackbits(array.view(np.uint8)).sum(dtype=np.int64))
+    return total + sum(byte.bit_count() for byte in bytes(chunk[words * 8:]))
+
+
+def byte_histogram(chunk):
+    """各字节值（0~255）出现的次数"""
+    histogram = np.zeros(256, dtype=np.int64)
+    array = np.frombuffer(chunk, dtype=np.uint8)
+    for start in range(0, array.size, HISTOGRAM_SLICE):
+        histogram += np.bincount(array[start:start + HISTOGRAM_SLICE], minlength=256)
+    return histogram
+
+
+class FileDigest:
+    """逐块累计的校验和与位统计"""
+
+    def __init__(self, start=0, end=0, histogram=False):
+        """
+        Args:
+            start, end: 统计的字节范围（用于显示）
+            histogram: 是否统计字节直方图
+        """
+        self.start = start
+        self.end = end
+        self.size = 0
+        self.crc32 = 0
+        self.adler32 = 1
+        self.popcount = 0
+        self.histogram = np.zeros(256, dtype=np.int64) if histogram else None
+
+    def update(self, chunk):
+        """合并一块数据（bytes、bytearray 或 memoryview）"""
+        self.crc32 = zlib.crc32(chunk, self.crc32)
+        self.adler32 = zlib.adler32(chunk, self.adler32)
+        self.popcount += count_bits(chunk)
+        if self.histogram is not None:
+            self.histogram += byte_histogram(chunk)
+        self.size += len(chunk)
+
+    @property
+    def parity(self):
+        """奇偶校验位：1 的个数为奇数时为 1"""
+        return self.popcount & 1
+
+    def summary(self):
+        """
+        结果列表
+
+        Returns:
+            [(名称, 说明, 值, 显示文本)]
+        """
+        rows = [
+            ("size", "字节数", self.size, f"{self.size:,}"),
+            ("crc32", "CRC32", self.crc32, f"0x{self.crc32:08X}"),
+            ("adler32", "Adler-32", self.adler32, f"0x{self.adler32:08X}"),
+            ("popcount", "置位数（1 的个数）", self.popcount, f"{self.popcount:,}"),
+            ("parity", "奇偶校验位（1 的个数为奇数时为 1）", self.parity, str(self.parity)),
+        ]
+        if self.size:
+            density = self.popcount / (8 * self.size)
+            rows.append(("density", "1 的比例", density, f"{density:.4%}"))
+        if self.histogram is not None:
+            distinct = int(np.count_nonzero(self.histogram))
+            rows.append(("distinct", "出现过的字节值个数", distinct, str(distinct)))
+        return rows
+
+    def histogram_bins(self):
+        """直方图的分箱 [(字节值, 字节值 + 1, 次数)]"""
+        if self.histogram is None:
+            return []
+        return [(value, value + 1, int(count)) for value, count in enumerate(self.histogram.tolist())]
+
+
+def resolve_range(size, offset, length):
+    """
+    把起始偏移和长度限制在文件范围内
+
+    Args:
+        offset: 起始偏移，负数表示从文件末尾倒数
+        length: 长度，为 None 时到文件末尾
+
+    Returns:
+        (起始位置, 结束位置)
+    """
+    start = offset + size if offset < 0 else offset
+    if not 0 <= start <= size:
+        raise ValueError(f"起始偏移超出文件范围（文件共 {size} 字节）")
+    if length is not None and length < 0:
+        raise ValueError("长度不能为负数")
+    end = size if length is None else min(size, start + length)
+    return start, end
+
+
+class ChecksumSignals(QObject):
+    """校验任务的信号（QRunnable 本身不能发送信号）"""
+
+    # 参数：任务代号、进度（0~100）
+    progress = Signal(int, int)
+    # 参数：任务代号、FileDigest
+    finished = Signal(int, object)
+    # 参数：任务代号、错误信息
+    failed = Signal(int, str)
+
+
+class ChecksumTask(QRunnable):
+    """在工作线程中对文件的一段计算校验和与位统计"""
+
+    def __init__(self, path, offset, length, histogram, generation, cancel_event):
+        """
+        Args:
+            path: 文件路径
+            offset, length: 统计的范围（见 resolve_range）
+            histogram: 是否统计字节直方图
+            generation: 任务代号，随信号一起返回
+            cancel_event: threading.Event，被设置后任务放弃计算
+        """
+        super().__init__()
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.histogram = histogram
+        self.generation = generation
+        self.cancel_event = cancel_event
+        self.signals = ChecksumSignals()
+
+    def run(self):
+        try:
+            digest = self.compute()
+        except (OSError, ValueError) as e:
+            self.signals.failed.emit(self.generation, f"计算失败: {e}")
+            return
+        if digest is not None:
+            self.signals.finished.emit(self.generation, digest)
+
+    def compute(self):
+        """
+        执行计算，被取消时返回 None
+        """
+        # 不经过 Python 的缓冲层，直接读入可复用的缓冲区
+        with open(self.path, "rb", buffering=0) as f:
+            start, end = resolve_range(os.fstat(f.fileno()).st_size, self.offset, self.length)
+            f.seek(start)
+            if hasattr(os, "posix_fadvise") and end > start:
+                os.posix_fadvise(f.fileno(), start, end - start, os.POSIX_FADV_SEQUENTIAL)
+            digest = FileDigest(start, end, self.histogram)
+            buffer = memoryview(bytearray(min(CHUNK_SIZE, max(end - start, 1))))
+            last_percent = -1
+            while digest.size < end - start:
+                if self.cancel_event.is_set():
+                    return None
+                count = f.readinto(buffer[:min(len(buffer), end - start - digest.size)])
+                if not count:
+                    break  # 文件在读取过程中变短了
+                digest.update(buffer[:count])
+                percent = digest.size * 100 // (end - start)
+                if percent != last_percent:
+                    last_percent = percent
+                    self.signals.progress.emit(self.generation, percent)
+        return digest
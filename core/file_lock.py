@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件锁 - 多个计算器进程之间的互斥
+Windows 使用 msvcrt.locking，其他系统使用 fcntl.flock
+"""
+
+import os
+import time
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import fcntl
+
+
+class FileLock:
+    """基于锁文件的进程间互斥锁（可作为上下文管理器使用）"""
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        # 最近一次持有锁的时长（秒），用于诊断
+        self.last_hold_time = 0.0
+        self.max_hold_time = 0.0
+        self._acquired_at = 0.0
+
+    def acquire(self):
+        """获取锁（阻塞）"""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if msvcrt:
+                # msvcrt.locking 最多重试 10 秒，持续重试直到成功
+                while True:
+                    try:
+                        os.lseek(fd, 0, os.SEEK_SET)
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.01)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+        self._acquired_at = time.perf_counter()
+
+    def release(self):
+        """释放锁"""
+        if self._fd is None:
+            return
+        self.last_hold_time = time.perf_counter() - self._acquired_at
+        self.max_hold_time = max(self.max_hold_time, self.last_hold_time)
+        try:
+            if msvcrt:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
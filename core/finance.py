@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+金融函数 - 年金（PMT、PV、FV）、净现值（NPV）、内部收益率（IRR）和还款计划
+现金流的符号约定：收到的钱为正，付出的钱为负（如贷款 pv 为正，每期还款 pmt 为负）；
+还款计划用 NumPy 按公式一次算出所有期（不逐期循环），利率和本金可以是数组，一次计算整组方案
+"""
+
+import math
+
+from . import matrix_ops
+
+
+# 计算 IRR 时搜索符号变化的利率（从 -99% 到 100000%）
+IRR_SEARCH_RATES = (-0.99, -0.9, -0.75, -0.5, -0.25, -0.1, 0.0, 0.05, 0.1, 0.2, 0.35, 0.5,
+                    0.75, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 50.0, 100.0, 1000.0)
+
+# 没有指定时 IRR 取最接近这个利率的解（现金流多次变号时可能有多个解）
+IRR_GUESS = 0.1
+
+# IRR 迭代的最大次数和相对精度
+IRR_MAX_ITERATIONS = 100
+IRR_TOLERANCE = 1e-12
+
+# 还款方式：等额本息、等额本金
+ANNUITY = "annuity"
+EQUAL_PRINCIPAL = "equal_principal"
+
+
+class FinanceError(ValueError):
+    """金融函数的参数无效（错误信息直接显示给用户）"""
+
+
+def check_when(when):
+    """付款时点：0 为期末，1 为期初"""
+    if when not in (0, 1):
+        raise FinanceError("付款时点必须是 0（期末）或 1（期初）")
+    return when
+
+
+def growth(rate, nper):
+    """(1 + rate)^nper（由 log1p/expm1 计算，利率很小时也准确），返回 (增长倍数, 增长倍数 - 1)"""
+    if rate <= -1:
+        raise FinanceError("利率必须大于 -100%")
+    exponent = nper * math.log1p(rate)
+    return math.exp(exponent), math.expm1(exponent)
+
+
+def fv(rate, nper, pmt, pv, when=0):
+    """终值：现值 pv、每期 pmt，nper 期后的价值"""
+    check_when(when)
+    if rate == 0:
+        return -(pv + pmt * nper)
+    factor, increase = growth(rate, nper)
+    return -(pv * factor + pmt * (1 + rate * when) * increase / rate)
+
+
+def pmt(rate, nper, pv, fv=0, when=0):
+    """每期付款额：nper 期内还清现值 pv（并留下终值 fv）"""
+    check_when(when)
+    if nper == 0:
+        raise FinanceError("期数不能为 0")
+    if rate == 0:
+        return -(pv + fv) / nper
+    factor, increase = growth(rate, nper)
+    return -(fv + pv * factor) * rate / ((1 + rate * when) * increase)
+
+
+def pv(rate, nper, pmt, fv=0, when=0):
+    """现值：每期付款 pmt、nper 期后终值 fv 的现金流现在的价值"""
+    check_when(when)
+    if rate == 0:
+        return -(fv + pmt * nper)
+    factor, increase = growth(rate, nper)
+    return -(fv + pmt * (1 + rate * when) * increase / rate) / factor
+
+
+def cashflow_values(flows):
+    """把现金流参数（若干个数，或向量/列表）展开为浮点数列表"""
+    values = []
+    for flow in flows:
+        if matrix_ops.is_matrix(flow):
+            values.extend(float(value) for value in flow.ravel().tolist())
+        elif isinstance(flow, (list, tuple)):
+            values.extend(cashflow_values(flow))
+        elif isinstance(flow, (int, float)) and not isinstance(flow, bool):
+            values.append(float(flow))
+        else:
+            raise FinanceError("现金流必须是数")
+    return values
+
+
+def discounted_value(rate, values):
+    """第 0、1、2… 期现金流按 rate 折现到第 0 期之和，以及它对 rate 的导数（Horner 法则）"""
+    x = 1 / (1 + rate)
+    total = derivative = 0.0
+    for value in reversed(values):
+        derivative = derivative * x + total
+        total = total * x + value
+    # d/dr Σ c_t·x^t = Σ t·c_t·x^(t-1) · (-x²)
+    return total, -derivative * x * x
+
+
+def npv(rate, *flows):
+    """净现值：第一笔现金流在第 0 期（不折现），之后每期折现一次"""
+    values = cashflow_values(flows)
+    if not values:
+        raise FinanceError("npv 至少需要一笔现金流")
+    if rate <= -1:
+        raise FinanceError("利率必须大于 -100%")
+    return discounted_value(rate, values)[0]
+
+
+def irr(*flows):
+    """
+    内部收益率：使净现值为零的利率
+
+    先在一组利率上找出净现值变号的区间（有多个时取最接近 IRR_GUESS 的），
+    再在区间内用牛顿法迭代；牛顿步越出区间或收敛太慢时改为二分，因此总能收敛
+    """
+    values = cashflow_values(flows)
+    if not (any(value > 0 for value in values) and any(value < 0 for value in values)):
+        raise FinanceError("现金流需要同时有正有负才有内部收益率")
+
+    samples = [(rate, discounted_value(rate, values)[0]) for rate in IRR_SEARCH_RATES]
+    brackets = []
+    for (low, f_low), (high, f_high) in zip(samples, samples[1:]):
+        if f_low == 0:
+            return low
+        if (f_low < 0) != (f_high < 0):
+            brackets.append((low, high, f_low))
+    if samples[-1][1] == 0:
+        return samples[-1][0]
+    if not brackets:
+        raise FinanceError("在 -99% 到 100000% 之间找不到内部收益率")
+    low, high, f_low = min(brackets, key=lambda b: abs((b[0] + b[1]) / 2 - IRR_GUESS))
+    return safeguarded_newton(values, low, high, f_low)
+
+
+def safeguarded_newton(values, low, high, f_low):
+    """在 [low, high]（两端净现值异号）内求净现值的零点"""
+    rising = f_low < 0  # 净现值从 low 到 high 是否由负变正
+    rate = (low + high) / 2
+    step = previous_step = high - low
+    for _ in range(IRR_MAX_ITERATIONS):
+        value, derivative = discounted_value(rate, values)
+        if value == 0:
+            return rate
+        if (value < 0) == rising:
+            low = rate
+        else:
+            high = rate
+        newton = rate - value / derivative if derivative else None
+        # 牛顿步越出区间，或步长没有比上上步缩小一半：改为二分
+        if newton is None or not low < newton < high or abs(2 * value) > abs(previous_step * derivative):
+            previous_step, step = step, (high - low) / 2
+            rate = low + step
+        else:
+            previous_step, step = step, rate - newton
+            rate = newton
+        if abs(step) <= IRR_TOLERANCE * (1 + abs(rate)):
+            return rate
+    return rate
+
+
+class Schedule:
+    """
+    还款计划：各期的还款额、利息、本金和剩余本金（NumPy 数组，最后一维是期数）
+
+    利率和本金为数组时一次计算整组方案，各数组的形状为 广播后的形状 + (期数,)
+    """
+
+    COLUMNS = ("period", "payment", "interest", "principal", "balance")
+
+    def __init__(self, payment, interest, principal, balance):
+        self.payment = payment
+        self.interest = interest
+        self.principal = principal
+        self.balance = balance
+
+    @property
+    def periods(self):
+        return self.payment.shape[-1]
+
+    def total_interest(self):
+        return self.interest.sum(axis=-1)
+
+    def total_payment(self):
+        return self.payment.sum(axis=-1)
+
+    def row(self, index):
+        """第 index 期（从 0 开始）的 (期数, 还款额, 利息, 本金, 剩余本金)，只用于单个方案"""
+        return (index + 1, float(self.payment[index]), float(self.interest[index]),
+                float(self.principal[index]), float(self.balance[index]))
+
+
+def schedule(rate, nper, principal, method=ANNUITY):
+    """
+    计算还款计划（期末还款，最后一期还清）
+
+    Args:
+        rate: 每期利率（数或数组）
+        nper: 期数
+        principal: 贷款本金（数或数组，为正数）
+        method: ANNUITY（等额本息）或 EQUAL_PRINCIPAL（等额本金）
+
+    Returns:
+        Schedule，还款额、利息、本金均为正数
+    """
+    import numpy as np
+    nper = int(nper)
+    if nper <= 0:
+        raise FinanceError("期数必须是正整数")
+    rate = np.asarray(rate, dtype=float)[..., np.newaxis]
+    principal = np.asarray(principal, dtype=float)[..., np.newaxis]
+    if np.any(rate <= -1):
+        raise FinanceError("利率必须大于 -100%")
+    k = np.arange(nper + 1, dtype=float)  # 第 0 ~ nper 期末
+
+    if method == EQUAL_PRINCIPAL:
+        balance = principal * (1 - k / nper)
+        interest = balance[..., :-1] * rate
+        paid = np.broadcast_to(principal / nper, interest.shape)
+        payment = paid + interest
+    elif method == ANNUITY:
+        # (1 + r)^k - 1 和 ((1 + r)^k - 1) / r（r 为 0 时取极限 k）
+        log_growth = np.log1p(rate)
+        increase = np.expm1(k * log_growth)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            annuity = np.where(rate == 0, k, increase / np.where(rate == 0, 1, rate))
+        per_period = principal * (1 + increase[..., -1:]) / annuity[..., -1:]
+        balance = principal * (1 + increase) - per_period * annuity
+        interest = balance[..., :-1] * rate
+        payment = np.broadcast_to(per_period, interest.shape)
+        paid = payment - interest
+    else:
+        raise FinanceError(f"未知的还款方式: {method}")
+
+    balance = balance[..., 1:].copy()
+    balance[..., -1] = 0.0  # 最后一期还清（消除舍入误差）
+    return Schedule(np.ascontiguousarray(payment), interest, np.ascontiguousarray(paid), balance)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+函数采样 - 用 NumPy 向量化求值 f(x)，并在曲率大和不连续处自适应加密
+先在区间上均匀取点，再逐层只对“中点偏离弦”的小区间取中点，每层一次向量化求值；
+加密到最大层数后仍有明显跳变的区间视为不连续，在结果中用 NaN 断开
+"""
+
+import math
+import numpy as np
+
+
+def build_namespace(engine):
+    """创建向量化求值可用的函数和常数（与计算引擎的函数表对应，角度模式相同）"""
+    if engine.angle_mode == "deg":
+        to_radians, from_radians = np.radians, np.degrees
+    else:
+        to_radians = from_radians = lambda v: v
+    gamma = np.vectorize(safe_gamma, otypes=[float])
+    return {
+        "__builtins__": {},
+        "abs": np.abs,
+        "round": np.round,
+        "pow": np.power,
+        "sqrt": np.sqrt,
+        "cbrt": np.cbrt,
+        "nthroot": lambda v, n: np.power(v, 1 / n),
+        "sin": lambda v: np.sin(to_radians(v)),
+        "cos": lambda v: np.cos(to_radians(v)),
+        "tan": lambda v: np.tan(to_radians(v)),
+        "asin": lambda v: from_radians(np.arcsin(v)),
+        "acos": lambda v: from_radians(np.arccos(v)),
+        "atan": lambda v: from_radians(np.arctan(v)),
+        "sinh": np.sinh,
+        "cosh": np.cosh,
+        "tanh": np.tanh,
+        "log": np.log10,
+        "ln": np.log,
+        "exp": np.exp,
+        "pi": np.pi,
+        "e": np.e,
+        "factorial": lambda v: gamma(np.asarray(v, dtype=float) + 1),  # 用 Γ(x+1) 连续延拓
+        "degrees": np.degrees,
+        "radians": np.radians,
+        "ceil": np.ceil,
+        "floor": np.floor,
+        # 求解函数逐点调用（参数可以是数组，如以 x 为积分上限）
+        "solve": np.vectorize(engine.solvers.solve, otypes=[float]),
+        "integrate": np.vectorize(engine.solvers.integrate, otypes=[float]),
+        "diff": np.vectorize(engine.solvers.diff, otypes=[float]),
+    }
+
+
+def safe_gamma(v):
+    """Γ 函数，极点和溢出处为 NaN"""
+    try:
+        return math.gamma(v)
+    except (ValueError, OverflowError):
+        return math.nan
+
+
+def compile_function(engine, expression):
+    """
+    把含 x 的表达式编译为向量化函数
+
+    Returns:
+        接收 x 数组、返回 y 数组的函数（定义域外为 NaN）
+
+    Raises:
+        SyntaxError: 表达式语法错误
+        NameError: 引用了 x 以外的未知名称
+    """
+    code = compile(engine.preprocess_expression(expression), "<plot>", "eval")
+    namespace = build_namespace(engine)
+    for name in code.co_names:
+        if name != "x" and name not in namespace:
+            raise NameError(name)
+
+    def function(xs):
+        return evaluate_array(code, namespace, "x", xs)
+
+    return function
+
+
+def evaluate_array(code, namespace, variable, xs, variables=None):
+    """
+    以数组 xs 作为变量 variable 向量化求值（variables 是表达式可引用的其他变量）
+
+    Returns:
+        与 xs 形状相同的浮点数组，定义域外、复数结果和无穷大为 NaN
+    """
+    with np.errstate(all="ignore"):
+        try:
+            ys = eval(code, namespace, {**(variables or {}), variable: xs})
+            ys = np.asarray(ys)
+            if np.iscomplexobj(ys):
+                ys = np.where(ys.imag == 0, ys.real, np.nan)
+            ys = np.array(np.broadcast_to(ys.astype(float), xs.shape))
+            ys[np.isinf(ys)] = np.nan  # 极点（如 1/0）与定义域外同样断开
+            return ys
+        except (TypeError, ValueError, ZeroDivisionError, OverflowError):
+            # 向量化求值失败（如整数运算溢出）时退回逐点求值
+            return np.array([evaluate_point(code, namespace, variable, x, variables) for x in xs], dtype=float)
+
+
+def evaluate_point(code, namespace, variable, x, variables=None):
+    """逐点求值，出错时为 NaN"""
+    try:
+        y = complex(eval(code, namespace, {**(variables or {}), variable: float(x)}))
+        return y.real if y.imag == 0 and math.isfinite(y.real) else math.nan
+    except Exception:
+        return math.nan
+
+
+def sample(function, x0, x1, count, tolerance, max_depth=6, clip=None):
+    """
+    在 [x0, x1] 上自适应采样
+
+    Args:
+        function: 向量化函数
+        count: 初始均匀区间数
+        tolerance: 允许的中点偏差（y 方向，数据单位）
+        max_depth: 最多加密的层数
+        clip: (下限, 上限)，超出的 y 被截断（避免绘制极大的坐标）
+
+    Returns:
+        (xs, ys)，不连续处插入 y 为 NaN 的点
+    """
+    xs = np.linspace(x0, x1, count + 1)
+    ys = function(xs)
+    candidates = np.arange(count)  # 待检查区间的左端点下标
+    for depth in range(max_depth + 1):
+        if candidates.size == 0:
+            break
+        left, right = ys[candidates], ys[candidates + 1]
+        mid_xs = (xs[candidates] + xs[candidates + 1]) / 2
+        mid_ys = function(mid_xs)
+        with np.errstate(invalid="ignore"):
+            deviation = np.abs(mid_ys - (left + right) / 2)
+            flagged = deviation > tolerance
+        # 定义域边界：端点和中点中只有部分为 NaN
+        nan_count = np.isnan(left).astype(int) + np.isnan(right) + np.isnan(mid_ys)
+        flagged |= (nan_count > 0) & (nan_count < 3)
+
+        if depth == max_depth:
+            # 加密到底仍明显跳变，且区间内远非线性（陡峭但连续的曲线在这么小的区间内近似直线）：
+            # 视为不连续，在区间中点断开
+            with np.errstate(invalid="ignore"):
+                jump = np.abs(right - left)
+                jumps = flagged & (jump > 4 * tolerance) & (deviation > jump / 4)
+            breaks = candidates[jumps]
+            xs = np.insert(xs, breaks + 1, mid_xs[jumps])
+            ys = np.insert(ys, breaks + 1, np.nan)
+            break
+
+        indexes = candidates[flagged]
+        xs = np.insert(xs, indexes + 1, mid_xs[flagged])
+        ys = np.insert(ys, indexes + 1, mid_ys[flagged])
+        # 插入后第 k 个被加密区间的左端点下移 k 位，左右两半都要继续检查
+        shifted = indexes + np.arange(indexes.size)
+        candidates = np.concatenate((shifted, shifted + 1))
+        candidates.sort()
+
+    if clip is not None:
+        ys = np.clip(ys, *clip)
+    return xs, ys
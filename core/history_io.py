@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史记录导入导出 - 以流的方式读写 CSV、JSON Lines 和列式归档格式
+所有读写函数都逐条（或逐个行组）处理，不会一次性构造全部记录
+
+列式归档格式（.calccol）：
+    文件头    b"CALCCOL1"
+    行组 ×N   uint32 行数 n（n 为 0 表示文件结束）
+              int64[n] 时间戳
+              字符串列 表达式（字典编码）
+              字符串列 结果（字典编码）
+    字符串列  uint32 不同取值个数 k，uint32[k+1] 偏移量，UTF-8 数据，uint32[n] 取值编号
+所有整数均为小端序
+"""
+
+import csv
+import json
+import struct
+import sys
+from array import array
+from itertools import islice
+
+from .history_record import HistoryRecord
+
+
+# 支持的格式及其扩展名
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMAT_COLUMNAR = "calccol"
+FORMAT_EXTENSIONS = {
+    ".csv": FORMAT_CSV,
+    ".jsonl": FORMAT_JSONL,
+    ".calccol": FORMAT_COLUMNAR,
+}
+
+COLUMNAR_MAGIC = b"CALCCOL1"
+ROW_GROUP_SIZE = 65536
+CSV_FIELDS = ["expression", "result", "timestamp"]
+
+_UINT32 = struct.Struct("<I")
+
+
+def detect_format(path):
+    """根据扩展名判断文件格式，无法识别时抛出 ValueError"""
+    lowered = path.lower()
+    for extension, file_format in FORMAT_EXTENSIONS.items():
+        if lowered.endswith(extension):
+            return file_format
+    raise ValueError(f"不支持的文件格式: {path}")
+
+
+def write_records(path, records, file_format=None):
+    """
+    把记录流写入文件
+
+    Args:
+        path: 文件路径
+        records: HistoryRecord 的可迭代对象
+        file_format: 文件格式，默认根据扩展名判断
+
+    Returns:
+        写入的记录数
+    """
+    file_format = file_format or detect_format(path)
+    if file_format == FORMAT_CSV:
+        return _write_csv(path, records)
+    elif file_format == FORMAT_JSONL:
+        return _write_jsonl(path, records)
+    elif file_format == FORMAT_COLUMNAR:
+        return _write_columnar(path, records)
+    raise ValueError(f"不支持的文件格式: {file_format}")
+
+
+def read_records(path, file_format=None):
+    """按文件顺序逐条产生 HistoryRecord"""
+    file_format = file_format or detect_format(path)
+    if file_format == FORMAT_CSV:
+        return _read_csv(path)
+    elif file_format == FORMAT_JSONL:
+        return _read_jsonl(path)
+    elif file_format == FORMAT_COLUMNAR:
+        return _read_columnar(path)
+    raise ValueError(f"不支持的文件格式: {file_format}")
+
+
+def _write_csv(path, records):
+    """写入 CSV（时间为 ISO 8601 格式）"""
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        for record in records:
+            writer.writerow([record.expression, record.result, record.iso_timestamp])
+            count += 1
+    return count
+
+
+def _read_csv(path):
+    """读取 CSV"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            yield HistoryRecord.from_dict(row)
+
+
+def _write_jsonl(path, records):
+    """写入 JSON Lines（每行一条记录）"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record.to_dict(), ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def _read_jsonl(path):
+    """读取 JSON Lines"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield HistoryRecord.from_dict(json.loads(line))
+
+
+def _write_columnar(path, records):
+    """写入列式归档，每 ROW_GROUP_SIZE 条记录一个行组"""
+    count = 0
+    iterator = iter(records)
+    with open(path, 'wb') as f:
+        f.write(COLUMNAR_MAGIC)
+        while True:
+            group = list(islice(iterator, ROW_GROUP_SIZE))
+            if not group:
+                break
+            f.write(_UINT32.pack(len(group)))
+            f.write(_to_little_endian(array('q', [record.timestamp for record in group])).tobytes())
+            f.write(_encode_strings([record.expression for record in group]))
+            f.write(_encode_strings([record.result for record in group]))
+            count += len(group)
+        f.write(_UINT32.pack(0))
+    return count
+
+
+def _read_columnar(path):
+    """读取列式归档，整列批量解码"""
+    with open(path, 'rb') as f:
+        if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"不是有效的列式归档文件: {path}")
+        while True:
+            (row_count,) = _UINT32.unpack(f.read(_UINT32.size))
+            if row_count == 0:
+                return
+            timestamps = _read_array(f, 'q', row_count)
+            expressions = _decode_strings(f, row_count)
+            results = _decode_strings(f, row_count)
+            # 字典编码使相同的字符串只解码一次，且天然共享同一个对象
+            for expression, result, timestamp in zip(expressions, results, timestamps):
+                yield HistoryRecord(expression, result, timestamp)
+
+
+def _encode_strings(values):
+    """字典编码一列字符串"""
+    codes_by_value = {}
+    codes = array('I')
+    for value in values:
+        code = codes_by_value.get(value)
+        if code is None:
+            code = codes_by_value[value] = len(codes_by_value)
+        codes.append(code)
+
+    blob = bytearray()
+    offsets = array('I', [0])
+    for value in codes_by_value:
+        blob += value.encode('utf-8')
+        offsets.append(len(blob))
+
+    return b"".join([
+        _UINT32.pack(len(codes_by_value)),
+        _to_little_endian(offsets).tobytes(),
+        bytes(blob),
+        _to_little_endian(codes).tobytes(),
+    ])
+
+
+def _decode_strings(f, row_count):
+    """解码一列字典编码的字符串，返回长度为 row_count 的列表"""
+    (unique_count,) = _UINT32.unpack(f.read(_UINT32.size))
+    offsets = _read_array(f, 'I', unique_count + 1)
+    blob = f.read(offsets[-1])
+    dictionary = [sys.intern(blob[offsets[i]:offsets[i + 1]].decode('utf-8'))
+                  for i in range(unique_count)]
+    codes = _read_array(f, 'I', row_count)
+    return [dictionary[code] for code in codes]
+
+
+def _read_array(f, typecode, count):
+    """从文件读取小端序的数组"""
+    values = array(typecode)
+    values.frombytes(f.read(values.itemsize * count))
+    return _to_little_endian(values)
+
+
+def _to_little_endian(values):
+    """在大端序机器上交换字节序（原地修改并返回）"""
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
@@ -3,135 +3,419 @@
 """
 历史记录管理器 - 管理计算历史记录
 支持保存、读取和管理计算历史
+多个计算器实例共享同一份历史记录，彼此的新记录会被增量同步
+启动时可以延迟加载：窗口显示后再在工作线程中读取旧版 JSON 文件，在此之前用到历史记录时立即加载
 """
 
-from PySide6.QtCore import QObject, Signal
-from datetime import datetime
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+from collections import deque
+from itertools import islice
 import json
 import os
+import time
+
+from . import history_io
+from .expression_trie import ExpressionTrie
+from .history_record import HistoryRecord
+from .history_store import HistoryStore, SCAN_CHUNK
+
+
+def read_legacy_history(path):
+    """读取旧版 JSON 历史文件，返回记录（从旧到新）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        legacy = json.load(f)
+    # 旧文件中最新的记录在前，存储中按从旧到新排列
+    return [HistoryRecord.from_dict(record) for record in reversed(legacy)]
+
+
+class HistoryLoadSignals(QObject):
+    """加载任务的信号（QRunnable 本身不能发送信号）"""
+    finished = Signal(object)  # 旧版文件中的记录，无需迁移时为空列表，读取失败时为 None
+
+
+class HistoryLoadTask(QRunnable):
+    """在工作线程中读取、解析需要迁移的旧版 JSON 历史文件"""
+
+    def __init__(self, history_file, store):
+        super().__init__()
+        self.history_file = history_file
+        self.store = store
+        self.signals = HistoryLoadSignals()
+
+    def run(self):
+        records = []
+        try:
+            if not self.store.exists() and os.path.exists(self.history_file):
+                records = read_legacy_history(self.history_file)
+        except Exception:
+            # 在主线程中重新读取，由那里报告错误
+            records = None
+        self.signals.finished.emit(records)
 
 
 class HistoryManager(QObject):
     """历史记录管理器"""
     
+    # 统计的运算符（按顺序对应存储中记录标志位的各位）
+    STATISTIC_OPERATORS = ["+", "-", "×", "÷", "√", "²", "³"]
+
+    # 常驻内存的最新一页记录数
+    PAGE_SIZE = 100
+    # 自动补全前缀树从最近多少条记录建立
+    COMPLETION_SEED_RECORDS = 2000
+    # 统计计算日期时按多少秒分组（本地时间的零点总在 UTC 的整 15 分钟上，同一组的记录日期相同）
+    DATE_BUCKET_SECONDS = 900
+
     # 信号定义
-    history_updated = Signal()  # 历史记录更新信号
+    history_updated = Signal()            # 历史记录更新信号
+    record_added = Signal()               # 新记录插入到开头（第0行）
+    records_removed = Signal(int, int)    # 删除了[first, last]行
+    history_reset = Signal()              # 历史记录整体替换（加载、清除）
+    history_loaded = Signal()             # 历史记录加载完成（只发送一次）
     
-    def __init__(self):
+    def __init__(self, defer_loading=False):
+        """
+        Args:
+            defer_loading: 为 True 时不在这里加载，由 load_history_async 在后台加载，
+                在此之前用到历史记录时立即加载
+        """
         super().__init__()
-        self.history = []
-        self.max_history = 100  # 最大历史记录数
-        self.history_file = "calculator_history.json"
-        self.load_history()
+        # 全部记录保存在内存映射的存储中，只有最新的一页以 Python 对象常驻内存（最新的在左端）
+        self.history = deque(maxlen=self.PAGE_SIZE)
+        self.max_history = None  # 最大历史记录数，None 表示不限制
+        self.history_file = "calculator_history.json"  # 旧版历史文件，首次启动时迁移
+        self._expression_trie = None  # 自动补全前缀树，首次补全时建立
+        self.store = HistoryStore("calculator_history", self.operator_flags, parent=self)
+        self.store.records_appended.connect(self.on_store_records_appended)
+        self.store.store_reset.connect(self.on_store_reset)
+        self.loaded = False
+        self.page_reloads = 0     # 重新读取最新一页的次数（用于判断操作期间页面是否已按存储重建）
+        # 计算日期的统计：(存储代号, 已扫描的记录数, 已见过的时间分组, 日期集合)，追加记录后只扫描新记录
+        self._date_statistics = (None, 0, set(), set())
+        self.load_signals = None  # 正在进行的后台加载任务的信号
+        if not defer_loading:
+            self.load_history()
+
+    def ensure_loaded(self):
+        """尚未加载时立即加载（后台任务之后的结果被忽略）"""
+        if not self.loaded:
+            self.load_history()
+
+    def load_history_async(self):
+        """在工作线程中读取旧版文件，读完后在主线程中打开存储"""
+        if self.loaded or self.load_signals is not None:
+            return
+        task = HistoryLoadTask(self.history_file, self.store)
+        self.load_signals = task.signals
+        self.load_signals.finished.connect(self.on_legacy_history_read)
+        QThreadPool.globalInstance().start(task)
+
+    @Slot(object)
+    def on_legacy_history_read(self, records):
+        self.load_signals = None
+        if not self.loaded:
+            self.load_history(records)
         
     def add_record(self, expression, result):
         """添加计算记录"""
-        record = {
-            "expression": expression,
-            "result": result,
-            "timestamp": datetime.now().isoformat(),
-            "formatted_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        self.ensure_loaded()
+        record = HistoryRecord(expression, result)
         
-        # 添加到历史记录开头
-        self.history.insert(0, record)
+        # 追加到共享存储（同时读入其他实例的新记录）
+        page_reloads = self.page_reloads
+        try:
+            self.store.append([record])
+            self.compact_store()
+        except Exception as e:
+            print(f"保存历史记录失败: {e}")
         
-        # 限制历史记录数量
-        if len(self.history) > self.max_history:
-            self.history = self.history[:self.max_history]
-            
-        # 保存到文件
-        self.save_history()
+        # 添加到历史记录开头（存储被其他实例重写或压缩过时，重新读取的一页中已经包含这条记录）
+        if self.page_reloads == page_reloads:
+            self.insert_newest(record)
         
         # 发送更新信号
         self.history_updated.emit()
         
     def get_history(self, limit=None):
-        """获取历史记录"""
-        if limit:
-            return self.history[:limit]
-        return self.history
+        """获取历史记录（从新到旧），不指定 limit 时读取全部记录"""
+        self.ensure_loaded()
+        if limit and limit <= len(self.history):
+            return list(islice(self.history, limit))
+        count = self.record_count()
+        first = max(0, count - limit) if limit else 0
+        return self.store.records(first, count)[::-1]
+
+    def record_count(self):
+        """获取记录总数"""
+        self.ensure_loaded()
+        return self.store.count()
+
+    def record_at(self, index):
+        """获取指定索引的记录（0为最新），最新一页之外的记录直接从存储映射中读取"""
+        self.ensure_loaded()
+        if index < len(self.history):
+            return self.history[index]
+        return self.store.record(self.store.count() - 1 - index)
+
+    def get_page(self, page, page_size=PAGE_SIZE):
+        """获取第 page 页的记录（从新到旧，第0页为最新），不读取其他页"""
+        self.ensure_loaded()
+        count = self.record_count()
+        first = page * page_size
+        last = min(first + page_size, count)
+        if last <= len(self.history):
+            return list(islice(self.history, first, last))
+        return self.store.records(count - last, count - first)[::-1]
+
+    def snapshot(self):
+        """获取历史记录快照（拥有独立的内存映射，供工作线程只读访问，用完后需 close）"""
+        self.ensure_loaded()
+        return self.store.snapshot()
+
+    def iter_records(self):
+        """逐条产生历史记录（从新到旧）"""
+        snapshot = self.snapshot()
+        try:
+            yield from snapshot.iter_records()
+        finally:
+            snapshot.close()
+
+    def export_history(self, path, file_format=None):
+        """
+        以流的方式导出历史记录
+
+        Args:
+            path: 目标文件路径
+            file_format: "csv"、"jsonl" 或 "calccol"，默认根据扩展名判断
+
+        Returns:
+            导出的记录数
+        """
+        return history_io.write_records(path, self.iter_records(), file_format)
+
+    def import_history(self, path, file_format=None):
+        """
+        从文件导入历史记录，与已有记录重复的条目会被跳过
+
+        Returns:
+            (导入的记录数, 跳过的重复记录数)
+        """
+        self.ensure_loaded()
+        new_records = []
+        seen = set()
+        duplicates = 0
+        for record in history_io.read_records(path, file_format):
+            if record in seen:
+                duplicates += 1
+                continue
+            seen.add(record)
+            new_records.append(record)
+        # 导出的文件从新到旧排列，反转为从旧到新后追加，同一秒内的记录保持原来的先后
+        new_records.reverse()
+
+        imported = 0
+        if new_records:
+            # 只追加存储中没有的记录（不读入整个存储），超出上限时由 compact_store 去掉最旧的记录
+            imported = len(self.store.append_missing(new_records))
+            self.compact_store()
+            self.reload_page()
+
+        return imported, duplicates + len(new_records) - imported
         
     def clear_history(self):
         """清除所有历史记录"""
-        self.history.clear()
-        self.save_history()
-        self.history_updated.emit()
+        self.ensure_loaded()
+        try:
+            self.store.clear()
+        except Exception as e:
+            print(f"保存历史记录失败: {e}")
+        self.reload_page()
         
     def remove_record(self, index):
         """删除指定索引的记录"""
-        if 0 <= index < len(self.history):
-            self.history.pop(index)
-            self.save_history()
+        count = self.record_count()
+        if 0 <= index < count:
+            record = self.record_at(index)
+            page_reloads = self.page_reloads
+            try:
+                removed = self.store.remove(count - 1 - index, record)
+            except Exception as e:
+                print(f"保存历史记录失败: {e}")
+                removed = False
+            if self.page_reloads != page_reloads:
+                # 其他实例的修改已通过 store_reset 重新读取，行号已经变化
+                return
+            if not removed:
+                self.reload_page()
+                return
+            self._load_newest_page()
+            self._expression_trie = None
+            self.records_removed.emit(index, index)
             self.history_updated.emit()
             
-    def save_history(self):
-        """保存历史记录到文件"""
+    def load_history(self, legacy_records=None):
+        """
+        从共享存储加载历史记录（首次启动时迁移旧版 JSON 文件），并开始监视其他实例的修改
+
+        Args:
+            legacy_records: 工作线程中已读出的旧版记录，为 None 时在这里读取
+        """
+        first_load = not self.loaded
+        self.loaded = True
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, ensure_ascii=False, indent=2)
+            if not self.store.exists() and os.path.exists(self.history_file):
+                records = legacy_records
+                if records is None:
+                    records = read_legacy_history(self.history_file)
+                self.store.rewrite(lambda existing: existing + records)
+            self.store.load()
         except Exception as e:
-            print(f"保存历史记录失败: {e}")
-            
-    def load_history(self):
-        """从文件加载历史记录"""
+            print(f"加载历史记录失败: {e}")
+        self.reload_page(notify_updated=False)
+        self.store.start_watching()
+        if first_load:
+            self.history_loaded.emit()
+
+    def compact_store(self):
+        """存储中的记录远超上限时，只保留最新的 max_history 条"""
+        if self.max_history is not None and self.store.count() > 2 * self.max_history:
+            self.store.rewrite(self._trim_oldest)
+            self.reload_page(notify_updated=False)
+
+    def _trim_oldest(self, records):
+        """去掉超出上限的最旧记录（records 从旧到新排列）"""
+        if self.max_history is not None and len(records) > self.max_history:
+            return records[-self.max_history:]
+        return records
+
+    def insert_newest(self, record):
+        """把一条最新记录放到开头，已满时最旧的一条移出内存（仍保留在存储中）"""
+        self.history.appendleft(record)
+        if self._expression_trie is not None:
+            self._expression_trie.add(record.expression)
+        self.record_added.emit()
+
+    def _load_newest_page(self):
+        """从存储读取最新的一页记录"""
         try:
-            if os.path.exists(self.history_file):
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    self.history = json.load(f)
+            count = self.store.count()
+            records = self.store.records(count - self.PAGE_SIZE, count)
         except Exception as e:
             print(f"加载历史记录失败: {e}")
-            self.history = []
+            records = []
+        self.history = deque(reversed(records), maxlen=self.PAGE_SIZE)
+
+    def reload_page(self, notify_updated=True):
+        """存储被整体替换后重新读取最新一页，并通知视图重置"""
+        self.page_reloads += 1
+        self._load_newest_page()
+        self._expression_trie = None
+        self.history_reset.emit()
+        if notify_updated:
+            self.history_updated.emit()
+
+    @Slot(object)
+    def on_store_records_appended(self, records):
+        """其他实例追加了新记录"""
+        for record in records:
+            self.insert_newest(record)
+        self.history_updated.emit()
+
+    @Slot()
+    def on_store_reset(self):
+        """其他实例重写了存储（清除、删除或导入）"""
+        self.reload_page()
+
+    def get_store_statistics(self):
+        """获取共享存储的统计信息"""
+        self.ensure_loaded()
+        return {
+            "stored_records": self.store.count(),
+            "resident_records": len(self.history),
+            "last_lock_hold_ms": self.store.lock.last_hold_time * 1000,
+            "max_lock_hold_ms": self.store.lock.max_hold_time * 1000,
+        }
+
+    def operator_flags(self, record):
+        """记录中出现的统计运算符（位掩码），随记录保存在存储的索引中"""
+        flags = 0
+        expression = record.expression
+        for bit, op in enumerate(self.STATISTIC_OPERATORS):
+            if op in expression:
+                flags |= 1 << bit
+        return flags
             
     def get_recent_expressions(self, limit=10):
         """获取最近的表达式（用于快速重用）"""
-        expressions = []
-        for record in self.history[:limit]:
-            if record["expression"] not in expressions:
-                expressions.append(record["expression"])
-        return expressions
+        self.ensure_loaded()
+        expressions = {}
+        for record in self.history:
+            expressions.setdefault(record.expression)
+            if len(expressions) == limit:
+                break
+        return list(expressions)
+
+    def expression_trie(self):
+        """获取自动补全前缀树（首次调用时从最近的记录建立）"""
+        self.ensure_loaded()
+        if self._expression_trie is None:
+            counts = {}
+            for record in self.get_history(self.COMPLETION_SEED_RECORDS):
+                counts[record.expression] = counts.get(record.expression, 0) + 1
+            trie = ExpressionTrie()
+            for expression, count in counts.items():
+                trie.add(expression, count)
+            self._expression_trie = trie
+        return self._expression_trie
+
+    def complete_expression(self, prefix, limit=8):
+        """按使用频率返回以 prefix 开头的历史表达式"""
+        return self.expression_trie().complete(prefix, limit)
         
     def search_history(self, keyword):
         """搜索历史记录"""
-        results = []
-        keyword = keyword.lower()
-        
-        for record in self.history:
-            if (keyword in record["expression"].lower() or 
-                keyword in str(record["result"]).lower()):
-                results.append(record)
-                
-        return results
+        snapshot = self.snapshot()
+        try:
+            return [snapshot.record(row) for row in snapshot.match_rows(keyword)]
+        finally:
+            snapshot.close()
         
     def get_statistics(self):
-        """获取使用统计"""
-        if not self.history:
+        """
+        获取使用统计
+
+        运算符计数保存在存储的文件头中，无需读取记录；
+        计算日期统计全部记录，只从映射中读取时间戳
+        """
+        total = self.record_count()
+        if not total:
             return {
                 "total_calculations": 0,
                 "most_used_operations": [],
                 "calculation_dates": []
             }
             
-        # 统计运算符使用频率
-        operations = {}
-        dates = set()
-        
-        for record in self.history:
-            # 统计日期
-            date = record["formatted_time"].split()[0]
-            dates.add(date)
-            
-            # 统计运算符
-            expression = record["expression"]
-            for op in ["+", "-", "×", "÷", "√", "²", "³"]:
-                if op in expression:
-                    operations[op] = operations.get(op, 0) + 1
-                    
         # 按使用频率排序
-        most_used = sorted(operations.items(), key=lambda x: x[1], reverse=True)
+        counts = zip(self.STATISTIC_OPERATORS, self.store.counters)
+        most_used = sorted(((op, count) for op, count in counts if count),
+                           key=lambda x: x[1], reverse=True)
         
         return {
-            "total_calculations": len(self.history),
+            "total_calculations": total,
             "most_used_operations": most_used[:5],
-            "calculation_dates": sorted(list(dates), reverse=True)
+            "calculation_dates": sorted(self.calculation_dates(), reverse=True)
         }
+
+    def calculation_dates(self):
+        """全部记录的计算日期（本地日期的集合），存储重写后重新扫描，否则只扫描新追加的记录"""
+        generation, scanned, buckets, dates = self._date_statistics
+        count = self.store.count()
+        if generation != self.store.generation or count < scanned:
+            scanned, buckets, dates = 0, set(), set()
+        for start in range(scanned, count, SCAN_CHUNK):
+            timestamps = self.store.timestamps(start, min(start + SCAN_CHUNK, count))
+            for bucket in set((timestamps // self.DATE_BUCKET_SECONDS).tolist()) - buckets:
+                buckets.add(bucket)
+                dates.add(time.strftime("%Y-%m-%d", time.localtime(bucket * self.DATE_BUCKET_SECONDS)))
+        self._date_statistics = (self.store.generation, count, buckets, dates)
+        return dates
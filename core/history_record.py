@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史记录条目 - 紧凑的计算历史记录表示
+时间戳只以整数秒保存一次，显示用的时间字符串在需要时再格式化
+"""
+
+import sys
+import time
+from datetime import datetime
+
+
+class HistoryRecord:
+    """单条计算历史记录"""
+
+    # 不使用 __dict__，每条记录只占三个槽位
+    __slots__ = ("expression", "result", "timestamp")
+
+    TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, expression, result, timestamp=None):
+        """
+        Args:
+            expression: 表达式（相同的表达式会被驻留，只保存一份）
+            result: 结果字符串
+            timestamp: Unix 时间戳（秒），默认为当前时间
+        """
+        self.expression = sys.intern(str(expression))
+        self.result = sys.intern(str(result))
+        self.timestamp = int(time.time()) if timestamp is None else int(timestamp)
+
+    @property
+    def formatted_time(self):
+        """格式化的本地时间，如 2025-07-27 19:13:00"""
+        return time.strftime(self.TIME_FORMAT, time.localtime(self.timestamp))
+
+    @property
+    def date(self):
+        """本地日期，如 2025-07-27"""
+        return time.strftime("%Y-%m-%d", time.localtime(self.timestamp))
+
+    @property
+    def iso_timestamp(self):
+        """ISO 8601 格式的时间"""
+        return datetime.fromtimestamp(self.timestamp).isoformat()
+
+    def to_dict(self):
+        """转换为字典（与旧版历史文件格式兼容）"""
+        return {
+            "expression": self.expression,
+            "result": self.result,
+            "timestamp": self.iso_timestamp,
+            "formatted_time": self.formatted_time,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """从字典创建记录，兼容旧版 ISO 字符串时间戳"""
+        timestamp = data.get("timestamp")
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp).timestamp()
+        return cls(data["expression"], data["result"], timestamp)
+
+    def __eq__(self, other):
+        if not isinstance(other, HistoryRecord):
+            return NotImplemented
+        return (self.expression == other.expression and
+                self.result == other.result and
+                self.timestamp == other.timestamp)
+
+    def __hash__(self):
+        return hash((self.expression, self.result, self.timestamp))
+
+    def __repr__(self):
+        return f"HistoryRecord({self.expression!r}, {self.result!r}, {self.timestamp})"
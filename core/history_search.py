@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史记录搜索 - 在工作线程中对历史记录快照（内存映射）进行关键词匹配
+新的搜索开始后，旧的搜索任务会在下一次检查时自行放弃
+匹配只忽略 ASCII 字母的大小写：工作线程直接在映射的 UTF-8 字节上查找，增量检查新记录时用同样的规则
+"""
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+
+def fold_case(text):
+    """只把 ASCII 字母转为小写（与对 UTF-8 字节用 bytes.lower() 的结果一致，长度不变）"""
+    return text.encode('utf-8').lower().decode('utf-8')
+
+
+def record_matches(record, keyword):
+    """判断记录是否匹配关键词（keyword 需已用 fold_case 转换）"""
+    return (keyword in fold_case(record.expression) or
+            keyword in fold_case(record.result))
+
+
+class HistorySearchSignals(QObject):
+    """搜索任务的信号（QRunnable 本身不能发送信号）"""
+
+    # 参数：任务代号、关键词、匹配的快照下标、快照时的插入计数
+    finished = Signal(int, str, object, int)
+
+
+class HistorySearchTask(QRunnable):
+    """历史记录搜索任务"""
+
+    def __init__(self, snapshot, keyword, generation, insert_count, cancel_event):
+        """
+        Args:
+            snapshot: 历史记录快照（StoreSnapshot，任务结束后关闭）
+            keyword: 关键词
+            generation: 任务代号，随结果一起返回
+            insert_count: 拍摄快照时代理模型的插入计数，随结果一起返回
+            cancel_event: threading.Event，被设置后任务放弃搜索
+        """
+        super().__init__()
+        self.snapshot = snapshot
+        self.keyword = keyword
+        self.generation = generation
+        self.insert_count = insert_count
+        self.cancel_event = cancel_event
+        self.signals = HistorySearchSignals()
+
+    def run(self):
+        """在工作线程中执行搜索"""
+        # 工作线程只访问纯 Python 对象，不触碰任何界面对象
+        try:
+            rows = self.snapshot.match_rows(self.keyword, self.cancel_event.is_set)
+        finally:
+            self.snapshot.close()
+        if rows is not None:
+            self.signals.finished.emit(self.generation, self.keyword, rows, self.insert_count)
@@ -0,0 +1,595 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史记录存储 - 多个计算器实例共享的历史记录归档
+追加写入时只持有很短时间的文件锁，其他实例通过文件监视增量读取新记录
+记录文件以内存映射方式只读访问，任意一条（一页）记录都能 O(1) 定位，无需加载其余记录
+
+文件组成（以 calculator_history 为例）：
+    calculator_history.head      文件头：魔数、代号、记录数、标志位计数
+    calculator_history.<代号>.dat 记录数据，按追加顺序（从旧到新）排列
+    calculator_history.<代号>.idx 定长索引项（偏移、长度、标志位），第 i 项对应第 i 条记录
+    calculator_history.lock      锁文件
+
+清除、删除等需要重写的操作写入新代号的文件，再更新文件头中的代号；
+其他实例发现代号变化后重新映射。旧代号的文件在不再被映射后删除
+（Windows 下仍被其他实例映射的文件无法删除，留待下次重写时清理）。
+"""
+
+import glob
+import mmap
+import os
+import shutil
+import struct
+from bisect import bisect_right
+
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal, Slot
+
+from .file_lock import FileLock
+from .history_record import HistoryRecord
+
+
+HEAD_MAGIC = b"CALCHD02"
+FLAG_COUNTERS = 8
+HEAD = struct.Struct(f"<8sQQ{FLAG_COUNTERS}Q")  # 魔数、代号、记录数、各标志位的计数
+INDEX_ENTRY = struct.Struct("<QII")             # 数据偏移、数据长度、标志位
+RECORD_HEADER = struct.Struct("<qII")           # 时间戳、表达式字节数、结果字节数
+
+# 旧版（单一 .idx/.dat 文件）的索引文件头，首次启动时迁移
+LEGACY_INDEX_MAGIC = b"CALCIDX1"
+LEGACY_INDEX_HEADER = struct.Struct("<8sQ")
+
+# 顺序扫描时每批处理的记录数
+SCAN_CHUNK = 65536
+
+
+def encode_record(record):
+    """把记录编码为字节串"""
+    expression = record.expression.encode('utf-8')
+    result = record.result.encode('utf-8')
+    return RECORD_HEADER.pack(record.timestamp, len(expression), len(result)) + expression + result
+
+
+def decode_record(buffer, offset=0):
+    """从字节串解码记录"""
+    timestamp, expression_length, result_length = RECORD_HEADER.unpack_from(buffer, offset)
+    start = offset + RECORD_HEADER.size
+    middle = start + expression_length
+    return HistoryRecord(
+        bytes(buffer[start:middle]).decode('utf-8'),
+        bytes(buffer[middle:middle + result_length]).decode('utf-8'),
+        timestamp
+    )
+
+
+def add_flags(counters, flags, delta):
+    """把标志位计入（delta=1）或移出（delta=-1）计数"""
+    while flags:
+        lowest = flags & -flags
+        counters[lowest.bit_length() - 1] += delta
+        flags ^= lowest
+
+
+def _map_file(path):
+    """只读映射整个文件，空文件返回 None"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class MappedArchive:
+    """某一代号的索引文件和数据文件的只读内存映射"""
+
+    def __init__(self, index_path, data_path):
+        self.index_path = index_path
+        self.data_path = data_path
+        self.index_map = None
+        self.data_map = None
+        self.mapped_count = 0
+
+    def ensure(self, count):
+        """保证前 count 条记录已被映射（文件增长后重新映射）"""
+        if count <= self.mapped_count:
+            return
+        self.close()
+        # 数据总是先于索引写入，先映射索引可保证映射到的索引项都指向完整的数据
+        self.index_map = _map_file(self.index_path)
+        self.data_map = _map_file(self.data_path)
+        if self.index_map is not None:
+            self.mapped_count = len(self.index_map) // INDEX_ENTRY.size
+        if count > self.mapped_count:
+            raise ValueError(f"历史记录索引文件不完整: {self.index_path}")
+
+    def entry(self, position):
+        """第 position 条记录的索引项 (偏移, 长度, 标志位)"""
+        return INDEX_ENTRY.unpack_from(self.index_map, position * INDEX_ENTRY.size)
+
+    def record(self, position):
+        """读取第 position 条记录（从 0 开始，最旧的在前）"""
+        self.ensure(position + 1)
+        return decode_record(self.data_map, self.entry(position)[0])
+
+    def records(self, start, stop):
+        """读取 [start, stop) 范围内的记录（从旧到新）"""
+        if stop <= start:
+            return []
+        self.ensure(stop)
+        data_map = self.data_map
+        return [decode_record(data_map, offset) for offset, _, _ in
+                INDEX_ENTRY.iter_unpack(self.index_map[start * INDEX_ENTRY.size:stop * INDEX_ENTRY.size])]
+
+    def timestamps(self, start, stop):
+        """[start, stop) 范围内记录的时间戳（NumPy 数组），只读取记录头，不解码记录"""
+        import numpy as np
+        if stop <= start:
+            return np.empty(0, dtype=np.int64)
+        self.ensure(stop)
+        index_dtype = np.dtype([("offset", "<u8"), ("length", "<u4"), ("flags", "<u4")])
+        offsets = np.frombuffer(self.index_map, dtype=index_dtype, count=stop - start,
+                                offset=start * INDEX_ENTRY.size)["offset"].astype(np.int64)
+        data = np.frombuffer(self.data_map, dtype=np.uint8)
+        # 时间戳是记录头的前 8 个字节
+        return data[offsets[:, None] + np.arange(8)].view("<i8").ravel()
+
+    def close(self):
+        """解除映射"""
+        for mapped in (self.index_map, self.data_map):
+            if mapped is not None:
+                mapped.close()
+        self.index_map = None
+        self.data_map = None
+        self.mapped_count = 0
+
+
+class StoreSnapshot:
+    """
+    存储在某一时刻的只读快照，拥有独立的内存映射，可在工作线程中使用
+    创建时立即映射文件，之后其他实例重写存储、删除这一代号的文件也不影响快照
+
+    行号与历史记录列表一致：第 0 行为最新的记录
+    """
+
+    def __init__(self, index_path, data_path, count):
+        self.archive = MappedArchive(index_path, data_path)
+        self.count = count
+        self.archive.ensure(count)
+
+    def __len__(self):
+        return self.count
+
+    def record(self, row):
+        """获取第 row 行的记录"""
+        return self.archive.record(self.count - 1 - row)
+
+    def iter_records(self):
+        """逐批读取，从新到旧产生全部记录"""
+        for stop in range(self.count, 0, -SCAN_CHUNK):
+            yield from reversed(self.archive.records(max(0, stop - SCAN_CHUNK), stop))
+
+    def match_rows(self, keyword, is_cancelled=None):
+        """
+        返回表达式或结果中包含关键词的行号（升序）
+
+        直接在映射的字节数据中查找关键词，只有命中的位置才解析记录头，
+        不为不匹配的记录创建任何 Python 对象
+
+        Args:
+            keyword: 关键词
+            is_cancelled: 可选的回调，返回 True 时停止搜索并返回 None
+        """
+        # 只忽略 ASCII 字母的大小写（与 history_search.fold_case 一致）
+        needle = keyword.encode('utf-8').lower()
+        positions = []
+        if not needle or self.count == 0:
+            return []
+        self.archive.ensure(self.count)
+        index_map = self.archive.index_map
+        data_map = self.archive.data_map
+
+        for start in range(0, self.count, SCAN_CHUNK):
+            if is_cancelled and is_cancelled():
+                return None
+            stop = min(start + SCAN_CHUNK, self.count)
+            entries = list(INDEX_ENTRY.iter_unpack(
+                index_map[start * INDEX_ENTRY.size:stop * INDEX_ENTRY.size]))
+            offsets = [offset for offset, _, _ in entries]
+            base = offsets[0]
+            end = entries[-1][0] + entries[-1][1]
+            chunk = data_map[base:end].lower()
+
+            last = -1
+            found = chunk.find(needle)
+            while found >= 0:
+                index = bisect_right(offsets, base + found) - 1
+                if index != last:
+                    offset, length, _ = entries[index]
+                    _, expression_length, _ = RECORD_HEADER.unpack_from(data_map, offset)
+                    begin = base + found
+                    middle = offset + RECORD_HEADER.size + expression_length
+                    # 匹配必须完整地落在表达式或结果之内
+                    if (offset + RECORD_HEADER.size <= begin and begin + len(needle) <= middle) or \
+                            (middle <= begin and begin + len(needle) <= offset + length):
+                        positions.append(start + index)
+                        last = index
+                found = chunk.find(needle, found + 1)
+
+        return sorted(self.count - 1 - position for position in positions)
+
+    def close(self):
+        """解除映射"""
+        self.archive.close()
+
+
+class HistoryStore(QObject):
+    """共享历史记录存储"""
+
+    # 信号定义
+    records_appended = Signal(object)  # 其他实例追加的新记录（从旧到新）
+    store_reset = Signal()             # 存储被重写或追加了大量记录，需要重新读取
+
+    # 轮询间隔（毫秒），作为文件监视的补充
+    POLL_INTERVAL_MS = 2000
+    # 其他实例一次追加超过该数量的记录时，以重置代替逐条通知
+    APPEND_NOTIFY_LIMIT = 1000
+
+    def __init__(self, base_path, flag_function=None, parent=None):
+        """
+        Args:
+            base_path: 文件路径前缀
+            flag_function: 可选，计算记录标志位（不超过 FLAG_COUNTERS 位）的函数，
+                各标志位的计数保存在文件头中，统计时无需读取记录
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.base_path = base_path
+        self.head_path = base_path + ".head"
+        self.lock = FileLock(base_path + ".lock")
+        self.flag_function = flag_function
+        self.generation = None               # 本实例已知的文件代号
+        self.known_count = 0                 # 本实例已知的记录数
+        self.counters = [0] * FLAG_COUNTERS  # 各标志位的记录数
+        self.archive = None
+        self.watcher = None
+        self.poll_timer = None
+
+    def exists(self):
+        """存储文件是否已存在"""
+        return os.path.exists(self.head_path) or os.path.exists(self.base_path + ".idx")
+
+    def count(self):
+        """本实例已知的记录数"""
+        return self.known_count
+
+    def generation_paths(self, generation):
+        """指定代号的 (索引文件, 数据文件) 路径"""
+        return (f"{self.base_path}.{generation}.idx", f"{self.base_path}.{generation}.dat")
+
+    def start_watching(self):
+        """开始监视其他实例的修改"""
+        if self.watcher is not None:
+            return
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.sync)
+        self._watch_head_file()
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(self.POLL_INTERVAL_MS)
+        self.poll_timer.timeout.connect(self.sync)
+        self.poll_timer.start()
+
+    def _watch_head_file(self):
+        """（重新）监视文件头，文件被替换后监视会失效"""
+        if self.watcher is not None and self.head_path not in self.watcher.files():
+            if os.path.exists(self.head_path):
+                self.watcher.addPath(self.head_path)
+
+    def load(self):
+        """打开存储（只映射文件，不读取记录），返回记录数"""
+        with self.lock:
+            self._ensure_files()
+            self._read_changes()
+        return self.known_count
+
+    def record(self, position):
+        """读取第 position 条记录（从 0 开始，最旧的在前）"""
+        return self.archive.record(position)
+
+    def records(self, start, stop):
+        """读取 [start, stop) 范围内的记录（从旧到新）"""
+        return self.archive.records(max(0, start), min(stop, self.known_count))
+
+    def timestamps(self, start, stop):
+        """读取 [start, stop) 范围内记录的时间戳（从旧到新，NumPy 数组）"""
+        return self.archive.timestamps(max(0, start), min(stop, self.known_count))
+
+    def snapshot(self):
+        """获取当前记录的只读快照（在锁内读取其他实例的修改并映射文件，映射前文件不会被删除）"""
+        with self.lock:
+            self._ensure_files()
+            change = self._read_changes()
+            snapshot = StoreSnapshot(*self.generation_paths(self.generation), self.known_count)
+        self._watch_head_file()
+        self._emit_change(change)
+        return snapshot
+
+    def append(self, records):
+        """
+        追加记录（从旧到新）
+
+        其他实例在此之前的修改先通过信号通知：追加的记录在本次记录之前通过 records_appended 送出；
+        存储被重写时发送 store_reset，重新读取的记录中已经包含本次追加的记录
+        """
+        with self.lock:
+            self._ensure_files()
+            change = self._read_changes()
+            self._append_records(records)
+
+        self._emit_change(change)
+
+    def append_missing(self, records):
+        """
+        追加存储中还没有的记录（从旧到新），返回实际追加的记录
+
+        相同的记录时间戳必然相同：按块读取时间戳，只解码与待追加记录时间戳相同的记录来比较，
+        不必把整个存储读入内存
+        """
+        import numpy as np
+        with self.lock:
+            self._ensure_files()
+            change = self._read_changes()
+            wanted = np.unique(np.fromiter((record.timestamp for record in records), dtype=np.int64))
+            stored = set()
+            for start in range(0, self.known_count, SCAN_CHUNK):
+                stop = min(start + SCAN_CHUNK, self.known_count)
+                matches = np.flatnonzero(np.isin(self.archive.timestamps(start, stop), wanted))
+                stored.update(self.archive.record(start + int(row)) for row in matches)
+            records = [record for record in records if record not in stored]
+            if records:
+                self._append_records(records)
+
+        self._emit_change(change)
+        return records
+
+    def _append_records(self, records):
+        """在锁内把记录追加到当前代号的文件"""
+        index_path, data_path = self.generation_paths(self.generation)
+        with open(data_path, 'ab') as data_file:
+            offset = data_file.seek(0, os.SEEK_END)
+            blobs = [encode_record(record) for record in records]
+            data_file.write(b"".join(blobs))
+        # 数据写完后再写索引，其他实例读到的索引项总是指向完整的数据
+        entries = []
+        for record, blob in zip(records, blobs):
+            flags = self._flags(record)
+            add_flags(self.counters, flags, 1)
+            entries.append(INDEX_ENTRY.pack(offset, len(blob), flags))
+            offset += len(blob)
+        with open(index_path, 'r+b') as index_file:
+            # 从文件头记录的位置写入，覆盖中断的写入留下的残余索引项
+            index_file.seek(self.known_count * INDEX_ENTRY.size)
+            index_file.write(b"".join(entries))
+        self.known_count += len(records)
+        self._write_head()
+
+    def rewrite(self, transform):
+        """
+        在锁内读取全部记录、变换后写入新代号的文件（合并其他实例的修改）
+
+        Args:
+            transform: 接收全部记录列表（从旧到新）并返回新列表的函数
+
+        Returns:
+            重写后的记录数
+        """
+        with self.lock:
+            self._ensure_files()
+            change = self._read_changes()
+            records = transform(self.archive.records(0, self.known_count))
+            self._commit_generation(lambda index_path, data_path: self._write_records(
+                index_path, data_path, records))
+        self._watch_head_file()
+        self._emit_reset_if_changed(change)
+        return self.known_count
+
+    def clear(self):
+        """清除全部记录"""
+        with self.lock:
+            self._ensure_files()
+            change = self._read_changes()
+            self._commit_generation(lambda index_path, data_path: self._write_records(
+                index_path, data_path, []))
+        self._watch_head_file()
+        self._emit_reset_if_changed(change)
+
+    def remove(self, position, record):
+        """
+        删除第 position 条记录（从旧到新计数）
+
+        只复制文件、去掉一个索引项，不解码其余记录；被删除记录的数据留在数据文件中，
+        下次重写时清理。其他实例在此期间修改过存储时，按内容查找最新的一条相同记录，
+        完成后发送 store_reset（本实例的行号已经过时）。
+
+        Returns:
+            是否删除了记录
+        """
+        with self.lock:
+            self._ensure_files()
+            change = self._read_changes()
+            if not (0 <= position < self.known_count and self.archive.record(position) == record):
+                position = self._find_newest(record)
+            if position is not None:
+                self._remove_entry(position)
+        self._watch_head_file()
+        self._emit_reset_if_changed(change)
+        return position is not None
+
+    def _remove_entry(self, position):
+        """把去掉第 position 个索引项的文件写入新代号（需在锁内调用）"""
+        old_index_path, old_data_path = self.generation_paths(self.generation)
+        flags = self.archive.entry(position)[2]
+        entry_start = position * INDEX_ENTRY.size
+        entry_stop = self.known_count * INDEX_ENTRY.size
+
+        def write(index_path, data_path):
+            shutil.copyfile(old_data_path, data_path)
+            with open(index_path, 'wb') as index_file:
+                index_file.write(self.archive.index_map[:entry_start])
+                index_file.write(self.archive.index_map[entry_start + INDEX_ENTRY.size:entry_stop])
+            counters = list(self.counters)
+            add_flags(counters, flags, -1)
+            return self.known_count - 1, counters
+
+        self._commit_generation(write)
+
+    def close(self):
+        """解除映射"""
+        if self.archive is not None:
+            self.archive.close()
+
+    @Slot()
+    def sync(self):
+        """读取其他实例的修改"""
+        if not os.path.exists(self.head_path):
+            return
+        with self.lock:
+            change = self._read_changes()
+        self._watch_head_file()
+        self._emit_change(change)
+
+    def _emit_reset_if_changed(self, change):
+        """重写前读到了其他实例的修改时，在释放锁之后通知重新读取（追加的记录不再逐条通知）"""
+        if change is not None:
+            self.store_reset.emit()
+
+    def _emit_change(self, change):
+        """在释放锁之后发送变化信号"""
+        if change is None:
+            return
+        kind, records = change
+        if kind == "reset":
+            self.store_reset.emit()
+        elif records:
+            self.records_appended.emit(records)
+
+    def _flags(self, record):
+        """计算记录的标志位"""
+        return self.flag_function(record) if self.flag_function else 0
+
+    def _find_newest(self, record):
+        """查找最新的一条相同记录（需在锁内调用），找不到时返回 None"""
+        for stop in range(self.known_count, 0, -SCAN_CHUNK):
+            start = max(0, stop - SCAN_CHUNK)
+            records = self.archive.records(start, stop)
+            for position in range(len(records) - 1, -1, -1):
+                if records[position] == record:
+                    return start + position
+        return None
+
+    def _ensure_files(self):
+        """存储文件不存在时创建，旧版文件则迁移（需在锁内调用）"""
+        if os.path.exists(self.head_path):
+            return
+        legacy_index_path = self.base_path + ".idx"
+        legacy_data_path = self.base_path + ".dat"
+        records = []
+        if os.path.exists(legacy_index_path):
+            with open(legacy_index_path, 'rb') as index_file:
+                magic, _ = LEGACY_INDEX_HEADER.unpack(index_file.read(LEGACY_INDEX_HEADER.size))
+                if magic != LEGACY_INDEX_MAGIC:
+                    raise ValueError(f"不是有效的历史记录索引文件: {legacy_index_path}")
+                index_data = index_file.read()
+            with open(legacy_data_path, 'rb') as data_file:
+                data = data_file.read()
+            records = [decode_record(data, offset) for offset, _, _ in
+                       INDEX_ENTRY.iter_unpack(index_data[:len(index_data) // INDEX_ENTRY.size
+                                                          * INDEX_ENTRY.size])]
+
+        self.generation = 0
+        self._commit_generation(lambda index_path, data_path: self._write_records(
+            index_path, data_path, records))
+        for path in (legacy_index_path, legacy_data_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _write_records(self, index_path, data_path, records):
+        """写入记录（从旧到新），返回 (记录数, 标志位计数)"""
+        counters = [0] * FLAG_COUNTERS
+        count = 0
+        with open(data_path, 'wb') as data_file, open(index_path, 'wb') as index_file:
+            offset = 0
+            for record in records:
+                blob = encode_record(record)
+                flags = self._flags(record)
+                data_file.write(blob)
+                index_file.write(INDEX_ENTRY.pack(offset, len(blob), flags))
+                add_flags(counters, flags, 1)
+                offset += len(blob)
+                count += 1
+        return count, counters
+
+    def _commit_generation(self, write):
+        """
+        写入下一代号的文件并切换过去（需在锁内调用）
+
+        Args:
+            write: 接收 (索引文件, 数据文件) 路径、写入后返回 (记录数, 标志位计数) 的函数
+        """
+        generation = self.generation + 1
+        count, counters = write(*self.generation_paths(generation))
+        self.generation = generation
+        self.known_count = count
+        self.counters = counters
+        self._write_head(create=True)
+        self._open_archive()
+        self._remove_stale_generations()
+
+    def _write_head(self, create=False):
+        """写入文件头（原地覆盖，保持文件监视有效）"""
+        with open(self.head_path, 'wb' if create else 'r+b') as head_file:
+            head_file.write(HEAD.pack(HEAD_MAGIC, self.generation, self.known_count, *self.counters))
+
+    def _open_archive(self):
+        """映射当前代号的文件"""
+        self.close()
+        self.archive = MappedArchive(*self.generation_paths(self.generation))
+        self.archive.ensure(self.known_count)
+
+    def _remove_stale_generations(self):
+        """删除其他代号的文件（仍被映射而无法删除的留待下次）"""
+        current = set(self.generation_paths(self.generation))
+        for path in glob.glob(glob.escape(self.base_path) + ".*.*"):
+            generation, extension = path[len(self.base_path) + 1:].split(".", 1)
+            if path in current or not generation.isdigit() or extension not in ("idx", "dat"):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _read_changes(self):
+        """
+        读取本实例上次读取之后的变化（需在锁内调用）
+
+        Returns:
+            None、("append", 新记录) 或 ("reset", None)
+        """
+        with open(self.head_path, 'rb') as head_file:
+            magic, generation, count, *counters = HEAD.unpack(head_file.read(HEAD.size))
+        if magic != HEAD_MAGIC:
+            raise ValueError(f"不是有效的历史记录文件: {self.head_path}")
+
+        previous_count = self.known_count
+        self.counters = counters
+        if generation != self.generation or self.archive is None:
+            self.generation = generation
+            self.known_count = count
+            self._open_archive()
+            return "reset", None
+
+        if count == previous_count:
+            return None
+        self.known_count = count
+        if count - previous_count > self.APPEND_NOTIFY_LIMIT:
+            return "reset", None
+        return "append", self.archive.records(previous_count, count)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+矩阵运算 - 矩阵字面量和线性代数函数（由 NumPy 实现）
+表达式中的 [1, 2; 3, 4] 或 [[1, 2], [3, 4]] 在预处理时改写为 matrix(...) 调用，结果是 NumPy 数组；
+@ 是矩阵乘法，+ - × ÷ 和乘方按元素运算。NumPy 只在第一次用到矩阵时才导入，不影响启动
+"""
+
+import math
+import re
+import sys
+
+
+# 结果的元素不超过这个数时在显示屏上完整显示（可以直接作为表达式再次使用），否则只显示形状
+MAX_INLINE_ELEMENTS = 36
+
+# 扫描矩阵字面量时关心的字符
+TOKEN_PATTERN = re.compile(r"[\[\](){}'\";]")
+
+
+class MatrixError(ValueError):
+    """矩阵运算失败（错误信息直接显示给用户）"""
+
+
+def convert_matrix_literals(expression):
+    """
+    把矩阵字面量改写为 matrix(...) 调用，例如
+    [1, 2; 3, 4] -> matrix([[1, 2], [3, 4]])，[[1, 2], [3, 4]] -> matrix([[1, 2], [3, 4]])；
+    紧跟在名称、右括号之后的方括号是取下标（如 A[0]），不改写
+    """
+    if "[" not in expression:
+        return expression
+    parts = []
+    position = 0
+    quote = None
+    # 只在括号、引号和分号之间跳转，不逐个字符扫描数字
+    for match in TOKEN_PATTERN.finditer(expression):
+        index = match.start()
+        char = match.group()
+        if index < position:
+            continue
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == "[" and not is_subscript(expression, index):
+            literal = scan_literal(expression, index)
+            if literal is None:
+                break  # 括号不配对，留给编译报语法错误
+            rows, end = literal
+            if len(rows) > 1:
+                text = "[" + ", ".join(f"[{row.strip()}]" for row in rows) + "]"
+            else:
+                text = expression[index:end]
+            parts.append(expression[position:index])
+            parts.append(f"matrix({text})")
+            position = end
+    parts.append(expression[position:])
+    return "".join(parts)
+
+
+def is_subscript(expression, index):
+    """index 处的左方括号是否为取下标"""
+    index -= 1
+    while index >= 0 and expression[index].isspace():
+        index -= 1
+    return index >= 0 and (expression[index].isalnum() or expression[index] in "_)]")
+
+
+def scan_literal(expression, start):
+    """
+    找到与 start 处左方括号配对的右方括号，同时按顶层的分号拆分各行
+
+    Returns:
+        (各行的文本, 右方括号之后的位置)，括号不配对时返回 None
+    """
+    rows = []
+    depth = 0
+    quote = None
+    begin = start + 1
+    for match in TOKEN_PATTERN.finditer(expression, start):
+        index = match.start()
+        char = match.group()
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+            if depth == 0:
+                if char != "]":
+                    return None
+                rows.append(expression[begin:index])
+                # 允许末尾多写一个分号
+                if len(rows) > 1 and not rows[-1].strip():
+                    rows.pop()
+                return rows, index + 1
+        elif char == ";" and depth == 1:
+            rows.append(expression[begin:index])
+            begin = index + 1
+    return None
+
+
+def is_matrix(value):
+    """是否为矩阵（NumPy 数组）结果；NumPy 尚未导入时不可能是"""
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def matrix(rows):
+    """由嵌套列表创建矩阵（整数转换为浮点数，避免矩阵乘法中溢出）"""
+    import numpy as np
+    try:
+        array = np.array(rows)
+    except ValueError:
+        raise MatrixError("矩阵各行的元素个数必须相同") from None
+    if array.dtype.kind not in "biufc":
+        raise MatrixError("矩阵的元素必须是数")
+    if array.ndim > 2:
+        raise MatrixError("只支持向量和二维矩阵")
+    if array.dtype.kind != "c":
+        array = array.astype(float, copy=False)
+    return array
+
+
+def as_matrix(value):
+    """把参数转换为矩阵（可以是嵌套列表）"""
+    if is_matrix(value):
+        return value
+    if isinstance(value, (list, tuple)):
+        return matrix(value)
+    raise MatrixError("参数必须是矩阵")
+
+
+def square_matrix(value, name):
+    """检查参数是方阵"""
+    array = as_matrix(value)
+    if array.ndim != 2 or array.shape[0] != array.shape[1]:
+        raise MatrixError(f"{name} 的参数必须是方阵")
+    return array
+
+
+def det(a):
+    """行列式（由对数行列式计算，大矩阵的行列式超出浮点范围时报溢出，而不是得到 inf）"""
+    import numpy as np
+    sign, logdet = np.linalg.slogdet(square_matrix(a, "det"))
+    if sign == 0:
+        return 0.0
+    magnitude = math.exp(logdet)
+    return complex(sign) * magnitude if np.iscomplexobj(sign) else float(sign) * magnitude
+
+
+def inv(a):
+    """逆矩阵"""
+    import numpy as np
+    try:
+        return np.linalg.inv(square_matrix(a, "inv"))
+    except np.linalg.LinAlgError:
+        raise MatrixError("矩阵不可逆") from None
+
+
+def transpose(a):
+    """转置（行向量转置为列向量）"""
+    array = as_matrix(a)
+    if array.ndim == 1:
+        return array.reshape(-1, 1)
+    return array.T
+
+
+def linsolve(a, b):
+    """解线性方程组 A·x = b（b 可以是向量或多列矩阵）"""
+    import numpy as np
+    array = square_matrix(a, "solve")
+    rhs = as_matrix(b)
+    if rhs.shape[0] != array.shape[0]:
+        raise MatrixError("方程组的系数矩阵和右端的行数不一致")
+    try:
+        return np.linalg.solve(array, rhs)
+    except np.linalg.LinAlgError:
+        raise MatrixError("系数矩阵奇异，方程组没有唯一解") from None
+
+
+def eig(a):
+    """
+    特征值（按实部、虚部升序排列）
+
+    对称矩阵用专门的算法（更快，结果为实数）；全部特征值为实数时返回实数向量
+    """
+    import numpy as np
+    array = square_matrix(a, "eig")
+    if not np.iscomplexobj(array) and np.array_equal(array, array.T):
+        return np.linalg.eigvalsh(array)
+    values = np.sort_complex(np.linalg.eigvals(array))
+    if not np.any(values.imag):
+        values = values.real.copy()
+    return values
+
+
+def matmul(a, b):
+    """矩阵乘法（与 a @ b 相同）"""
+    import numpy as np
+    try:
+        return np.matmul(as_matrix(a), as_matrix(b))
+    except ValueError:
+        raise MatrixError("矩阵维数不匹配，无法相乘") from None
+
+
+def format_matrix(array, format_number):
+    """
+    格式化矩阵结果：元素不多时写成可以再次输入的字面量（如 [1, 2; 3, 4]），否则只给出形状
+
+    Args:
+        format_number: 格式化单个元素的函数
+    """
+    if array.ndim == 0:
+        return format_number(array.item())
+    if array.ndim == 1:
+        if array.size > MAX_INLINE_ELEMENTS:
+            return f"{array.size} 维向量"
+        return "[" + ", ".join(format_number(value) for value in array.tolist()) + "]"
+    if array.ndim != 2 or array.size > MAX_INLINE_ELEMENTS:
+        return "×".join(str(n) for n in array.shape) + " 矩阵"
+    rows = [", ".join(format_number(value) for value in row) for row in array.tolist()]
+    if len(rows) == 1:
+        return f"[[{rows[0]}]]"  # 1×n 矩阵，与向量区分
+    return "[" + "; ".join(rows) + "]"
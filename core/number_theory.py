@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数论函数 - 素性检验、因数分解、最大公约数、最小公倍数、模幂和模逆
+素性检验用 Miller–Rabin：2^64 以内用固定的底数，结果是确定的；更大的数另加随机底数，是概率性的。
+因数分解先用小素数表试除，再用 Pollard–Brent rho 算法分解余下的合数，分解结果缓存；
+在显示屏上直接分解时限制迭代次数，超出时转到工作线程分解（可以报告进度、取消）
+"""
+
+import itertools
+import math
+import random
+import threading
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+
+# 小素数表的上限（试除用）
+SMALL_PRIME_LIMIT = 1 << 16
+
+# 试除时每组素数的个数：先求 n 与整组素数之积的最大公约数，为 1 时跳过整组
+TRIAL_CHUNK = 128
+
+# Miller–Rabin 检验的确定性底数：(上限, 底数)，n 小于上限时用这组底数检验的结果是确定的
+DETERMINISTIC_BASES = (
+    (1 << 32, (2, 7, 61)),
+    (3474749660383, (2, 3, 5, 7, 11, 13)),
+    (1 << 64, (2, 325, 9375, 28178, 450775, 9780504, 1795265022)),
+)
+
+# 检验前先试除的素数（很快排除大部分合数）
+QUICK_DIVISORS = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+# 超出 2^64 时在底数 2 之外另加的随机底数个数（合数被误判为素数的概率小于 4^-16）
+EXTRA_ROUNDS = 16
+
+# rho 算法每批的迭代次数：每批求一次最大公约数，并检查迭代次数上限和是否取消
+RHO_BATCH = 128
+
+# 在显示屏上直接分解时 rho 算法的迭代次数上限（约 0.3 秒），超出时转到工作线程分解
+INLINE_ITERATIONS = 1 << 19
+
+# 缓存的分解结果个数
+FACTOR_CACHE_SIZE = 256
+
+
+class NumberTheoryError(ValueError):
+    """数论函数的参数无效（错误信息直接显示给用户）"""
+
+
+class FactorizationDeferred(NumberTheoryError):
+    """直接分解超出迭代次数上限，需要在工作线程中分解"""
+
+    def __init__(self, n):
+        super().__init__("分解需要较长时间，请在显示屏上计算（在后台分解，可以取消）")
+        self.n = n
+
+
+class FactorizationCancelled(Exception):
+    """分解被取消"""
+
+
+class Factorization:
+    """因数分解的结果：显示为 2**3 × 3**2 × 5（可以再次输入），int() 得到原数"""
+
+    __slots__ = ("n", "factors")
+
+    def __init__(self, n, factors):
+        """
+        Args:
+            n: 原数
+            factors: ((素因数, 指数), ...)，按素因数升序
+        """
+        self.n = n
+        self.factors = factors
+
+    def __int__(self):
+        return self.n
+
+    __index__ = __int__
+
+    def __eq__(self, other):
+        return isinstance(other, Factorization) and self.n == other.n
+
+    def __hash__(self):
+        return hash(self.n)
+
+    def __str__(self):
+        if not self.factors:
+            return str(self.n)
+        text = " × ".join(str(p) if e == 1 else f"{p}**{e}" for p, e in self.factors)
+        return "-" + text if self.n < 0 else text
+
+    __repr__ = __str__
+
+
+def as_integer(value, name):
+    """把参数转换为整数（允许整数值的浮点数）"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise NumberTheoryError(f"{name} 的参数必须是整数")
+
+
+# 小素数筛和试除用的分组（第一次用到时生成）
+_sieve = None
+_trial_chunks = None
+
+
+def small_prime_sieve():
+    """SMALL_PRIME_LIMIT 以内的素数筛：sieve[i] 为 1 表示 i 是素数"""
+    global _sieve, _trial_chunks
+    if _sieve is None:
+        sieve = bytearray([1]) * SMALL_PRIME_LIMIT
+        sieve[0] = sieve[1] = 0
+        for i in range(2, math.isqrt(SMALL_PRIME_LIMIT - 1) + 1):
+            if sieve[i]:
+                sieve[i * i::i] = bytes(len(range(i * i, SMALL_PRIME_LIMIT, i)))
+        primes = list(itertools.compress(range(SMALL_PRIME_LIMIT), sieve))
+        _trial_chunks = [(primes[i:i + TRIAL_CHUNK], math.prod(primes[i:i + TRIAL_CHUNK]))
+                         for i in range(0, len(primes), TRIAL_CHUNK)]
+        _sieve = sieve
+    return _sieve
+
+
+def trial_chunks():
+    """试除用的素数分组 [(素数列表, 各素数之积)]"""
+    small_prime_sieve()
+    return _trial_chunks
+
+
+def probable_prime(n):
+    """Miller–Rabin 素性检验（n 为整数）"""
+    if n < SMALL_PRIME_LIMIT:
+        return n >= 2 and small_prime_sieve()[n] == 1
+    for p in QUICK_DIVISORS:
+        if n % p == 0:
+            return False
+    s = ((n - 1) & (1 - n)).bit_length() - 1  # n - 1 = d·2^s，d 为奇数
+    d = (n - 1) >> s
+    for limit, bases in DETERMINISTIC_BASES:
+        if n < limit:
+            break
+    else:
+        bases = (2,) + tuple(random.randrange(3, n - 1) for _ in range(EXTRA_ROUNDS))
+    for a in bases:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+class Factorizer:
+    """
+    一次因数分解
+
+    记录 rho 算法的迭代次数：超过上限时抛出 FactorizationDeferred，被取消时抛出 FactorizationCancelled。
+    进度按位数估计：已分解的部分计入全部位数；rho 迭代 k 次大致排除了 k² 以内的因数，
+    按已排除的因数位数占最大可能因数（平方根）位数的比例计入正在分解的合数
+    """
+
+    def __init__(self, n, budget=None, cancelled=None, progress=None):
+        """
+        Args:
+            n: 要分解的正整数
+            budget: rho 算法的迭代次数上限，为 None 时不限
+            cancelled: 返回是否已取消的函数
+            progress: 接收进度（0~1）的函数
+        """
+        self.n = n
+        self.budget = budget
+        self.cancelled = cancelled
+        self.progress = progress
+        self.iterations = 0
+        self.total_log = math.log(n) if n > 1 else 1.0
+        self.done_log = 0.0  # 已确定的素因数之积的对数
+
+    def run(self):
+        """返回 {素因数: 指数}"""
+        factors = {}
+        rest = self.trial_divide(self.n, factors)
+        pending = [rest] if rest > 1 else []
+        while pending:
+            m = pending.pop()
+            if probable_prime(m):
+                factors[m] = factors.get(m, 0) + 1
+                self.done_log += math.log(m)
+                continue
+            root = math.isqrt(m)
+            if root * root == m:
+                pending += (root, root)
+            else:
+                d = self.rho(m)
+                pending += (d, m // d)
+        return factors
+
+    def trial_divide(self, n, factors):
+        """用小素数试除，返回余下的部分"""
+        for primes, product in trial_chunks():
+            if primes[0] * primes[0] > n:
+                break
+            if math.gcd(n, product) == 1:
+                continue
+            for p in primes:
+                while n % p == 0:
+                    n //= p
+                    factors[p] = factors.get(p, 0) + 1
+        if 1 < n < SMALL_PRIME_LIMIT * SMALL_PRIME_LIMIT:
+            # 没有小于 SMALL_PRIME_LIMIT 的因数，余下的部分必定是素数
+            factors[n] = factors.get(n, 0) + 1
+            n = 1
+        self.done_log = math.log(self.n // n) if n > 1 else self.total_log
+        return n
+
+    def rho(self, n):
+        """Pollard–Brent rho：返回奇合数 n 的一个非平凡因数"""
+        start = self.iterations
+        # 找到最小素因数需要的迭代次数约为它的平方根，不超过 n 的四次方根
+        log_expected = math.log(n) / 4
+        for c in itertools.count(1):
+            y, r, q, g = 2, 1, 1, 1
+            while g == 1:
+                x = y
+                for k in range(0, r, RHO_BATCH):
+                    batch = min(RHO_BATCH, r - k)
+                    for _ in range(batch):
+                        y = (y * y + c) % n
+                    self.step(batch, n, start, log_expected)
+                k = 0
+                while k < r and g == 1:
+                    ys = y
+                    batch = min(RHO_BATCH, r - k)
+                    for _ in range(batch):
+                        y = (y * y + c) % n
+                        q = q * abs(x - y) % n
+                    g = math.gcd(q, n)
+                    k += batch
+                    self.step(batch, n, start, log_expected)
+                r *= 2
+            if g == n:
+                # 这一批中越过了因数，从这一批的起点逐次重算
+                g = 1
+                while g == 1:
+                    ys = (ys * ys + c) % n
+                    g = math.gcd(abs(x - ys), n)
+            if g != n:
+                return g
+
+    def step(self, count, n, start, log_expected):
+        """记录迭代次数，检查上限和取消，报告进度"""
+        self.iterations += count
+        if self.budget is not None and self.iterations > self.budget:
+            raise FactorizationDeferred(self.n)
+        if self.cancelled is not None and self.cancelled():
+            raise FactorizationCancelled()
+        if self.progress is not None:
+            share = math.log(n) * min(0.99, math.log(self.iterations - start) / log_expected)
+            self.progress((self.done_log + share) / self.total_log)
+
+
+# 分解结果缓存 {|n|: ((素因数, 指数), ...)}（工作线程也会写入，用锁保护）
+_factor_cache = OrderedDict()
+_factor_cache_lock = threading.Lock()
+
+
+def factorize(n, budget=None, cancelled=None, progress=None):
+    """
+    因数分解（参数见 Factorizer），结果缓存
+
+    Returns:
+        Factorization
+    """
+    if n == 0:
+        raise NumberTheoryError("0 不能分解")
+    key = abs(n)
+    with _factor_cache_lock:
+        factors = _factor_cache.get(key)
+        if factors is not None:
+            _factor_cache.move_to_end(key)
+    if factors is None:
+        factors = tuple(sorted(Factorizer(key, budget, cancelled, progress).run().items()))
+        with _factor_cache_lock:
+            _factor_cache[key] = factors
+            if len(_factor_cache) > FACTOR_CACHE_SIZE:
+                _factor_cache.popitem(last=False)
+    return Factorization(n, factors)
+
+
+def clear_factor_cache():
+    """清空分解结果缓存"""
+    with _factor_cache_lock:
+        _factor_cache.clear()
+
+
+# 表达式中可用的函数
+
+def isprime(n):
+    """是否为素数"""
+    return probable_prime(as_integer(n, "isprime"))
+
+
+def factor(n):
+    """因数分解；需要较长时间时抛出 FactorizationDeferred，由调用方转到工作线程"""
+    return factorize(as_integer(n, "factor"), budget=INLINE_ITERATIONS)
+
+
+def gcd(*values):
+    """最大公约数"""
+    return math.gcd(*(as_integer(value, "gcd") for value in values))
+
+
+def lcm(*values):
+    """最小公倍数"""
+    return math.lcm(*(as_integer(value, "lcm") for value in values))
+
+
+def modpow(a, b, m):
+    """a^b mod m（b 为负数时先求 a 的模逆）"""
+    a, b, m = (as_integer(value, "modpow") for value in (a, b, m))
+    if m == 0:
+        raise NumberTheoryError("模数不能为 0")
+    try:
+        return pow(a, b, m)
+    except ValueError:
+        raise NumberTheoryError(f"{a} 在模 {m} 下不可逆") from None
+
+
+def modinv(a, m):
+    """a 在模 m 下的逆元"""
+    return modpow(a, -1, m)
+
+
+class FactorizationSignals(QObject):
+    """分解任务的信号（QRunnable 本身不能发送信号）"""
+
+    # 参数：任务代号、进度（0~100，按迭代次数估计）
+    progress = Signal(int, int)
+    # 参数：任务代号、Factorization
+    finished = Signal(int, object)
+    # 参数：任务代号、错误信息
+    failed = Signal(int, str)
+
+
+class FactorizationTask(QRunnable):
+    """在工作线程中分解较大的数（结果写入分解缓存）"""
+
+    def __init__(self, n, generation, cancel_event):
+        """
+        Args:
+            n: 要分解的整数
+            generation: 任务代号，随信号一起返回
+            cancel_event: threading.Event，被设置后任务放弃分解
+        """
+        super().__init__()
+        self.n = n
+        self.generation = generation
+        self.cancel_event = cancel_event
+        self.signals = FactorizationSignals()
+        self.last_percent = -1
+
+    def run(self):
+        try:
+            result = factorize(self.n, cancelled=self.cancel_event.is_set, progress=self.report)
+        except FactorizationCancelled:
+            return
+        except NumberTheoryError as e:
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        self.signals.finished.emit(self.generation, result)
+
+    def report(self, fraction):
+        """进度的整数百分比变化时才发送信号"""
+        percent = int(fraction * 100)
+        if percent != self.last_percent:
+            self.last_percent = percent
+            self.signals.progress.emit(self.generation, percent)
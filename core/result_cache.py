@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+结果缓存 - 跨会话的表达式结果记忆表
+以规范化表达式为键，保存显示的结果和完整精度的值，按最近最少使用（LRU）淘汰，并持久化到文件
+写入缓存后不立即保存，最后一次写入一段时间后才整体写入文件（退出时由主窗口保存未写入的条目）
+"""
+
+from collections import OrderedDict
+import json
+import os
+
+from PySide6.QtCore import QTimer
+
+
+class ResultCache:
+    """表达式结果缓存"""
+
+    # 最后一次写入多久后保存到文件（毫秒）
+    SAVE_DELAY_MS = 2000
+
+    def __init__(self, version, cache_file="calculator_memo.json", capacity=1000):
+        """
+        Args:
+            version: 函数语义版本号，与文件中的版本不一致时丢弃全部缓存
+            cache_file: 缓存文件路径
+            capacity: 最多缓存的条目数
+        """
+        self.version = version
+        self.cache_file = cache_file
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False  # 是否有尚未保存的修改
+        self.save_timer = QTimer()
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(self.SAVE_DELAY_MS)
+        self.save_timer.timeout.connect(self.flush)
+        self.loaded_from_file = self.load()
+
+    def get(self, key):
+        """
+        查找缓存
+
+        Returns:
+            命中时返回 (结果字符串, 完整精度的值)，值未知（由历史记录预热的条目）时为 None；未命中时返回 None
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return tuple(entry)
+
+    def put(self, key, result, value=None, save=True):
+        """写入缓存，超出容量时淘汰最久未使用的条目；save 为 True 时安排稍后保存"""
+        self.entries[key] = (result, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        self.dirty = True
+        if save:
+            self.save_timer.start()
+
+    def clear(self):
+        """清空缓存"""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.save()
+
+    def hit_ratio(self):
+        """命中率（0~1），尚未查询过时为 0"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_statistics(self):
+        """获取缓存统计"""
+        return {
+            "entries": len(self.entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hit_ratio(),
+            "version": self.version,
+        }
+
+    def flush(self):
+        """保存尚未写入文件的修改"""
+        if self.dirty:
+            self.save()
+
+    def save(self):
+        """保存缓存到文件"""
+        self.save_timer.stop()
+        self.dirty = False
+        try:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.version, "entries": list(self.entries.items())},
+                          f, ensure_ascii=False)
+        except Exception as e:
+            print(f"保存结果缓存失败: {e}")
+
+    def load(self):
+        """从文件加载缓存，返回是否成功加载了当前版本的缓存"""
+        try:
+            if not os.path.exists(self.cache_file):
+                return False
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != self.version:
+                # 函数语义已变化，旧结果不再可信
+                return False
+            self.entries = OrderedDict(data["entries"][-self.capacity:])
+            return True
+        except Exception as e:
+            print(f"加载结果缓存失败: {e}")
+            self.entries = OrderedDict()
+            return False
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RPN（逆波兰）计算 - 每个运算键立即作用于显式的栈，按键时就得到结果，不需要重新解析整个表达式
+栈是不可变的链表：压栈、出栈都生成新的栈，与旧栈共享其余部分，
+因此撤销只需在每步之前记下当时的栈（每步 O(1) 的时间和内存），深栈也不必复制；
+函数和角度模式与中缀计算引擎共用同一个函数表，每个数同时记下等价的中缀表达式，可送到显示屏再次计算
+"""
+
+import math
+import operator
+from collections import deque
+
+from PySide6.QtCore import QObject, Signal
+
+
+# 最多可撤销的步数
+UNDO_LIMIT = 1000
+
+# 中缀表达式的最大长度：更长时改用结果的数值（反复 DUP 再运算会使表达式长度成倍增长）
+MAX_EXPRESSION_LENGTH = 500
+
+# 中缀表达式的优先级：数和函数调用最高，作为运算数时从不加括号；
+# 负号排在加减和乘除之间，负数作乘除的运算数或作右运算数时加括号（如 3×(-2)、3-(-2)）
+ATOM = 9
+POWER = 5
+PRODUCT = 3
+NEGATION = 2
+
+# 二元运算：按键 -> (中缀运算符, 函数, 优先级)；只有乘方是右结合的
+BINARY_OPERATORS = {
+    "+": ("+", operator.add, 1),
+    "-": ("-", operator.sub, 1),
+    "×": ("×", operator.mul, PRODUCT),
+    "÷": ("÷", operator.truediv, PRODUCT),
+    "mod": (" mod ", operator.mod, PRODUCT),
+    "xʸ": ("**", operator.pow, POWER),
+}
+
+# 一元运算：按键 -> (中缀表达式模板, 函数表中的函数名或函数, 结果的优先级, 运算数不加括号所需的优先级)
+UNARY_OPERATORS = {
+    "√x": ("√({})", "sqrt", ATOM, 0),
+    "x²": ("{}²", lambda x: x * x, POWER, ATOM),
+    "1/x": ("1/{}", lambda x: 1 / x, PRODUCT, PRODUCT + 1),
+    "±": ("-{}", operator.neg, NEGATION, POWER),
+    "n!": ("factorial({})", "factorial", ATOM, 0),
+}
+
+# 函数表中参数个数不是 1 的函数
+FUNCTION_ARITY = {
+    "pow": 2, "nthroot": 2, "gcd": 2, "lcm": 2, "modinv": 2, "modpow": 3,
+}
+
+# 常数：按键 -> (中缀表达式, 值)
+CONSTANTS = {
+    "π": ("π", math.pi),
+    "e": ("e", math.e),
+}
+
+
+class RpnError(ValueError):
+    """RPN 操作无效（错误信息直接显示给用户）"""
+
+
+class StackItem:
+    """栈中的一个数：值和得到它的中缀表达式"""
+
+    __slots__ = ("value", "expression", "precedence")
+
+    def __init__(self, value, expression, precedence=ATOM):
+        self.value = value
+        self.expression = expression
+        self.precedence = precedence  # 表达式最外层运算的优先级
+
+    def operand(self, minimum):
+        """作为运算数时的表达式：优先级低于 minimum 时加括号"""
+        return self.expression if self.precedence >= minimum else f"({self.expression})"
+
+
+class Stack:
+    """
+    不可变的栈（单链表）：每个节点保存栈顶的数和它下面的栈
+
+    push、pop 不修改原来的栈，新栈与原栈共享下面的节点
+    """
+
+    __slots__ = ("item", "below", "depth")
+
+    def __init__(self, item=None, below=None):
+        self.item = item
+        self.below = below
+        self.depth = 0 if below is None else below.depth + 1
+
+    def __len__(self):
+        return self.depth
+
+    def __iter__(self):
+        """从栈顶向下依次返回各个数"""
+        node = self
+        while node.depth:
+            yield node.item
+            node = node.below
+
+    def push(self, item):
+        return Stack(item, self)
+
+    def pop(self, count):
+        """
+        弹出 count 个数
+
+        Returns:
+            (按入栈顺序排列的数, 剩下的栈)
+        """
+        if count > self.depth:
+            raise RpnError(f"需要 {count} 个数，栈中只有 {self.depth} 个")
+        items = []
+        node = self
+        for _ in range(count):
+            items.append(node.item)
+            node = node.below
+        items.reverse()
+        return items, node
+
+    def top(self):
+        """栈顶的数，空栈为 None"""
+        return self.item if self.depth else None
+
+
+EMPTY_STACK = Stack()
+
+
+class RpnCalculator(QObject):
+    """RPN 计算器：栈、正在输入的数和撤销记录"""
+
+    # 信号定义
+    stack_changed = Signal()      # 栈或正在输入的数改变
+    error_occurred = Signal(str)  # 操作失败（栈保持不变）
+
+    def __init__(self, engine, parent=None):
+        """
+        Args:
+            engine: 计算引擎，提供函数表、角度模式和结果格式化
+        """
+        super().__init__(parent)
+        self.engine = engine
+        self.stack = EMPTY_STACK
+        self.entry = ""  # 正在输入的数
+        # 撤销、重做记录：每步之前的 (栈, 正在输入的数)，栈与当前栈共享节点
+        self.undo_states = deque(maxlen=UNDO_LIMIT)
+        self.redo_states = []
+
+    # 输入数字
+    def type_text(self, text):
+        """在正在输入的数后面添加数字或小数点"""
+        if text == "." and "." in self.entry:
+            return
+        self.entry += text
+        self.stack_changed.emit()
+
+    def backspace(self):
+        """删除正在输入的数的最后一位；没有正在输入的数时丢弃栈顶"""
+        if self.entry:
+            self.entry = self.entry[:-1]
+            self.stack_changed.emit()
+        else:
+            self.drop()
+
+    def clear_entry(self):
+        if self.entry:
+            self.entry = ""
+            self.stack_changed.emit()
+
+    def change_sign(self):
+        """改变正在输入的数的符号；没有正在输入的数时对栈顶取负"""
+        if self.entry:
+            self.entry = self.entry[1:] if self.entry.startswith("-") else "-" + self.entry
+            self.stack_changed.emit()
+        else:
+            self.operate("±")
+
+    def parse_entry(self):
+        """把正在输入的数转换为栈中的数"""
+        value = self.engine.parse_number(self.entry)
+        if value is None:
+            raise RpnError(f"无效的数: {self.entry}")
+        return StackItem(value, self.entry, NEGATION if self.entry.startswith("-") else ATOM)
+
+    def committed_stack(self):
+        """正在输入的数压栈后的栈（不修改当前状态）"""
+        if not self.entry:
+            return self.stack
+        return self.stack.push(self.parse_entry())
+
+    # 栈操作
+    def enter(self):
+        """把正在输入的数压栈；没有正在输入的数时复制栈顶"""
+        if self.entry:
+            self.apply(lambda stack: stack, commit=True)
+        else:
+            self.dup()
+
+    def dup(self):
+        self.apply(lambda stack: stack.push(stack.pop(1)[0][0]))
+
+    def drop(self):
+        self.apply(lambda stack: stack.pop(1)[1])
+
+    def swap(self):
+        def swap(stack):
+            (y, x), rest = stack.pop(2)
+            return rest.push(x).push(y)
+        self.apply(swap)
+
+    def rotate(self):
+        """把第三层的数移到栈顶"""
+        def rotate(stack):
+            (z, y, x), rest = stack.pop(3)
+            return rest.push(y).push(x).push(z)
+        self.apply(rotate)
+
+    def clear(self):
+        self.apply(lambda stack: EMPTY_STACK, commit=False)
+
+    # 运算
+    def operate(self, key):
+        """
+        执行一个运算键：二元运算、一元运算、常数或函数表中的函数（如 sin、gcd）
+
+        Returns:
+            是否认识这个按键
+        """
+        if key in BINARY_OPERATORS:
+            symbol, function, precedence = BINARY_OPERATORS[key]
+            # 左结合的运算右边同级时要加括号（如 a-(b-c)），右结合的乘方相反（如 (a**b)**c）
+            if precedence == POWER:
+                minimums = (precedence + 1, precedence)
+            else:
+                minimums = (precedence, max(precedence, NEGATION) + 1)
+            self.apply(lambda stack: self.call(stack, function, "{}" + symbol + "{}", precedence, minimums))
+        elif key in UNARY_OPERATORS:
+            template, function, precedence, minimum = UNARY_OPERATORS[key]
+            if isinstance(function, str):
+                function = self.engine.functions[function]
+            self.apply(lambda stack: self.call(stack, function, template, precedence, (minimum,)))
+        elif key in CONSTANTS:
+            expression, value = CONSTANTS[key]
+            self.apply(lambda stack: stack.push(StackItem(value, expression)))
+        elif callable(self.engine.functions.get(key)):
+            function = self.engine.functions[key]
+            arity = FUNCTION_ARITY.get(key, 1)
+            template = f"{key}({', '.join(['{}'] * arity)})"
+            self.apply(lambda stack: self.call(stack, function, template, ATOM, (0,) * arity))
+        else:
+            return False
+        return True
+
+    def call(self, stack, function, template, precedence, minimums):
+        """
+        弹出 len(minimums) 个数作为参数调用 function，结果压栈
+
+        Args:
+            template: 结果的中缀表达式模板，各运算数依次填入 {}
+            precedence: 结果的优先级
+            minimums: 各运算数不加括号所需的优先级
+        """
+        items, rest = stack.pop(len(minimums))
+        value = function(*(item.value for item in items))
+        expression = template.format(*(item.operand(minimum) for item, minimum in zip(items, minimums)))
+        if len(expression) > MAX_EXPRESSION_LENGTH:
+            expression = self.engine.format_result(value)
+            precedence = NEGATION if expression.startswith("-") else ATOM
+        return rest.push(StackItem(value, expression, precedence))
+
+    def apply(self, change, commit=True):
+        """
+        先把正在输入的数压栈（commit 为 True 时），再由 change(栈) 得到新栈
+        出错时栈和正在输入的数都保持不变
+        """
+        try:
+            stack = change(self.committed_stack() if commit else self.stack)
+        except Exception as e:
+            self.error_occurred.emit(self.engine.get_error_message(e))
+            return
+        self.undo_states.append((self.stack, self.entry))
+        self.redo_states.clear()
+        self.stack = stack
+        self.entry = ""
+        self.stack_changed.emit()
+
+    # 撤销和重做
+    def can_undo(self):
+        return bool(self.undo_states)
+
+    def can_redo(self):
+        return bool(self.redo_states)
+
+    def undo(self):
+        if self.undo_states:
+            self.redo_states.append((self.stack, self.entry))
+            self.stack, self.entry = self.undo_states.pop()
+            self.stack_changed.emit()
+
+    def redo(self):
+        if self.redo_states:
+            self.undo_states.append((self.stack, self.entry))
+            self.stack, self.entry = self.redo_states.pop()
+            self.stack_changed.emit()
+
+    def format_item(self, item):
+        return self.engine.format_result(item.value)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会话快照 - 退出时保存显示屏的表达式、内存值、角度模式、进制和当前标签页，下次启动时恢复
+文件很小（定长的头加表达式的 UTF-8 字节），启动时只需一次读取
+"""
+
+import os
+import struct
+
+from .undo_history import ANGLE_MODES, pack_memory, unpack_memory
+
+
+# 文件格式：魔数，定长的头，之后是表达式
+SESSION_MAGIC = b"CALCSS01"
+HEADER = struct.Struct("<BdBBBI")  # 内存值类型、内存值、角度模式、进制、标签页、表达式的字节数
+
+
+class SessionSnapshot:
+    """一次会话的状态（属性与撤销历史的一步相同，可直接用恢复撤销状态的方法恢复）"""
+
+    __slots__ = ("expression", "memory", "angle_mode", "base", "tab_index")
+
+    def __init__(self, expression="", memory=0, angle_mode="deg", base=10, tab_index=0):
+        self.expression = expression
+        self.memory = memory
+        self.angle_mode = angle_mode
+        self.base = base
+        self.tab_index = tab_index
+
+    def save(self, path):
+        """写入文件（先写临时文件再替换）"""
+        encoded = self.expression.encode("utf-8")
+        kind, value = pack_memory(self.memory)
+        angle = ANGLE_MODES.index(self.angle_mode) if self.angle_mode in ANGLE_MODES else 0
+        temporary = path + ".tmp"
+        try:
+            with open(temporary, "wb") as f:
+                f.write(SESSION_MAGIC + HEADER.pack(kind, value, angle, self.base, self.tab_index, len(encoded))
+                        + encoded)
+            os.replace(temporary, path)
+        except OSError as e:
+            print(f"保存会话失败: {e}")
+
+    @classmethod
+    def load(cls, path):
+        """
+        读取文件
+
+        Returns:
+            SessionSnapshot，文件不存在或无效时为 None
+        """
+        try:
+            if not os.path.exists(path):
+                return None
+            with open(path, "rb") as f:
+                data = f.read()
+            if not data.startswith(SESSION_MAGIC):
+                return None
+            kind, value, angle, base, tab_index, size = HEADER.unpack_from(data, len(SESSION_MAGIC))
+            start = len(SESSION_MAGIC) + HEADER.size
+            expression = data[start:start + size].decode("utf-8")
+            return cls(expression, unpack_memory(kind, value), ANGLE_MODES[angle], base, tab_index)
+        except (OSError, ValueError, IndexError, struct.error) as e:
+            print(f"加载会话失败: {e}")
+            return None
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时 - 记录启动各阶段（导入、创建窗口部件、应用样式、加载历史记录等）的耗时，
+以 --profile-startup 启动时打印
+"""
+
+import time
+import unicodedata
+from contextlib import contextmanager
+
+
+def display_width(text):
+    """文字在终端中占的列数（中文字符占两列）"""
+    return sum(2 if unicodedata.east_asian_width(char) in "WF" else 1 for char in text)
+
+
+class StartupProfile:
+    """启动各阶段的耗时和若干时刻（都从进程开始计时）"""
+
+    def __init__(self, start=None):
+        """
+        Args:
+            start: 计时起点（time.perf_counter() 的值），默认为创建时
+        """
+        self.start = time.perf_counter() if start is None else start
+        self.phases = []      # (阶段, 毫秒)
+        self.milestones = []  # (时刻, 距起点的毫秒数)
+
+    def add(self, name, seconds):
+        self.phases.append((name, seconds * 1000))
+
+    @contextmanager
+    def phase(self, name):
+        """记录 with 块的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def mark(self, name):
+        """记录到此刻为止的耗时"""
+        self.milestones.append((name, (time.perf_counter() - self.start) * 1000))
+
+    def report(self):
+        """各阶段和各时刻的文字报告"""
+        entries = self.phases + self.milestones
+        width = max((display_width(name) for name, _ in entries), default=0)
+        lines = ["启动耗时："]
+        for index, (name, ms) in enumerate(entries):
+            padding = " " * (width - display_width(name))
+            suffix = "（距进程启动）" if index >= len(self.phases) else ""
+            lines.append(f"  {name}{padding} {ms:8.1f} ms{suffix}")
+        return "\n".join(lines)
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式统计 - 一次遍历数据，内存占用与数据量无关
+文件通过内存映射按块读取，每块按行边界切分后用 NumPy 解析出选定的列；
+均值和方差按 Welford 方法逐块合并，分位数用 t-digest 估计，直方图的分箱宽度随数据范围自动加倍
+"""
+
+import io
+import math
+import mmap
+import os
+
+import numpy as np
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+
+# 每次读取和解析的块大小（字节）；解析时文本会展开为 UCS-4，峰值内存约为块大小的 8 倍
+CHUNK_SIZE = 1 << 20
+
+# 结果中列出的分位数
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+class RunningMoments:
+    """计数、总和、均值、方差和最值（Welford 方法，逐块合并）"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0  # 与均值之差的平方和
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def update(self, values):
+        """合并一块数据（Chan 等人的并行合并公式，块内用 NumPy 计算）"""
+        count = values.size
+        if count == 0:
+            return
+        mean = float(values.mean())
+        m2 = float(np.square(values - mean).sum())
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.total += float(values.sum())
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+
+    def variance(self):
+        """样本方差（少于两个数据时为 NaN）"""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+
+class TDigest:
+    """
+    合并式 t-digest：数据按值排序后聚成质心，靠近两端的质心小、中间的大，
+    分位数在两端也很准确；质心数只取决于压缩参数
+    """
+
+    def __init__(self, compression=500):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    def update(self, values):
+        """把一块数据与现有质心一起排序，再按 k1 尺度函数重新聚合"""
+        if values.size == 0:
+            return
+        means = np.concatenate((self.means, np.sort(values)))
+        weights = np.concatenate((self.weights, np.ones(values.size)))
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        # k1 尺度 k(q) = δ/(2π)·asin(2q−1)：每个质心在 k 上的跨度不超过 1
+        before = (np.cumsum(weights) - weights) / weights.sum()
+        scale = self.compression / (2 * math.pi) * np.arcsin(2 * before - 1)
+        groups = np.floor(scale - scale[0]).astype(np.int64)
+        starts = np.flatnonzero(np.concatenate(([True], groups[1:] != groups[:-1])))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantiles(self, qs, minimum, maximum):
+        """估计分位数 qs（0~1），在相邻质心之间线性插值"""
+        total = self.weights.sum()
+        if total == 0:
+            return [math.nan] * len(qs)
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate(([0.0], centers, [total]))
+        values = np.concatenate(([minimum], self.means, [maximum]))
+        return np.interp(np.asarray(qs) * total, positions, values).tolist()
+
+
+class AdaptiveHistogram:
+    """
+    精确计数的直方图：固定数目的细分箱，箱宽为 2 的幂并与其整数倍对齐；
+    新数据超出范围时把箱宽加倍、相邻两箱合并，计数始终精确
+    """
+
+    # 细分箱的个数
+    BIN_COUNT = 4096
+
+    def __init__(self):
+        self.width = None  # 箱宽
+        self.start = 0     # 第一个箱的编号（箱 i 覆盖 [i·width, (i+1)·width)）
+        self.counts = np.zeros(self.BIN_COUNT, dtype=np.int64)
+
+    def update(self, values):
+        if values.size == 0:
+            return
+        low, high = float(values.min()), float(values.max())
+        if self.width is None:
+            span = (high - low) or abs(low) or 1.0
+            self.width = math.ldexp(1.0, math.ceil(math.log2(span / self.BIN_COUNT)) + 1)
+            self.start = math.floor(low / self.width)
+        while low < self.start * self.width or high >= (self.start + self.BIN_COUNT) * self.width:
+            self.coarsen(low, high)
+        indexes = np.floor(values / self.width).astype(np.int64) - self.start
+        # 浮点误差可能使边界上的值落到相邻的箱
+        np.clip(indexes, 0, self.BIN_COUNT - 1, out=indexes)
+        self.counts += np.bincount(indexes, minlength=self.BIN_COUNT)
+
+    def coarsen(self, low, high):
+        """箱宽加倍并合并计数，范围向新数据所在的一侧扩展（已有的计数始终在范围内）"""
+        absolute = np.arange(self.start, self.start + self.BIN_COUNT) // 2
+        self.width *= 2
+        if low < self.start * self.width / 2:
+            start = math.floor(low / self.width)
+        else:
+            start = math.floor(high / self.width) - self.BIN_COUNT + 1
+        start = min(max(start, absolute[-1] - self.BIN_COUNT + 1), absolute[0])
+        counts = np.zeros(self.BIN_COUNT, dtype=np.int64)
+        np.add.at(counts, absolute - start, self.counts)
+        self.counts = counts
+        self.start = int(start)
+
+    def bins(self, count=20):
+        """
+        合并为至多 count 个显示用的箱
+
+        Returns:
+            [(下界, 上界, 计数)]
+        """
+        occupied = np.flatnonzero(self.counts)
+        if occupied.size == 0:
+            return []
+        first, last = occupied[0], occupied[-1]
+        group = max(1, math.ceil((last - first + 1) / count))
+        sums = np.add.reduceat(self.counts[first:last + 1], np.arange(0, last - first + 1, group))
+        return [((self.start + first + i * group) * self.width,
+                 (self.start + first + (i + 1) * group) * self.width,
+                 int(n)) for i, n in enumerate(sums)]
+
+
+class StreamingStatistics:
+    """一次遍历的统计：各部分都按块更新，内存占用固定"""
+
+    def __init__(self):
+        self.moments = RunningMoments()
+        self.digest = TDigest()
+        self.histogram = AdaptiveHistogram()
+        self.skipped = 0  # 无法解析或不是有限数的值
+
+    def update(self, values, skipped=0):
+        finite = values[np.isfinite(values)]
+        self.skipped += skipped + values.size - finite.size
+        self.moments.update(finite)
+        self.digest.update(finite)
+        self.histogram.update(finite)
+
+    def summary(self):
+        """
+        Returns:
+            [(名称, 说明, 值)]，名称用于生成历史记录中的表达式
+        """
+        moments = self.moments
+        variance = moments.variance()
+        rows = [
+            ("count", "计数", moments.count),
+            ("sum", "总和", moments.total),
+            ("mean", "平均值", moments.mean if moments.count else math.nan),
+            ("var", "方差（样本）", variance),
+            ("std", "标准差（样本）", math.sqrt(variance) if variance == variance else math.nan),
+            ("min", "最小值", moments.minimum if moments.count else math.nan),
+            ("max", "最大值", moments.maximum if moments.count else math.nan),
+        ]
+        values = self.digest.quantiles(QUANTILES, moments.minimum, moments.maximum)
+        for q, value in zip(QUANTILES, values):
+            name = "median" if q == 0.5 else f"p{round(q * 100)}"
+            label = "中位数" if q == 0.5 else f"{round(q * 100)}% 分位数"
+            rows.append((name, label, value))
+        return rows
+
+
+def detect_layout(first_line):
+    """
+    根据第一行判断分隔符和各列名称
+
+    Returns:
+        (分隔符（None 表示空白）, 列名列表, 第一行是否为表头)
+    """
+    for delimiter in (",", "\t", ";"):
+        if delimiter in first_line:
+            break
+    else:
+        delimiter = None
+    fields = [field.strip().strip('"') for field in first_line.split(delimiter)]
+    header = any(field and not is_number(field) for field in fields)
+    names = [field if header and field else f"列 {index + 1}" for index, field in enumerate(fields)]
+    return delimiter, names, header
+
+
+def is_number(text):
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+
+def iter_chunks(buffer, size, chunk_size=CHUNK_SIZE):
+    """
+    按行边界把 buffer（bytes 或 mmap）切分成块
+
+    Yields:
+        (块的字节, 块结束位置)
+    """
+    start = 0
+    while start < size:
+        end = min(start + chunk_size, size)
+        if end < size:
+            newline = buffer.rfind(b"\n", start, end)
+            if newline < 0:
+                # 一行比块还长：延伸到这一行结束
+                newline = buffer.find(b"\n", end)
+                newline = size - 1 if newline < 0 else newline
+            end = newline + 1
+        yield buffer[start:end], end
+        start = end
+
+
+def parse_column(text, delimiter, column):
+    """
+    解析文本中某一列的数值
+
+    Returns:
+        (数值数组, 跳过的行数)
+    """
+    try:
+        # 快速路径：NumPy 的 C 解析器，整块都是规整的数值行时适用
+        values = np.loadtxt(io.StringIO(text), delimiter=delimiter, usecols=column,
+                            ndmin=1, quotechar='"', comments=None)
+        return values.astype(float, copy=False), 0
+    except ValueError:
+        pass
+    # 含空行、缺列或非数值的块逐行解析，跳过无法解析的行
+    values = []
+    skipped = 0
+    for line in text.splitlines():
+        fields = line.split(delimiter)
+        if not line.strip():
+            continue
+        try:
+            values.append(float(fields[column].strip().strip('"')))
+        except (IndexError, ValueError):
+            skipped += 1
+    return np.array(values, dtype=float), skipped
+
+
+def read_first_line(path):
+    """读取文件的第一行（用于判断列）"""
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        return f.readline().rstrip("\r\n")
+
+
+class StatisticsSignals(QObject):
+    """统计任务的信号（QRunnable 本身不能发送信号）"""
+
+    # 参数：任务代号、进度（0~100）
+    progress = Signal(int, int)
+    # 参数：任务代号、StreamingStatistics
+    finished = Signal(int, object)
+    # 参数：任务代号、错误信息
+    failed = Signal(int, str)
+
+
+class StatisticsTask(QRunnable):
+    """在工作线程中对文件或粘贴的文本做流式统计"""
+
+    def __init__(self, source, column, generation, cancel_event):
+        """
+        Args:
+            source: 文件路径，或 bytes（粘贴的文本）
+            column: 列号
+            generation: 任务代号，随信号一起返回
+            cancel_event: threading.Event，被设置后任务放弃统计
+        """
+        super().__init__()
+        self.source = source
+        self.column = column
+        self.generation = generation
+        self.cancel_event = cancel_event
+        self.signals = StatisticsSignals()
+
+    def run(self):
+        try:
+            statistics = self.compute()
+        except (OSError, ValueError) as e:
+            self.signals.failed.emit(self.generation, f"统计失败: {e}")
+            return
+        if statistics is not None:
+            self.signals.finished.emit(self.generation, statistics)
+
+    def compute(self):
+        """
+        执行统计，被取消时返回 None
+        """
+        if isinstance(self.source, bytes):
+            return self.compute_buffer(self.source, len(self.source))
+        size = os.path.getsize(self.source)
+        if size == 0:
+            return StreamingStatistics()
+        with open(self.source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return self.compute_buffer(buffer, size)
+
+    def compute_buffer(self, buffer, size):
+        statistics = StreamingStatistics()
+        delimiter = header = None
+        last_percent = -1
+        for chunk, end in iter_chunks(buffer, size):
+            if self.cancel_event.is_set():
+                return None
+            text = chunk.decode("utf-8-sig" if header is None else "utf-8", errors="replace")
+            if header is None:
+                first_line, _, rest = text.lstrip("\r\n").partition("\n")
+                delimiter, _, header = detect_layout(first_line.rstrip("\r"))
+                if header:
+                    text = rest
+            values, skipped = parse_column(text, delimiter, self.column)
+            statistics.update(values, skipped)
+            percent = end * 100 // size
+            if percent != last_percent:
+                last_percent = percent
+                self.signals.progress.emit(self.generation, percent)
+        return statistics
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+撤销历史 - 表达式、内存和模式（角度、进制）的无限撤销和重做
+每一步是一个不可变的状态，状态链接到上一步（撤销和重做只移动指针，O(1)）；
+表达式按固定长度分块，块串成链表，相邻各步共享相同的前缀块，
+因此长表达式的很多步只多占用改动的那一块；退出时把最近的若干步连同共享结构一起写入紧凑的二进制文件
+"""
+
+import os
+import struct
+import zlib
+
+from .matrix_ops import is_matrix
+
+
+# 表达式分块的长度（字符）
+CHUNK_SIZE = 32
+
+# 写入文件的最多步数（内存中不限）
+SNAPSHOT_LIMIT = 10000
+
+# 文件格式：魔数，之后是 zlib 压缩的正文
+SNAPSHOT_MAGIC = b"CALCUN01"
+COUNTS = struct.Struct("<III")       # 块数、可撤销的状态数、可重做的状态数
+CHUNK_HEADER = struct.Struct("<iH")  # 前一块的序号（-1 表示没有）、块的字节数
+STATE = struct.Struct("<iBdBB")      # 表达式最后一块的序号、内存值类型、内存值、角度模式、进制
+
+# 内存值类型（整数超出 double 的精确范围时按浮点数保存；矩阵等其他值不保存，恢复为 0）
+MEMORY_INT, MEMORY_FLOAT, MEMORY_OTHER = 0, 1, 2
+
+ANGLE_MODES = ("deg", "rad")
+
+
+def pack_memory(memory):
+    """内存值 -> (类型, double)"""
+    if isinstance(memory, int) and not isinstance(memory, bool) and abs(memory) <= 1 << 53:
+        return MEMORY_INT, float(memory)
+    if isinstance(memory, (int, float)) and not isinstance(memory, bool):
+        return MEMORY_FLOAT, float(memory)
+    return MEMORY_OTHER, 0.0
+
+
+def unpack_memory(kind, value):
+    """(类型, double) -> 内存值"""
+    return int(value) if kind == MEMORY_INT else value if kind == MEMORY_FLOAT else 0
+
+
+def same_memory(a, b):
+    """两个内存值是否相同（类型也须相同；矩阵逐元素比较）"""
+    if type(a) is not type(b):
+        return False
+    if is_matrix(a):
+        return a.shape == b.shape and bool((a == b).all())
+    return a == b
+
+
+class TextChunk:
+    """表达式的一块：本块文字和它前面的块（不可变，可被多个表达式共享）"""
+
+    __slots__ = ("head", "chunk", "length")
+
+    def __init__(self, head, chunk):
+        self.head = head
+        self.chunk = chunk
+        self.length = len(chunk) + (head.length if head is not None else 0)
+
+    def chunks(self):
+        """从第一块到本块的列表"""
+        node = self
+        chunks = []
+        while node is not None:
+            chunks.append(node)
+            node = node.head
+        chunks.reverse()
+        return chunks
+
+    def text(self):
+        return "".join(node.chunk for node in self.chunks())
+
+
+def share_text(previous, text):
+    """
+    把 text 分块，与 previous（上一步的表达式）共享相同的整块前缀
+
+    Returns:
+        最后一块，text 为空时为 None
+    """
+    head = None
+    offset = 0
+    if previous is not None:
+        for node in previous.chunks():
+            # 只共享满块（最后一块不满时在其后追加文字会生成新块）
+            if len(node.chunk) != CHUNK_SIZE or not text.startswith(node.chunk, offset):
+                break
+            head = node
+            offset += CHUNK_SIZE
+    for start in range(offset, len(text), CHUNK_SIZE):
+        head = TextChunk(head, text[start:start + CHUNK_SIZE])
+    return head
+
+
+class UndoState:
+    """一步的状态（不可变）：表达式、内存值、角度模式、进制，以及上一步"""
+
+    __slots__ = ("text", "memory", "angle_mode", "base", "previous")
+
+    def __init__(self, text, memory, angle_mode, base, previous):
+        self.text = text
+        self.memory = memory
+        self.angle_mode = angle_mode
+        self.base = base
+        self.previous = previous
+
+    @property
+    def expression(self):
+        return self.text.text() if self.text is not None else ""
+
+    def same_as(self, expression, memory, angle_mode, base):
+        return (same_memory(self.memory, memory)
+                and self.angle_mode == angle_mode and self.base == base
+                and (self.text.length if self.text is not None else 0) == len(expression)
+                and self.expression == expression)
+
+
+class UndoHistory:
+    """撤销历史：当前状态（链接到之前的各步）和可重做的状态"""
+
+    def __init__(self, snapshot_file="calculator_undo.bin"):
+        self.snapshot_file = snapshot_file
+        self.current = None  # 当前状态，尚未记录时为 None
+        self.redo_states = []
+        self.depth = 0       # 可撤销的步数
+
+    def record(self, expression, memory, angle_mode, base):
+        """
+        记录一步（与当前状态相同时忽略），清空可重做的状态
+
+        Returns:
+            是否记录了新的一步
+        """
+        current = self.current
+        if current is not None and current.same_as(expression, memory, angle_mode, base):
+            return False
+        text = share_text(current.text if current is not None else None, expression)
+        self.current = UndoState(text, memory, angle_mode, base, current)
+        if current is not None:
+            self.depth += 1
+        self.redo_states.clear()
+        return True
+
+    def can_undo(self):
+        return self.depth > 0
+
+    def can_redo(self):
+        return bool(self.redo_states)
+
+    def undo(self):
+        """回到上一步，返回该状态；没有可撤销的步时返回 None"""
+        if not self.depth:
+            return None
+        self.redo_states.append(self.current)
+        self.current = self.current.previous
+        self.depth -= 1
+        return self.current
+
+    def redo(self):
+        """重做撤销的一步，返回该状态；没有可重做的步时返回 None"""
+        if not self.redo_states:
+            return None
+        self.current = self.redo_states.pop()
+        self.depth += 1
+        return self.current
+
+    def states(self, limit=None):
+        """从最早到当前的各状态（最多 limit 个，取最近的）"""
+        states = []
+        state = self.current
+        while state is not None and (limit is None or len(states) < limit):
+            states.append(state)
+            state = state.previous
+        states.reverse()
+        return states
+
+    # 文件读写
+    def save(self):
+        """把最近 SNAPSHOT_LIMIT 步和可重做的状态写入文件（先写临时文件再替换）"""
+        undo_states = self.states(SNAPSHOT_LIMIT)
+        redo_states = self.redo_states[-SNAPSHOT_LIMIT:]
+        chunk_index = {}  # id(TextChunk) -> 序号，共享的块只写一次
+        chunk_data = []
+
+        def index_of(text):
+            if text is None:
+                return -1
+            pending = []
+            node = text
+            while node is not None and id(node) not in chunk_index:
+                pending.append(node)
+                node = node.head
+            for node in reversed(pending):
+                encoded = node.chunk.encode("utf-8")
+                head = chunk_index[id(node.head)] if node.head is not None else -1
+                chunk_index[id(node)] = len(chunk_index)
+                chunk_data.append(CHUNK_HEADER.pack(head, len(encoded)) + encoded)
+            return chunk_index[id(text)]
+
+        state_data = [self.pack_state(state, index_of(state.text)) for state in undo_states + redo_states]
+        body = COUNTS.pack(len(chunk_data), len(undo_states), len(redo_states)) + b"".join(chunk_data + state_data)
+        temporary = self.snapshot_file + ".tmp"
+        try:
+            with open(temporary, "wb") as f:
+                f.write(SNAPSHOT_MAGIC + zlib.compress(body))
+            os.replace(temporary, self.snapshot_file)
+        except OSError as e:
+            print(f"保存撤销历史失败: {e}")
+
+    @staticmethod
+    def pack_state(state, text_index):
+        kind, value = pack_memory(state.memory)
+        angle = ANGLE_MODES.index(state.angle_mode) if state.angle_mode in ANGLE_MODES else 0
+        return STATE.pack(text_index, kind, value, angle, state.base)
+
+    def load(self):
+        """
+        从文件恢复撤销历史
+
+        Returns:
+            是否成功恢复
+        """
+        try:
+            if not os.path.exists(self.snapshot_file):
+                return False
+            with open(self.snapshot_file, "rb") as f:
+                data = f.read()
+            if not data.startswith(SNAPSHOT_MAGIC):
+                return False
+            body = zlib.decompress(data[len(SNAPSHOT_MAGIC):])
+            chunk_count, undo_count, redo_count = COUNTS.unpack_from(body)
+            offset = COUNTS.size
+            chunks = []
+            for _ in range(chunk_count):
+                head, size = CHUNK_HEADER.unpack_from(body, offset)
+                offset += CHUNK_HEADER.size
+                chunk = body[offset:offset + size].decode("utf-8")
+                offset += size
+                chunks.append(TextChunk(chunks[head] if head >= 0 else None, chunk))
+            states = []
+            for _ in range(undo_count + redo_count):
+                text_index, kind, value, angle, base = STATE.unpack_from(body, offset)
+                offset += STATE.size
+                memory = unpack_memory(kind, value)
+                text = chunks[text_index] if text_index >= 0 else None
+                states.append((text, memory, ANGLE_MODES[angle], base))
+        except (OSError, ValueError, IndexError, struct.error, zlib.error) as e:
+            print(f"加载撤销历史失败: {e}")
+            return False
+
+        current = None
+        for text, memory, angle_mode, base in states[:undo_count]:
+            current = UndoState(text, memory, angle_mode, base, current)
+        self.current = current
+        self.depth = max(undo_count - 1, 0)
+        # 可重做的状态各自链接到它之前的一步（重做时 current 会被替换为它们）
+        previous = current
+        self.redo_states = []
+        for text, memory, angle_mode, base in reversed(states[undo_count:]):
+            previous = UndoState(text, memory, angle_mode, base, previous)
+            self.redo_states.append(previous)
+        self.redo_states.reverse()
+        return True
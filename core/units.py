@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单位换算 - 带单位的量和量纲分析
+表达式中数字后面的单位（如 5 km/h、3 ft + 20 cm）在预处理时改写为 quantity(5, 'km/h')，
+“… to 单位”改写为 convert(…, '单位')。单位表在第一次用到单位时编译一次：
+每个单位沿定义链（如 mi → yd → ft → in → m）折算成相对 SI 基本单位的倍数和量纲向量，
+组合单位（如 km/h）的倍数和量纲向量、两个单位之间的换算系数都缓存起来，
+之后每次换算只是一次乘加，不需要再查找单位之间的关系
+"""
+
+import keyword
+import re
+
+
+# 量纲向量各分量对应的基本单位
+BASE_UNITS = ("m", "kg", "s", "A", "K", "mol", "cd", "bit")
+
+# 单位定义：(名称（第一个为显示名称，其余为别名）, 倍数, 参照单位)；参照单位可以是组合单位
+UNIT_DEFINITIONS = (
+    # 长度
+    (("in", "inch"), 0.0254, "m"),
+    (("ft",), 12, "in"),
+    (("yd",), 3, "ft"),
+    (("mi", "mile"), 1760, "yd"),
+    (("nmi",), 1852, "m"),
+    (("au",), 149597870700, "m"),
+    (("ly",), 9460730472580800, "m"),
+    # 质量
+    (("g",), 1e-3, "kg"),
+    (("t",), 1000, "kg"),
+    (("lb", "lbs"), 0.45359237, "kg"),
+    (("oz",), 1 / 16, "lb"),
+    # 时间
+    (("min",), 60, "s"),
+    (("h", "hr"), 60, "min"),
+    (("d", "day"), 24, "h"),
+    (("wk", "week"), 7, "d"),
+    (("yr", "year"), 365.25, "d"),
+    (("Hz",), 1, "1/s"),
+    # 面积和体积
+    (("ha",), 10000, "m^2"),
+    (("acre",), 4046.8564224, "m^2"),
+    (("L", "l"), 1e-3, "m^3"),
+    (("gal",), 3.785411784, "L"),
+    # 速度
+    (("mph",), 1, "mi/h"),
+    (("kn", "knot"), 1, "nmi/h"),
+    # 力、压强、能量、功率
+    (("N",), 1, "kg·m/s^2"),
+    (("lbf",), 4.4482216152605, "N"),
+    (("Pa",), 1, "N/m^2"),
+    (("bar",), 100000, "Pa"),
+    (("atm",), 101325, "Pa"),
+    (("psi",), 1, "lbf/in^2"),
+    (("mmHg",), 133.322387415, "Pa"),
+    (("J",), 1, "N·m"),
+    (("cal",), 4.184, "J"),
+    (("eV",), 1.602176634e-19, "J"),
+    (("W",), 1, "J/s"),
+    (("Wh",), 1, "W·h"),
+    (("hp",), 745.69987158227022, "W"),
+    # 电学
+    (("C",), 1, "A·s"),
+    (("V",), 1, "W/A"),
+    (("Ω", "ohm"), 1, "V/A"),
+    (("F",), 1, "C/V"),
+    # 信息量
+    (("B", "byte"), 8, "bit"),
+)
+
+# 带零点偏移的温度单位：(名称, 倍数, 零点（K）)，只能单独使用
+AFFINE_UNITS = (
+    (("°C", "℃", "degC"), 1, 273.15),
+    (("°F", "℉", "degF"), 5 / 9, 459.67 * 5 / 9),
+)
+
+# 十进制词头及可以加词头的单位
+PREFIXES = {"P": 1e15, "T": 1e12, "G": 1e9, "M": 1e6, "k": 1e3, "c": 1e-2,
+            "m": 1e-3, "µ": 1e-6, "u": 1e-6, "n": 1e-9, "p": 1e-12}
+PREFIXABLE = ("m", "g", "s", "A", "K", "mol", "cd", "Hz", "L", "l", "N", "Pa", "bar", "J",
+              "cal", "eV", "W", "Wh", "C", "V", "Ω", "F", "bit", "B")
+# 二进制词头（只用于信息量）
+BINARY_PREFIXES = {"Ki": 2 ** 10, "Mi": 2 ** 20, "Gi": 2 ** 30, "Ti": 2 ** 40}
+
+# 单位表达式的记号：单位名、指数、乘除号、括号
+UNIT_TOKEN_PATTERN = re.compile(
+    r"\s*(?:(?P<name>[A-Za-z°µΩ℃℉]+)|(?P<power>(?:\*\*|\^)\s*(?P<exponent>-?\d+))"
+    r"|(?P<op>[*/·])|(?P<open>\()|(?P<close>\))|(?P<one>1)(?=\s*/))")
+
+# 数字（十六进制等带前缀的整数整体跳过，不会把其中的字母当作单位）
+NUMBER_PATTERN = re.compile(
+    r"(?<![\w.])(?:0[xXoObB][0-9A-Fa-f_]+|(?:\d[\d_]*(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)")
+
+# 预处理时先用它判断表达式是否可能含有单位：数字后面紧跟字母或单位符号，或者有 to
+UNIT_HINT_PATTERN = re.compile(r"[\d.]\s*[^\W\d_]|[\d.]\s*[°µΩ℃℉]|(?<!\w)to(?!\w)")
+
+# 查找顶层的 to（括号、引号之外）
+TO_TOKEN_PATTERN = re.compile(r"[()\[\]{}'\"]|(?<![\w.])to(?!\w)")
+
+
+class UnitError(ValueError):
+    """单位错误（错误信息直接显示给用户）"""
+
+
+class Unit:
+    """编译好的单位：相对 SI 基本单位的倍数、零点和量纲向量"""
+
+    __slots__ = ("text", "factor", "offset", "dims", "terms")
+
+    def __init__(self, text, factor, offset, dims, terms):
+        self.text = text      # 显示名称
+        self.factor = factor  # 1 个该单位 = factor 个 SI 基本单位（的组合）
+        self.offset = offset  # 零点（只有 °C、°F 不为 0）
+        self.dims = dims      # 量纲向量，各分量依次是 BASE_UNITS 的指数
+        self.terms = terms    # 组成该单位的 ((单位名, 指数), ...)，用于组合单位
+
+    def is_affine(self):
+        return self.offset != 0
+
+    def is_dimensionless(self):
+        return not any(self.dims)
+
+
+class UnitRegistry:
+    """单位表：编译一次后所有查询都是字典查找"""
+
+    def __init__(self):
+        self.units = {}        # 单位名（含别名和加词头的名称）-> Unit
+        self.composites = {}   # 单位表达式或 terms -> Unit
+        self.conversions = {}  # (源单位, 目标单位) -> (倍数, 偏移)
+        self.compile()
+
+    def compile(self):
+        """把单位定义沿定义链折算为相对基本单位的倍数和量纲向量"""
+        for index, name in enumerate(BASE_UNITS):
+            dims = tuple(1 if i == index else 0 for i in range(len(BASE_UNITS)))
+            self.units[name] = Unit(name, 1.0, 0.0, dims, ((name, 1),))
+        # 定义按依赖顺序排列：参照单位总是已经编译好
+        for names, multiple, reference in UNIT_DEFINITIONS:
+            base = self.parse(reference)
+            self.add_unit(names, multiple * base.factor, 0.0, base.dims)
+        kelvin = self.units["K"]
+        for names, multiple, offset in AFFINE_UNITS:
+            self.add_unit(names, multiple, offset, kelvin.dims)
+        # 词头：显式定义的名称优先（如 min 不是 m·in，cd 不是厘日）
+        for name in PREFIXABLE:
+            unit = self.units[name]
+            for prefix, multiple in PREFIXES.items():
+                self.add_prefixed(prefix + name, multiple, unit)
+        for name in ("bit", "B"):
+            for prefix, multiple in BINARY_PREFIXES.items():
+                self.add_prefixed(prefix + name, multiple, self.units[name])
+        # 编译定义时缓存的组合单位名称可能与后来的单位冲突，清空重来
+        self.composites.clear()
+
+    def add_unit(self, names, factor, offset, dims):
+        for name in names:
+            self.units[name] = Unit(names[0], factor, offset, dims, ((names[0], 1),))
+
+    def add_prefixed(self, name, multiple, unit):
+        if name not in self.units:
+            self.units[name] = Unit(name, multiple * unit.factor, 0.0, unit.dims, ((name, 1),))
+
+    def is_unit(self, name):
+        return name in self.units
+
+    def parse(self, text):
+        """
+        解析单位表达式（如 km/h、kg·m/s^2、J/(kg·K)），结果按文本缓存
+
+        Raises:
+            UnitError: 未知单位或语法错误
+        """
+        unit = self.composites.get(text)
+        if unit is None:
+            terms = UnitParser(self, text).parse()
+            unit = self.combine(terms)
+            self.composites[text] = unit
+        return unit
+
+    def combine(self, terms):
+        """由 ((单位名, 指数), ...) 组合出单位（同名单位的指数合并），结果按 terms 缓存"""
+        merged = {}
+        for name, exponent in terms:
+            merged[name] = merged.get(name, 0) + exponent
+        terms = tuple((name, exponent) for name, exponent in merged.items() if exponent)
+        unit = self.composites.get(terms)
+        if unit is not None:
+            return unit
+        factor = 1.0
+        dims = [0] * len(BASE_UNITS)
+        for name, exponent in terms:
+            part = self.units[name]
+            if part.is_affine() and (len(terms) > 1 or exponent != 1):
+                raise UnitError(f"{name} 不能与其他单位组合，请改用 K")
+            factor *= part.factor ** exponent
+            for index, value in enumerate(part.dims):
+                dims[index] += value * exponent
+        offset = self.units[terms[0][0]].offset if len(terms) == 1 else 0.0
+        unit = Unit(format_terms(terms), factor, offset, tuple(dims), terms)
+        self.composites[terms] = unit
+        return unit
+
+    def conversion(self, source, target):
+        """
+        从 source 换算到 target 的 (倍数, 偏移)：目标值 = 源值 × 倍数 + 偏移，结果缓存
+
+        Raises:
+            UnitError: 量纲不同
+        """
+        key = (source.terms, target.terms)
+        conversion = self.conversions.get(key)
+        if conversion is None:
+            if source.dims != target.dims:
+                raise UnitError(f"无法把 {source.text} 换算为 {target.text}：量纲不同")
+            conversion = (source.factor / target.factor, (source.offset - target.offset) / target.factor)
+            self.conversions[key] = conversion
+        return conversion
+
+
+class UnitParser:
+    """单位表达式的递归下降解析：表达式 = 项 ((*|·|/) 项)*，项 = (单位名 | (表达式) | 1) [^整数]"""
+
+    def __init__(self, registry, text):
+        self.registry = registry
+        self.text = text
+        self.tokens = []
+        position = 0
+        text = text.rstrip()
+        if not text:
+            raise UnitError("缺少单位")
+        while position < len(text):
+            match = UNIT_TOKEN_PATTERN.match(text, position)
+            if match is None or match.end() == position:
+                raise UnitError(f"无法识别的单位 {self.text.strip()}")
+            self.tokens.append(match)
+            position = match.end()
+        self.index = 0
+
+    def parse(self):
+        terms = self.expression()
+        if self.index != len(self.tokens):
+            raise UnitError(f"无法识别的单位 {self.text.strip()}")
+        return terms
+
+    def peek(self, kind):
+        return self.index < len(self.tokens) and self.tokens[self.index].group(kind) is not None
+
+    def expression(self):
+        terms = self.term()
+        while self.peek("op"):
+            op = self.tokens[self.index].group("op")
+            self.index += 1
+            right = self.term()
+            terms += right if op != "/" else [(name, -exponent) for name, exponent in right]
+        return terms
+
+    def term(self):
+        if self.peek("name"):
+            name = self.tokens[self.index].group("name")
+            if not self.registry.is_unit(name):
+                raise UnitError(f"未知的单位 {name}")
+            self.index += 1
+            terms = [(name, 1)]
+        elif self.peek("open"):
+            self.index += 1
+            terms = self.expression()
+            if not self.peek("close"):
+                raise UnitError(f"单位 {self.text.strip()} 的括号不配对")
+            self.index += 1
+        elif self.peek("one"):
+            self.index += 1
+            terms = []
+        else:
+            raise UnitError(f"无法识别的单位 {self.text.strip()}")
+        if self.peek("power"):
+            exponent = int(self.tokens[self.index].group("exponent"))
+            self.index += 1
+            terms = [(name, value * exponent) for name, value in terms]
+        return terms
+
+
+def format_terms(terms):
+    """把 ((单位名, 指数), ...) 写成 kg·m/s^2 的形式（只有分母时写成 s^-1，可以再次输入）"""
+    def power(name, exponent):
+        return name if exponent == 1 else f"{name}^{exponent}"
+    numerator = "·".join(power(name, exponent) for name, exponent in terms if exponent > 0)
+    denominator = [power(name, -exponent) for name, exponent in terms if exponent < 0]
+    if not numerator:
+        return "·".join(power(name, exponent) for name, exponent in terms)
+    if not denominator:
+        return numerator
+    if len(denominator) == 1:
+        return f"{numerator}/{denominator[0]}"
+    return f"{numerator}/({'·'.join(denominator)})"
+
+
+class Quantity:
+    """带单位的量：数值以 unit 为单位保存，加减时把另一个量换算到本单位"""
+
+    __slots__ = ("value", "unit")
+
+    def __init__(self, value, unit):
+        self.value = value
+        self.unit = unit
+
+    def to(self, unit):
+        scale, shift = registry().conversion(self.unit, unit)
+        return Quantity(self.value * scale + shift, unit)
+
+    def format(self, format_number):
+        return f"{format_number(self.value)} {self.unit.text}"
+
+    def __repr__(self):
+        return f"{self.value!r} {self.unit.text}"
+
+    # 加减：另一个量换算到本单位；不能与没有单位的数相加减
+    def converted_value(self, other, operation):
+        if not isinstance(other, Quantity):
+            raise UnitError(f"不能把没有单位的数与 {self.unit.text} {operation}")
+        if other.unit.terms == self.unit.terms:
+            return other.value
+        if self.unit.is_affine() or other.unit.is_affine():
+            raise UnitError("°C、°F 只能与同一单位相加减，其他情况请先用 to 换算")
+        scale, shift = registry().conversion(other.unit, self.unit)
+        return other.value * scale + shift
+
+    def __add__(self, other):
+        return Quantity(self.value + self.converted_value(other, "相加"), self.unit)
+
+    def __radd__(self, other):
+        return Quantity(self.converted_value(other, "相加") + self.value, self.unit)
+
+    def __sub__(self, other):
+        return Quantity(self.value - self.converted_value(other, "相减"), self.unit)
+
+    def __rsub__(self, other):
+        return Quantity(self.converted_value(other, "相减") - self.value, self.unit)
+
+    def __neg__(self):
+        return Quantity(-self.value, self.unit)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Quantity(abs(self.value), self.unit)
+
+    # 乘除：与数相乘除只改变数值；与量相乘除时组合单位，量纲抵消时得到普通的数
+    def __mul__(self, other):
+        if isinstance(other, Quantity):
+            return combined(self.value * other.value, self.unit.terms + other.unit.terms)
+        return Quantity(self.value * other, self.unit)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, Quantity):
+            inverse = tuple((name, -exponent) for name, exponent in other.unit.terms)
+            return combined(self.value / other.value, self.unit.terms + inverse)
+        return Quantity(self.value / other, self.unit)
+
+    def __rtruediv__(self, other):
+        inverse = tuple((name, -exponent) for name, exponent in self.unit.terms)
+        return combined(other / self.value, inverse)
+
+    def __pow__(self, exponent):
+        if isinstance(exponent, Quantity) or exponent != int(exponent):
+            raise UnitError("带单位的量的指数必须是整数")
+        exponent = int(exponent)
+        return combined(self.value ** exponent,
+                        tuple((name, value * exponent) for name, value in self.unit.terms))
+
+
+def combined(value, terms):
+    """
+    数值乘以组合单位：与前面某个单位量纲相同的单位先换算为该单位（如 km·min/h 化为 km），
+    量纲完全抵消时（如 km/m）得到普通的数
+    """
+    table = registry()
+    merged = []  # [[单位名, 指数], ...]
+    for name, exponent in terms:
+        unit = table.units[name]
+        for entry in merged:
+            other = table.units[entry[0]]
+            if other.dims == unit.dims and not (other.is_affine() or unit.is_affine()):
+                value *= (unit.factor / other.factor) ** exponent
+                entry[1] += exponent
+                break
+        else:
+            merged.append([name, exponent])
+    unit = table.combine(tuple((name, exponent) for name, exponent in merged))
+    if unit.is_dimensionless():
+        return value * unit.factor
+    return Quantity(value, unit)
+
+
+_registry = None
+
+
+def registry():
+    """单位表（第一次调用时编译）"""
+    global _registry
+    if _registry is None:
+        _registry = UnitRegistry()
+    return _registry
+
+
+def is_loaded():
+    """单位表是否已经编译（用于检查启动时没有加载）"""
+    return _registry is not None
+
+
+def quantity(value, unit):
+    """带单位的量，如 quantity(5, 'km/h')"""
+    if isinstance(value, Quantity):
+        raise UnitError(f"{value.unit.text} 后面不能再跟单位 {unit}")
+    return Quantity(value, registry().parse(unit))
+
+
+def convert(value, unit):
+    """把带单位的量换算为 unit，如 convert(quantity(5, 'km/h'), 'm/s')"""
+    target = registry().parse(unit)
+    if not isinstance(value, Quantity):
+        raise UnitError(f"没有单位的数不能换算为 {target.text}")
+    return value.to(target)
+
+
+def rewrite_units(expression):
+    """
+    把表达式中带单位的数和 to 换算改写为函数调用，例如
+    5 km/h to m/s -> convert(quantity(5, 'km/h'), 'm/s')，3 ft + 20 cm -> quantity(3, 'ft') + quantity(20, 'cm')；
+    只有数字后面的已知单位才改写，单位表在第一次遇到这样的名称时才编译
+    """
+    target = None
+    split = find_top_level_to(expression)
+    if split is not None:
+        expression, target = expression[:split[0]], expression[split[1]:].strip()
+
+    parts = []
+    position = 0
+    for match in NUMBER_PATTERN.finditer(expression):
+        if match.start() < position:
+            continue
+        end = scan_unit(expression, match.end())
+        if end is None:
+            continue
+        unit = expression[match.end():end].strip()
+        parts.append(expression[position:match.start()])
+        parts.append(f"quantity({match.group()}, {unit!r})")
+        position = end
+    parts.append(expression[position:])
+    rewritten = "".join(parts)
+    if target is not None:
+        rewritten = f"convert({rewritten.strip()}, {target!r})"
+    return rewritten
+
+
+def find_top_level_to(expression):
+    """找到括号和引号之外的第一个 to，返回 (开始, 结束) 位置，没有时返回 None"""
+    depth = 0
+    quote = None
+    for match in TO_TOKEN_PATTERN.finditer(expression):
+        token = match.group()
+        if quote:
+            if token == quote:
+                quote = None
+        elif token in "'\"":
+            quote = token
+        elif token in "([{":
+            depth += 1
+        elif token in ")]}":
+            depth -= 1
+        elif depth == 0:
+            return match.start(), match.end()
+    return None
+
+
+def scan_unit(expression, start):
+    """
+    从 start 开始（可以先有空白）匹配尽可能长的单位表达式，只接受已知的单位名
+
+    Returns:
+        单位表达式结束的位置，start 处不是单位时返回 None
+    """
+    position = start
+    expect_operand = True
+    depth = 0
+    end = None
+    while True:
+        match = UNIT_TOKEN_PATTERN.match(expression, position)
+        if match is None:
+            break
+        if expect_operand:
+            name = match.group("name")
+            if name is not None:
+                if keyword.iskeyword(name) and name != "in" or not registry().is_unit(name):
+                    break
+                expect_operand = False
+            elif match.group("open") is None:
+                break
+            else:
+                depth += 1
+        elif match.group("power") is not None:
+            pass
+        elif match.group("op") is not None:
+            expect_operand = True
+        elif match.group("close") is not None and depth > 0:
+            depth -= 1
+        else:
+            break
+        position = match.end()
+        if not expect_operand and depth == 0:
+            end = position
+    return end
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工作表 - 逐行求值、可定义变量的表达式工作表
+每行是一个表达式，或“名称 = 表达式”形式的变量定义；
+各行引用的变量构成依赖图，修改一行时只按拓扑顺序重新计算它及其下游各行，
+每行的预处理和编译结果在修改该行时生成一次，重新计算时直接求值
+"""
+
+import re
+from PySide6.QtCore import QObject, Signal
+
+from .numeric_solvers import solver_argument_names
+
+
+# 变量定义：名称 = 表达式（名称可以是中文；排除 ==）
+ASSIGNMENT_PATTERN = re.compile(r"^\s*([^\W\d]\w*)\s*=(?!=)(.*)$")
+
+
+class WorksheetLine:
+    """工作表中的一行"""
+
+    __slots__ = ("text", "name", "code", "deps", "value", "result", "error")
+
+    def __init__(self, text):
+        self.text = text
+        self.name = None     # 定义的变量名，不是变量定义时为 None
+        self.code = None     # 编译好的表达式，空行和注释行为 None
+        self.deps = ()       # 引用的变量名
+        self.value = None    # 计算结果
+        self.result = ""     # 格式化的结果
+        self.error = None    # 错误信息
+
+
+class Worksheet(QObject):
+    """表达式工作表"""
+
+    # 信号定义
+    lines_recomputed = Signal(int)  # 重新计算了若干行
+
+    def __init__(self, engine, parent=None):
+        """
+        Args:
+            engine: 计算引擎，提供表达式预处理、函数表和结果格式化
+        """
+        super().__init__(parent)
+        self.engine = engine
+        self.lines = []
+        self.definitions = {}  # 变量名 -> 定义它的行（按定义顺序，第一行有效）
+        self.dependents = {}   # 变量名 -> 引用它的行
+        self.values = {}       # 变量名 -> 当前值
+
+    def __len__(self):
+        return len(self.lines)
+
+    def line(self, index):
+        """获取第 index 行"""
+        return self.lines[index]
+
+    def set_text(self, text):
+        """用整段文本替换工作表的全部内容"""
+        return self.replace_lines(0, len(self.lines), text.split("\n"))
+
+    def replace_lines(self, start, stop, texts):
+        """
+        用 texts 替换 [start, stop) 行，并重新计算受影响的行
+
+        Returns:
+            重新计算的行数
+        """
+        seeds = []
+        touched = set()  # 定义被删除或新增的变量名
+        for line in self.lines[start:stop]:
+            self.unregister(line)
+            if line.name is not None:
+                touched.add(line.name)
+
+        new_lines = [self.parse(text) for text in texts]
+        self.lines[start:stop] = new_lines
+        for line in new_lines:
+            self.register(line)
+            seeds.append(line)
+            if line.name is not None:
+                touched.add(line.name)
+
+        for name in touched:
+            # 变量的有效定义可能变了：所有定义行和引用它的行都要重新计算
+            seeds.extend(self.definitions.get(name, ()))
+            seeds.extend(self.dependents.get(name, ()))
+            if name not in self.definitions:
+                self.values.pop(name, None)
+        return self.recompute(seeds)
+
+    def recompute_all(self):
+        """重新计算全部行（如角度模式改变后）"""
+        self.values.clear()
+        return self.recompute(self.lines)
+
+    def parse(self, text):
+        """解析并编译一行"""
+        line = WorksheetLine(text)
+        expression = text
+        match = ASSIGNMENT_PATTERN.match(text)
+        if match:
+            line.name, expression = match.group(1), match.group(2)
+        if not expression.strip() or expression.lstrip().startswith("#"):
+            if line.name is not None:
+                line.error = "缺少表达式"
+            return line
+        if line.name is not None and line.name in self.engine.functions:
+            line.error = f"不能用 {line.name} 作变量名"
+            return line
+        try:
+            processed = self.engine.preprocess_expression(expression.strip())
+            line.code = compile(processed, "<worksheet>", "eval")
+        except SyntaxError:
+            line.error = "表达式语法错误"
+            return line
+        # 求解函数的表达式参数已改写为字符串，其中引用的变量（自变量除外）另行计入
+        names = dict.fromkeys(line.code.co_names)
+        names.update(dict.fromkeys(sorted(solver_argument_names(processed))))
+        line.deps = tuple(name for name in names if name not in self.engine.functions)
+        return line
+
+    def register(self, line):
+        """把一行加入依赖图"""
+        if line.name is not None:
+            self.definitions.setdefault(line.name, []).append(line)
+        for name in line.deps:
+            self.dependents.setdefault(name, set()).add(line)
+
+    def unregister(self, line):
+        """把一行移出依赖图"""
+        if line.name is not None:
+            definitions = self.definitions[line.name]
+            definitions.remove(line)
+            if not definitions:
+                del self.definitions[line.name]
+        for name in line.deps:
+            dependents = self.dependents[name]
+            dependents.discard(line)
+            if not dependents:
+                del self.dependents[name]
+
+    def definition(self, name):
+        """变量的有效定义行（重复定义时为最靠前的一行），未定义时返回 None"""
+        definitions = self.definitions.get(name)
+        if not definitions:
+            return None
+        if len(definitions) == 1:
+            return definitions[0]
+        return min(definitions, key=self.lines.index)
+
+    def recompute(self, seeds):
+        """
+        重新计算 seeds 及其全部下游行，按拓扑顺序求值，构成环的行标记为循环引用
+
+        Returns:
+            重新计算的行数
+        """
+        # 收集受影响的行
+        affected = set()
+        stack = list(seeds)
+        while stack:
+            line = stack.pop()
+            if line in affected:
+                continue
+            affected.add(line)
+            if line.name is not None:
+                stack.extend(self.dependents.get(line.name, ()))
+
+        # 先按拓扑顺序求值；剩下的行位于环上或在环的下游
+        leftover = self.evaluate_in_order(affected)
+        if leftover:
+            cyclic = self.find_cycles(leftover)
+            for line in cyclic:
+                self.set_error(line, "循环引用")
+            self.evaluate_in_order(leftover - cyclic)
+
+        self.lines_recomputed.emit(len(affected))
+        return len(affected)
+
+    def is_active(self, line):
+        """该行是否为其变量的有效定义"""
+        return line.name is not None and self.definition(line.name) is line
+
+    def downstream(self, line, within):
+        """within 中直接引用该行变量的行"""
+        if not self.is_active(line):
+            return []
+        return [dependent for dependent in self.dependents.get(line.name, ()) if dependent in within]
+
+    def evaluate_in_order(self, lines):
+        """
+        按拓扑顺序（Kahn 算法）求值 lines，上游不在 lines 中的已有结果
+
+        Returns:
+            因环而无法求值的行
+        """
+        pending = {}
+        ready = []
+        for line in lines:
+            if line.name is not None and not self.is_active(line):
+                count = 0  # 重复定义的行直接标记错误，不必等待上游
+            else:
+                count = sum(self.definition(name) in lines for name in line.deps)
+            pending[line] = count
+            if count == 0:
+                ready.append(line)
+
+        while ready:
+            line = ready.pop()
+            del pending[line]
+            self.evaluate(line)
+            for dependent in self.downstream(line, pending):
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    ready.append(dependent)
+        return set(pending)
+
+    def find_cycles(self, lines):
+        """返回 lines 中位于环上的行（Tarjan 强连通分量，非递归）"""
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+        cyclic = set()
+        for root in lines:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.downstream(root, lines)))]
+            while work:
+                line, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = low[child] = len(index)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.downstream(child, lines))))
+                        break
+                    if child in on_stack:
+                        low[line] = min(low[line], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[line])
+                    if low[line] == index[line]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member is line:
+                                break
+                        if len(component) > 1 or line.name in line.deps:
+                            cyclic.update(component)
+        return cyclic
+
+    def evaluate(self, line):
+        """求值一行（上游各行已经求值）"""
+        if line.code is None:
+            self.set_error(line, line.error)
+            return
+        if line.name is not None and self.definition(line.name) is not line:
+            self.set_error(line, f"{line.name} 重复定义")
+            return
+        for name in line.deps:
+            source = self.definition(name)
+            if source is None:
+                self.set_error(line, f"未定义的变量 {name}")
+                return
+            if source.error is not None:
+                self.set_error(line, f"{name} 有错误")
+                return
+        try:
+            value = self.engine.evaluate_expression(line.code, self.values)
+            result = self.engine.format_result(value)
+        except Exception as e:
+            self.set_error(line, self.engine.get_error_message(e))
+            return
+        line.value, line.result, line.error = value, result, None
+        if line.name is not None:
+            self.values[line.name] = value
+
+    def set_error(self, line, error):
+        """标记一行出错（空行和注释行 error 为 None，只清除结果）"""
+        line.value, line.result, line.error = None, "", error
+        if line.name is not None and self.definition(line.name) is line:
+            self.values.pop(line.name, None)
@@ -4,18 +4,27 @@
 PySide6 多功能计算器
 作者：Claude 4.0 sonnet
 功能：标准计算器、科学计算器、程序员计算器
+用法：python main.py [--profile-startup]
+    --profile-startup  打印启动各阶段（导入、创建窗口部件、应用样式、加载历史记录等）的耗时
 """
 
+import time
+
+START = time.perf_counter()
+
 import sys
 import os
 from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QObject, QEvent
 from PySide6.QtGui import QFont, QIcon
 
 # 添加项目路径到系统路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from ui.main_window import MainWindow
+from core.startup_profile import StartupProfile
+
+IMPORTED = time.perf_counter()
 
 
 def setup_application():
@@ -39,12 +48,46 @@ def setup_application():
     return app
 
 
+class StartupReporter(QObject):
+    """主窗口首次绘制、历史记录加载完成后打印启动耗时"""
+
+    def __init__(self, window):
+        super().__init__()
+        self.window = window
+        self.painted = False
+        # 窗口显示前用到历史记录时已经加载
+        self.history_loaded = window.calculator_engine.history_manager.loaded
+        window.installEventFilter(self)
+        window.calculator_engine.history_manager.history_loaded.connect(self.on_history_loaded)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and not self.painted:
+            self.painted = True
+            self.window.startup_profile.mark("首次绘制")
+            self.report_when_done()
+        return False
+
+    def on_history_loaded(self):
+        self.history_loaded = True
+        self.report_when_done()
+
+    def report_when_done(self):
+        if self.painted and self.history_loaded:
+            self.window.removeEventFilter(self)
+            print(self.window.startup_profile.report(), flush=True)
+
+
 def main():
     """主函数"""
-    app = setup_application()
+    profile = StartupProfile(START)
+    profile.add("导入模块", IMPORTED - START)
+    with profile.phase("创建应用程序"):
+        app = setup_application()
     
     # 创建主窗口
-    window = MainWindow()
+    window = MainWindow(profile)
+    if "--profile-startup" in sys.argv:
+        reporter = StartupReporter(window)
     window.show()
     
     # 启动应用程序事件循环
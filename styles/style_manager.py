@@ -3,31 +3,131 @@
 """
 样式管理器 - 管理计算器的界面样式
 提供中国化的界面设计和主题支持
+themes.qss 是带 ${变量名} 的模板，每个主题只替换一次配色，编译结果按主题缓存，
+切换主题只需对主窗口设置一次样式表；字号档位、出错状态等都由属性选择器表达，
+同一份样式表即可覆盖，不需要为它们重新生成
 """
 
 import os
-from PySide6.QtCore import QObject
+from string import Template
+from PySide6.QtCore import QObject, Signal
+
+
+# 默认主题（与最初的配色一致）
+DEFAULT_COLORS = {
+    "window_bg": "#F8F9FA",         # 窗口背景
+    "surface": "#FFFFFF",           # 菜单、输入框、按钮等控件背景
+    "text": "#2C3E50",              # 主要文字
+    "text_secondary": "#495057",    # 菜单文字
+    "text_muted": "#6C757D",        # 状态栏、未选中标签页文字
+    "border_light": "#E9ECEF",
+    "border": "#DEE2E6",
+    "control_border": "#CCCCCC",
+    "hover_bg": "#E3F2FD",          # 菜单项、补全项悬停
+    "hover_text": "#1976D2",
+    "pressed_bg": "#BBDEFB",
+    "accent": "#4A90E2",            # 运算符按钮、选中的标签页
+    "accent_dark": "#357ABD",
+    "accent_darker": "#2E86AB",
+    "on_accent": "#FFFFFF",         # 强调色上的文字
+    "focus_bg": "#FAFBFC",
+    "button_text": "#333333",
+    "button_hover": "#F0F8FF",
+    "button_pressed": "#E6F3FF",
+    "disabled_text": "#ADB5BD",
+    "function_bg": "#F8F9FA",       # 功能按钮
+    "function_text": "#495057",
+    "function_hover": "#E9ECEF",
+    "special": "#FF8C00",           # 等号按钮
+    "special_hover": "#FF7F00",
+    "special_pressed": "#FF6347",
+    "dimmed_bg": "#F5F5F5",         # 程序员模式下当前进制不可用的数字
+    "dimmed_text": "#AAAAAA",
+    "dimmed_border": "#E0E0E0",
+    "dimmed_hover": "#EEEEEE",
+    "highlight_border": "#FF6B6B",  # 高亮按钮
+    "highlight_bg": "#FFE5E5",
+    "scrollbar_handle": "#ADB5BD",
+    "scrollbar_hover": "#6C757D",
+    "tooltip_bg": "#2C3E50",
+    "tooltip_text": "#FFFFFF",
+    "tooltip_border": "#495057",
+    "history_text": "#888888",      # 显示屏上的上一条表达式
+    "error_bg": "#FFF5F5",          # 计算出错时的结果区
+    "error_border": "#FEB2B2",
+    "error_text": "#E53E3E",
+}
+
+# 主题名 -> (菜单中显示的名称, 配色)
+THEMES = {
+    "default": ("默认", DEFAULT_COLORS),
+    "light": ("浅色", dict(
+        DEFAULT_COLORS,
+        window_bg="#FFFFFF", text="#212529", text_secondary="#343A40",
+        border_light="#EEEEEE", border="#E0E0E0", control_border="#D0D0D0",
+        hover_bg="#EAF2FB", hover_text="#1565C0", pressed_bg="#D0E3F7",
+        accent="#1E88E5", accent_dark="#1976D2", accent_darker="#1565C0",
+        focus_bg="#FFFFFF", button_text="#212529", button_hover="#F5F9FF", button_pressed="#E8F1FC",
+        disabled_text="#BDBDBD", function_bg="#F3F4F6", function_text="#343A40", function_hover="#E9EBEE",
+        special="#FB8C00", special_hover="#F57C00", special_pressed="#EF6C00",
+        scrollbar_handle="#BDBDBD", scrollbar_hover="#9E9E9E",
+        tooltip_bg="#424242", tooltip_border="#616161", history_text="#9E9E9E",
+    )),
+    "dark": ("深色", dict(
+        DEFAULT_COLORS,
+        window_bg="#1E2329", surface="#2A3038", text="#E6EDF3", text_secondary="#C9D1D9",
+        text_muted="#8B949E", border_light="#363D47", border="#3D4550", control_border="#4A525E",
+        hover_bg="#2F4A6B", hover_text="#8CC4FF", pressed_bg="#36577F",
+        accent_darker="#2E6DA4", focus_bg="#2E353E",
+        button_text="#E6EDF3", button_hover="#323B47", button_pressed="#2B3F57",
+        disabled_text="#5C6570", function_bg="#323842", function_text="#C9D1D9", function_hover="#3B4350",
+        special_hover="#E67E00", special_pressed="#CC5A3A",
+        dimmed_bg="#262B31", dimmed_text="#5C6570", dimmed_border="#333A43", dimmed_hover="#2C3239",
+        highlight_bg="#5A2E33", scrollbar_handle="#4A525E", scrollbar_hover="#6C7682",
+        tooltip_bg="#0D1117", tooltip_text="#E6EDF3", tooltip_border="#3D4550",
+        history_text="#8B949E", error_bg="#3D2326", error_border="#8E3B41", error_text="#FF7B72",
+    )),
+}
 
 
 class StyleManager(QObject):
     """样式管理器类"""
 
+    # 信号定义
+    theme_changed = Signal(str)  # 主题已切换
+
     def __init__(self):
         super().__init__()
         self.current_theme = "default"
         self.theme_file = os.path.join(os.path.dirname(__file__), "themes.qss")
+        self.template = None  # 主题模板，首次使用时读取
+        self.compiled = {}    # 主题名 -> 替换好配色的样式表
         
     def load_theme_from_file(self):
-        """从文件加载主题"""
-        try:
-            with open(self.theme_file, 'r', encoding='utf-8') as f:
-                return f.read()
-        except FileNotFoundError:
-            return self.get_fallback_style()
+        """从文件加载主题模板（只读取一次）"""
+        if self.template is None:
+            try:
+                with open(self.theme_file, 'r', encoding='utf-8') as f:
+                    self.template = Template(f.read())
+            except FileNotFoundError:
+                self.template = Template(self.get_fallback_style())
+        return self.template
+
+    def compile_theme(self, theme_name):
+        """返回主题编译后的样式表，每个主题只编译一次"""
+        style = self.compiled.get(theme_name)
+        if style is None:
+            try:
+                style = self.load_theme_from_file().substitute(THEMES[theme_name][1])
+            except (KeyError, ValueError) as e:
+                print(f"编译主题失败: {e}")
+                style = self.get_fallback_style()
+            self.compiled[theme_name] = style
+        return style
 
     def get_main_window_style(self):
         """获取主窗口样式"""
-        return self.load_theme_from_file()
+        return self.compile_theme(self.current_theme)
 
     def get_fallback_style(self):
         """获取备用样式（当主题文件不存在时使用）"""
@@ -118,164 +218,22 @@ class StyleManager(QObject):
             }
         """
         
-    def get_button_styles(self):
-        """获取按钮样式字典"""
-        return {
-            "normal": """
-                QPushButton {
-                    background-color: #FFFFFF;
-                    color: #333333;
-                    border: 1px solid #CCCCCC;
-                    border-radius: 6px;
-                    font-size: 14px;
-                    font-weight: bold;
-                    padding: 8px;
-                    margin: 1px;
-                    font-family: "Microsoft YaHei", "SimHei", sans-serif;
-                }
-                QPushButton:hover {
-                    border-color: #4A90E2;
-                    background-color: #F0F8FF;
-                }
-                QPushButton:pressed {
-                    background-color: #E6F3FF;
-                    border-color: #2E86AB;
-                }
-                QPushButton:disabled {
-                    background-color: #F5F5F5;
-                    color: #CCCCCC;
-                    border-color: #E0E0E0;
-                }
-            """,
-            
-            "operator": """
-                QPushButton {
-                    background-color: #4A90E2;
-                    color: #FFFFFF;
-                    border: 1px solid #357ABD;
-                    border-radius: 6px;
-                    font-size: 14px;
-                    font-weight: bold;
-                    padding: 8px;
-                    margin: 1px;
-                    font-family: "Microsoft YaHei", "SimHei", sans-serif;
-                }
-                QPushButton:hover {
-                    background-color: #357ABD;
-                }
-                QPushButton:pressed {
-                    background-color: #2E86AB;
-                }
-            """,
-            
-            "function": """
-                QPushButton {
-                    background-color: #F8F9FA;
-                    color: #495057;
-                    border: 1px solid #DEE2E6;
-                    border-radius: 6px;
-                    font-size: 14px;
-                    font-weight: bold;
-                    padding: 8px;
-                    margin: 1px;
-                    font-family: "Microsoft YaHei", "SimHei", sans-serif;
-                }
-                QPushButton:hover {
-                    background-color: #E9ECEF;
-                    border-color: #ADB5BD;
-                }
-                QPushButton:pressed {
-                    background-color: #DEE2E6;
-                }
-                QPushButton:disabled {
-                    background-color: #F5F5F5;
-                    color: #CCCCCC;
-                    border-color: #E0E0E0;
-                }
-            """,
-            
-            "special": """
-                QPushButton {
-                    background-color: #FF8C00;
-                    color: #FFFFFF;
-                    border: 1px solid #FF7F00;
-                    border-radius: 6px;
-                    font-size: 16px;
-                    font-weight: bold;
-                    padding: 8px;
-                    margin: 1px;
-                    font-family: "Microsoft YaHei", "SimHei", sans-serif;
-                }
-                QPushButton:hover {
-                    background-color: #FF7F00;
-                }
-                QPushButton:pressed {
-                    background-color: #FF6347;
-                }
-            """
-        }
-        
-    def get_display_styles(self):
-        """获取显示区域样式"""
-        return {
-            "history": """
-                QLabel {
-                    color: #888888;
-                    font-size: 12px;
-                    background: transparent;
-                    border: none;
-                    padding: 2px 8px;
-                    font-family: "Consolas", "Microsoft YaHei", monospace;
-                }
-            """,
-            
-            "expression": """
-                QLineEdit {
-                    background-color: #FFFFFF;
-                    border: 1px solid #CCCCCC;
-                    border-radius: 4px;
-                    padding: 8px 12px;
-                    font-size: 16px;
-                    color: #333333;
-                    selection-background-color: #4A90E2;
-                    font-family: "Consolas", "Microsoft YaHei", monospace;
-                }
-                QLineEdit:focus {
-                    border-color: #4A90E2;
-                }
-            """,
-            
-            "result": """
-                QLabel {
-                    background-color: #F8F9FA;
-                    border: 1px solid #E9ECEF;
-                    border-radius: 4px;
-                    padding: 12px;
-                    font-size: 24px;
-                    font-weight: bold;
-                    color: #2C3E50;
-                    font-family: "Consolas", "Microsoft YaHei", monospace;
-                }
-            """,
-            
-            "error": """
-                QLabel {
-                    background-color: #FFF5F5;
-                    border: 1px solid #FEB2B2;
-                    border-radius: 4px;
-                    padding: 12px;
-                    font-size: 18px;
-                    font-weight: bold;
-                    color: #E53E3E;
-                    font-family: "Microsoft YaHei", sans-serif;
-                }
-            """
-        }
-        
     def set_theme(self, theme_name):
-        """设置主题"""
-        if theme_name in ["default", "dark", "light"]:
-            self.current_theme = theme_name
+        """
+        设置主题
+
+        Returns:
+            主题是否发生了变化
+        """
+        if theme_name not in THEMES or theme_name == self.current_theme:
+            return False
+        self.current_theme = theme_name
+        self.theme_changed.emit(theme_name)
+        return True
+
+    def get_theme_names(self):
+        """获取 {主题名: 显示名称}"""
+        return {name: title for name, (title, _) in THEMES.items()}
             
     def get_current_theme(self):
         """获取当前主题"""
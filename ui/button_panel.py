@@ -3,6 +3,7 @@
 """
 按钮面板基类 - 所有计算器面板的基础类
 提供通用的按钮创建和布局功能
+按钮样式全部来自主窗口的样式表（按 buttonType 等属性选择），按钮本身不设置样式表
 """
 
 from PySide6.QtWidgets import QWidget, QGridLayout, QPushButton, QSizePolicy
@@ -14,11 +15,11 @@ class ButtonPanel(QWidget):
     """按钮面板基类"""
     
     # 信号定义
-    button_clicked = Signal(str)  # 按钮点击信号
+    button_clicked = Signal(str)  # 按钮点击信号（参数为命令名）
     
     def __init__(self):
         super().__init__()
-        self.buttons = {}  # 存储按钮引用
+        self.buttons = {}  # 存储按钮引用（按命令名）
         self.init_ui()
         
     def init_ui(self):
@@ -27,7 +28,7 @@ class ButtonPanel(QWidget):
         self.layout.setContentsMargins(8, 8, 8, 8)
         self.layout.setSpacing(6)
         
-    def create_button(self, text, row, col, row_span=1, col_span=1, button_type="normal"):
+    def create_button(self, text, row, col, row_span=1, col_span=1, button_type="normal", command=None):
         """
         创建按钮
         
@@ -38,7 +39,9 @@ class ButtonPanel(QWidget):
             row_span: 行跨度
             col_span: 列跨度
             button_type: 按钮类型 ("normal", "operator", "function", "special")
+            command: 点击时分发的命令名，默认与按钮文本相同
         """
+        command = command or text
         button = QPushButton(text)
         # 设置更合理的按钮尺寸，确保文字显示完整
         button.setMinimumSize(70, 55)
@@ -48,21 +51,18 @@ class ButtonPanel(QWidget):
 
         # 设置按钮类型属性（用于QSS选择器）
         button.setProperty("buttonType", button_type)
-
-        # 设置按钮样式
-        self.apply_button_style(button, button_type)
         
         # 设置工具提示
         self.set_button_tooltip(button, text, button_type)
 
         # 连接信号
-        button.clicked.connect(lambda: self.on_button_clicked(text))
+        button.clicked.connect(lambda: self.on_button_clicked(command))
 
         # 添加到布局
         self.layout.addWidget(button, row, col, row_span, col_span)
 
         # 存储按钮引用
-        self.buttons[text] = button
+        self.buttons[command] = button
 
         return button
 
@@ -97,137 +97,82 @@ class ButtonPanel(QWidget):
             # 对数函数
             "log": "常用对数", "ln": "自然对数", "exp": "指数函数",
 
+            # 数值求解
+            "solve": "求根 solve(f, x, a, b)：f 在 [a, b] 上的零点；solve(A, b)：解线性方程组 A·x = b",
+            "∫": "定积分 integrate(f, x, a, b)",
+            "d/dx": "导数 diff(f, x, x0)：f 在 x0 处的导数",
+            "x": "自变量", ",": "参数分隔符",
+
+            # 矩阵
+            "[": "矩阵开始，如 [1, 2; 3, 4]", "]": "矩阵结束", ";": "矩阵的行分隔符",
+            "det": "行列式", "inv": "逆矩阵", "Aᵀ": "转置", "eig": "特征值",
+            "@": "矩阵乘法（× 按元素相乘）",
+
             # 进制
             "HEX": "十六进制", "DEC": "十进制", "OCT": "八进制", "BIN": "二进制",
 
             # 位运算
             "AND": "按位与", "OR": "按位或", "XOR": "按位异或",
             "NOT": "按位非", "LSH": "左移", "RSH": "右移",
+
+            # 数论
+            "isprime": "是否为素数 isprime(n)", "factor": "因数分解 factor(n)，较大的数在后台分解",
+            "gcd": "最大公约数 gcd(a, b, …)", "lcm": "最小公倍数 lcm(a, b, …)", "mod": "取模",
+            "modpow": "模幂 modpow(a, b, m) = a^b mod m", "modinv": "模逆 modinv(a, m)",
+
+            # RPN
+            "ENTER": "压栈（没有输入时复制栈顶）", "SWAP": "交换第 1、2 层", "DROP": "丢弃栈顶",
+            "ROT": "把第 3 层移到栈顶", "DUP": "复制栈顶", "↶": "撤销 (Ctrl+Z)", "↷": "重做 (Ctrl+Y)",
+            "DEG": "角度模式（与其他模式共用），点击切换",
         }
 
         tooltip = tooltip_map.get(text, text)
         button.setToolTip(tooltip)
         
-    def apply_button_style(self, button, button_type):
-        """应用按钮样式"""
-        base_style = """
-            QPushButton {
-                border: 1px solid #CCCCCC;
-                border-radius: 6px;
-                font-size: 14px;
-                font-weight: bold;
-                padding: 8px;
-                margin: 1px;
-            }
-            QPushButton:hover {
-                border-color: #4A90E2;
-                background-color: #F0F8FF;
-            }
-            QPushButton:pressed {
-                background-color: #E6F3FF;
-                border-color: #2E86AB;
-            }
+    @staticmethod
+    def set_button_state(button, name, value):
         """
-        
-        if button_type == "normal":
-            # 普通数字按钮 - 白色背景
-            style = base_style + """
-                QPushButton {
-                    background-color: #FFFFFF;
-                    color: #333333;
-                }
-            """
-        elif button_type == "operator":
-            # 运算符按钮 - 蓝色背景
-            style = base_style + """
-                QPushButton {
-                    background-color: #4A90E2;
-                    color: #FFFFFF;
-                    border-color: #357ABD;
-                }
-                QPushButton:hover {
-                    background-color: #357ABD;
-                }
-                QPushButton:pressed {
-                    background-color: #2E86AB;
-                }
-            """
-        elif button_type == "function":
-            # 功能按钮 - 浅灰色背景
-            style = base_style + """
-                QPushButton {
-                    background-color: #F8F9FA;
-                    color: #495057;
-                    border-color: #DEE2E6;
-                }
-                QPushButton:hover {
-                    background-color: #E9ECEF;
-                }
-            """
-        elif button_type == "special":
-            # 特殊按钮 - 橙色背景
-            style = base_style + """
-                QPushButton {
-                    background-color: #FF8C00;
-                    color: #FFFFFF;
-                    border-color: #FF7F00;
-                }
-                QPushButton:hover {
-                    background-color: #FF7F00;
-                }
-                QPushButton:pressed {
-                    background-color: #FF6347;
-                }
-            """
-        else:
-            style = base_style + """
-                QPushButton {
-                    background-color: #FFFFFF;
-                    color: #333333;
-                }
-            """
-            
-        button.setStyleSheet(style)
+        设置按钮的状态属性并重新应用样式
+
+        样式表中以属性选择器（如 [activeBase="true"]）描述各状态的样式，
+        状态改变时只需修改属性并重新 polish，无需解析新的样式表
+        """
+        if button.property(name) == value:
+            return
+        button.setProperty(name, value)
+        style = button.style()
+        style.unpolish(button)
+        style.polish(button)
+        button.update()
         
     @Slot()
-    def on_button_clicked(self, text):
+    def on_button_clicked(self, command):
         """按钮点击处理"""
-        self.button_clicked.emit(text)
+        self.button_clicked.emit(command)
         
-    def get_button(self, text):
+    def get_button(self, command):
         """获取按钮引用"""
-        return self.buttons.get(text)
+        return self.buttons.get(command)
         
-    def enable_button(self, text, enabled=True):
+    def enable_button(self, command, enabled=True):
         """启用/禁用按钮"""
-        button = self.get_button(text)
+        button = self.get_button(command)
         if button:
             button.setEnabled(enabled)
             
-    def set_button_text(self, old_text, new_text):
-        """修改按钮文本"""
-        button = self.get_button(old_text)
+    def set_button_text(self, command, new_text):
+        """修改按钮文本（命令名不变）"""
+        button = self.get_button(command)
         if button:
             button.setText(new_text)
-            # 更新字典键
-            self.buttons[new_text] = self.buttons.pop(old_text)
             
-    def highlight_button(self, text, highlight=True):
+    def highlight_button(self, command, highlight=True):
         """高亮显示按钮"""
-        button = self.get_button(text)
+        button = self.get_button(command)
         if button:
-            if highlight:
-                button.setStyleSheet(button.styleSheet() + """
-                    QPushButton {
-                        border: 2px solid #FF6B6B;
-                        background-color: #FFE5E5;
-                    }
-                """)
-            else:
-                # 恢复原始样式 - 这里简化处理，实际应该保存原始样式
-                self.apply_button_style(button, "normal")
+            self.set_button_state(button, "highlighted", highlight)
                 
     def clear_highlights(self):
         """清除所有按钮高亮"""
-        for text, button in self.buttons.items():
-            self.apply_button_style(button, "normal")
+        for button in self.buttons.values():
+            self.set_button_state(button, "highlighted", False)
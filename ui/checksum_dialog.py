@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件校验对话框 - 对文件或其中的一段计算 CRC32、Adler-32、置位数、奇偶校验位和字节直方图
+计算在工作线程中进行（见 core.file_checksum），显示进度和速度，可随时取消；
+双击某一项可把它像普通计算结果一样送到显示屏并记入历史（程序员模式下可再转换进制）
+"""
+
+import os
+import threading
+import time
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QLineEdit, QCheckBox,
+    QProgressBar, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QFileDialog
+)
+from PySide6.QtCore import Qt, QThreadPool, Signal, Slot
+
+from .statistics_panel import HistogramView
+from core.file_checksum import ChecksumTask
+
+
+class ChecksumDialog(QDialog):
+    """文件校验和位统计对话框"""
+
+    # 信号定义
+    result_published = Signal(str, object)  # 把某一项作为计算结果发布（表达式, 值）
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("文件校验和位统计")
+        self.setMinimumSize(480, 420)
+        self.resize(560, 520)
+
+        self.path = None
+        self.rows = []            # 当前结果 [(名称, 说明, 值, 显示文本)]
+        self.range_text = ""      # 历史记录中表示统计范围的后缀，如 [0x100:0x200]
+        self.generation = 0
+        self.cancel_event = threading.Event()
+        self.started_at = 0.0
+
+        self.init_ui()
+        self.connect_signals()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(6)
+
+        file_row = QHBoxLayout()
+        self.path_edit = QLineEdit()
+        self.path_edit.setReadOnly(True)
+        self.path_edit.setPlaceholderText("选择要计算的文件")
+        file_row.addWidget(self.path_edit, 1)
+        self.open_button = QPushButton("打开文件…")
+        file_row.addWidget(self.open_button)
+        layout.addLayout(file_row)
+
+        range_row = QHBoxLayout()
+        range_row.addWidget(QLabel("起始偏移:"))
+        self.offset_edit = QLineEdit()
+        self.offset_edit.setPlaceholderText("0")
+        self.offset_edit.setToolTip("可以写成十六进制（如 0x200）；负数表示从文件末尾倒数")
+        range_row.addWidget(self.offset_edit, 1)
+        range_row.addWidget(QLabel("长度:"))
+        self.length_edit = QLineEdit()
+        self.length_edit.setPlaceholderText("到文件末尾")
+        self.length_edit.setToolTip("可以写成十六进制（如 0x1000）")
+        range_row.addWidget(self.length_edit, 1)
+        layout.addLayout(range_row)
+
+        action_row = QHBoxLayout()
+        self.histogram_check = QCheckBox("字节直方图")
+        self.histogram_check.setToolTip("统计每个字节值出现的次数（比计算校验和慢得多）")
+        action_row.addWidget(self.histogram_check)
+        action_row.addStretch(1)
+        self.start_button = QPushButton("计算")
+        self.start_button.setEnabled(False)
+        action_row.addWidget(self.start_button)
+        self.cancel_button = QPushButton("取消")
+        self.cancel_button.setEnabled(False)
+        action_row.addWidget(self.cancel_button)
+        layout.addLayout(action_row)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setMaximumHeight(6)
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel()
+        self.status_label.setObjectName("checksumStatus")
+        layout.addWidget(self.status_label)
+
+        self.table = QTableWidget(0, 2)
+        self.table.setHorizontalHeaderLabels(["项目", "值"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setToolTip("双击把这一项送到显示屏")
+        layout.addWidget(self.table, 2)
+
+        self.histogram = HistogramView()
+        self.histogram.hide()
+        layout.addWidget(self.histogram, 1)
+
+    def connect_signals(self):
+        self.open_button.clicked.connect(self.open_file)
+        self.start_button.clicked.connect(self.start)
+        self.cancel_button.clicked.connect(self.cancel)
+        self.offset_edit.returnPressed.connect(self.start)
+        self.length_edit.returnPressed.connect(self.start)
+        self.table.cellDoubleClicked.connect(self.publish_row)
+
+    @Slot()
+    def open_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "选择文件", "", "所有文件 (*)")
+        if path:
+            self.set_path(path)
+            self.start()
+
+    def set_path(self, path):
+        """选择要计算的文件（不立即开始计算）"""
+        self.path = path
+        self.path_edit.setText(path)
+        self.start_button.setEnabled(True)
+
+    @staticmethod
+    def parse_integer(text, default):
+        """解析偏移或长度（十进制或带 0x/0o/0b 前缀），为空时返回默认值"""
+        text = text.strip().replace("_", "")
+        if not text:
+            return default
+        return int(text, 0)
+
+    @Slot()
+    def start(self):
+        """在工作线程中开始计算（作废正在进行的计算）"""
+        if self.path is None:
+            return
+        try:
+            offset = self.parse_integer(self.offset_edit.text(), 0)
+            length = self.parse_integer(self.length_edit.text(), None)
+        except ValueError:
+            self.status_label.setText("起始偏移和长度必须是整数（可以带 0x 前缀）")
+            return
+        self.cancel()
+        self.cancel_event = threading.Event()
+        task = ChecksumTask(self.path, offset, length, self.histogram_check.isChecked(),
+                            self.generation, self.cancel_event)
+        task.signals.progress.connect(self.on_progress)
+        task.signals.finished.connect(self.on_finished)
+        task.signals.failed.connect(self.on_failed)
+        self.progress_bar.setValue(0)
+        self.cancel_button.setEnabled(True)
+        self.status_label.setText(f"正在读取 {os.path.basename(self.path)} …")
+        self.started_at = time.perf_counter()
+        QThreadPool.globalInstance().start(task)
+
+    @Slot()
+    def cancel(self):
+        """作废正在进行的计算"""
+        self.generation += 1
+        self.cancel_event.set()
+        self.cancel_button.setEnabled(False)
+        self.progress_bar.setValue(0)
+
+    @Slot(int, int)
+    def on_progress(self, generation, percent):
+        if generation == self.generation:
+            self.progress_bar.setValue(percent)
+
+    @Slot(int, object)
+    def on_finished(self, generation, digest):
+        if generation != self.generation:
+            return
+        elapsed = time.perf_counter() - self.started_at
+        self.cancel_button.setEnabled(False)
+        self.progress_bar.setValue(100)
+        name = os.path.basename(self.path)
+        whole_file = digest.start == 0 and digest.end == os.path.getsize(self.path)
+        self.range_text = "" if whole_file else f"[0x{digest.start:X}:0x{digest.end:X}]"
+        status = f"{name}{self.range_text}：{digest.size:,} 字节，用时 {elapsed:.2f} 秒"
+        if elapsed > 0 and digest.size:
+            status += f"（{digest.size / elapsed / 1e6:,.0f} MB/s）"
+        self.status_label.setText(status)
+        self.show_rows(digest.summary())
+        bins = digest.histogram_bins()
+        self.histogram.set_bins(bins)
+        self.histogram.setVisible(bool(bins))
+        if bins:
+            # 逐个字节值的提示太长，只列出出现最多的几个
+            common = sorted(bins, key=lambda item: item[2], reverse=True)[:8]
+            self.histogram.setToolTip("出现最多的字节值：\n" + "\n".join(
+                f"0x{value:02X}: {count:,}" for value, _, count in common))
+
+    @Slot(int, str)
+    def on_failed(self, generation, message):
+        if generation != self.generation:
+            return
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText(message)
+
+    def show_rows(self, rows):
+        self.rows = rows
+        self.table.setRowCount(len(rows))
+        for index, (_, label, _, text) in enumerate(rows):
+            self.table.setItem(index, 0, QTableWidgetItem(label))
+            item = QTableWidgetItem(text)
+            item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            self.table.setItem(index, 1, item)
+
+    @Slot(int)
+    def publish_row(self, row, column=0):
+        """把一项作为计算结果发布，表达式形如 crc32(image.iso) 或 crc32(image.iso[0x0:0x200])"""
+        if not 0 <= row < len(self.rows):
+            return
+        name, _, value, _ = self.rows[row]
+        self.result_published.emit(f"{name}({os.path.basename(self.path)}{self.range_text})", value)
+
+    def closeEvent(self, event):
+        """关闭时取消正在进行的计算"""
+        self.cancel()
+        super().closeEvent(event)
+
+    def reject(self):
+        self.cancel()
+        super().reject()
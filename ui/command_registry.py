@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令表 - 按钮、键盘快捷键、菜单和宏回放共用的命令分发
+每个命令在启动时登记一次，按命令名查字典分发；
+按钮以命令名（而不是按钮文字）发出点击信号，因此十六进制 C 与清除键 C 互不冲突
+"""
+
+from PySide6.QtCore import QObject, Signal
+
+
+class Command:
+    """一条命令：处理函数及其可用条件"""
+
+    __slots__ = ("name", "handler", "title", "bases", "precondition",
+                 "rejected_message", "keys", "shortcut", "recordable")
+
+    def __init__(self, name, handler, title=None, bases=None, precondition=None,
+                 rejected_message=None, keys=(), shortcut=None, recordable=True):
+        """
+        Args:
+            name: 命令名（按钮的命令名、菜单和宏中引用的名字）
+            handler: 无参数的处理函数
+            title: 显示名称（菜单文字、状态栏提示），默认为命令名
+            bases: 允许使用的进制集合，None 表示任何进制都可用
+            precondition: 无参数、返回是否可以执行的函数，不满足时静默忽略
+            rejected_message: 当前进制不可用时在状态栏显示的提示
+            keys: 触发该命令的按键（Qt.Key）
+            shortcut: 菜单项的快捷键
+            recordable: 是否记录到宏中（界面切换、宏本身等命令不记录）
+        """
+        self.name = name
+        self.handler = handler
+        self.title = title or name
+        self.bases = frozenset(bases) if bases is not None else None
+        self.precondition = precondition
+        self.rejected_message = rejected_message
+        self.keys = tuple(keys)
+        self.shortcut = shortcut
+        self.recordable = recordable
+
+
+class CommandRegistry(QObject):
+    """命令表"""
+
+    # 信号定义
+    command_rejected = Signal(str)  # 命令在当前进制下不可用（提示信息）
+    command_executed = Signal(str)  # 命令已执行（命令名）
+
+    def __init__(self, base_provider, fallback=None, parent=None):
+        """
+        Args:
+            base_provider: 返回当前进制的函数
+            fallback: 未登记命令的处理函数（以命令名为参数），None 表示忽略
+        """
+        super().__init__(parent)
+        self.base_provider = base_provider
+        self.fallback = fallback
+        self.commands = {}      # 命令名 -> Command
+        self.key_commands = {}  # Qt.Key -> 命令名
+        self.recording = None   # 正在录制的宏（命令名列表），未录制时为 None
+
+    def register(self, name, handler, **options):
+        """登记命令，options 见 Command"""
+        command = Command(name, handler, **options)
+        self.commands[name] = command
+        for key in command.keys:
+            self.key_commands[key] = name
+        return command
+
+    def get(self, name):
+        """获取命令，未登记时返回 None"""
+        return self.commands.get(name)
+
+    def title(self, name):
+        """命令的显示名称"""
+        command = self.commands.get(name)
+        return command.title if command is not None else name
+
+    def command_for_key(self, key):
+        """按键对应的命令名，没有时返回 None"""
+        return self.key_commands.get(key)
+
+    def dispatch(self, name):
+        """
+        执行命令
+
+        Returns:
+            命令是否被执行
+        """
+        command = self.commands.get(name)
+        if command is None:
+            if self.fallback is None:
+                return False
+            self.record(name)
+            self.fallback(name)
+            self.command_executed.emit(name)
+            return True
+        if command.bases is not None and self.base_provider() not in command.bases:
+            if command.rejected_message:
+                self.command_rejected.emit(command.rejected_message)
+            return False
+        if command.precondition is not None and not command.precondition():
+            return False
+        if command.recordable:
+            self.record(name)
+        command.handler()
+        self.command_executed.emit(name)
+        return True
+
+    def record(self, name):
+        """录制宏时记录命令"""
+        if self.recording is not None:
+            self.recording.append(name)
+
+    def is_recording(self):
+        """是否正在录制宏"""
+        return self.recording is not None
+
+    def start_recording(self):
+        """开始录制宏"""
+        self.recording = []
+
+    def stop_recording(self):
+        """停止录制宏，返回录制的命令名列表"""
+        macro, self.recording = self.recording or [], None
+        return macro
+
+    def replay(self, macro):
+        """
+        回放宏：逐条分发，可用条件在回放时重新判断
+
+        Returns:
+            实际执行的命令数
+        """
+        return sum(self.dispatch(name) for name in macro)
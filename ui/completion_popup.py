@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动补全下拉列表 - 在表达式输入框下方显示历史表达式
+列表不获取键盘焦点，按键仍由主窗口处理，输入不会被打断
+"""
+
+from PySide6.QtWidgets import QListWidget, QAbstractItemView
+from PySide6.QtCore import Qt, QPoint, Signal
+
+
+class CompletionPopup(QListWidget):
+    """表达式自动补全下拉列表"""
+
+    # 信号定义
+    completion_selected = Signal(str)  # 选中了某个补全
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setObjectName("completionPopup")
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setUniformItemSizes(True)
+        self.itemClicked.connect(lambda item: self.completion_selected.emit(item.text()))
+        self.hide()
+
+    def show_completions(self, completions, anchor):
+        """在 anchor 控件下方、与其同宽显示补全列表"""
+        self.clear()
+        self.addItems(completions)
+        top_left = anchor.mapTo(self.parentWidget(), QPoint(0, anchor.height()))
+        height = self.sizeHintForRow(0) * len(completions) + 2 * self.frameWidth()
+        self.setGeometry(top_left.x(), top_left.y(), anchor.width(), height)
+        self.raise_()
+        self.show()
+
+    def move_selection(self, step):
+        """上下移动选中项（未选中时从第一项开始）"""
+        if self.currentRow() < 0:
+            row = 0 if step > 0 else self.count() - 1
+        else:
+            row = max(0, min(self.count() - 1, self.currentRow() + step))
+        self.setCurrentRow(row)
+
+    def current_completion(self):
+        """当前选中的补全，未选中时返回 None"""
+        item = self.currentItem()
+        return item.text() if item is not None and item.isSelected() else None
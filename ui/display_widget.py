@@ -2,13 +2,15 @@
 # -*- coding: utf-8 -*-
 """
 显示屏组件 - 计算器的显示区域
-支持表达式显示、结果显示和历史记录
+支持表达式显示、结果显示、历史记录和表达式自动补全
 """
 
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QLabel
-from PySide6.QtCore import Qt, Signal, Slot
+from PySide6.QtCore import Qt, Signal, Slot, QTimer
 from PySide6.QtGui import QFont, QPalette
 
+from .completion_popup import CompletionPopup
+
 
 class DisplayWidget(QWidget):
     """显示屏组件"""
@@ -19,6 +21,8 @@ class DisplayWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.current_expression = ""
+        self.completion_provider = None  # 自动补全函数
+        self.completion_popup = None     # 首次需要时创建
         self.init_ui()
         self.apply_styles()
         
@@ -51,46 +55,21 @@ class DisplayWidget(QWidget):
         layout.addWidget(self.result_label)
         
     def apply_styles(self):
-        """应用样式"""
-        # 历史记录样式
-        self.history_label.setStyleSheet("""
-            QLabel {
-                color: #888888;
-                font-size: 12px;
-                background: transparent;
-                border: none;
-                padding: 2px 8px;
-            }
-        """)
-        
-        # 表达式输入框样式
-        self.expression_edit.setStyleSheet("""
-            QLineEdit {
-                background-color: #FFFFFF;
-                border: 1px solid #CCCCCC;
-                border-radius: 4px;
-                padding: 8px 12px;
-                font-size: 16px;
-                color: #333333;
-                selection-background-color: #4A90E2;
-            }
-            QLineEdit:focus {
-                border-color: #4A90E2;
-            }
-        """)
-        
-        # 结果显示样式
-        self.result_label.setStyleSheet("""
-            QLabel {
-                background-color: #F8F9FA;
-                border: 1px solid #E9ECEF;
-                border-radius: 4px;
-                padding: 12px;
-                font-size: 24px;
-                font-weight: bold;
-                color: #2C3E50;
-            }
-        """)
+        """应用样式（样式由主窗口样式表按对象名提供，这里只设置对象名和初始状态）"""
+        self.history_label.setObjectName("historyLabel")
+        self.expression_edit.setObjectName("expressionEdit")
+        self.result_label.setObjectName("resultLabel")
+        self.result_label.setProperty("displayState", "normal")
+
+    def set_display_state(self, state):
+        """切换结果区的显示状态（normal / error），只重新应用结果区自身的样式"""
+        if self.result_label.property("displayState") == state:
+            return
+        self.result_label.setProperty("displayState", state)
+        style = self.result_label.style()
+        style.unpolish(self.result_label)
+        style.polish(self.result_label)
+        self.result_label.update()
         
     def append_text(self, text):
         """添加文本到表达式"""
@@ -102,7 +81,8 @@ class DisplayWidget(QWidget):
 
         # 如果当前显示的是"0"或错误信息，则替换
         if current == "0" or current.startswith("错误"):
-            if text in "0123456789.":
+            # 数字、函数名和左括号替换掉初始的 0（否则得到 0sin( 这样的表达式）
+            if text in "0123456789." or text[0].isalpha() or text[0] in "([":
                 self.expression_edit.setText(text)
             else:
                 self.expression_edit.setText("0" + text)
@@ -111,6 +91,7 @@ class DisplayWidget(QWidget):
 
         self.current_expression = self.expression_edit.text()
         self.expression_changed.emit(self.current_expression)
+        self.update_completions()
 
     def validate_input(self, current, new_text):
         """验证输入是否合法"""
@@ -128,8 +109,64 @@ class DisplayWidget(QWidget):
 
         return True
         
+    def set_completion_provider(self, provider):
+        """设置自动补全函数：接收已输入的表达式，返回补全列表"""
+        self.completion_provider = provider
+
+    def update_completions(self):
+        """根据当前表达式更新自动补全列表"""
+        text = self.current_expression
+        completions = []
+        if self.completion_provider and text and text != "0":
+            completions = self.completion_provider(text)
+        if not completions:
+            self.hide_completions()
+            return
+        if self.completion_popup is None:
+            self.completion_popup = CompletionPopup(self.window())
+            self.completion_popup.completion_selected.connect(self.accept_completion)
+        self.completion_popup.show_completions(completions, self.expression_edit)
+
+    def hide_completions(self):
+        """隐藏自动补全列表"""
+        if self.completion_popup is not None:
+            self.completion_popup.hide()
+
+    def handle_completion_key(self, key):
+        """
+        自动补全列表显示时处理方向键、回车和 Esc
+
+        Returns:
+            按键是否已被处理
+        """
+        popup = self.completion_popup
+        if popup is None or not popup.isVisible():
+            return False
+        if key == Qt.Key_Up:
+            popup.move_selection(-1)
+        elif key == Qt.Key_Down:
+            popup.move_selection(1)
+        elif key in (Qt.Key_Enter, Qt.Key_Return) and popup.current_completion():
+            self.accept_completion(popup.current_completion())
+        elif key == Qt.Key_Escape:
+            self.hide_completions()
+        else:
+            return False
+        return True
+
+    @Slot(str)
+    def accept_completion(self, expression):
+        """使用选中的补全"""
+        self.set_expression(expression)
+
+    def resizeEvent(self, event):
+        """大小改变后补全列表的位置失效，将其隐藏"""
+        super().resizeEvent(event)
+        self.hide_completions()
+        
     def clear(self):
         """清除所有内容"""
+        self.hide_completions()
         self.expression_edit.setText("0")
         self.result_label.setText("0")
         self.history_label.setText("")
@@ -138,6 +175,7 @@ class DisplayWidget(QWidget):
         
     def clear_entry(self):
         """清除当前输入"""
+        self.hide_completions()
         self.expression_edit.setText("0")
         self.current_expression = ""
         self.expression_changed.emit("")
@@ -153,10 +191,12 @@ class DisplayWidget(QWidget):
             
         self.current_expression = self.expression_edit.text()
         self.expression_changed.emit(self.current_expression)
+        self.update_completions()
         
     @Slot(str)
     def set_result(self, result):
         """设置计算结果"""
+        self.hide_completions()
         # 保存历史记录
         if self.current_expression and self.current_expression != "0":
             history_text = f"{self.current_expression} ="
@@ -170,40 +210,18 @@ class DisplayWidget(QWidget):
     @Slot(str)
     def set_error(self, error_msg):
         """设置错误信息"""
+        self.hide_completions()
         self.result_label.setText(f"错误: {error_msg}")
         self.expression_edit.setText("0")
         self.current_expression = ""
         
-        # 错误时使用红色显示
-        self.result_label.setStyleSheet("""
-            QLabel {
-                background-color: #FFF5F5;
-                border: 1px solid #FEB2B2;
-                border-radius: 4px;
-                padding: 12px;
-                font-size: 18px;
-                font-weight: bold;
-                color: #E53E3E;
-            }
-        """)
-        
-        # 2秒后恢复正常样式
-        from PySide6.QtCore import QTimer
+        # 错误时使用红色显示，2秒后恢复正常样式
+        self.set_display_state("error")
         QTimer.singleShot(2000, self.restore_normal_style)
         
     def restore_normal_style(self):
         """恢复正常样式"""
-        self.result_label.setStyleSheet("""
-            QLabel {
-                background-color: #F8F9FA;
-                border: 1px solid #E9ECEF;
-                border-radius: 4px;
-                padding: 12px;
-                font-size: 24px;
-                font-weight: bold;
-                color: #2C3E50;
-            }
-        """)
+        self.set_display_state("normal")
         
     def get_current_expression(self):
         """获取当前表达式"""
@@ -215,6 +233,7 @@ class DisplayWidget(QWidget):
 
     def set_expression(self, expression):
         """设置表达式"""
+        self.hide_completions()
         self.expression_edit.setText(expression)
         self.current_expression = expression
         self.expression_changed.emit(expression)
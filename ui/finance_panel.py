@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+金融面板 - 贷款的还款计划，以及一组现金流的净现值和内部收益率
+还款计划由 NumPy 一次算出所有期（见 core.finance），表格通过模型直接读取数组，
+只为当前可见的单元格格式化文本，几百期的计划也能即时显示和滚动；
+每期还款、NPV、IRR 可以像普通计算结果一样送到显示屏，表达式（如 pmt(4.9%/12, 360, 1000000)）可以再次计算
+"""
+
+import re
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QPushButton, QComboBox, QLabel, QLineEdit,
+    QTableView, QHeaderView
+)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, Signal, Slot
+
+from core import finance
+
+
+class ScheduleModel(QAbstractTableModel):
+    """还款计划的表格模型（每行一期）"""
+
+    HEADERS = ("期数", "还款额", "利息", "本金", "剩余本金")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.columns = ()
+
+    def set_schedule(self, schedule):
+        """
+        Args:
+            schedule: 单个方案的 finance.Schedule，为 None 时清空
+        """
+        self.beginResetModel()
+        if schedule is None:
+            self.columns = ()
+        else:
+            self.columns = (schedule.payment, schedule.interest, schedule.principal, schedule.balance)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or not self.columns:
+            return 0
+        return self.columns[0].shape[-1]
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            if index.column() == 0:
+                return str(index.row() + 1)
+            return f"{self.columns[index.column() - 1][index.row()]:,.2f}"
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class FinancePanel(QWidget):
+    """金融面板"""
+
+    # 输入停止变化多久后重新计算（毫秒）
+    INPUT_DEBOUNCE_MS = 200
+
+    # 表格的行高（固定，不按内容计算）
+    ROW_HEIGHT = 24
+
+    # 还款频率：(名称, 每年期数)
+    FREQUENCIES = (("按月还款", 12), ("按季还款", 4), ("按年还款", 1))
+
+    # 还款方式：(名称, finance 中的常量)
+    METHODS = (("等额本息", finance.ANNUITY), ("等额本金", finance.EQUAL_PRINCIPAL))
+
+    # 信号定义
+    result_published = Signal(str, object)  # 把结果发布到显示屏（表达式, 值）
+
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+        self.loan = None       # 当前贷款 (本金, 年利率 %, 期数, 每年期数, 还款方式)，输入无效时为 None
+        self.schedule = None
+        self.flows = []        # 当前现金流的文本（按输入原样写进表达式）
+
+        self.init_ui()
+        self.input_timer = QTimer(self)
+        self.input_timer.setSingleShot(True)
+        self.input_timer.setInterval(self.INPUT_DEBOUNCE_MS)
+        self.input_timer.timeout.connect(self.update_all)
+        self.connect_signals()
+        self.update_all()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(6)
+
+        form = QGridLayout()
+        form.setHorizontalSpacing(8)
+        form.setVerticalSpacing(6)
+        self.amount_edit = self.create_edit("1000000", "贷款本金，可以用逗号分隔千位")
+        self.rate_edit = self.create_edit("4.9", "年利率（百分数）")
+        self.years_edit = self.create_edit("30", "贷款年限，可以是小数（如 2.5）")
+        self.frequency_combo = QComboBox()
+        for name, _ in self.FREQUENCIES:
+            self.frequency_combo.addItem(name)
+        self.method_combo = QComboBox()
+        for name, _ in self.METHODS:
+            self.method_combo.addItem(name)
+        form.addWidget(QLabel("贷款金额:"), 0, 0)
+        form.addWidget(self.amount_edit, 0, 1)
+        form.addWidget(QLabel("年利率 %:"), 0, 2)
+        form.addWidget(self.rate_edit, 0, 3)
+        form.addWidget(QLabel("年限:"), 1, 0)
+        form.addWidget(self.years_edit, 1, 1)
+        form.addWidget(self.frequency_combo, 1, 2)
+        form.addWidget(self.method_combo, 1, 3)
+        form.setColumnStretch(1, 1)
+        form.setColumnStretch(3, 1)
+        layout.addLayout(form)
+
+        summary_row = QHBoxLayout()
+        self.summary_label = QLabel()
+        self.summary_label.setObjectName("financeSummary")
+        self.summary_label.setWordWrap(True)
+        summary_row.addWidget(self.summary_label, 1)
+        self.payment_button = QPushButton("送到显示屏")
+        self.payment_button.setToolTip("把每期还款额（等额本金为首期）送到显示屏")
+        summary_row.addWidget(self.payment_button)
+        layout.addLayout(summary_row)
+
+        self.model = ScheduleModel(self)
+        self.table = QTableView()
+        self.table.setObjectName("scheduleView")
+        self.table.setModel(self.model)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(self.ROW_HEIGHT)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setVerticalScrollMode(QTableView.ScrollPerPixel)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setToolTip("双击把这一期的还款额送到显示屏")
+        self.table.setMinimumHeight(120)
+        layout.addWidget(self.table, 1)
+
+        flow_row = QHBoxLayout()
+        flow_row.addWidget(QLabel("现金流:"))
+        self.flows_edit = self.create_edit("-1000, 300, 400, 500", "第一笔在第 0 期（不折现），之后每期一笔；"
+                                           "用逗号或空格分隔，付出为负、收到为正")
+        flow_row.addWidget(self.flows_edit, 3)
+        flow_row.addWidget(QLabel("折现率 %:"))
+        self.discount_edit = self.create_edit("10", "每期的折现率（百分数）")
+        flow_row.addWidget(self.discount_edit, 1)
+        layout.addLayout(flow_row)
+
+        result_row = QHBoxLayout()
+        self.flow_label = QLabel()
+        self.flow_label.setObjectName("financeSummary")
+        result_row.addWidget(self.flow_label, 1)
+        self.npv_button = QPushButton("NPV")
+        self.npv_button.setToolTip("把净现值送到显示屏")
+        result_row.addWidget(self.npv_button)
+        self.irr_button = QPushButton("IRR")
+        self.irr_button.setToolTip("把内部收益率送到显示屏")
+        result_row.addWidget(self.irr_button)
+        layout.addLayout(result_row)
+
+    @staticmethod
+    def create_edit(text, tooltip):
+        edit = QLineEdit(text)
+        edit.setToolTip(tooltip)
+        return edit
+
+    def connect_signals(self):
+        for edit in (self.amount_edit, self.rate_edit, self.years_edit, self.flows_edit, self.discount_edit):
+            edit.textChanged.connect(self.input_timer.start)
+        self.frequency_combo.currentIndexChanged.connect(self.update_schedule)
+        self.method_combo.currentIndexChanged.connect(self.update_schedule)
+        self.payment_button.clicked.connect(self.publish_payment)
+        self.table.doubleClicked.connect(self.publish_period)
+        self.npv_button.clicked.connect(self.publish_npv)
+        self.irr_button.clicked.connect(self.publish_irr)
+
+    @staticmethod
+    def parse_number(text):
+        """解析输入的数（允许千位逗号和下划线）"""
+        return float(text.strip().replace(",", "").replace("_", ""))
+
+    @Slot()
+    def update_all(self):
+        self.update_schedule()
+        self.update_cashflow()
+
+    @Slot()
+    def update_schedule(self):
+        """按贷款输入重新计算还款计划"""
+        self.loan = self.schedule = None
+        try:
+            amount = self.parse_number(self.amount_edit.text())
+            rate = self.parse_number(self.rate_edit.text())
+            years = self.parse_number(self.years_edit.text())
+        except ValueError:
+            self.show_schedule("请输入有效的贷款金额、年利率和年限")
+            return
+        per_year = self.FREQUENCIES[self.frequency_combo.currentIndex()][1]
+        method = self.METHODS[self.method_combo.currentIndex()][1]
+        nper = round(years * per_year)
+        if amount <= 0 or nper <= 0:
+            self.show_schedule("贷款金额和年限必须大于 0")
+            return
+        try:
+            self.schedule = finance.schedule(rate / 100 / per_year, nper, amount, method)
+        except finance.FinanceError as e:
+            self.show_schedule(str(e))
+            return
+        self.loan = (amount, rate, nper, per_year, method)
+        payment = self.schedule.payment
+        if method == finance.ANNUITY:
+            text = f"每期还款 {payment[0]:,.2f}"
+        else:
+            text = f"首期还款 {payment[0]:,.2f}，末期 {payment[-1]:,.2f}"
+        text += (f"，共 {nper} 期，总利息 {float(self.schedule.total_interest()):,.2f}，"
+                 f"总还款 {float(self.schedule.total_payment()):,.2f}")
+        self.show_schedule(text)
+
+    def show_schedule(self, text):
+        self.summary_label.setText(text)
+        self.payment_button.setEnabled(self.schedule is not None)
+        self.model.set_schedule(self.schedule)
+
+    @Slot()
+    def update_cashflow(self):
+        """按现金流输入重新计算净现值和内部收益率"""
+        self.flows = [item for item in re.split(r"[\s,;，；]+", self.flows_edit.text().strip()) if item]
+        self.npv_button.setEnabled(False)
+        self.irr_button.setEnabled(False)
+        try:
+            values = [float(item) for item in self.flows]
+            discount = self.parse_number(self.discount_edit.text())
+        except ValueError:
+            self.flow_label.setText("现金流和折现率必须是数")
+            return
+        if not values:
+            self.flow_label.setText("输入一组现金流以计算净现值和内部收益率")
+            return
+        parts = []
+        try:
+            parts.append(f"NPV {finance.npv(discount / 100, values):,.2f}")
+            self.npv_button.setEnabled(True)
+        except finance.FinanceError as e:
+            parts.append(str(e))
+        try:
+            parts.append(f"IRR {finance.irr(values):.4%}")
+            self.irr_button.setEnabled(True)
+        except finance.FinanceError as e:
+            parts.append(str(e))
+        self.flow_label.setText("，".join(parts))
+
+    def loan_rate_text(self):
+        """当前贷款每期利率的表达式，如 4.9%/12"""
+        _, rate, _, per_year, _ = self.loan
+        return f"{rate:g}%" if per_year == 1 else f"{rate:g}%/{per_year}"
+
+    @Slot()
+    def publish_payment(self):
+        """把每期还款额（等额本金为首期）送到显示屏"""
+        if self.loan is None:
+            return
+        amount, _, nper, _, method = self.loan
+        if method == finance.ANNUITY:
+            # 按 pmt 的符号约定，还款为负数
+            expression = f"pmt({self.loan_rate_text()}, {nper}, {amount:g})"
+            self.result_published.emit(expression, -float(self.schedule.payment[0]))
+        else:
+            expression = f"{amount:g}/{nper} + {amount:g}×{self.loan_rate_text()}"
+            self.result_published.emit(expression, float(self.schedule.payment[0]))
+
+    @Slot(QModelIndex)
+    def publish_period(self, index):
+        """把双击的那一期的某一项（点在期数列上时为还款额）送到显示屏，表达式形如 利息[12]"""
+        if self.schedule is None or not index.isValid():
+            return
+        column = max(index.column(), 1)
+        value = self.model.columns[column - 1][index.row()]
+        self.result_published.emit(f"{ScheduleModel.HEADERS[column]}[{index.row() + 1}]", float(value))
+
+    @Slot()
+    def publish_npv(self):
+        values = [float(item) for item in self.flows]
+        discount = self.parse_number(self.discount_edit.text())
+        expression = f"npv({discount:g}%, {', '.join(self.flows)})"
+        self.result_published.emit(expression, finance.npv(discount / 100, values))
+
+    @Slot()
+    def publish_irr(self):
+        values = [float(item) for item in self.flows]
+        self.result_published.emit(f"irr({', '.join(self.flows)})", finance.irr(values))
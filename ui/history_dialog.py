@@ -4,17 +4,33 @@
 历史记录对话框 - 显示和管理计算历史记录
 """
 
+import threading
+
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem,
-    QPushButton, QLabel, QLineEdit, QMessageBox, QSplitter, QWidget
+    QDialog, QVBoxLayout, QHBoxLayout, QTableView, QHeaderView, QAbstractItemView,
+    QPushButton, QLabel, QLineEdit, QMessageBox, QSplitter, QWidget,
+    QFileDialog, QApplication
 )
-from PySide6.QtCore import Qt, Signal, Slot
+from PySide6.QtCore import Qt, Signal, Slot, QTimer, QThreadPool
 from PySide6.QtGui import QFont
 
+from .history_model import HistoryListModel, HistorySearchProxyModel, HighlightDelegate
+from core.history_search import HistorySearchTask
+
 
 class HistoryDialog(QDialog):
     """历史记录对话框"""
     
+    # 输入停顿多久后开始搜索（毫秒）
+    SEARCH_DEBOUNCE_MS = 150
+    
+    # 导入导出的文件类型：过滤器 -> 扩展名
+    FILE_FILTERS = {
+        "CSV 文件 (*.csv)": ".csv",
+        "JSON Lines 文件 (*.jsonl)": ".jsonl",
+        "列式归档 (*.calccol)": ".calccol",
+    }
+    
     # 信号定义
     expression_selected = Signal(str)  # 选择表达式信号
     
@@ -25,6 +41,18 @@ class HistoryDialog(QDialog):
         self.setMinimumSize(600, 400)
         self.resize(700, 500)
         
+        # 历史记录模型和搜索结果代理模型
+        self.history_model = HistoryListModel(history_manager, self)
+        self.search_model = HistorySearchProxyModel(self)
+        self.search_model.setSourceModel(self.history_model)
+        
+        # 搜索防抖定时器、任务代号和当前任务的取消标志
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self.search_generation = 0
+        self.search_cancel_event = threading.Event()
+        
         self.init_ui()
         self.load_history()
         self.connect_signals()
@@ -51,8 +79,24 @@ class HistoryDialog(QDialog):
         layout.addWidget(splitter)
         
         # 历史记录列表
-        self.history_list = QListWidget()
+        # 使用单列、固定行高的 QTableView 作为列表：它只向模型查询可见行，
+        # 而 QListView 布局时会逐行访问模型，百万条记录时打开需要数秒
+        self.history_list = QTableView()
         self.history_list.setAlternatingRowColors(True)
+        self.history_list.setShowGrid(False)
+        self.history_list.setWordWrap(False)
+        self.history_list.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.history_list.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.history_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.history_list.horizontalHeader().hide()
+        self.history_list.horizontalHeader().setStretchLastSection(True)
+        self.history_list.verticalHeader().hide()
+        self.history_list.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.history_list.verticalHeader().setDefaultSectionSize(
+            self.history_list.fontMetrics().height() + 8)
+        self.history_list.setModel(self.history_model)
+        self.highlight_delegate = HighlightDelegate(self.history_list)
+        self.history_list.setItemDelegate(self.highlight_delegate)
         splitter.addWidget(self.history_list)
         
         # 详情面板
@@ -73,6 +117,12 @@ class HistoryDialog(QDialog):
         self.clear_button = QPushButton("清除所有历史")
         button_layout.addWidget(self.clear_button)
         
+        self.export_button = QPushButton("导出...")
+        button_layout.addWidget(self.export_button)
+        
+        self.import_button = QPushButton("导入...")
+        button_layout.addWidget(self.import_button)
+        
         button_layout.addStretch()
         
         self.close_button = QPushButton("关闭")
@@ -109,35 +159,35 @@ class HistoryDialog(QDialog):
         self.search_button.clicked.connect(self.search_history)
         self.search_edit.returnPressed.connect(self.search_history)
         self.search_edit.textChanged.connect(self.on_search_text_changed)
+        self.search_timer.timeout.connect(self.search_history)
+        self.search_model.invalidated.connect(self.on_search_invalidated)
         
-        self.history_list.itemSelectionChanged.connect(self.on_selection_changed)
-        self.history_list.itemDoubleClicked.connect(self.use_selected_expression)
+        self.history_list.selectionModel().currentChanged.connect(self.on_selection_changed)
+        self.history_list.doubleClicked.connect(self.use_selected_expression)
         
         self.use_button.clicked.connect(self.use_selected_expression)
         self.clear_button.clicked.connect(self.clear_all_history)
+        self.export_button.clicked.connect(self.export_history)
+        self.import_button.clicked.connect(self.import_history)
         self.close_button.clicked.connect(self.accept)
         
-        # 连接历史管理器信号
-        self.history_manager.history_updated.connect(self.load_history)
+        # 连接历史管理器信号（列表由模型增量更新，这里只刷新统计）
+        self.history_manager.history_updated.connect(self.update_statistics)
         
     def load_history(self):
         """加载历史记录"""
-        self.history_list.clear()
-        
-        history = self.history_manager.get_history()
-        for record in history:
-            item_text = f"{record['expression']} = {record['result']}"
-            item = QListWidgetItem(item_text)
-            item.setData(Qt.UserRole, record)
-            
-            # 设置工具提示
-            tooltip = f"表达式: {record['expression']}\n结果: {record['result']}\n时间: {record['formatted_time']}"
-            item.setToolTip(tooltip)
-            
-            self.history_list.addItem(item)
+        self.set_list_model(self.history_model)
             
         # 更新统计信息
         self.update_statistics()
+
+    def set_list_model(self, model):
+        """切换列表视图使用的模型"""
+        if self.history_list.model() is model:
+            return
+        self.history_list.setModel(model)
+        self.history_list.selectionModel().currentChanged.connect(self.on_selection_changed)
+        self.on_selection_changed()
         
     def update_statistics(self):
         """更新统计信息"""
@@ -155,43 +205,78 @@ class HistoryDialog(QDialog):
             
     @Slot()
     def search_history(self):
-        """搜索历史记录"""
+        """搜索历史记录（在工作线程中进行）"""
+        self.search_timer.stop()
         keyword = self.search_edit.text().strip()
         if not keyword:
+            self.cancel_search()
+            self.highlight_delegate.set_keyword("")
             self.load_history()
             return
             
-        self.history_list.clear()
-        results = self.history_manager.search_history(keyword)
-        
-        for record in results:
-            item_text = f"{record['expression']} = {record['result']}"
-            item = QListWidgetItem(item_text)
-            item.setData(Qt.UserRole, record)
-            
-            tooltip = f"表达式: {record['expression']}\n结果: {record['result']}\n时间: {record['formatted_time']}"
-            item.setToolTip(tooltip)
-            
-            self.history_list.addItem(item)
+        self.cancel_search()
+        self.search_cancel_event = threading.Event()
+        task = HistorySearchTask(
+            self.history_manager.snapshot(),
+            keyword,
+            self.search_generation,
+            self.search_model.insert_count,
+            self.search_cancel_event
+        )
+        task.signals.finished.connect(self.on_search_finished)
+        QThreadPool.globalInstance().start(task)
+
+    def cancel_search(self):
+        """作废正在进行的搜索"""
+        self.search_timer.stop()
+        self.search_generation += 1
+        self.search_cancel_event.set()
+
+    @Slot(int, str, object, int)
+    def on_search_finished(self, generation, keyword, rows, insert_count):
+        """搜索完成，通过代理模型应用结果"""
+        if generation != self.search_generation:
+            return
+
+        # 无搜索时直接使用源模型，避免代理模型维护全部记录的映射
+        self.search_model.set_matches(keyword, rows, insert_count)
+        self.highlight_delegate.set_keyword(keyword)
+        self.set_list_model(self.search_model)
+        self.history_list.viewport().update()
             
     @Slot()
     def on_search_text_changed(self):
-        """搜索文本改变时的处理"""
+        """搜索文本改变时的处理（防抖后自动搜索）"""
         if not self.search_edit.text().strip():
+            self.cancel_search()
+            self.highlight_delegate.set_keyword("")
             self.load_history()
+        else:
+            self.search_timer.start()
+
+    @Slot()
+    def on_search_invalidated(self):
+        """历史记录被整体替换后重新搜索"""
+        if self.history_list.model() is self.search_model:
+            self.search_timer.start()
+            
+    def done(self, result):
+        """关闭对话框时作废正在进行的搜索"""
+        self.cancel_search()
+        super().done(result)
             
     @Slot()
     def on_selection_changed(self):
         """选择改变时的处理"""
-        self.use_button.setEnabled(bool(self.history_list.currentItem()))
+        self.use_button.setEnabled(self.history_list.currentIndex().isValid())
         
     @Slot()
     def use_selected_expression(self):
         """使用选中的表达式"""
-        current_item = self.history_list.currentItem()
-        if current_item:
-            record = current_item.data(Qt.UserRole)
-            self.expression_selected.emit(record['expression'])
+        current_index = self.history_list.currentIndex()
+        if current_index.isValid():
+            record = current_index.data(HistoryListModel.RecordRole)
+            self.expression_selected.emit(record.expression)
             self.accept()
             
     @Slot()
@@ -208,3 +293,45 @@ class HistoryDialog(QDialog):
         if reply == QMessageBox.Yes:
             self.history_manager.clear_history()
             QMessageBox.information(self, "完成", "历史记录已清除。")
+
+    @Slot()
+    def export_history(self):
+        """导出历史记录"""
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "导出历史记录", "calculator_history.csv", ";;".join(self.FILE_FILTERS)
+        )
+        if not path:
+            return
+        extension = self.FILE_FILTERS.get(selected_filter, ".csv")
+        if not any(path.lower().endswith(ext) for ext in self.FILE_FILTERS.values()):
+            path += extension
+            
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            count = self.history_manager.export_history(path)
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.warning(self, "导出失败", f"导出历史记录失败: {e}")
+            return
+        QApplication.restoreOverrideCursor()
+        QMessageBox.information(self, "完成", f"已导出 {count} 条历史记录。")
+        
+    @Slot()
+    def import_history(self):
+        """导入历史记录"""
+        filters = ["历史记录文件 (*.csv *.jsonl *.calccol)", *self.FILE_FILTERS]
+        path, _ = QFileDialog.getOpenFileName(self, "导入历史记录", "", ";;".join(filters))
+        if not path:
+            return
+            
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            imported, duplicates = self.history_manager.import_history(path)
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.warning(self, "导入失败", f"导入历史记录失败: {e}")
+            return
+        QApplication.restoreOverrideCursor()
+        QMessageBox.information(
+            self, "完成", f"已导入 {imported} 条历史记录，跳过 {duplicates} 条重复记录。"
+        )
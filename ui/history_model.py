@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史记录模型 - 基于 QAbstractListModel 的历史记录数据模型
+只在视图请求可见行时才生成显示文本和工具提示
+另含搜索结果代理模型和高亮匹配文本的委托
+"""
+
+import html
+from bisect import bisect_left, bisect_right
+
+from PySide6.QtCore import (
+    Qt, QAbstractListModel, QAbstractProxyModel, QModelIndex, Signal, Slot
+)
+from PySide6.QtGui import QTextDocument, QPalette
+from PySide6.QtWidgets import QStyledItemDelegate, QStyle, QApplication
+
+from core.history_search import fold_case, record_matches
+
+
+class HistoryListModel(QAbstractListModel):
+    """历史记录列表模型"""
+
+    # 自定义角色：返回原始记录
+    RecordRole = Qt.UserRole
+
+    def __init__(self, history_manager, parent=None):
+        super().__init__(parent)
+        self.history_manager = history_manager
+        # 模型自己维护行数，保证 begin/end 通知与视图看到的行数一致
+        self._row_count = history_manager.record_count()
+
+        history_manager.record_added.connect(self.on_record_added)
+        history_manager.records_removed.connect(self.on_records_removed)
+        history_manager.history_reset.connect(self.on_history_reset)
+
+    def rowCount(self, parent=QModelIndex()):
+        """行数"""
+        if parent.isValid():
+            return 0
+        return self._row_count
+
+    def data(self, index, role=Qt.DisplayRole):
+        """按需生成各角色的数据"""
+        if not index.isValid() or index.row() >= self._row_count:
+            return None
+
+        record = self.history_manager.record_at(index.row())
+        if role == Qt.DisplayRole:
+            return f"{record.expression} = {record.result}"
+        elif role == Qt.ToolTipRole:
+            return (f"表达式: {record.expression}\n"
+                    f"结果: {record.result}\n"
+                    f"时间: {record.formatted_time}")
+        elif role == self.RecordRole:
+            return record
+        return None
+
+    def record(self, row):
+        """获取指定行的记录"""
+        return self.history_manager.record_at(row)
+
+    @Slot()
+    def on_record_added(self):
+        """新记录插入到开头"""
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._row_count += 1
+        self.endInsertRows()
+
+    @Slot(int, int)
+    def on_records_removed(self, first, last):
+        """记录被删除"""
+        self.beginRemoveRows(QModelIndex(), first, last)
+        self._row_count -= last - first + 1
+        self.endRemoveRows()
+
+    @Slot()
+    def on_history_reset(self):
+        """历史记录整体替换"""
+        self.beginResetModel()
+        self._row_count = self.history_manager.record_count()
+        self.endResetModel()
+
+
+class HistorySearchProxyModel(QAbstractProxyModel):
+    """
+    搜索结果代理模型
+
+    匹配结果由工作线程计算后一次性设置。内部保存匹配行的"键"，
+    源行号 = 键 + 偏移量；新记录总是插入到第0行，只需增加偏移量，
+    无需逐个调整已匹配的行。
+    """
+
+    # 源模型被整体重置，需要重新搜索
+    invalidated = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._keys = []       # 升序排列的匹配行键
+        self._shift = 0       # 源行号偏移量
+        self._keyword = ""
+        self.insert_count = 0  # 累计插入到源模型的行数
+
+    def setSourceModel(self, model):
+        """设置源模型并监听其变化"""
+        super().setSourceModel(model)
+        model.rowsInserted.connect(self.on_source_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self.on_source_rows_about_to_be_removed)
+        model.modelReset.connect(self.on_source_reset)
+
+    def keyword(self):
+        """当前关键词"""
+        return self._keyword
+
+    def set_matches(self, keyword, rows, insert_count):
+        """
+        应用搜索结果
+
+        Args:
+            keyword: 关键词
+            rows: 匹配记录在快照中的下标（升序）
+            insert_count: 拍摄快照时的 insert_count
+        """
+        source = self.sourceModel()
+        source_count = source.rowCount()
+        # 快照之后新插入的行位于开头，直接逐条检查
+        offset = self.insert_count - insert_count
+        lowered = fold_case(keyword)
+        new_rows = [row for row in range(min(offset, source_count))
+                    if record_matches(source.record(row), lowered)]
+
+        self.beginResetModel()
+        self._keyword = keyword
+        self._shift = 0
+        self._keys = new_rows
+        self._keys.extend(row + offset for row in rows if row + offset < source_count)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        """行数"""
+        if parent.isValid():
+            return 0
+        return len(self._keys)
+
+    def columnCount(self, parent=QModelIndex()):
+        """列数"""
+        return 0 if parent.isValid() else 1
+
+    def index(self, row, column, parent=QModelIndex()):
+        """创建索引"""
+        if parent.isValid() or not (0 <= row < len(self._keys)) or column != 0:
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        """列表模型没有父节点"""
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        """代理索引 -> 源索引"""
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(self._keys[proxy_index.row()] + self._shift, 0)
+
+    def mapFromSource(self, source_index):
+        """源索引 -> 代理索引"""
+        if not source_index.isValid():
+            return QModelIndex()
+        key = source_index.row() - self._shift
+        row = bisect_left(self._keys, key)
+        if row < len(self._keys) and self._keys[row] == key:
+            return self.createIndex(row, 0)
+        return QModelIndex()
+
+    def record(self, row):
+        """获取指定行的记录"""
+        return self.sourceModel().record(self._keys[row] + self._shift)
+
+    @Slot(QModelIndex, int, int)
+    def on_source_rows_inserted(self, parent, first, last):
+        """源模型插入了新行"""
+        count = last - first + 1
+        self.insert_count += count
+
+        # 已匹配行中位于插入点之后的整体后移
+        if first == 0:
+            self._shift += count
+        else:
+            split = bisect_left(self._keys, first - self._shift)
+            for i in range(split, len(self._keys)):
+                self._keys[i] += count
+
+        if not self._keyword:
+            return
+
+        # 检查新插入的行是否匹配
+        lowered = fold_case(self._keyword)
+        source = self.sourceModel()
+        matched = [row - self._shift for row in range(first, last + 1)
+                   if record_matches(source.record(row), lowered)]
+        if matched:
+            position = bisect_left(self._keys, matched[0])
+            self.beginInsertRows(QModelIndex(), position, position + len(matched) - 1)
+            self._keys[position:position] = matched
+            self.endInsertRows()
+
+    @Slot(QModelIndex, int, int)
+    def on_source_rows_about_to_be_removed(self, parent, first, last):
+        """源模型即将删除行"""
+        count = last - first + 1
+        start = bisect_left(self._keys, first - self._shift)
+        end = bisect_right(self._keys, last - self._shift)
+        if start < end:
+            self.beginRemoveRows(QModelIndex(), start, end - 1)
+            del self._keys[start:end]
+            self.endRemoveRows()
+
+        # 删除点之后的行整体前移（截断末尾时无需调整）
+        for i in range(start, len(self._keys)):
+            self._keys[i] -= count
+
+    @Slot()
+    def on_source_reset(self):
+        """源模型重置"""
+        self.beginResetModel()
+        self._keys = []
+        self._shift = 0
+        self.endResetModel()
+        self.invalidated.emit()
+
+
+class HighlightDelegate(QStyledItemDelegate):
+    """高亮显示匹配关键词的委托"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.keyword = ""
+
+    def set_keyword(self, keyword):
+        """设置要高亮的关键词"""
+        self.keyword = keyword
+
+    def paint(self, painter, option, index):
+        """绘制单元格"""
+        if not self.keyword:
+            super().paint(painter, option, index)
+            return
+
+        self.initStyleOption(option, index)
+        text = option.text
+        option.text = ""
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, option, painter, option.widget)
+
+        # 用富文本绘制，匹配部分加背景色
+        document = QTextDocument()
+        document.setDefaultFont(option.font)
+        document.setDocumentMargin(0)
+        document.setHtml(self.highlight_html(text, option))
+
+        text_rect = style.subElementRect(QStyle.SE_ItemViewItemText, option, option.widget)
+        painter.save()
+        painter.translate(text_rect.left() + 3,
+                          text_rect.top() + (text_rect.height() - document.size().height()) / 2)
+        document.drawContents(painter)
+        painter.restore()
+
+    def highlight_html(self, text, option):
+        """生成带高亮标记的 HTML"""
+        if option.state & QStyle.State_Selected:
+            color = option.palette.color(QPalette.HighlightedText).name()
+        else:
+            color = option.palette.color(QPalette.Text).name()
+
+        lowered = fold_case(text)
+        keyword = fold_case(self.keyword)
+        parts = []
+        position = 0
+        while True:
+            found = lowered.find(keyword, position)
+            if found < 0:
+                break
+            parts.append(html.escape(text[position:found]))
+            parts.append('<span style="background-color:#FFE066;color:#2C3E50;">'
+                         f'{html.escape(text[found:found + len(keyword)])}</span>')
+            position = found + len(keyword)
+        parts.append(html.escape(text[position:]))
+        return f'<span style="color:{color};white-space:pre;">{"".join(parts)}</span>'
@@ -5,45 +5,131 @@
 实现标签页切换和整体布局管理
 """
 
+import threading
+import time
+from functools import partial
+
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QTabWidget, 
-    QMenuBar, QStatusBar, QApplication
+    QMenuBar, QStatusBar, QApplication, QPushButton, QProgressBar
 )
-from PySide6.QtCore import Qt, Signal, Slot
-from PySide6.QtGui import QKeySequence, QAction
+from PySide6.QtCore import Qt, Signal, Slot, QTimer, QThreadPool
+from PySide6.QtGui import QKeySequence, QAction, QActionGroup
 
 from .display_widget import DisplayWidget
 from .standard_panel import StandardPanel
 from .scientific_panel import ScientificPanel
 from .programmer_panel import ProgrammerPanel
+from .worksheet_panel import WorksheetPanel
+from .plot_panel import PlotPanel
+from .statistics_panel import StatisticsPanel
+from .matrix_panel import MatrixPanel
+from .finance_panel import FinancePanel
+from .rpn_panel import RpnPanel
+from .button_panel import ButtonPanel
 from .history_dialog import HistoryDialog
+from .checksum_dialog import ChecksumDialog
+from .command_registry import CommandRegistry
 from core.calculator_engine import CalculatorEngine
+from core.number_theory import FactorizationTask
+from core.undo_history import UndoHistory
+from core.session_snapshot import SessionSnapshot
+from core.startup_profile import StartupProfile
 from styles.style_manager import StyleManager
 
 
 class MainWindow(QMainWindow):
     """主窗口类"""
     
-    def __init__(self):
+    # 各模式面板（与标签页顺序一致）：(属性名, 面板类, 标签页标题)
+    PANELS = [
+        ("standard_panel", StandardPanel, "标准"),
+        ("scientific_panel", ScientificPanel, "科学"),
+        ("programmer_panel", ProgrammerPanel, "程序员"),
+        ("worksheet_panel", WorksheetPanel, "工作表"),
+        ("plot_panel", PlotPanel, "绘图"),
+        ("statistics_panel", StatisticsPanel, "统计"),
+        ("matrix_panel", MatrixPanel, "矩阵"),
+        ("finance_panel", FinancePanel, "金融"),
+        ("rpn_panel", RpnPanel, "RPN"),
+    ]
+    
+    # 首次显示后多久开始在空闲时预先创建其余面板（毫秒）
+    PANEL_PREFETCH_DELAY_MS = 500
+    
+    # 会话快照文件（退出时写入，启动时恢复显示屏、内存、模式和标签页）
+    SESSION_FILE = "calculator_session.bin"
+    
+    # 按钮字号档位：(档位, 宽度上限, 高度上限)，窗口宽或高小于上限时使用该档位
+    FONT_TIERS = [
+        ("small", 550, 750),
+        ("medium", 650, 850),
+        ("large", None, None),
+    ]
+    
+    # 窗口大小停止变化多久后更新字号档位（毫秒）
+    FONT_TIER_DEBOUNCE_MS = 80
+    
+    def __init__(self, startup_profile=None):
+        """
+        Args:
+            startup_profile: 记录启动各阶段耗时的 StartupProfile，默认新建一个
+        """
         super().__init__()
+        self.startup_profile = startup_profile or StartupProfile()
         self.setWindowTitle("多功能计算器 - Claude 4.0 sonnet")
         # 设置更合理的最小尺寸，确保按钮不会挤压
         self.setMinimumSize(500, 700)
         self.resize(550, 750)
         
-        # 初始化核心组件
-        self.calculator_engine = CalculatorEngine()
+        # 初始化核心组件（历史记录在窗口显示后才在后台加载）
+        with self.startup_profile.phase("创建计算引擎"):
+            self.calculator_engine = CalculatorEngine(defer_history=True)
         self.style_manager = StyleManager()
         
         # 设置窗口属性
         self.setWindowFlags(Qt.Window | Qt.WindowCloseButtonHint | Qt.WindowMinimizeButtonHint)
         
+        # 是否已安排空闲时预先创建面板
+        self.panel_prefetch_scheduled = False
+        
+        # 开始后台加载历史记录的时刻（用于记录加载耗时）
+        self.history_load_start = None
+        
+        # 后台因数分解：任务代号、取消标志，以及请求分解时的表达式（完成后表达式未变则重新计算）
+        self.factor_generation = 0
+        self.factor_cancel_event = threading.Event()
+        self.factor_expression = None
+        
+        # 文件校验对话框（第一次打开时创建，关闭后保留结果）
+        self.checksum_dialog = None
+
+        # 撤销历史（表达式、内存和模式），上次退出时的历史可继续撤销；恢复状态时不记录新的一步
+        with self.startup_profile.phase("加载撤销历史"):
+            self.undo_history = UndoHistory()
+            self.undo_history.load()
+        self.restoring_undo_state = False
+        
+        # 按钮字号档位：窗口大小改变后防抖，档位真正变化时才更新
+        self.font_tier = None
+        self.pending_font_tier = None
+        self.font_tier_timer = QTimer(self)
+        self.font_tier_timer.setSingleShot(True)
+        self.font_tier_timer.setInterval(self.FONT_TIER_DEBOUNCE_MS)
+        self.font_tier_timer.timeout.connect(self.apply_pending_font_tier)
+        
         # 初始化UI
-        self.init_ui()
-        self.init_menu()
-        self.init_status_bar()
-        self.apply_styles()
+        with self.startup_profile.phase("创建窗口部件"):
+            self.init_ui()
+            self.init_commands()
+            self.init_menu()
+            self.init_status_bar()
+        with self.startup_profile.phase("应用样式"):
+            self.apply_styles()
         self.connect_signals()
+        with self.startup_profile.phase("恢复会话"):
+            self.restore_session()
+        self.record_undo_state()
         
     def init_ui(self):
         """初始化用户界面"""
@@ -65,58 +151,130 @@ class MainWindow(QMainWindow):
         self.tab_widget.setTabPosition(QTabWidget.North)
         main_layout.addWidget(self.tab_widget)
         
-        # 创建各模式面板
-        self.standard_panel = StandardPanel()
-        self.scientific_panel = ScientificPanel()
-        self.programmer_panel = ProgrammerPanel()
-        
-        # 添加标签页
-        self.tab_widget.addTab(self.standard_panel, "标准")
-        self.tab_widget.addTab(self.scientific_panel, "科学")
-        self.tab_widget.addTab(self.programmer_panel, "程序员")
+        # 添加标签页：每页先放一个空容器，面板在首次切换到该页时才创建
+        for name, panel_class, title in self.PANELS:
+            setattr(self, name, None)
+            page = QWidget()
+            page_layout = QVBoxLayout(page)
+            page_layout.setContentsMargins(0, 0, 0, 0)
+            self.tab_widget.addTab(page, title)
         
-        # 设置默认标签页
+        # 设置默认标签页（只有标准面板在启动时创建）
         self.tab_widget.setCurrentIndex(0)
+        self.ensure_panel(0)
+        
+    def ensure_panel(self, index):
+        """获取指定标签页的面板，尚未创建时创建并连接信号"""
+        name, panel_class, _ = self.PANELS[index]
+        panel = getattr(self, name)
+        if panel is None:
+            if issubclass(panel_class, ButtonPanel):
+                panel = panel_class()
+                panel.button_clicked.connect(self.handle_button_click)
+            else:
+                # 工作表、绘图等面板直接使用计算引擎，没有按钮
+                panel = panel_class(self.calculator_engine)
+                if hasattr(panel, "result_published"):
+                    panel.result_published.connect(self.show_published_result)
+            self.tab_widget.widget(index).layout().addWidget(panel)
+            setattr(self, name, panel)
+        return panel
+        
+    @Slot(int)
+    def on_tab_changed(self, index):
+        """切换标签页时创建对应的面板"""
+        if index >= 0:
+            self.ensure_panel(index)
+            
+    @Slot()
+    def prefetch_panels(self):
+        """空闲时预先创建一个尚未创建的面板，每次只创建一个以免阻塞界面"""
+        for index, (name, _, _) in enumerate(self.PANELS):
+            if getattr(self, name) is None:
+                self.ensure_panel(index)
+                QTimer.singleShot(0, self.prefetch_panels)
+                return
+                
+    def showEvent(self, event):
+        """首次显示后在后台加载历史记录，并安排空闲时预先创建其余面板"""
+        super().showEvent(event)
+        if not self.panel_prefetch_scheduled:
+            self.panel_prefetch_scheduled = True
+            QTimer.singleShot(0, self.load_history)
+            QTimer.singleShot(self.PANEL_PREFETCH_DELAY_MS, self.prefetch_panels)
+            
+    @Slot()
+    def load_history(self):
+        """开始在后台加载历史记录（之前已用到历史记录时已经加载）"""
+        history_manager = self.calculator_engine.history_manager
+        if not history_manager.loaded:
+            self.history_load_start = time.perf_counter()
+            history_manager.load_history_async()
+            
+    @Slot()
+    def on_history_loaded(self):
+        """记录历史记录的加载耗时（--profile-startup 时打印）"""
+        if self.history_load_start is not None:
+            self.startup_profile.add("加载历史记录（后台）", time.perf_counter() - self.history_load_start)
+        self.startup_profile.mark("历史记录加载完成")
         
     def init_menu(self):
         """初始化菜单栏"""
         menubar = self.menuBar()
+
+        # 编辑菜单
+        edit_menu = menubar.addMenu("编辑(&E)")
+        self.undo_action = self.create_command_action("edit.undo")
+        self.redo_action = self.create_command_action("edit.redo")
+        edit_menu.addAction(self.undo_action)
+        edit_menu.addAction(self.redo_action)
         
         # 查看菜单
         view_menu = menubar.addMenu("查看(&V)")
-        
-        # 标准模式
-        standard_action = QAction("标准(&S)", self)
-        standard_action.setShortcut(QKeySequence("Alt+1"))
-        standard_action.triggered.connect(lambda: self.tab_widget.setCurrentIndex(0))
-        view_menu.addAction(standard_action)
-        
-        # 科学模式
-        scientific_action = QAction("科学(&C)", self)
-        scientific_action.setShortcut(QKeySequence("Alt+2"))
-        scientific_action.triggered.connect(lambda: self.tab_widget.setCurrentIndex(1))
-        view_menu.addAction(scientific_action)
-        
-        # 程序员模式
-        programmer_action = QAction("程序员(&P)", self)
-        programmer_action.setShortcut(QKeySequence("Alt+3"))
-        programmer_action.triggered.connect(lambda: self.tab_widget.setCurrentIndex(2))
-        view_menu.addAction(programmer_action)
-        
+        for name in ("view.standard", "view.scientific", "view.programmer", "view.worksheet",
+                     "view.plot", "view.statistics", "view.matrix", "view.finance", "view.rpn"):
+            view_menu.addAction(self.create_command_action(name))
         view_menu.addSeparator()
-        
-        # 历史记录
-        history_action = QAction("历史记录(&R)", self)
-        history_action.setShortcut(QKeySequence("Ctrl+H"))
-        history_action.triggered.connect(self.show_history)
-        view_menu.addAction(history_action)
+        view_menu.addAction(self.create_command_action("view.history"))
+
+        view_menu.addSeparator()
+
+        # 主题（互斥选择）
+        theme_menu = view_menu.addMenu("主题(&T)")
+        self.theme_actions = QActionGroup(self)
+        self.theme_actions.setExclusive(True)
+        for name, title in self.style_manager.get_theme_names().items():
+            theme_action = QAction(title, self)
+            theme_action.setCheckable(True)
+            theme_action.setChecked(name == self.style_manager.get_current_theme())
+            theme_action.triggered.connect(lambda checked, name=name: self.style_manager.set_theme(name))
+            self.theme_actions.addAction(theme_action)
+            theme_menu.addAction(theme_action)
+
+        # 工具菜单
+        tools_menu = menubar.addMenu("工具(&T)")
+        tools_menu.addAction(self.create_command_action("tools.checksum"))
+
+        # 宏菜单
+        macro_menu = menubar.addMenu("宏(&M)")
+        self.macro_record_action = self.create_command_action("macro.record")
+        self.macro_record_action.setCheckable(True)
+        macro_menu.addAction(self.macro_record_action)
+        macro_menu.addAction(self.create_command_action("macro.replay"))
 
         # 帮助菜单
         help_menu = menubar.addMenu("帮助(&H)")
-        
-        about_action = QAction("关于(&A)", self)
-        about_action.triggered.connect(self.show_about)
-        help_menu.addAction(about_action)
+        help_menu.addAction(self.create_command_action("help.diagnostics"))
+        help_menu.addAction(self.create_command_action("help.about"))
+
+    def create_command_action(self, name):
+        """为命令创建菜单项"""
+        command = self.commands.get(name)
+        action = QAction(command.title, self)
+        if command.shortcut:
+            action.setShortcut(QKeySequence(command.shortcut))
+        action.triggered.connect(lambda: self.commands.dispatch(name))
+        return action
         
     def init_status_bar(self):
         """初始化状态栏"""
@@ -124,167 +282,387 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("就绪", 2000)
         
+        # 后台因数分解的进度和取消按钮（分解时才显示）
+        self.factor_progress = QProgressBar()
+        self.factor_progress.setRange(0, 100)
+        self.factor_progress.setMaximumWidth(120)
+        self.factor_progress.setMaximumHeight(14)
+        self.factor_cancel_button = QPushButton("取消")
+        self.factor_cancel_button.setToolTip("取消后台因数分解（Esc）")
+        self.factor_cancel_button.clicked.connect(self.cancel_factorization)
+        for widget in (self.factor_progress, self.factor_cancel_button):
+            widget.hide()
+            self.status_bar.addPermanentWidget(widget)
+        
     def apply_styles(self):
         """应用样式"""
         self.setStyleSheet(self.style_manager.get_main_window_style())
+
+    @Slot(str)
+    def on_theme_changed(self, theme_name):
+        """切换主题：对主窗口设置一次样式表，所有子控件在同一遍中重新应用样式"""
+        start = time.perf_counter()
+        self.apply_styles()
+        elapsed = (time.perf_counter() - start) * 1000
+        title = self.style_manager.get_theme_names()[theme_name]
+        self.status_bar.showMessage(f"已切换到{title}主题（{elapsed:.1f} ms）", 3000)
         
     def connect_signals(self):
         """连接信号槽"""
         # 连接计算引擎信号
         self.calculator_engine.result_ready.connect(self.display.set_result)
         self.calculator_engine.error_occurred.connect(self.display.set_error)
+        self.calculator_engine.matrix_ready.connect(self.show_matrix_result)
+        self.calculator_engine.factorization_requested.connect(self.start_factorization)
         
-        # 连接面板信号
-        self.standard_panel.button_clicked.connect(self.handle_button_click)
-        self.scientific_panel.button_clicked.connect(self.handle_button_click)
-        self.programmer_panel.button_clicked.connect(self.handle_button_click)
+        # 面板的信号在面板创建时连接，这里只监听标签页切换
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
         
         # 连接显示屏信号
         self.display.expression_changed.connect(self.calculator_engine.set_expression)
+
+        # 主题切换
+        self.style_manager.theme_changed.connect(self.on_theme_changed)
+
+        # 命令在当前进制下不可用时的提示
+        self.commands.command_rejected.connect(self.show_command_rejected)
+
+        # 表达式、内存或模式可能改变时记录撤销历史（与当前状态相同时忽略）
+        self.commands.command_executed.connect(self.record_undo_state)
+        self.display.expression_changed.connect(self.record_undo_state)
+        self.calculator_engine.result_ready.connect(self.record_undo_state)
+        self.calculator_engine.angle_mode_changed.connect(self.record_undo_state)
         
-    @Slot(str)
-    def handle_button_click(self, button_text):
-        """处理按钮点击事件"""
-        self.status_bar.showMessage(f"按下: {button_text}", 1000)
+        # 表达式自动补全（按历史使用频率）
+        self.display.set_completion_provider(
+            self.calculator_engine.history_manager.complete_expression)
+        self.calculator_engine.history_manager.history_loaded.connect(self.on_history_loaded)
+        
+    def init_commands(self):
+        """
+        建立命令表：按钮、键盘、菜单和宏回放都按命令名分发到这里登记的处理函数
+        未登记的按钮（如 mod、Rand）按原样把按钮文字添加到表达式
+        """
+        self.commands = CommandRegistry(self.get_current_base, fallback=self.display.append_text, parent=self)
+        self.macro = []  # 最近录制的宏
+        register = self.commands.register
+        engine = self.calculator_engine
+        display = self.display
 
-        # 根据按钮类型处理
-        if button_text == "=":
-            self.calculator_engine.calculate()
-        elif button_text == "C":
-            self.display.clear()
-            self.calculator_engine.clear()
-        elif button_text == "CE":
-            self.display.clear_entry()
-        elif button_text == "⌫":
-            self.display.backspace()
-        elif button_text == "MC":
-            self.calculator_engine.memory_clear()
-        elif button_text == "MR":
-            self.calculator_engine.memory_recall()
-        elif button_text == "MS":
-            self.calculator_engine.memory_store()
-        elif button_text == "M+":
-            self.calculator_engine.memory_add()
-        elif button_text == "M-":
-            self.calculator_engine.memory_subtract()
-        elif button_text in ["√x", "x²", "1/x", "%", "±"]:
-            self.handle_function_button(button_text)
-        elif button_text in ["sin", "cos", "tan", "asin", "acos", "atan",
-                            "sinh", "cosh", "tanh", "log", "ln", "exp",
-                            "x³", "xʸ", "10ˣ", "eˣ", "∛x", "ʸ√x", "n!", "π", "e"]:
-            self.handle_scientific_function(button_text)
-        elif button_text in ["HEX", "DEC", "OCT", "BIN"]:
-            self.handle_base_change(button_text)
-        elif button_text in ["AND", "OR", "XOR", "NOT", "LSH", "RSH"]:
-            self.handle_bitwise_operation(button_text)
-        elif button_text in ["A", "B", "C", "D", "E", "F"]:
-            # 十六进制字母按钮处理
-            current_base = self.get_current_base()
-            if current_base == 16:
-                self.display.append_text(button_text)
-            else:
-                # 如果不是十六进制模式，提示用户切换到十六进制
-                self.status_bar.showMessage(f"请先切换到十六进制模式才能使用 {button_text}", 2000)
-        elif button_text in ["8", "9"]:
-            # 数字8、9的进制检查
-            current_base = self.get_current_base()
-            if current_base >= 10:  # 十进制或十六进制
-                self.display.append_text(button_text)
-            else:
-                self.status_bar.showMessage(f"当前进制不支持数字 {button_text}", 2000)
-        elif button_text in ["2", "3", "4", "5", "6", "7"]:
-            # 数字2-7的进制检查
-            current_base = self.get_current_base()
-            if current_base >= 8:  # 八进制、十进制或十六进制
-                self.display.append_text(button_text)
+        def insert(name, text=None, **options):
+            """登记一个向表达式添加文本的命令"""
+            register(name, partial(display.append_text, text or name), **options)
+
+        # 数字：2-7 需要八进制及以上，8、9 需要十进制及以上，A-F 只用于十六进制
+        for digit in "0123456789":
+            key = Qt.Key_0 + int(digit)
+            if digit in "01":
+                insert(digit, keys=(key,))
             else:
-                self.status_bar.showMessage(f"当前进制不支持数字 {button_text}", 2000)
-        else:
-            self.display.append_text(button_text)
+                bases = (8, 10, 16) if digit < "8" else (10, 16)
+                insert(digit, bases=bases, keys=(key,),
+                       rejected_message=f"当前进制不支持数字 {digit}")
+        for letter in "ABCDEF":
+            insert(f"HEX_{letter}", letter, title=letter, bases=(16,),
+                   rejected_message=f"请先切换到十六进制模式才能使用 {letter}")
 
-    def handle_function_button(self, function):
-        """处理功能按钮"""
-        current_text = self.display.get_current_expression()
-        if not current_text or current_text == "0":
+        # 运算符和括号
+        insert("+", keys=(Qt.Key_Plus,))
+        insert("-", keys=(Qt.Key_Minus,))
+        insert("×", keys=(Qt.Key_Asterisk,))
+        insert("÷", keys=(Qt.Key_Slash,))
+        insert(".", keys=(Qt.Key_Period,))
+        insert("(")
+        insert(")")
+        register("=", engine.calculate, keys=(Qt.Key_Enter, Qt.Key_Return))
+
+        # 编辑
+        register("C", self.clear_all, keys=(Qt.Key_Escape,))
+        register("CE", display.clear_entry)
+        register("⌫", display.backspace, keys=(Qt.Key_Backspace,))
+
+        # 内存
+        register("MC", engine.memory_clear)
+        register("MR", engine.memory_recall)
+        register("MS", engine.memory_store)
+        register("M+", engine.memory_add)
+        register("M-", engine.memory_subtract)
+
+        # 需要已有表达式的功能
+        has_expression = self.has_expression
+        insert("√x", "√(", precondition=has_expression)
+        insert("x²", "²", precondition=has_expression)
+        insert("%", precondition=has_expression)
+        insert("n!", "!", precondition=has_expression)
+        register("1/x", self.reciprocal, precondition=has_expression)
+        register("±", self.toggle_sign, precondition=has_expression)
+
+        # 科学函数和常数
+        for function in ("sin", "cos", "tan", "asin", "acos", "atan",
+                         "sinh", "cosh", "tanh", "log", "ln", "exp"):
+            insert(function, f"{function}(")
+        insert("π")
+        insert("e")
+        insert("x³", "³")
+        insert("xʸ", "^")
+        insert("10ˣ", "10^(")
+        insert("eˣ", "exp(")
+        insert("∛x", "∛(")
+        insert("ʸ√x", "√(")
+
+        # 数值求解
+        insert("solve", "solve(")
+        insert("∫", "integrate(")
+        insert("d/dx", "diff(")
+        insert("x")
+        insert(",", ", ")
+
+        # 矩阵
+        insert("[")
+        insert("]")
+        insert(";", "; ")
+        insert("det", "det(")
+        insert("inv", "inv(")
+        insert("Aᵀ", "transpose(")
+        insert("eig", "eig(")
+        insert("@", " @ ")
+
+        # 数论
+        for function in ("isprime", "factor", "gcd", "lcm", "modpow", "modinv"):
+            insert(function, f"{function}(")
+        insert("mod", " mod ")
+
+        # 进制和位运算
+        for base, name in ProgrammerPanel.BASE_BUTTONS.items():
+            register(name, partial(self.handle_base_change, base), precondition=has_expression)
+        for operation in ("AND", "OR", "XOR", "LSH", "RSH"):
+            insert(operation, f" {operation} ")
+        register("NOT", self.bitwise_not, precondition=has_expression)
+
+        # 菜单命令（不记录到宏中）
+        register("edit.undo", self.undo, title="撤销(&U)", shortcut="Ctrl+Z", recordable=False)
+        register("edit.redo", self.redo, title="重做(&R)", shortcut="Ctrl+Y", recordable=False)
+        register("view.standard", partial(self.tab_widget.setCurrentIndex, 0),
+                 title="标准(&S)", shortcut="Alt+1", recordable=False)
+        register("view.scientific", partial(self.tab_widget.setCurrentIndex, 1),
+                 title="科学(&C)", shortcut="Alt+2", recordable=False)
+        register("view.programmer", partial(self.tab_widget.setCurrentIndex, 2),
+                 title="程序员(&P)", shortcut="Alt+3", recordable=False)
+        register("view.worksheet", partial(self.tab_widget.setCurrentIndex, 3),
+                 title="工作表(&W)", shortcut="Alt+4", recordable=False)
+        register("view.plot", partial(self.tab_widget.setCurrentIndex, 4),
+                 title="绘图(&G)", shortcut="Alt+5", recordable=False)
+        register("view.statistics", partial(self.tab_widget.setCurrentIndex, 5),
+                 title="统计(&I)", shortcut="Alt+6", recordable=False)
+        register("view.matrix", partial(self.tab_widget.setCurrentIndex, 6),
+                 title="矩阵(&X)", shortcut="Alt+7", recordable=False)
+        register("view.finance", partial(self.tab_widget.setCurrentIndex, 7),
+                 title="金融(&N)", shortcut="Alt+8", recordable=False)
+        register("view.rpn", partial(self.tab_widget.setCurrentIndex, 8),
+                 title="RPN(&R)", shortcut="Alt+9", recordable=False)
+        register("view.history", self.show_history, title="历史记录(&R)", shortcut="Ctrl+H", recordable=False)
+        register("tools.checksum", self.show_checksum_dialog, title="文件校验和位统计(&F)…",
+                 shortcut="Ctrl+Shift+F", recordable=False)
+        register("macro.record", self.toggle_macro_recording, title="录制宏(&R)",
+                 shortcut="Ctrl+Shift+R", recordable=False)
+        register("macro.replay", self.replay_macro, title="回放宏(&P)",
+                 shortcut="Ctrl+Shift+P", recordable=False)
+        register("help.diagnostics", self.show_diagnostics, title="诊断信息(&D)", recordable=False)
+        register("help.about", self.show_about, title="关于(&A)", recordable=False)
+
+    @Slot(str)
+    def handle_button_click(self, command):
+        """处理按钮点击事件：按命令名分发"""
+        self.status_bar.showMessage(f"按下: {self.commands.title(command)}", 1000)
+        self.commands.dispatch(command)
+
+    @Slot(str)
+    def show_command_rejected(self, message):
+        """命令在当前进制下不可用时提示用户"""
+        self.status_bar.showMessage(message, 2000)
+
+    @Slot(str, object)
+    def show_published_result(self, expression, result):
+        """其他面板发布的结果（如统计量）像普通计算结果一样显示并记入历史"""
+        self.display.set_expression(expression)
+        self.calculator_engine.publish_result(expression, result)
+
+    @Slot(object)
+    def show_matrix_result(self, matrix):
+        """矩阵结果在矩阵面板的表格中完整显示（显示屏上较大的矩阵只显示形状）"""
+        if matrix.ndim not in (1, 2):
             return
+        index = next(i for i, (name, _, _) in enumerate(self.PANELS) if name == "matrix_panel")
+        self.ensure_panel(index).set_matrix(matrix, self.calculator_engine.format_result)
+        if self.tab_widget.currentIndex() != index:
+            self.status_bar.showMessage("完整的矩阵结果见“矩阵”标签页（Alt+7）", 3000)
+
+    @Slot(object)
+    def start_factorization(self, n):
+        """在工作线程中分解较大的数（作废正在进行的分解），完成后重新计算当前表达式"""
+        self.stop_factorization()
+        self.factor_expression = self.calculator_engine.current_expression
+        self.factor_cancel_event = threading.Event()
+        task = FactorizationTask(n, self.factor_generation, self.factor_cancel_event)
+        task.signals.progress.connect(self.on_factorization_progress)
+        task.signals.finished.connect(self.on_factorization_finished)
+        task.signals.failed.connect(self.on_factorization_failed)
+        self.factor_progress.setValue(0)
+        self.factor_progress.show()
+        self.factor_cancel_button.show()
+        self.status_bar.showMessage(f"正在后台分解 {len(str(abs(n)))} 位数…（Esc 取消）")
+        QThreadPool.globalInstance().start(task)
+
+    def is_factorizing(self):
+        """是否正在后台分解"""
+        return not self.factor_cancel_button.isHidden()
+
+    def stop_factorization(self):
+        """作废正在进行的分解（之后收到的信号都被忽略）并隐藏进度"""
+        self.factor_generation += 1
+        self.factor_cancel_event.set()
+        self.factor_progress.hide()
+        self.factor_cancel_button.hide()
 
-        if function == "√x":
-            self.display.append_text("√(")
-        elif function == "x²":
-            self.display.append_text("²")
-        elif function == "1/x":
-            self.display.set_expression(f"1/({current_text})")
+    @Slot()
+    def cancel_factorization(self):
+        """取消后台分解"""
+        if self.is_factorizing():
+            self.stop_factorization()
+            self.status_bar.showMessage("已取消因数分解", 2000)
+
+    @Slot(int, int)
+    def on_factorization_progress(self, generation, percent):
+        if generation == self.factor_generation:
+            self.factor_progress.setValue(percent)
+
+    @Slot(int, object)
+    def on_factorization_finished(self, generation, factorization):
+        if generation != self.factor_generation:
+            return
+        self.stop_factorization()
+        self.status_bar.clearMessage()
+        # 分解结果已在缓存中，重新计算时直接得到
+        if self.calculator_engine.current_expression == self.factor_expression:
             self.calculator_engine.calculate()
-        elif function == "%":
-            self.display.append_text("%")
-        elif function == "±":
-            if current_text.startswith("-"):
-                self.display.set_expression(current_text[1:])
-            else:
-                self.display.set_expression("-" + current_text)
+        else:
+            self.status_bar.showMessage(f"分解完成: {factorization}", 5000)
+
+    @Slot(int, str)
+    def on_factorization_failed(self, generation, message):
+        if generation != self.factor_generation:
+            return
+        self.stop_factorization()
+        self.status_bar.clearMessage()
+        self.display.set_error(message)
 
-    def handle_scientific_function(self, function):
-        """处理科学计算函数"""
+    def has_expression(self):
+        """当前是否已输入表达式"""
         current_text = self.display.get_current_expression()
+        return bool(current_text) and current_text != "0"
 
-        if function in ["π", "e"]:
-            # 常数直接添加
-            self.display.append_text(function)
-        elif function in ["sin", "cos", "tan", "asin", "acos", "atan",
-                         "sinh", "cosh", "tanh", "log", "ln", "exp"]:
-            # 函数需要括号
-            self.display.append_text(f"{function}(")
-        elif function == "x³":
-            self.display.append_text("³")
-        elif function == "n!":
-            if current_text and current_text != "0":
-                self.display.append_text("!")
-        elif function == "10ˣ":
-            self.display.append_text("10^(")
-        elif function == "eˣ":
-            self.display.append_text("exp(")
-        elif function == "∛x":
-            self.display.append_text("∛(")
-        elif function == "xʸ":
-            self.display.append_text("^")
-        elif function == "ʸ√x":
-            self.display.append_text("√(")
-
-    def handle_base_change(self, base_name):
-        """处理进制切换"""
-        current_value = self.display.get_current_expression()
-        if not current_value or current_value == "0":
-            return
+    def clear_all(self):
+        """全部清除（同时取消后台分解）"""
+        self.cancel_factorization()
+        self.display.clear()
+        self.calculator_engine.clear()
 
-        # 获取当前进制
-        current_base = self.get_current_base()
+    def reciprocal(self):
+        """倒数：立即计算 1/(当前表达式)"""
+        self.display.set_expression(f"1/({self.display.get_current_expression()})")
+        self.calculator_engine.calculate()
 
-        # 确定目标进制
-        target_base = {"HEX": 16, "DEC": 10, "OCT": 8, "BIN": 2}[base_name]
+    def toggle_sign(self):
+        """正负号切换"""
+        current_text = self.display.get_current_expression()
+        if current_text.startswith("-"):
+            self.display.set_expression(current_text[1:])
+        else:
+            self.display.set_expression("-" + current_text)
 
-        # 转换数值
+    def handle_base_change(self, target_base):
+        """处理进制切换：转换当前数值并更新程序员面板的进制模式"""
+        current_value = self.display.get_current_expression()
         converted = self.calculator_engine.convert_to_base(current_value, target_base)
         self.display.set_expression(converted)
 
-        # 更新程序员面板的进制模式
-        if hasattr(self.programmer_panel, 'set_base_mode'):
+        if self.programmer_panel is not None:
             self.programmer_panel.set_base_mode(target_base)
 
-    def handle_bitwise_operation(self, operation):
-        """处理位运算"""
+    def bitwise_not(self):
+        """按位非（一元运算，立即求值）"""
         current_text = self.display.get_current_expression()
-        if operation == "NOT":
-            # NOT是一元运算符
-            if current_text and current_text != "0":
-                result = self.calculator_engine.bitwise_operation(current_text, 0, operation)
-                self.display.set_expression(str(result))
+        result = self.calculator_engine.bitwise_operation(current_text, 0, "NOT")
+        self.display.set_expression(str(result))
+
+    @Slot()
+    def record_undo_state(self):
+        """记录当前的表达式、内存值、角度模式和进制（与当前一步相同时忽略）"""
+        if self.restoring_undo_state:
+            return
+        self.undo_history.record(self.display.get_current_expression(), self.calculator_engine.memory_value,
+                                 self.calculator_engine.angle_mode, self.get_current_base())
+        self.update_undo_actions()
+
+    def update_undo_actions(self):
+        self.undo_action.setEnabled(self.undo_history.can_undo())
+        self.redo_action.setEnabled(self.undo_history.can_redo())
+
+    def undo(self):
+        """撤销（RPN 面板显示时撤销它的栈操作）"""
+        if self.rpn_panel is not None and self.rpn_panel.isVisible():
+            self.rpn_panel.handle_command("UNDO")
+        else:
+            self.apply_undo_state(self.undo_history.undo())
+
+    def redo(self):
+        """重做（RPN 面板显示时重做它的栈操作）"""
+        if self.rpn_panel is not None and self.rpn_panel.isVisible():
+            self.rpn_panel.handle_command("REDO")
         else:
-            # 其他是二元运算符
-            self.display.append_text(f" {operation} ")
+            self.apply_undo_state(self.undo_history.redo())
+
+    def apply_undo_state(self, state):
+        """恢复撤销历史中的一步"""
+        if state is None:
+            return
+        self.restoring_undo_state = True
+        try:
+            expression = state.expression
+            if expression:
+                self.display.set_expression(expression)
+            else:
+                self.display.clear_entry()
+            self.calculator_engine.memory_value = state.memory
+            self.calculator_engine.set_angle_mode(state.angle_mode)
+            if state.base != self.get_current_base():
+                index = next(i for i, (name, _, _) in enumerate(self.PANELS) if name == "programmer_panel")
+                self.ensure_panel(index).set_base_mode(state.base)
+        finally:
+            self.restoring_undo_state = False
+        self.update_undo_actions()
+
+    def toggle_macro_recording(self):
+        """开始或停止录制宏"""
+        if self.commands.is_recording():
+            self.macro = self.commands.stop_recording()
+            self.status_bar.showMessage(f"宏录制完成，共 {len(self.macro)} 个命令", 3000)
+        else:
+            self.commands.start_recording()
+            self.status_bar.showMessage("正在录制宏…", 3000)
+        self.macro_record_action.setChecked(self.commands.is_recording())
+
+    def replay_macro(self):
+        """回放最近录制的宏"""
+        if not self.macro:
+            self.status_bar.showMessage("尚未录制宏", 2000)
+            return
+        executed = self.commands.replay(self.macro)
+        self.status_bar.showMessage(f"已回放宏：执行 {executed} / {len(self.macro)} 个命令", 3000)
 
     def get_current_base(self):
-        """获取当前进制"""
-        if hasattr(self.programmer_panel, 'get_current_base'):
+        """获取当前进制（程序员面板尚未创建时为十进制）"""
+        if self.programmer_panel is not None:
             return self.programmer_panel.get_current_base()
         return 10
 
@@ -300,11 +678,41 @@ class MainWindow(QMainWindow):
             import traceback
             traceback.print_exc()
 
+    @Slot()
+    def show_checksum_dialog(self):
+        """显示文件校验对话框（非模态，计算时仍可使用计算器）"""
+        if self.checksum_dialog is None:
+            self.checksum_dialog = ChecksumDialog(self)
+            self.checksum_dialog.result_published.connect(self.show_published_result)
+        self.checksum_dialog.show()
+        self.checksum_dialog.raise_()
+        self.checksum_dialog.activateWindow()
+
     @Slot(str)
     def use_history_expression(self, expression):
         """使用历史记录中的表达式"""
         self.display.set_expression(expression)
         
+    @Slot()
+    def show_diagnostics(self):
+        """显示诊断信息"""
+        from PySide6.QtWidgets import QMessageBox
+        diagnostics = self.calculator_engine.get_diagnostics()
+        cache = diagnostics["result_cache"]
+        store = diagnostics["history_store"]
+        QMessageBox.information(
+            self,
+            "诊断信息",
+            "结果缓存\n"
+            f"  命中率: {cache['hit_ratio']:.1%}（命中 {cache['hits']} 次，未命中 {cache['misses']} 次）\n"
+            f"  条目数: {cache['entries']} / {cache['capacity']}\n"
+            f"  函数版本: {cache['version']}\n"
+            "历史记录存储\n"
+            f"  存储记录数: {store['stored_records']}（常驻内存 {store['resident_records']} 条）\n"
+            f"  文件锁持有时间: 最近 {store['last_lock_hold_ms']:.2f} ms，"
+            f"最长 {store['max_lock_hold_ms']:.2f} ms"
+        )
+        
     @Slot()
     def show_about(self):
         """显示关于对话框"""
@@ -322,63 +730,86 @@ class MainWindow(QMainWindow):
     def keyPressEvent(self, event):
         """处理键盘事件"""
         key = event.key()
-        text = event.text()
-        
-        # 数字键
-        if key >= Qt.Key_0 and key <= Qt.Key_9:
-            self.handle_button_click(text)
-        # 运算符键
-        elif key == Qt.Key_Plus:
-            self.handle_button_click("+")
-        elif key == Qt.Key_Minus:
-            self.handle_button_click("-")
-        elif key == Qt.Key_Asterisk:
-            self.handle_button_click("×")
-        elif key == Qt.Key_Slash:
-            self.handle_button_click("÷")
-        elif key == Qt.Key_Period:
-            self.handle_button_click(".")
-        elif key == Qt.Key_Enter or key == Qt.Key_Return:
-            self.handle_button_click("=")
-        elif key == Qt.Key_Escape:
-            self.handle_button_click("C")
-        elif key == Qt.Key_Backspace:
-            self.handle_button_click("⌫")
+        
+        # 自动补全列表显示时优先处理方向键、回车和 Esc
+        if self.display.handle_completion_key(key):
+            return
+
+        # RPN 面板显示时，数字、运算符和回车作用于它的栈
+        if self.rpn_panel is not None and self.rpn_panel.isVisible() and self.rpn_panel.handle_key(event):
+            return
+        
+        # 数字、运算符、回车、Esc、退格等按命令表分发
+        command = self.commands.command_for_key(key)
+        if command is not None:
+            self.handle_button_click(command)
         else:
             super().keyPressEvent(event)
 
-    def resizeEvent(self, event):
-        """处理窗口大小改变事件"""
-        super().resizeEvent(event)
-
-        # 根据窗口大小动态调整字体
-        width = self.width()
-        height = self.height()
+    def restore_session(self):
+        """恢复上次退出时的标签页、显示屏、内存和模式"""
+        session = SessionSnapshot.load(self.SESSION_FILE)
+        if session is None:
+            return
+        if 0 <= session.tab_index < len(self.PANELS):
+            self.tab_widget.setCurrentIndex(session.tab_index)
+        self.apply_undo_state(session)
 
-        # 计算合适的字体大小
-        if width < 550 or height < 750:
-            font_size = 11
-        elif width < 650 or height < 850:
-            font_size = 12
-        else:
-            font_size = 13
+    def save_session(self):
+        SessionSnapshot(self.display.get_current_expression(), self.calculator_engine.memory_value,
+                        self.calculator_engine.angle_mode, self.get_current_base(),
+                        self.tab_widget.currentIndex()).save(self.SESSION_FILE)
 
-        # 更新按钮字体大小
-        self.update_button_font_size(font_size)
+    def closeEvent(self, event):
+        """退出时保存会话、撤销历史和尚未写入的结果缓存"""
+        self.save_session()
+        self.undo_history.save()
+        self.calculator_engine.result_cache.flush()
+        super().closeEvent(event)
 
-    def update_button_font_size(self, font_size):
-        """更新所有按钮的字体大小"""
-        style_template = """
-            QPushButton {{
-                font-size: {font_size}px;
-            }}
+    def resizeEvent(self, event):
+        """处理窗口大小改变事件：字号档位变化时（防抖后）更新按钮字号"""
+        super().resizeEvent(event)
+        
+        tier = self.compute_font_tier(self.width(), self.height())
+        if self.font_tier is None:
+            # 首次显示时立即应用，避免先以默认字号绘制
+            self.apply_font_tier(tier)
+        elif tier != self.font_tier:
+            self.pending_font_tier = tier
+            self.font_tier_timer.start()
+        else:
+            # 拖动过程中又回到了当前档位
+            self.pending_font_tier = None
+            self.font_tier_timer.stop()
+            
+    @classmethod
+    def compute_font_tier(cls, width, height):
+        """根据窗口大小计算字号档位"""
+        for tier, max_width, max_height in cls.FONT_TIERS[:-1]:
+            if width < max_width or height < max_height:
+                return tier
+        return cls.FONT_TIERS[-1][0]
+        
+    @Slot()
+    def apply_pending_font_tier(self):
+        """防抖结束后应用新的字号档位"""
+        if self.pending_font_tier is not None:
+            self.apply_font_tier(self.pending_font_tier)
+            self.pending_font_tier = None
+            
+    def apply_font_tier(self, tier):
         """
-
-        # 应用新的字体大小样式
-        additional_style = style_template.format(font_size=font_size)
-        current_style = self.styleSheet()
-
-        # 移除旧的字体大小设置，添加新的
-        import re
-        current_style = re.sub(r'QPushButton\s*\{\s*font-size:\s*\d+px;\s*\}', '', current_style)
-        self.setStyleSheet(current_style + additional_style)
+        应用字号档位
+        
+        各档位的字号由样式表中的 QMainWindow[fontTier=...] 规则给出，
+        这里只修改窗口属性并重新 polish 按钮，不重写样式表
+        """
+        if tier == self.font_tier:
+            return
+        self.font_tier = tier
+        self.setProperty("fontTier", tier)
+        for button in self.findChildren(QPushButton):
+            style = button.style()
+            style.unpolish(button)
+            style.polish(button)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+矩阵模式面板 - 输入矩阵和线性代数函数的按钮，以及显示矩阵结果的表格
+表格通过模型直接读取结果数组，只为当前可见的单元格格式化文本，
+行高、列宽固定，不需要遍历全部单元格，大矩阵也能即时显示和滚动
+"""
+
+from PySide6.QtWidgets import QVBoxLayout, QGridLayout, QWidget, QLabel, QTableView, QHeaderView
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from .button_panel import ButtonPanel
+
+
+class MatrixModel(QAbstractTableModel):
+    """矩阵结果的表格模型（向量显示为一列）"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.matrix = None
+        self.format_number = str
+
+    def set_matrix(self, matrix, format_number):
+        """
+        Args:
+            matrix: NumPy 数组（一维或二维）
+            format_number: 格式化单个元素的函数
+        """
+        self.beginResetModel()
+        self.matrix = matrix.reshape(-1, 1) if matrix.ndim == 1 else matrix
+        self.format_number = format_number
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.matrix is None:
+            return 0
+        return self.matrix.shape[0]
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.matrix is None:
+            return 0
+        return self.matrix.shape[1]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self.format_number(self.matrix[index.row(), index.column()].item())
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            return str(section + 1)
+        return None
+
+
+class MatrixPanel(ButtonPanel):
+    """矩阵模式面板"""
+
+    # 表格的行高和列宽（固定，不按内容计算）
+    ROW_HEIGHT = 24
+    COLUMN_WIDTH = 120
+
+    def __init__(self):
+        super().__init__()
+        self.create_buttons()
+
+    def init_ui(self):
+        """上方是结果表格，下方是按钮"""
+        outer = QVBoxLayout(self)
+        outer.setContentsMargins(8, 8, 8, 8)
+        outer.setSpacing(6)
+
+        self.shape_label = QLabel("矩阵结果显示在这里")
+        self.shape_label.setObjectName("matrixShape")
+        outer.addWidget(self.shape_label)
+
+        self.model = MatrixModel(self)
+        self.table = QTableView()
+        self.table.setObjectName("matrixView")
+        self.table.setModel(self.model)
+        for header, size in ((self.table.verticalHeader(), self.ROW_HEIGHT),
+                             (self.table.horizontalHeader(), self.COLUMN_WIDTH)):
+            header.setSectionResizeMode(QHeaderView.Fixed)
+            header.setDefaultSectionSize(size)
+        self.table.setHorizontalScrollMode(QTableView.ScrollPerPixel)
+        self.table.setVerticalScrollMode(QTableView.ScrollPerPixel)
+        self.table.setMinimumHeight(120)
+        outer.addWidget(self.table, 1)
+
+        buttons = QWidget()
+        self.layout = QGridLayout(buttons)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+        self.layout.setSpacing(6)
+        outer.addWidget(buttons)
+
+    def create_buttons(self):
+        """创建矩阵模式的所有按钮"""
+
+        # 第一行：矩阵字面量（[1, 2; 3, 4]，逗号分隔元素，分号分隔行）
+        self.create_button("[", 0, 0, button_type="function")
+        self.create_button("]", 0, 1, button_type="function")
+        self.create_button(",", 0, 2, button_type="function")
+        self.create_button(";", 0, 3, button_type="function")
+        self.create_button("(", 0, 4, button_type="function")
+        self.create_button(")", 0, 5, button_type="function")
+
+        # 第二行：线性代数函数
+        self.create_button("det", 1, 0, button_type="function")   # 行列式
+        self.create_button("inv", 1, 1, button_type="function")   # 逆矩阵
+        self.create_button("Aᵀ", 1, 2, button_type="function")    # 转置
+        self.create_button("eig", 1, 3, button_type="function")   # 特征值
+        self.create_button("solve", 1, 4, button_type="function") # 解方程组
+        self.create_button("@", 1, 5, button_type="operator")     # 矩阵乘法
+
+        # 第三至五行：数字和运算符
+        self.create_button("7", 2, 0)
+        self.create_button("8", 2, 1)
+        self.create_button("9", 2, 2)
+        self.create_button("÷", 2, 3, button_type="operator")
+        self.create_button("C", 2, 4, button_type="function")
+        self.create_button("⌫", 2, 5, button_type="function")
+
+        self.create_button("4", 3, 0)
+        self.create_button("5", 3, 1)
+        self.create_button("6", 3, 2)
+        self.create_button("×", 3, 3, button_type="operator")
+        self.create_button("-", 3, 4, button_type="operator")
+        self.create_button("+", 3, 5, button_type="operator")
+
+        self.create_button("1", 4, 0)
+        self.create_button("2", 4, 1)
+        self.create_button("3", 4, 2)
+        self.create_button("0", 4, 3)
+        self.create_button(".", 4, 4)
+        self.create_button("=", 4, 5, button_type="special")
+
+        for i in range(6):
+            self.layout.setColumnStretch(i, 1)
+
+    def set_matrix(self, matrix, format_number):
+        """显示矩阵结果"""
+        self.model.set_matrix(matrix, format_number)
+        if matrix.ndim == 1:
+            self.shape_label.setText(f"{matrix.shape[0]} 维向量")
+        else:
+            self.shape_label.setText(f"{matrix.shape[0]}×{matrix.shape[1]} 矩阵")
+        self.table.scrollToTop()
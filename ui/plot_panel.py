@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+绘图面板 - 绘制一个或多个 f(x) 的函数图像
+x 轴按当前缩放级别划分为固定像素宽的图块，每条曲线的每个图块只采样一次并缓存为 QPainterPath
+（数据坐标），绘制时用视图变换映射到屏幕：平移只需采样新露出的图块，缩放回到用过的级别时直接复用
+"""
+
+import math
+from collections import OrderedDict
+
+import numpy as np
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLineEdit
+from PySide6.QtCore import Qt, QPointF, QTimer, Property, Slot
+from PySide6.QtGui import QColor, QPainter, QPainterPath, QPen, QPolygonF, QTransform
+
+from core.function_sampler import compile_function, sample
+
+
+class PlotCurve:
+    """一条曲线及其按图块缓存的路径"""
+
+    # 每个图块的像素宽度（按当前级别，实际宽度在 1~2 倍之间）
+    TILE_PIXELS = 256
+    # 每个图块初始均匀采样的区间数
+    TILE_SAMPLES = 128
+    # y 方向分带的像素高度：路径中超出当前带上下一带的值被截断
+    BAND_PIXELS = 1 << 16
+    # 每条曲线最多缓存的图块数
+    CACHE_SIZE = 256
+
+    def __init__(self, expression, function, color):
+        self.expression = expression
+        self.function = function
+        self.color = QColor(color)
+        self.tiles = OrderedDict()  # (x 级别, y 级别, y 分带, 图块号) -> QPainterPath
+
+    def path(self, level_x, level_y, band, tile):
+        """获取图块的路径，未缓存时采样并生成"""
+        key = (level_x, level_y, band, tile)
+        path = self.tiles.get(key)
+        if path is not None:
+            self.tiles.move_to_end(key)
+            return path
+
+        tile_width = math.ldexp(self.TILE_PIXELS, level_x)
+        band_height = math.ldexp(self.BAND_PIXELS, level_y)
+        xs, ys = sample(self.function, tile * tile_width, (tile + 1) * tile_width, self.TILE_SAMPLES,
+                        tolerance=math.ldexp(0.5, level_y),
+                        clip=((band - 1) * band_height, (band + 2) * band_height))
+        path = self.build_path(xs, ys)
+        self.tiles[key] = path
+        while len(self.tiles) > self.CACHE_SIZE:
+            self.tiles.popitem(last=False)
+        return path
+
+    @staticmethod
+    def build_path(xs, ys):
+        """把采样点连成路径，y 为 NaN 处断开"""
+        path = QPainterPath()
+        valid = ~np.isnan(ys)
+        # 各段连续有效点的起止下标
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], valid, [False])).astype(np.int8)))
+        for start, stop in zip(edges[::2], edges[1::2]):
+            if stop - start > 1:
+                path.addPolygon(QPolygonF([QPointF(x, y) for x, y in zip(xs[start:stop].tolist(),
+                                                                       ys[start:stop].tolist())]))
+        return path
+
+
+class PlotCanvas(QWidget):
+    """函数图像画布：拖动平移，滚轮缩放，双击恢复默认视图"""
+
+    # 曲线颜色（按顺序循环使用）
+    CURVE_COLORS = ["#4A90E2", "#E53E3E", "#2E9E5B", "#FF8C00", "#8E44AD", "#16A085"]
+    # 相邻网格线的最小间距（像素）
+    GRID_PIXELS = 80
+
+    def __init__(self, engine, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.curves = []
+        self.angle_mode = engine.angle_mode  # 曲线编译时的角度模式
+        self.x_min, self.x_max, self.y_min, self.y_max = -10.0, 10.0, -10.0, 10.0
+        self.view_initialized = False
+        self.drag_origin = None
+        # 颜色可由样式表通过 qproperty-backgroundColor 等设置
+        self.background_color = QColor("#FFFFFF")
+        self.grid_color = QColor("#E9ECEF")
+        self.axis_color = QColor("#6C757D")
+
+        self.setObjectName("plotCanvas")
+        self.setMinimumSize(300, 240)
+        self.setCursor(Qt.OpenHandCursor)
+
+    def get_background_color(self):
+        return self.background_color
+
+    def set_background_color(self, color):
+        self.background_color = QColor(color)
+        self.update()
+
+    def get_grid_color(self):
+        return self.grid_color
+
+    def set_grid_color(self, color):
+        self.grid_color = QColor(color)
+        self.update()
+
+    def get_axis_color(self):
+        return self.axis_color
+
+    def set_axis_color(self, color):
+        self.axis_color = QColor(color)
+        self.update()
+
+    backgroundColor = Property(QColor, get_background_color, set_background_color)
+    gridColor = Property(QColor, get_grid_color, set_grid_color)
+    axisColor = Property(QColor, get_axis_color, set_axis_color)
+
+    def set_expressions(self, expressions):
+        """
+        设置要绘制的函数（未改变的曲线保留已缓存的图块）
+
+        Returns:
+            [(表达式, 错误信息)]，全部正确时为空列表
+        """
+        existing = {curve.expression: curve for curve in self.curves}
+        curves = []
+        errors = []
+        for expression in expressions:
+            curve = existing.get(expression)
+            if curve is None:
+                try:
+                    function = compile_function(self.engine, expression)
+                except SyntaxError:
+                    errors.append((expression, "表达式语法错误"))
+                    continue
+                except NameError as e:
+                    errors.append((expression, f"未定义的变量 {e}"))
+                    continue
+                curve = PlotCurve(expression, function, "#000000")
+            curve.color = QColor(self.CURVE_COLORS[len(curves) % len(self.CURVE_COLORS)])
+            curves.append(curve)
+        self.curves = curves
+        self.update()
+        return errors
+
+    def reset_view(self):
+        """恢复默认视图：原点居中（角度模式下 x 范围为 ±360°，弧度模式下为 ±10）"""
+        x_half = 360.0 if self.engine.angle_mode == "deg" else 10.0
+        y_half = 10.0 * self.height() / max(self.width(), 1)
+        self.set_view(-x_half, x_half, -y_half, y_half)
+
+    def set_view(self, x_min, x_max, y_min, y_max):
+        """设置可见范围"""
+        self.x_min, self.x_max, self.y_min, self.y_max = x_min, x_max, y_min, y_max
+        self.view_initialized = True
+        self.update()
+
+    def levels(self):
+        """当前的 x、y 缩放级别：每像素对应的数据单位取以 2 为底的对数向下取整"""
+        x_level = math.floor(math.log2((self.x_max - self.x_min) / max(self.width(), 1)))
+        y_level = math.floor(math.log2((self.y_max - self.y_min) / max(self.height(), 1)))
+        return x_level, y_level
+
+    def transform(self):
+        """数据坐标到像素坐标的变换"""
+        scale_x = self.width() / (self.x_max - self.x_min)
+        scale_y = self.height() / (self.y_max - self.y_min)
+        return QTransform(scale_x, 0, 0, -scale_y, -self.x_min * scale_x, self.y_max * scale_y)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.angle_mode != self.engine.angle_mode:
+            # 在其他面板切换了角度模式：按新模式重新编译曲线并恢复默认视图
+            self.angle_mode = self.engine.angle_mode
+            expressions = [curve.expression for curve in self.curves]
+            self.curves = []
+            self.set_expressions(expressions)
+            self.view_initialized = False
+        if not self.view_initialized:
+            self.reset_view()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.background_color)
+        self.paint_grid(painter)
+
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setTransform(self.transform())
+        level_x, level_y = self.levels()
+        tile_width = math.ldexp(PlotCurve.TILE_PIXELS, level_x)
+        band = math.floor((self.y_min + self.y_max) / 2 / math.ldexp(PlotCurve.BAND_PIXELS, level_y))
+        first_tile = math.floor(self.x_min / tile_width)
+        last_tile = math.floor(self.x_max / tile_width)
+        for curve in self.curves:
+            pen = QPen(curve.color, 2)
+            pen.setCosmetic(True)  # 线宽不随视图变换缩放
+            painter.setPen(pen)
+            for tile in range(first_tile, last_tile + 1):
+                painter.drawPath(curve.path(level_x, level_y, band, tile))
+
+    def paint_grid(self, painter):
+        """绘制网格线、坐标轴和刻度"""
+        transform = self.transform()
+        width, height = self.width(), self.height()
+        metrics = painter.fontMetrics()
+        origin = transform.map(QPointF(0, 0))
+        # 坐标轴不在可见范围内时，刻度贴着边缘显示
+        axis_x = min(max(origin.x(), 2), width - 2)
+        axis_y = min(max(origin.y(), 2), height - 2)
+
+        x_step = self.grid_step(self.x_max - self.x_min, width)
+        y_step = self.grid_step(self.y_max - self.y_min, height)
+        grid_pen = QPen(self.grid_color, 1)
+        text_pen = QPen(self.axis_color, 1)
+
+        value = math.ceil(self.x_min / x_step) * x_step
+        while value <= self.x_max:
+            x = transform.map(QPointF(value, 0)).x()
+            painter.setPen(grid_pen)
+            painter.drawLine(QPointF(x, 0), QPointF(x, height))
+            if abs(value) > x_step / 2:
+                painter.setPen(text_pen)
+                label_y = axis_y + metrics.ascent() + 2 if axis_y < height - metrics.height() else axis_y - 4
+                painter.drawText(QPointF(x + 2, label_y), f"{value:g}")
+            value += x_step
+
+        value = math.ceil(self.y_min / y_step) * y_step
+        while value <= self.y_max:
+            y = transform.map(QPointF(0, value)).y()
+            painter.setPen(grid_pen)
+            painter.drawLine(QPointF(0, y), QPointF(width, y))
+            if abs(value) > y_step / 2:
+                painter.setPen(text_pen)
+                label = f"{value:g}"
+                label_x = axis_x + 4 if axis_x < width - metrics.horizontalAdvance(label) - 8 \
+                    else axis_x - metrics.horizontalAdvance(label) - 4
+                painter.drawText(QPointF(label_x, y - 2), label)
+            value += y_step
+
+        painter.setPen(QPen(self.axis_color, 1))
+        painter.drawLine(QPointF(axis_x, 0), QPointF(axis_x, height))
+        painter.drawLine(QPointF(0, axis_y), QPointF(width, axis_y))
+
+    def grid_step(self, span, pixels):
+        """网格间距：1、2、5 乘以 10 的幂，且不小于 GRID_PIXELS 像素"""
+        raw = span * self.GRID_PIXELS / max(pixels, 1)
+        magnitude = 10 ** math.floor(math.log10(raw))
+        for factor in (1, 2, 5, 10):
+            if factor * magnitude >= raw:
+                return factor * magnitude
+        return 10 * magnitude
+
+    def pan(self, dx, dy):
+        """按像素平移视图"""
+        x_shift = dx * (self.x_max - self.x_min) / max(self.width(), 1)
+        y_shift = dy * (self.y_max - self.y_min) / max(self.height(), 1)
+        self.set_view(self.x_min - x_shift, self.x_max - x_shift,
+                      self.y_min + y_shift, self.y_max + y_shift)
+
+    def zoom(self, factor, anchor):
+        """以像素坐标 anchor 为中心缩放视图，factor > 1 为放大"""
+        point = self.transform().inverted()[0].map(QPointF(anchor))
+        self.set_view(point.x() - (point.x() - self.x_min) / factor,
+                      point.x() + (self.x_max - point.x()) / factor,
+                      point.y() - (point.y() - self.y_min) / factor,
+                      point.y() + (self.y_max - point.y()) / factor)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.drag_origin = event.position()
+            self.setCursor(Qt.ClosedHandCursor)
+
+    def mouseMoveEvent(self, event):
+        if self.drag_origin is not None:
+            delta = event.position() - self.drag_origin
+            self.drag_origin = event.position()
+            self.pan(delta.x(), delta.y())
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.drag_origin = None
+            self.setCursor(Qt.OpenHandCursor)
+
+    def mouseDoubleClickEvent(self, event):
+        self.reset_view()
+
+    def wheelEvent(self, event):
+        self.zoom(1.2 ** (event.angleDelta().y() / 120), event.position())
+
+
+class PlotPanel(QWidget):
+    """绘图面板"""
+
+    # 输入停止多久后重新绘制（毫秒）
+    INPUT_DEBOUNCE_MS = 250
+
+    def __init__(self, engine):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(6)
+
+        self.input_edit = QLineEdit()
+        self.input_edit.setObjectName("plotInput")
+        self.input_edit.setPlaceholderText("输入含 x 的函数，多个函数用分号分隔，例如：sin(x); x²/10")
+        layout.addWidget(self.input_edit)
+
+        self.canvas = PlotCanvas(engine)
+        layout.addWidget(self.canvas, 1)
+
+        self.input_timer = QTimer(self)
+        self.input_timer.setSingleShot(True)
+        self.input_timer.setInterval(self.INPUT_DEBOUNCE_MS)
+        self.input_timer.timeout.connect(self.update_curves)
+        self.input_edit.textChanged.connect(self.input_timer.start)
+        self.input_edit.returnPressed.connect(self.update_curves)
+
+    def set_expressions(self, text):
+        """设置输入框中的函数并立即绘制"""
+        self.input_edit.setText(text)
+        self.update_curves()
+
+    @Slot()
+    def update_curves(self):
+        """按输入框的内容更新曲线，出错的函数标记在输入框上"""
+        self.input_timer.stop()
+        expressions = [part.strip() for part in self.input_edit.text().split(";") if part.strip()]
+        errors = self.canvas.set_expressions(expressions)
+        state = "error" if errors else "normal"
+        self.input_edit.setToolTip("\n".join(f"{expression}: {error}" for expression, error in errors))
+        if self.input_edit.property("inputState") != state:
+            self.input_edit.setProperty("inputState", state)
+            style = self.input_edit.style()
+            style.unpolish(self.input_edit)
+            style.polish(self.input_edit)
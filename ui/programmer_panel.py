@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 程序员模式面板 - 程序员计算器功能
-包含进制转换、位运算等程序开发相关功能
+包含进制转换、位运算、数论函数等程序开发相关功能
 """
 
 from .button_panel import ButtonPanel
@@ -11,9 +11,22 @@ from .button_panel import ButtonPanel
 class ProgrammerPanel(ButtonPanel):
     """程序员计算器面板"""
     
+    # 各进制可用的数字
+    BASE_DIGITS = {
+        16: "0123456789ABCDEF",
+        10: "0123456789",
+        8: "01234567",
+        2: "01",
+    }
+    
+    # 各进制对应的进制按钮
+    BASE_BUTTONS = {16: "HEX", 10: "DEC", 8: "OCT", 2: "BIN"}
+    
     def __init__(self):
-        super().__init__()
         self.current_base = 10  # 当前进制：10进制
+        # 数字按钮（按数字保存；十六进制字母的命令名为 HEX_A 等，与清除键 C 区分）
+        self.digit_buttons = {}
+        super().__init__()
         self.create_buttons()
         
     def create_buttons(self):
@@ -34,14 +47,14 @@ class ProgrammerPanel(ButtonPanel):
         self.create_button("M+", 1, 4, button_type="function")    # 内存加
         
         # 第三行：十六进制字母和位运算
-        self.create_button("A", 2, 0, button_type="normal")      # 十六进制A
-        self.create_button("B", 2, 1, button_type="normal")      # 十六进制B
-        self.create_button("C", 2, 2, button_type="normal")      # 十六进制C
-        self.create_button("D", 2, 3, button_type="normal")      # 十六进制D
-        self.create_button("E", 2, 4, button_type="normal")      # 十六进制E
+        self.create_digit_button("A", 2, 0)                      # 十六进制A
+        self.create_digit_button("B", 2, 1)                      # 十六进制B
+        self.create_digit_button("C", 2, 2)                      # 十六进制C
+        self.create_digit_button("D", 2, 3)                      # 十六进制D
+        self.create_digit_button("E", 2, 4)                      # 十六进制E
         
         # 第四行：十六进制F和位运算
-        self.create_button("F", 3, 0, button_type="normal")      # 十六进制F
+        self.create_digit_button("F", 3, 0)                      # 十六进制F
         self.create_button("AND", 3, 1, button_type="operator")  # 按位与
         self.create_button("OR", 3, 2, button_type="operator")   # 按位或
         self.create_button("XOR", 3, 3, button_type="operator")  # 按位异或
@@ -62,18 +75,30 @@ class ProgrammerPanel(ButtonPanel):
         self.create_button("=", 5, 4, button_type="special")     # 等号
         
         # 第七行：数字9、8、7、6、5
-        self.create_button("9", 6, 0, button_type="normal")      # 数字9
-        self.create_button("8", 6, 1, button_type="normal")      # 数字8
-        self.create_button("7", 6, 2, button_type="normal")      # 数字7
-        self.create_button("6", 6, 3, button_type="normal")      # 数字6
-        self.create_button("5", 6, 4, button_type="normal")      # 数字5
+        self.create_digit_button("9", 6, 0)                      # 数字9
+        self.create_digit_button("8", 6, 1)                      # 数字8
+        self.create_digit_button("7", 6, 2)                      # 数字7
+        self.create_digit_button("6", 6, 3)                      # 数字6
+        self.create_digit_button("5", 6, 4)                      # 数字5
         
         # 第八行：数字4、3、2、1、0
-        self.create_button("4", 7, 0, button_type="normal")      # 数字4
-        self.create_button("3", 7, 1, button_type="normal")      # 数字3
-        self.create_button("2", 7, 2, button_type="normal")      # 数字2
-        self.create_button("1", 7, 3, button_type="normal")      # 数字1
-        self.create_button("0", 7, 4, button_type="normal")      # 数字0
+        self.create_digit_button("4", 7, 0)                      # 数字4
+        self.create_digit_button("3", 7, 1)                      # 数字3
+        self.create_digit_button("2", 7, 2)                      # 数字2
+        self.create_digit_button("1", 7, 3)                      # 数字1
+        self.create_digit_button("0", 7, 4)                      # 数字0
+        
+        # 第九、十行：数论函数
+        self.create_button("isprime", 8, 0, button_type="function")  # 素性检验
+        self.create_button("factor", 8, 1, button_type="function")   # 因数分解
+        self.create_button("gcd", 8, 2, button_type="function")      # 最大公约数
+        self.create_button("lcm", 8, 3, button_type="function")      # 最小公倍数
+        self.create_button("mod", 8, 4, button_type="operator")      # 取模
+        self.create_button("modpow", 9, 0, button_type="function")   # 模幂
+        self.create_button("modinv", 9, 1, button_type="function")   # 模逆
+        self.create_button(",", 9, 2, button_type="function")        # 参数分隔符
+        self.create_button("(", 9, 3, button_type="function")        # 左括号
+        self.create_button(")", 9, 4, button_type="function")        # 右括号
         
         # 初始化时设置十六进制模式，这样所有按钮都可用
         self.set_base_mode(16)
@@ -82,141 +107,29 @@ class ProgrammerPanel(ButtonPanel):
         for i in range(5):
             self.layout.setColumnStretch(i, 1)
             self.layout.setColumnMinimumWidth(i, 80)
-        for i in range(8):
+        for i in range(10):
             self.layout.setRowStretch(i, 1)
-            self.layout.setRowMinimumHeight(i, 60)
+            self.layout.setRowMinimumHeight(i, 48)
+            
+    def create_digit_button(self, digit, row, col):
+        """创建数字按钮（0-9、A-F）"""
+        command = f"HEX_{digit}" if digit.isalpha() else digit
+        button = self.create_button(digit, row, col, button_type="normal", command=command)
+        self.digit_buttons[digit] = button
+        return button
             
     def set_base_mode(self, base):
-        """设置进制模式"""
+        """设置进制模式：高亮进制按钮，当前进制下不可用的数字变灰（仍可点击）"""
         self.current_base = base
         
-        # 重置所有进制按钮样式
-        for base_btn in ["HEX", "DEC", "OCT", "BIN"]:
-            button = self.get_button(base_btn)
+        for button_base, name in self.BASE_BUTTONS.items():
+            button = self.get_button(name)
             if button:
-                self.apply_button_style(button, "function")
+                self.set_button_state(button, "activeBase", button_base == base)
         
-        # 高亮当前进制按钮
-        if base == 16:
-            self.highlight_base_button("HEX")
-            self.enable_hex_buttons(True)
-        elif base == 10:
-            self.highlight_base_button("DEC")
-            self.enable_hex_buttons(False)
-        elif base == 8:
-            self.highlight_base_button("OCT")
-            self.enable_hex_buttons(False)
-            self.enable_octal_buttons()
-        elif base == 2:
-            self.highlight_base_button("BIN")
-            self.enable_hex_buttons(False)
-            self.enable_binary_buttons()
-            
-    def highlight_base_button(self, base_name):
-        """高亮进制按钮"""
-        button = self.get_button(base_name)
-        if button:
-            button.setStyleSheet("""
-                QPushButton {
-                    background-color: #4A90E2;
-                    color: #FFFFFF;
-                    border: 2px solid #357ABD;
-                    border-radius: 6px;
-                    font-size: 14px;
-                    font-weight: bold;
-                    padding: 8px;
-                    margin: 1px;
-                }
-            """)
-            
-    def enable_hex_buttons(self, enabled):
-        """启用/禁用十六进制字母按钮的视觉效果"""
-        hex_buttons = ["A", "B", "C", "D", "E", "F"]
-        for btn_text in hex_buttons:
-            button = self.get_button(btn_text)
-            if button:
-                if enabled:
-                    # 启用状态 - 正常样式
-                    self.apply_button_style(button, "normal")
-                else:
-                    # 禁用状态 - 灰色样式，但仍然可以点击
-                    button.setStyleSheet("""
-                        QPushButton {
-                            background-color: #F5F5F5;
-                            color: #AAAAAA;
-                            border: 2px solid #E0E0E0;
-                            border-radius: 8px;
-                            font-size: 13px;
-                            font-weight: bold;
-                            padding: 8px 6px;
-                            margin: 3px;
-                        }
-                        QPushButton:hover {
-                            background-color: #EEEEEE;
-                            border: 3px solid #CCCCCC;
-                        }
-                    """)
-            
-    def enable_octal_buttons(self):
-        """设置八进制按钮样式（0-7可用，8-9和A-F灰色）"""
-        # 设置8、9和十六进制字母为灰色样式
-        disabled_buttons = ["8", "9", "A", "B", "C", "D", "E", "F"]
-        for btn_text in disabled_buttons:
-            button = self.get_button(btn_text)
-            if button:
-                button.setStyleSheet("""
-                    QPushButton {
-                        background-color: #F5F5F5;
-                        color: #AAAAAA;
-                        border: 2px solid #E0E0E0;
-                        border-radius: 8px;
-                        font-size: 13px;
-                        font-weight: bold;
-                        padding: 8px 6px;
-                        margin: 3px;
-                    }
-                    QPushButton:hover {
-                        background-color: #EEEEEE;
-                        border: 3px solid #CCCCCC;
-                    }
-                """)
-        # 设置0-7为正常样式
-        enabled_buttons = ["0", "1", "2", "3", "4", "5", "6", "7"]
-        for btn_text in enabled_buttons:
-            button = self.get_button(btn_text)
-            if button:
-                self.apply_button_style(button, "normal")
-            
-    def enable_binary_buttons(self):
-        """设置二进制按钮样式（0-1可用，其他灰色）"""
-        # 设置2-9和十六进制字母为灰色样式
-        disabled_buttons = ["2", "3", "4", "5", "6", "7", "8", "9",
-                           "A", "B", "C", "D", "E", "F"]
-        for btn_text in disabled_buttons:
-            button = self.get_button(btn_text)
-            if button:
-                button.setStyleSheet("""
-                    QPushButton {
-                        background-color: #F5F5F5;
-                        color: #AAAAAA;
-                        border: 2px solid #E0E0E0;
-                        border-radius: 8px;
-                        font-size: 13px;
-                        font-weight: bold;
-                        padding: 8px 6px;
-                        margin: 3px;
-                    }
-                    QPushButton:hover {
-                        background-color: #EEEEEE;
-                        border: 3px solid #CCCCCC;
-                    }
-                """)
-        # 设置0-1为正常样式
-        enabled_buttons = ["0", "1"]
-        for btn_text in enabled_buttons:
-            button = self.get_button(btn_text)
-            if button:
-                self.apply_button_style(button, "normal")
+        digits = self.BASE_DIGITS[base]
+        for digit, button in self.digit_buttons.items():
+            self.set_button_state(button, "enabledInBase", digit in digits)
             
     def get_current_base(self):
         """获取当前进制"""
@@ -225,7 +138,7 @@ class ProgrammerPanel(ButtonPanel):
     def get_button_layout(self):
         """获取按钮布局信息"""
         return {
-            "rows": 8,
+            "rows": 10,
             "cols": 5,
             "buttons": list(self.buttons.keys()),
             "current_base": self.current_base
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RPN 模式面板 - 逆波兰计算：先输入数，再按运算键，运算立即作用于栈（见 core.rpn_stack）
+栈显示在只渲染可见行的表格中，第 1 行是栈顶；双击某一层把它（以等价的中缀表达式）送到显示屏；
+RPN 面板显示时，键盘输入的数字、运算符和回车由本面板处理
+"""
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableView, QHeaderView
+)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal, Slot
+
+from .button_panel import ButtonPanel
+from core.rpn_stack import RpnCalculator, EMPTY_STACK
+
+
+class StackModel(QAbstractTableModel):
+    """栈的表格模型：一列，第 0 行是栈顶，行号即层号"""
+
+    def __init__(self, format_item, parent=None):
+        """
+        Args:
+            format_item: 格式化栈中一个数的函数
+        """
+        super().__init__(parent)
+        self.format_item = format_item
+        self.stack = EMPTY_STACK
+        # 上次取数据的 (行号, 节点)：视图按行号递增取可见行的数据，从这里继续向下走，不必每行都从栈顶开始
+        self.cursor = (0, EMPTY_STACK)
+
+    def set_stack(self, stack):
+        self.beginResetModel()
+        self.stack = stack
+        self.cursor = (0, stack)
+        self.endResetModel()
+
+    def item(self, row):
+        """第 row 行（从栈顶数起）的数"""
+        start, node = self.cursor
+        if row < start:
+            start, node = 0, self.stack
+        for _ in range(row - start):
+            node = node.below
+        self.cursor = (row, node)
+        return node.item
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.stack)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.format_item(self.item(index.row()))
+        if role == Qt.ToolTipRole:
+            return self.item(index.row()).expression
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Vertical:
+            return str(section + 1)
+        return None
+
+
+class RpnKeypad(ButtonPanel):
+    """RPN 模式的按钮（点击由 RpnPanel 处理，不经过主窗口的命令表）"""
+
+    # 按钮的最小高度
+    BUTTON_HEIGHT = 36
+
+    def __init__(self):
+        super().__init__()
+        self.create_buttons()
+
+    def init_ui(self):
+        super().init_ui()
+        self.layout.setContentsMargins(0, 0, 0, 0)
+
+    def create_buttons(self):
+        """创建 RPN 模式的所有按钮"""
+
+        # 第一、二行：函数（与中缀计算共用函数表和角度模式）
+        self.create_button("sin", 0, 0, button_type="function")
+        self.create_button("cos", 0, 1, button_type="function")
+        self.create_button("tan", 0, 2, button_type="function")
+        self.create_button("√x", 0, 3, button_type="function")
+        self.create_button("x²", 0, 4, button_type="function")
+        self.create_button("xʸ", 0, 5, button_type="function")
+
+        self.create_button("ln", 1, 0, button_type="function")
+        self.create_button("log", 1, 1, button_type="function")
+        self.create_button("exp", 1, 2, button_type="function")
+        self.create_button("1/x", 1, 3, button_type="function")
+        self.create_button("n!", 1, 4, button_type="function")
+        self.create_button("π", 1, 5, button_type="function")
+
+        # 第三行：栈操作和撤销
+        self.create_button("SWAP", 2, 0, button_type="function")
+        self.create_button("DROP", 2, 1, button_type="function")
+        self.create_button("ROT", 2, 2, button_type="function")
+        self.create_button("DUP", 2, 3, button_type="function")
+        self.create_button("↶", 2, 4, button_type="function", command="UNDO")
+        self.create_button("↷", 2, 5, button_type="function", command="REDO")
+
+        # 第四至七行：数字和运算符
+        self.create_button("7", 3, 0)
+        self.create_button("8", 3, 1)
+        self.create_button("9", 3, 2)
+        self.create_button("÷", 3, 3, button_type="operator")
+        self.create_button("C", 3, 4, button_type="function")
+        self.create_button("⌫", 3, 5, button_type="function")
+
+        self.create_button("4", 4, 0)
+        self.create_button("5", 4, 1)
+        self.create_button("6", 4, 2)
+        self.create_button("×", 4, 3, button_type="operator")
+        self.create_button("CE", 4, 4, button_type="function")
+        self.create_button("DEG", 4, 5, button_type="function", command="ANGLE")
+
+        self.create_button("1", 5, 0)
+        self.create_button("2", 5, 1)
+        self.create_button("3", 5, 2)
+        self.create_button("-", 5, 3, button_type="operator")
+        self.create_button("±", 5, 4, button_type="function")
+        self.create_button("mod", 5, 5, button_type="function")
+
+        self.create_button("0", 6, 0)
+        self.create_button(".", 6, 1)
+        self.create_button("ENTER", 6, 2, col_span=2, button_type="special")
+        self.create_button("+", 6, 4, col_span=2, button_type="operator")
+
+        # 按钮比其他面板矮一些，给栈留出位置
+        for button in self.buttons.values():
+            button.setMinimumHeight(self.BUTTON_HEIGHT)
+        for i in range(6):
+            self.layout.setColumnStretch(i, 1)
+        for i in range(7):
+            self.layout.setRowStretch(i, 1)
+            self.layout.setRowMinimumHeight(i, self.BUTTON_HEIGHT)
+
+
+class RpnPanel(QWidget):
+    """RPN 模式面板"""
+
+    # 栈表格的行高（固定，不按内容计算）
+    ROW_HEIGHT = 26
+
+    # 键盘按键 -> 命令名（数字和小数点直接输入）
+    KEY_COMMANDS = {
+        Qt.Key_Enter: "ENTER", Qt.Key_Return: "ENTER",
+        Qt.Key_Plus: "+", Qt.Key_Minus: "-", Qt.Key_Asterisk: "×", Qt.Key_Slash: "÷",
+        Qt.Key_AsciiCircum: "xʸ", Qt.Key_Percent: "mod",
+        Qt.Key_Backspace: "⌫", Qt.Key_Escape: "C", Qt.Key_Delete: "DROP",
+    }
+
+    # 信号定义
+    result_published = Signal(str, object)  # 把栈中的数发布到显示屏（中缀表达式, 值）
+
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+        self.calculator = RpnCalculator(engine, self)
+
+        self.init_ui()
+        self.connect_signals()
+        self.update_view()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(6)
+
+        entry_row = QHBoxLayout()
+        self.entry_label = QLabel()
+        self.entry_label.setObjectName("rpnEntry")
+        self.entry_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        entry_row.addWidget(self.entry_label, 1)
+        self.publish_button = QPushButton("送到显示屏")
+        self.publish_button.setToolTip("把栈顶的数送到显示屏（双击某一层送出那一层）")
+        entry_row.addWidget(self.publish_button)
+        layout.addLayout(entry_row)
+
+        self.model = StackModel(self.calculator.format_item, self)
+        self.table = QTableView()
+        self.table.setObjectName("rpnStack")
+        self.table.setModel(self.model)
+        self.table.horizontalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(self.ROW_HEIGHT)
+        self.table.setVerticalScrollMode(QTableView.ScrollPerPixel)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        # 不接收焦点：键盘输入的数字交给面板，不触发表格的按键搜索
+        self.table.setFocusPolicy(Qt.NoFocus)
+        self.table.setMinimumHeight(3 * self.ROW_HEIGHT)
+        layout.addWidget(self.table, 1)
+
+        self.status_label = QLabel()
+        self.status_label.setObjectName("rpnStatus")
+        layout.addWidget(self.status_label)
+
+        self.keypad = RpnKeypad()
+        layout.addWidget(self.keypad, 2)
+
+    def connect_signals(self):
+        self.calculator.stack_changed.connect(self.update_view)
+        self.calculator.error_occurred.connect(self.show_error)
+        self.keypad.button_clicked.connect(self.handle_command)
+        self.publish_button.clicked.connect(self.publish_top)
+        self.table.doubleClicked.connect(self.publish_level)
+
+    @Slot(str)
+    def handle_command(self, command):
+        """执行按钮或按键对应的命令"""
+        calculator = self.calculator
+        actions = {
+            "ENTER": calculator.enter, "⌫": calculator.backspace, "CE": calculator.clear_entry,
+            "C": calculator.clear, "SWAP": calculator.swap, "DROP": calculator.drop,
+            "ROT": calculator.rotate, "DUP": calculator.dup, "UNDO": calculator.undo,
+            "REDO": calculator.redo, "±": calculator.change_sign, "ANGLE": self.toggle_angle_mode,
+        }
+        if command in actions:
+            actions[command]()
+        elif command.isdigit() or command == ".":
+            calculator.type_text(command)
+        else:
+            calculator.operate(command)
+
+    def handle_key(self, event):
+        """
+        处理键盘输入（RPN 面板显示时由主窗口转交）
+
+        Returns:
+            是否已处理
+        """
+        key = event.key()
+        if event.modifiers() & Qt.ControlModifier:
+            return False  # 撤销、重做等快捷键由主窗口的菜单项转交（见 MainWindow.undo）
+        text = event.text()
+        if text and (text.isdigit() or text == "."):
+            self.handle_command(text)
+            return True
+        if key in self.KEY_COMMANDS:
+            self.handle_command(self.KEY_COMMANDS[key])
+            return True
+        return False
+
+    @Slot()
+    def toggle_angle_mode(self):
+        """切换角度模式（与中缀计算共用）"""
+        self.engine.set_angle_mode("rad" if self.engine.angle_mode == "deg" else "deg")
+        self.update_view()
+
+    @Slot()
+    def update_view(self):
+        calculator = self.calculator
+        self.model.set_stack(calculator.stack)
+        self.entry_label.setText(calculator.entry or " ")
+        self.publish_button.setEnabled(len(calculator.stack) > 0)
+        self.keypad.get_button("UNDO").setEnabled(calculator.can_undo())
+        self.keypad.get_button("REDO").setEnabled(calculator.can_redo())
+        angle = self.engine.angle_mode
+        self.keypad.get_button("ANGLE").setText(angle.upper())
+        self.status_label.setText(f"栈深 {len(calculator.stack)}，角度模式：{'度' if angle == 'deg' else '弧度'}")
+
+    @Slot(str)
+    def show_error(self, message):
+        self.status_label.setText(message)
+
+    @Slot()
+    def publish_top(self):
+        self.publish_level(self.model.index(0, 0))
+
+    @Slot(QModelIndex)
+    def publish_level(self, index):
+        """把某一层的数送到显示屏，表达式为得到它的中缀表达式（可再次计算）"""
+        if not index.isValid():
+            return
+        item = self.model.item(index.row())
+        self.result_published.emit(item.expression, item.value)
@@ -97,19 +97,26 @@ class ScientificPanel(ButtonPanel):
         self.create_button("=", 9, 3, button_type="special")     # 等号
         self.create_button("Rand", 9, 4, button_type="function") # 随机数
         self.create_button("Ave", 9, 5, button_type="function")  # 平均值
+
+        # 第十一行：数值求解（参数用逗号分隔，如 solve(x²-2, x, 0, 2)）
+        self.create_button("solve", 10, 0, button_type="function")  # 求根
+        self.create_button("∫", 10, 1, button_type="function")      # 定积分
+        self.create_button("d/dx", 10, 2, button_type="function")   # 求导
+        self.create_button("x", 10, 3, button_type="function")      # 自变量
+        self.create_button(",", 10, 4, col_span=2, button_type="function")  # 参数分隔符
         
         # 调整布局比例，确保按钮均匀分布
         for i in range(6):
             self.layout.setColumnStretch(i, 1)
             self.layout.setColumnMinimumWidth(i, 75)
-        for i in range(10):
+        for i in range(11):
             self.layout.setRowStretch(i, 1)
             self.layout.setRowMinimumHeight(i, 55)
             
     def get_button_layout(self):
         """获取按钮布局信息"""
         return {
-            "rows": 10,
+            "rows": 11,
             "cols": 6,
             "buttons": list(self.buttons.keys())
         }
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+统计面板 - 对文件或粘贴的数据中的一列数值做统计
+统计在工作线程中流式进行（见 core.streaming_stats），显示进度并可随时取消；
+双击某个统计量可把它像普通计算结果一样送到显示屏并记入历史
+"""
+
+import math
+import os
+import threading
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QComboBox, QLabel, QPlainTextEdit,
+    QProgressBar, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QFileDialog
+)
+from PySide6.QtCore import Qt, QRectF, QThreadPool, QTimer, Property, Signal, Slot
+from PySide6.QtGui import QColor, QPainter
+
+from core.streaming_stats import StatisticsTask, detect_layout, read_first_line
+
+
+class HistogramView(QWidget):
+    """直方图"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.bins = []  # [(下界, 上界, 计数)]
+        # 颜色可由样式表通过 qproperty-barColor / qproperty-axisColor 设置
+        self.bar_color = QColor("#4A90E2")
+        self.axis_color = QColor("#6C757D")
+        self.setObjectName("statisticsHistogram")
+        self.setMinimumHeight(90)
+        self.setMaximumHeight(140)
+
+    def get_bar_color(self):
+        return self.bar_color
+
+    def set_bar_color(self, color):
+        self.bar_color = QColor(color)
+        self.update()
+
+    def get_axis_color(self):
+        return self.axis_color
+
+    def set_axis_color(self, color):
+        self.axis_color = QColor(color)
+        self.update()
+
+    barColor = Property(QColor, get_bar_color, set_bar_color)
+    axisColor = Property(QColor, get_axis_color, set_axis_color)
+
+    def set_bins(self, bins):
+        self.bins = bins
+        self.setToolTip("\n".join(f"[{low:g}, {high:g}): {count}" for low, high, count in bins))
+        self.update()
+
+    def paintEvent(self, event):
+        if not self.bins:
+            return
+        painter = QPainter(self)
+        metrics = painter.fontMetrics()
+        label_height = metrics.height() + 2
+        height = self.height() - label_height
+        width = self.width() / len(self.bins)
+        peak = max(count for _, _, count in self.bins) or 1
+        gap = min(1.0, width / 4)  # 分箱很多（如 256 个字节值）时缩小间隔，柱子不会细得看不见
+        for index, (_, _, count) in enumerate(self.bins):
+            bar = height * count / peak
+            painter.fillRect(QRectF(index * width + gap, height - bar, width - 2 * gap, bar), self.bar_color)
+
+        painter.setPen(self.axis_color)
+        painter.drawLine(0, height, self.width(), height)
+        low, high = self.bins[0][0], self.bins[-1][1]
+        painter.drawText(QRectF(0, height, self.width(), label_height), Qt.AlignLeft | Qt.AlignVCenter, f"{low:g}")
+        painter.drawText(QRectF(0, height, self.width(), label_height), Qt.AlignRight | Qt.AlignVCenter, f"{high:g}")
+
+
+class StatisticsPanel(QWidget):
+    """统计面板"""
+
+    # 粘贴的文本停止变化多久后重新统计（毫秒）
+    TEXT_DEBOUNCE_MS = 300
+
+    # 信号定义
+    result_published = Signal(str, object)  # 把统计量作为计算结果发布（表达式, 值）
+
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+        self.path = None           # 当前文件，为 None 时统计粘贴的文本
+        self.source_name = "数据"  # 历史记录中数据来源的名称
+        self.rows = []             # 当前统计结果 [(名称, 说明, 值)]
+        self.generation = 0
+        self.cancel_event = threading.Event()
+        self.publish_mean = False  # 统计完成后是否把平均值送到显示屏（打开文件或换列时）
+
+        self.init_ui()
+        self.text_timer = QTimer(self)
+        self.text_timer.setSingleShot(True)
+        self.text_timer.setInterval(self.TEXT_DEBOUNCE_MS)
+        self.text_timer.timeout.connect(self.use_text)
+        self.connect_signals()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(6)
+
+        toolbar = QHBoxLayout()
+        self.open_button = QPushButton("打开文件…")
+        toolbar.addWidget(self.open_button)
+        toolbar.addWidget(QLabel("列:"))
+        self.column_combo = QComboBox()
+        self.column_combo.setMinimumWidth(120)
+        toolbar.addWidget(self.column_combo, 1)
+        self.cancel_button = QPushButton("取消")
+        self.cancel_button.setEnabled(False)
+        toolbar.addWidget(self.cancel_button)
+        layout.addLayout(toolbar)
+
+        self.text_edit = QPlainTextEdit()
+        self.text_edit.setObjectName("statisticsInput")
+        self.text_edit.setPlaceholderText("粘贴数据（每行一个数，或用逗号、制表符分隔的多列），或打开 CSV/文本文件")
+        self.text_edit.setMaximumHeight(110)
+        layout.addWidget(self.text_edit)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setMaximumHeight(6)
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel()
+        self.status_label.setObjectName("statisticsStatus")
+        layout.addWidget(self.status_label)
+
+        self.table = QTableWidget(0, 2)
+        self.table.setHorizontalHeaderLabels(["统计量", "值"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setToolTip("双击把统计量送到显示屏")
+        layout.addWidget(self.table, 2)
+
+        self.histogram = HistogramView()
+        layout.addWidget(self.histogram, 1)
+
+    def connect_signals(self):
+        self.open_button.clicked.connect(self.open_file)
+        self.cancel_button.clicked.connect(self.cancel)
+        self.column_combo.activated.connect(self.on_column_activated)
+        self.text_edit.textChanged.connect(self.text_timer.start)
+        self.table.cellDoubleClicked.connect(self.publish_row)
+
+    @Slot()
+    def open_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "打开数据文件", "",
+                                              "数据文件 (*.csv *.tsv *.txt *.dat);;所有文件 (*)")
+        if path:
+            self.load_file(path)
+
+    def load_file(self, path):
+        """统计文件（先读第一行确定各列）"""
+        try:
+            first_line = read_first_line(path)
+        except OSError as e:
+            self.status_label.setText(f"无法打开文件: {e}")
+            return
+        self.path = path
+        self.source_name = os.path.basename(path)
+        self.set_columns(first_line)
+        self.start(publish_mean=True)
+
+    @Slot()
+    def on_column_activated(self):
+        self.start(publish_mean=True)
+
+    @Slot()
+    def use_text(self):
+        """改为统计粘贴的文本"""
+        text = self.text_edit.toPlainText()
+        self.path = None
+        self.source_name = "数据"
+        self.set_columns(text.lstrip("\n").partition("\n")[0].rstrip("\r"))
+        if text.strip():
+            self.start()
+        else:
+            self.cancel()
+            self.show_rows([])
+
+    def set_columns(self, first_line):
+        """按第一行更新列选择；列名不变时保持原来选中的列"""
+        _, names, _ = detect_layout(first_line)
+        existing = [self.column_combo.itemText(index) for index in range(self.column_combo.count())]
+        if names != existing:
+            self.column_combo.clear()
+            self.column_combo.addItems(names)
+
+    def start(self, publish_mean=False):
+        """
+        在工作线程中开始统计当前数据源的当前列（作废正在进行的统计）
+
+        Args:
+            publish_mean: 完成后把平均值作为计算结果送到显示屏（编辑粘贴的文本时不送，以免每次修改都记入历史）
+        """
+        self.cancel()
+        self.publish_mean = publish_mean
+        column = max(self.column_combo.currentIndex(), 0)
+        source = self.path if self.path is not None else self.text_edit.toPlainText().encode("utf-8")
+        self.cancel_event = threading.Event()
+        task = StatisticsTask(source, column, self.generation, self.cancel_event)
+        task.signals.progress.connect(self.on_progress)
+        task.signals.finished.connect(self.on_finished)
+        task.signals.failed.connect(self.on_failed)
+        self.progress_bar.setValue(0)
+        self.cancel_button.setEnabled(True)
+        self.status_label.setText(f"正在统计 {self.source_name} …")
+        QThreadPool.globalInstance().start(task)
+
+    @Slot()
+    def cancel(self):
+        """作废正在进行的统计"""
+        self.generation += 1
+        self.cancel_event.set()
+        self.cancel_button.setEnabled(False)
+        self.progress_bar.setValue(0)
+
+    @Slot(int, int)
+    def on_progress(self, generation, percent):
+        if generation == self.generation:
+            self.progress_bar.setValue(percent)
+
+    @Slot(int, object)
+    def on_finished(self, generation, statistics):
+        if generation != self.generation:
+            return
+        self.cancel_button.setEnabled(False)
+        self.progress_bar.setValue(100)
+        status = f"{self.source_name}：{statistics.moments.count} 个数值"
+        if statistics.skipped:
+            status += f"，跳过 {statistics.skipped} 个无法解析的值"
+        self.status_label.setText(status)
+        self.show_rows(statistics.summary())
+        self.histogram.set_bins(statistics.histogram.bins())
+        if self.publish_mean and statistics.moments.count:
+            self.publish_row(2)  # 平均值
+
+    @Slot(int, str)
+    def on_failed(self, generation, message):
+        if generation != self.generation:
+            return
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText(message)
+
+    def show_rows(self, rows):
+        self.rows = rows
+        self.table.setRowCount(len(rows))
+        for index, (_, label, value) in enumerate(rows):
+            self.table.setItem(index, 0, QTableWidgetItem(label))
+            text = "—" if isinstance(value, float) and math.isnan(value) else self.engine.format_result(value)
+            item = QTableWidgetItem(text)
+            item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            self.table.setItem(index, 1, item)
+        if not rows:
+            self.histogram.set_bins([])
+
+    @Slot(int)
+    def publish_row(self, row, column=0):
+        """把一个统计量作为计算结果发布，表达式形如 mean(data.csv:price)"""
+        if not 0 <= row < len(self.rows):
+            return
+        name, _, value = self.rows[row]
+        if isinstance(value, float) and math.isnan(value):
+            return
+        column_name = self.column_combo.currentText()
+        self.result_published.emit(f"{name}({self.source_name}:{column_name})", value)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工作表面板 - 逐行输入表达式和变量定义，每行的结果显示在右侧
+编辑时只把改动的几行交给工作表重新解析，工作表只重新计算受影响的行；
+结果区只绘制可见的行，行数再多也不影响绘制速度
+"""
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QPlainTextEdit
+from PySide6.QtCore import Qt, QRect, Property, Slot
+from PySide6.QtGui import QColor, QPainter
+
+from core.worksheet import Worksheet
+
+
+class ResultArea(QWidget):
+    """编辑器右侧的结果区"""
+
+    def __init__(self, editor):
+        super().__init__(editor)
+        self.editor = editor
+
+    def paintEvent(self, event):
+        self.editor.paint_results(event)
+
+
+class WorksheetEditor(QPlainTextEdit):
+    """工作表编辑器：左侧输入，右侧显示各行结果"""
+
+    # 结果区宽度（像素）
+    RESULT_AREA_WIDTH = 200
+
+    def __init__(self, worksheet, parent=None):
+        super().__init__(parent)
+        self.worksheet = worksheet
+        # 结果颜色可由样式表通过 qproperty-resultColor / qproperty-errorColor 设置
+        self.result_color = QColor("#4A90E2")
+        self.error_color = QColor("#E53E3E")
+
+        self.setObjectName("worksheetEditor")
+        self.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.setPlaceholderText("每行一个表达式，可用“名称 = 表达式”定义变量，例如：\n"
+                                "rate = 0.035\nprincipal = 100000\nmonthly = principal*rate/12")
+        self.result_area = ResultArea(self)
+        self.setViewportMargins(0, 0, self.RESULT_AREA_WIDTH, 0)
+
+        self.worksheet.set_text(self.toPlainText())
+        self.document().contentsChange.connect(self.on_contents_change)
+        self.updateRequest.connect(self.update_result_area)
+
+    def get_result_color(self):
+        return self.result_color
+
+    def set_result_color(self, color):
+        self.result_color = QColor(color)
+        self.result_area.update()
+
+    def get_error_color(self):
+        return self.error_color
+
+    def set_error_color(self, color):
+        self.error_color = QColor(color)
+        self.result_area.update()
+
+    resultColor = Property(QColor, get_result_color, set_result_color)
+    errorColor = Property(QColor, get_error_color, set_error_color)
+
+    @Slot(int, int, int)
+    def on_contents_change(self, position, removed, added):
+        """
+        把改动涉及的行交给工作表
+
+        改动后 [first, last] 行覆盖了新文本，它们替换原来的
+        last - first + 1 - (新增的行数) 行
+        """
+        document = self.document()
+        first = document.findBlock(position).blockNumber()
+        end = min(position + added, document.characterCount() - 1)
+        last = document.findBlock(end).blockNumber()
+        inserted = document.blockCount() - len(self.worksheet)
+        texts = [document.findBlockByNumber(number).text() for number in range(first, last + 1)]
+        self.worksheet.replace_lines(first, last + 1 - inserted, texts)
+        self.result_area.update()
+
+    @Slot(QRect, int)
+    def update_result_area(self, rect, dy):
+        """编辑器滚动或重绘时同步结果区"""
+        if dy:
+            self.result_area.scroll(0, dy)
+        else:
+            self.result_area.update(0, rect.y(), self.result_area.width(), rect.height())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        contents = self.contentsRect()
+        self.result_area.setGeometry(QRect(contents.right() - self.RESULT_AREA_WIDTH + 1, contents.top(),
+                                           self.RESULT_AREA_WIDTH, contents.height()))
+
+    def paint_results(self, event):
+        """绘制可见各行的结果"""
+        painter = QPainter(self.result_area)
+        painter.setFont(self.font())
+        painter.setPen(self.palette().color(self.palette().ColorRole.Mid))
+        painter.drawLine(0, event.rect().top(), 0, event.rect().bottom())
+
+        metrics = painter.fontMetrics()
+        width = self.RESULT_AREA_WIDTH - 16
+        block = self.firstVisibleBlock()
+        top = round(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
+        bottom = event.rect().bottom()
+        while block.isValid() and top <= bottom:
+            height = round(self.blockBoundingRect(block).height())
+            number = block.blockNumber()
+            if number < len(self.worksheet):
+                line = self.worksheet.line(number)
+                if line.error:
+                    painter.setPen(self.error_color)
+                    text = line.error
+                elif line.result:
+                    painter.setPen(self.result_color)
+                    text = f"= {line.result}"
+                else:
+                    text = ""
+                if text:
+                    painter.drawText(QRect(8, top, width, height), Qt.AlignRight | Qt.AlignVCenter,
+                                     metrics.elidedText(text, Qt.ElideRight, width))
+            block = block.next()
+            top += height
+
+
+class WorksheetPanel(QWidget):
+    """工作表面板"""
+
+    def __init__(self, engine):
+        super().__init__()
+        self.worksheet = Worksheet(engine, parent=self)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        self.editor = WorksheetEditor(self.worksheet)
+        layout.addWidget(self.editor)
+        # 角度模式无论从哪里改变（按钮、RPN 面板、撤销），三角函数的结果都要重新计算
+        engine.angle_mode_changed.connect(self.on_angle_mode_changed)
+
+    @Slot(str)
+    def on_angle_mode_changed(self, mode):
+        """角度模式改变后重新计算全部行并重绘结果区"""
+        self.worksheet.recompute_all()
+        self.editor.result_area.update()